@@ -1,106 +1,577 @@
-import json, math, os
+"""Score baseline par level : moteur vectorise (NumPy) + rapport Markdown/CSV/JSON.
 
-ROOT = r"C:\Tafor\Projet\pewpewloot"
+Toutes les vagues de data/worlds/world_*.json sont chargees UNE fois dans des
+tableaux plats (type, intervalle, count fixe, rows, score ennemi, level) ; la
+matrice level x enemy_density_multiplier x enemy_max_spawns_per_wave x
+multiplicateur d'override est ensuite calculee en une passe, sans boucle par
+vague. `analyze_level` reste la reference scalaire (meme formule que
+WaveManager._resolve_enemy_spawn_count) et sert au controle --check.
+
+Usage (racine du projet) :
+    python compute_scores.py                                  # rapport Markdown
+    python compute_scores.py --format csv --out scores.csv --density 1.0:2.0:0.1
+    python compute_scores.py --format json --max-spawns 60,120,220 --overrides 0,3,10
+    python compute_scores.py --check                          # parite vectorise / scalaire
+
+API :
+    from compute_scores import load_dataset, score_matrix
+    ds = load_dataset()
+    scores = score_matrix(ds, density=[1.0, 1.5], max_spawns=[None, 80])
+"""
+import argparse
+import csv
+import glob
+import io
+import json
+import math
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TOOLS = os.path.join(ROOT, "tools")
 SPAWN_STOP = 5.0
 
-with open(os.path.join(ROOT, "data", "enemies.json"), encoding="utf-8") as f:
-    enemies_data = json.load(f)
-# enemies.json only has forest enemies (5 archetypes). Scores are reused across worlds since enemy_id is the same name.
-ENEMY_SCORE = {e["id"]: e["score"] for e in enemies_data["enemies"]}
-# swarmer=10 fighter=25 tank=50 artillery=40 elite=100
-
-with open(os.path.join(ROOT, "data", "bosses.json"), encoding="utf-8") as f:
-    bosses_data = json.load(f)
-BOSS_SCORE = {b["id"]: b["score"] for b in bosses_data["bosses"]}
-
-with open(os.path.join(ROOT, "data", "game.json"), encoding="utf-8") as f:
-    game = json.load(f)
-gp = game["gameplay"]
-DENS_MULT = gp.get("enemy_density_multiplier", 1.0)
-DENS_CAP = gp.get("enemy_density_max_per_wave", 0)
-SWARM_DEFAULT = gp.get("swarm", {}).get("default_count", 35)
-TANK_DEFAULT_INTERVAL = gp.get("tank_wave", {}).get("default_interval_sec", 9.0)
-
-def compute_enemy_count(interval, force_duration, max_spawns):
+# Codes de type de vague dans les tableaux plats (cf. WaveManager._start_wave).
+WAVE_ENEMY = 0
+WAVE_SWARM = 1
+WAVE_TANK = 2
+WAVE_ARTILLERY = 3
+SCORED_WAVE_TYPES = {"enemy": WAVE_ENEMY, "swarm": WAVE_SWARM,
+                     "tank": WAVE_TANK, "artillery": WAVE_ARTILLERY}
+
+# Cles legacy de game.json > gameplay (DataManager._WAVE_TYPE_LEGACY_GAME_KEYS).
+_WAVE_TYPE_LEGACY_GAME_KEYS = {"swarm": "swarm", "tank": "tank_wave"}
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def world_paths(root=ROOT):
+    """data/worlds/world_N.json tries par N (world_10 apres world_9)."""
+    paths = glob.glob(os.path.join(root, "data", "worlds", "world_*.json"))
+    def order(p):
+        m = re.search(r"world_(\d+)\.json$", p)
+        return int(m.group(1)) if m else 0
+    return sorted(paths, key=order)
+
+
+def wave_type_config(wave_types, gameplay, wave_type):
+    """Miroir de DataManager.get_wave_type_config : wave_types.json d'abord,
+    puis le bloc legacy de game.json > gameplay."""
+    cfg = wave_types.get(wave_type, {})
+    if isinstance(cfg, dict) and cfg:
+        return cfg
+    legacy = gameplay.get(_WAVE_TYPE_LEGACY_GAME_KEYS.get(wave_type, wave_type), {})
+    return legacy if isinstance(legacy, dict) else {}
+
+
+def override_reward_multiplier(settings, active_count):
+    """Miroir de DataManager.get_override_reward_multiplier."""
+    count = max(0, min(int(active_count), 10))
+    base = float(settings.get("base_reward_multiplier", 1.0))
+    per_protocol = float(settings.get("per_protocol_multiplier", 0.2))
+    mapping = settings.get("reward_multiplier_by_active_count", {})
+    if isinstance(mapping, dict):
+        for i in range(count, -1, -1):
+            if str(i) in mapping:
+                return max(0.0, float(mapping[str(i)]))
+    elif isinstance(mapping, list) and len(mapping) > count:
+        return max(0.0, float(mapping[count]))
+    return max(0.0, base + per_protocol * count)
+
+
+def load_config(root=ROOT):
+    """Config dont depend le score : scores ennemis/boss, gameplay, wave_types."""
+    enemies_data = load_json(os.path.join(root, "data", "enemies.json"))
+    bosses_data = load_json(os.path.join(root, "data", "bosses.json"))
+    game = load_json(os.path.join(root, "data", "game.json"))
+    wave_types = load_json(os.path.join(root, "data", "wave_types.json"))
+    overrides_path = os.path.join(root, "data", "override_protocols.json")
+    overrides = load_json(overrides_path) if os.path.isfile(overrides_path) else {}
+    gp = game.get("gameplay", {})
+    return {
+        # Scores partages entre mondes : enemy_id identique, skin differente.
+        "enemy_score": {e["id"]: e.get("score", 0) for e in enemies_data["enemies"]},
+        "boss_score": {b["id"]: b.get("score", 0) for b in bosses_data["bosses"]},
+        "density_mult": gp.get("enemy_density_multiplier", 1.0),
+        "density_cap": gp.get("enemy_density_max_per_wave", 0),
+        "swarm_default": wave_type_config(wave_types, gp, "swarm").get("default_count", 35),
+        "tank_default_interval": wave_type_config(wave_types, gp, "tank").get("default_interval_sec", 9.0),
+        "override_settings": overrides.get("ui_settings", {}),
+        # Donnees brutes pour les simulateurs (tools/wave_timeline.py, ...).
+        "enemies": {e["id"]: e for e in enemies_data["enemies"]},
+        "bosses": {b["id"]: b for b in bosses_data["bosses"]},
+        "wave_types": wave_types,
+        "gameplay": gp,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reference scalaire (une vague a la fois)
+# ---------------------------------------------------------------------------
+
+def compute_enemy_count(interval, force_duration, max_spawns, dens_mult=1.0, dens_cap=0):
     spawn_window = max(0.1, force_duration - SPAWN_STOP)
     safe_interval = max(0.05, interval)
     base_count = max(1, math.ceil(spawn_window / safe_interval))
-    count = max(1, math.ceil(base_count * DENS_MULT))
+    count = max(1, math.ceil(base_count * dens_mult))
     max_count = max(1, max_spawns)
-    if DENS_CAP > 0:
-        max_count = min(max_count, DENS_CAP)
+    if dens_cap > 0:
+        max_count = min(max_count, dens_cap)
     return min(count, max_count)
 
+
 def compute_tank_count(interval, force_duration):
     spawn_window = max(0.1, force_duration - SPAWN_STOP)
     return max(1, math.ceil(spawn_window / max(0.1, interval)))
 
-def compute_artillery_count(wave, world_default):
-    rows = max(1, int(wave.get("rows", 3)))  # default artillery_rows = 3
-    requested = max(rows, int(wave.get("count", world_default)))
+
+def compute_artillery_count(wave, world_defaults):
+    rows = max(1, int(wave.get("rows", world_defaults.get("artillery_rows", 3))))
+    requested = max(rows, int(wave.get("count", world_defaults.get("artillery_count", 18))))
     count = math.ceil(requested / rows) * rows
+    max_units = int(wave.get("max_units", world_defaults.get("artillery_max_units", 0)))
+    if max_units > 0:
+        count = min(count, max(rows, (max_units // rows) * rows))
     return count
 
-def analyze_level(level, world_defaults):
+
+def resolve_wave_type(wave):
+    """Type effectif d'une vague (meme auto-correction que WaveManager._start_wave)."""
+    wtype = wave.get("type", "")
+    if wtype:
+        return wtype
+    if "obstacle_id" in wave:
+        return "obstacle"
+    if wave.get("enemy_id", "") == "artillery":
+        return "artillery"
+    return "enemy"
+
+
+def resolve_enemy_id(wave, wtype, enemy_score):
+    eid = wave.get("enemy_id", "")
+    if wtype == "tank" and (not eid or eid not in enemy_score):
+        return "tank"
+    if wtype == "artillery" and (not eid or eid not in enemy_score):
+        return "artillery"
+    if not eid or eid not in enemy_score:
+        return "swarmer" if "swarmer" in enemy_score else ""
+    return eid
+
+
+def analyze_level(level, world_defaults, config=None, dens_mult=None, max_spawns=None):
+    """enemy_id -> nombre d'ennemis (borne haute) pour un level."""
+    config = config or load_config()
+    dens_mult = config["density_mult"] if dens_mult is None else dens_mult
     force_duration = world_defaults.get("force_duration_sec", 20.0)
-    max_spawns = world_defaults.get("enemy_max_spawns_per_wave", 160)
-    artillery_default = world_defaults.get("artillery_count", 18)
-    artillery_rows = world_defaults.get("artillery_rows", 3)
+    if max_spawns is None:
+        max_spawns = world_defaults.get("enemy_max_spawns_per_wave", 160)
     target_interval = world_defaults.get("enemy_target_interval_sec", 1.0)
 
     enemy_counts = {}  # id -> count
     for wave in level.get("waves", []):
-        wtype = wave.get("type", "enemy")
-        if wtype == "obstacle" or wtype == "path_trial":
+        wtype = resolve_wave_type(wave)
+        if wtype not in SCORED_WAVE_TYPES:
             continue
-        eid = wave.get("enemy_id", "")
+        eid = resolve_enemy_id(wave, wtype, config["enemy_score"])
         if not eid:
             continue
         if wtype == "swarm":
-            c = max(1, int(wave.get("count", SWARM_DEFAULT)))
+            c = max(1, int(wave.get("count", config["swarm_default"])))
         elif wtype == "tank":
-            interval = max(0.1, float(wave.get("interval", TANK_DEFAULT_INTERVAL)))
+            interval = max(0.1, float(wave.get("interval", config["tank_default_interval"])))
             c = max(1, int(wave.get("count", compute_tank_count(interval, force_duration))))
         elif wtype == "artillery":
-            rows = max(1, int(wave.get("rows", artillery_rows)))
-            requested = max(rows, int(wave.get("count", artillery_default)))
-            c = math.ceil(requested / rows) * rows
+            c = compute_artillery_count(wave, world_defaults)
         else:
             interval = max(0.05, float(wave.get("interval", target_interval)))
-            c = compute_enemy_count(interval, force_duration, max_spawns)
+            c = compute_enemy_count(interval, force_duration, max_spawns,
+                                    dens_mult, config["density_cap"])
         enemy_counts[eid] = enemy_counts.get(eid, 0) + c
     return enemy_counts
 
-print("# Score baseline par level\n")
-world_totals = {}
-for i in range(1, 10):
-    path = os.path.join(ROOT, "data", "worlds", f"world_{i}.json")
-    with open(path, encoding="utf-8") as f:
-        world = json.load(f)
+
+# ---------------------------------------------------------------------------
+# Moteur vectorise
+# ---------------------------------------------------------------------------
+
+def level_rows(world, level, config):
+    """Un level -> metadonnees + lignes de vagues [kind, interval, fixed, rows, score, enemy_id].
+
+    Les vagues non-enemy (swarm/tank/artillery) ont un count independant de la
+    densite : il est resolu ici une fois pour toutes (`fixed`). Seules les
+    vagues `enemy` gardent leur intervalle pour le calcul batch. Resultat
+    JSON-serialisable (mis en cache par level, cf. tools/analysis_cache.py).
+    """
     defaults = world.get("wave_runtime_defaults", {})
-    print(f"\n## World {i}: {world.get('name','')}\n")
-    print(f"(force_duration={defaults.get('force_duration_sec')}, max_spawns={defaults.get('enemy_max_spawns_per_wave')}, target_interval={defaults.get('enemy_target_interval_sec')}, artillery_count={defaults.get('artillery_count')})\n")
-    print("| Niveau | Enemies (id x count) | Total ennemis | Score ennemis | Boss (score) | Total niveau | Cumulé |")
-    print("|---|---|---:|---:|---:|---:|---:|")
-    cum = 0
-    grand_total = 0
-    for lvl in world["levels"]:
-        counts = analyze_level(lvl, defaults)
-        enemy_breakdown = ", ".join(f"{eid}x{c}" for eid,c in counts.items())
-        n_enemies = sum(counts.values())
-        enemy_score = sum(c * ENEMY_SCORE.get(eid, 0) for eid,c in counts.items())
-        boss_id = lvl.get("boss_id", "")
-        boss_score = BOSS_SCORE.get(boss_id, 0) if boss_id else 0
-        level_total = enemy_score + boss_score
-        cum += level_total
-        boss_repr = f"{boss_id} ({boss_score})" if boss_id else "-"
-        print(f"| lvl_{lvl.get('index','?')} ({lvl.get('name','')}) | {enemy_breakdown} | {n_enemies} | {enemy_score} | {boss_repr} | {level_total} | {cum} |")
-        grand_total = cum
-    world_totals[i] = grand_total
-    print(f"\n**Total World {i} : {grand_total}**\n")
-
-print("\n## Récap: score baseline par world (somme des 6 niveaux)\n")
-print("| World | Total baseline |")
-print("|---|---:|")
-for i, t in world_totals.items():
-    print(f"| World {i} | {t} |")
+    force_duration = defaults.get("force_duration_sec", 20.0)
+    target_interval = defaults.get("enemy_target_interval_sec", 1.0)
+    boss_id = level.get("boss_id", "") or ""
+    waves = []
+    for wave in level.get("waves", []):
+        wtype = resolve_wave_type(wave)
+        kind = SCORED_WAVE_TYPES.get(wtype)
+        if kind is None:
+            continue
+        eid = resolve_enemy_id(wave, wtype, config["enemy_score"])
+        if not eid:
+            continue
+        interval, fixed, rows = 0.0, 0, 1
+        if kind == WAVE_ENEMY:
+            interval = max(0.05, float(wave.get("interval", target_interval)))
+        elif kind == WAVE_SWARM:
+            fixed = max(1, int(wave.get("count", config["swarm_default"])))
+        elif kind == WAVE_TANK:
+            interval = max(0.1, float(wave.get("interval", config["tank_default_interval"])))
+            fixed = max(1, int(wave.get("count", compute_tank_count(interval, force_duration))))
+        else:
+            rows = max(1, int(wave.get("rows", defaults.get("artillery_rows", 3))))
+            fixed = compute_artillery_count(wave, defaults)
+        waves.append([kind, interval, fixed, rows, config["enemy_score"].get(eid, 0), eid])
+    return {
+        "meta": {
+            "world_id": world.get("id", ""),
+            "world_name": world.get("name", ""),
+            "level_id": level.get("id", ""),
+            "level_index": level.get("index", 0),
+            "level_name": level.get("name", ""),
+            "boss_id": boss_id,
+            "defaults": defaults,
+        },
+        "spawn_window": max(0.1, force_duration - SPAWN_STOP),
+        "max_spawns": defaults.get("enemy_max_spawns_per_wave", 160),
+        "boss_score": config["boss_score"].get(boss_id, 0) if boss_id else 0,
+        "waves": waves,
+    }
+
+
+def _analysis_cache():
+    """tools/analysis_cache.py, importe comme le font les scripts de tools/
+    (`import analysis_cache`) : un seul module, jamais un double tools.analysis_cache."""
+    if TOOLS not in sys.path:
+        sys.path.insert(0, TOOLS)
+    import analysis_cache
+    return analysis_cache
+
+
+def load_dataset(root=ROOT, config=None, cache=None):
+    """Charge tous les mondes une fois et aplatit leurs vagues en tableaux NumPy.
+
+    `cache` : AnalysisCache optionnel (tools/analysis_cache.py) ; seuls les
+    levels dont le contenu ou la config ont change sont re-analyses.
+    """
+    config = config or load_config(root)
+    per_level = []
+    if cache is not None:
+        analysis_cache = _analysis_cache()
+        deps = analysis_cache.digest(analysis_cache.config_digest(root), "level_rows-v1")
+        for path in world_paths(root):
+            per_level.extend(cache.map_world_levels(path, deps, lambda w, l: level_rows(w, l, config)))
+    else:
+        for path in world_paths(root):
+            world = load_json(path)
+            per_level.extend(level_rows(world, lvl, config) for lvl in world.get("levels", []))
+
+    levels = []
+    wave_level, wave_kind, wave_interval, wave_fixed = [], [], [], []
+    wave_rows, wave_score, wave_enemy = [], [], []
+    for li, entry in enumerate(per_level):
+        levels.append(entry["meta"])
+        for kind, interval, fixed, rows, score, eid in entry["waves"]:
+            wave_level.append(li)
+            wave_kind.append(kind)
+            wave_interval.append(interval)
+            wave_fixed.append(fixed)
+            wave_rows.append(rows)
+            wave_score.append(score)
+            wave_enemy.append(eid)
+
+    return {
+        "config": config,
+        "levels": levels,
+        "wave_level": np.asarray(wave_level, dtype=np.int64),
+        "wave_kind": np.asarray(wave_kind, dtype=np.int8),
+        "wave_interval": np.asarray(wave_interval, dtype=np.float64),
+        "wave_fixed_count": np.asarray(wave_fixed, dtype=np.int64),
+        "wave_rows": np.asarray(wave_rows, dtype=np.int64),
+        "wave_score": np.asarray(wave_score, dtype=np.int64),
+        "wave_enemy_id": wave_enemy,
+        "level_spawn_window": np.asarray([e["spawn_window"] for e in per_level], dtype=np.float64),
+        "level_max_spawns": np.asarray([e["max_spawns"] for e in per_level], dtype=np.int64),
+        "level_boss_score": np.asarray([e["boss_score"] for e in per_level], dtype=np.int64),
+    }
+
+
+def _axis(values, default):
+    if values is None:
+        return [default]
+    return list(values) if np.ndim(values) else [values]
+
+
+def wave_counts(ds, density=None, max_spawns=None):
+    """Nombre d'ennemis par vague, shape (n_waves, n_density, n_max_spawns).
+
+    `max_spawns` : None = enemy_max_spawns_per_wave du monde, sinon valeur qui
+    le remplace pour tous les mondes (une entree None garde le defaut monde).
+    """
+    config = ds["config"]
+    dens = np.asarray(_axis(density, config["density_mult"]), dtype=np.float64)
+    spawns = _axis(max_spawns, None)
+    level = ds["wave_level"]
+    enemy = ds["wave_kind"] == WAVE_ENEMY
+
+    # (n_waves,) : base_count ne depend que de l'intervalle et de la fenetre.
+    safe_interval = np.maximum(0.05, np.where(enemy, ds["wave_interval"], 1.0))
+    base = np.maximum(1, np.ceil(ds["level_spawn_window"][level] / safe_interval))
+    # (n_waves, n_density) ; le round absorbe le bruit flottant avant ceil.
+    scaled = np.maximum(1, np.ceil(np.round(base[:, None] * dens[None, :], 9)))
+
+    # (n_waves, n_max_spawns)
+    caps = np.empty((len(level), len(spawns)), dtype=np.float64)
+    for j, value in enumerate(spawns):
+        per_level = ds["level_max_spawns"] if value is None else np.full_like(ds["level_max_spawns"], int(value))
+        caps[:, j] = np.maximum(1, per_level[level])
+    if config["density_cap"] > 0:
+        caps = np.minimum(caps, config["density_cap"])
+
+    counts = np.minimum(scaled[:, :, None], caps[:, None, :])
+    fixed = ds["wave_fixed_count"].astype(np.float64)[:, None, None]
+    return np.where(enemy[:, None, None], counts, fixed).astype(np.int64)
+
+
+def score_matrix(ds, density=None, max_spawns=None, overrides=None):
+    """Score baseline par level, shape (n_levels, n_density, n_max_spawns, n_overrides).
+
+    `overrides` : nombres de protocoles Override actifs (0..10) ; le score est
+    multiplie par reward_multiplier_by_active_count (meme resolution que
+    DataManager.get_override_reward_multiplier). Defaut : 0 (x1.0).
+    """
+    counts = wave_counts(ds, density, max_spawns)
+    wave_scores = counts * ds["wave_score"][:, None, None]
+    # Reduction vague -> level par produit matriciel (one-hot level x vague) :
+    # bien plus rapide que np.add.at sur de gros sweeps, exact en float64.
+    n_levels = len(ds["levels"])
+    onehot = np.zeros((n_levels, len(ds["wave_level"])), dtype=np.float64)
+    onehot[ds["wave_level"], np.arange(len(ds["wave_level"]))] = 1.0
+    flat = onehot @ wave_scores.reshape(len(ds["wave_level"]), -1).astype(np.float64)
+    level_scores = np.rint(flat).astype(np.int64).reshape((n_levels,) + wave_scores.shape[1:])
+    level_scores += ds["level_boss_score"][:, None, None]
+
+    active = _axis(overrides, 0)
+    mult = np.asarray([override_reward_multiplier(ds["config"]["override_settings"], c) for c in active])
+    return level_scores[..., None] * mult[None, None, None, :]
+
+
+def level_enemy_counts(ds, density=None, max_spawns=None):
+    """Detail enemy_id -> count par level pour le premier point (density, max_spawns)."""
+    counts = wave_counts(ds, density, max_spawns)[:, 0, 0]
+    result = [dict() for _ in ds["levels"]]
+    for li, eid, c in zip(ds["wave_level"].tolist(), ds["wave_enemy_id"], counts.tolist()):
+        result[li][eid] = result[li].get(eid, 0) + c
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Sorties
+# ---------------------------------------------------------------------------
+
+def iter_rows(ds, scores, density, max_spawns, overrides):
+    """Lignes plates (une par level x point de sweep) pour CSV/JSON."""
+    dens = _axis(density, ds["config"]["density_mult"])
+    spawns = _axis(max_spawns, None)
+    active = _axis(overrides, 0)
+    for li, lvl in enumerate(ds["levels"]):
+        for di, d in enumerate(dens):
+            for mi, m in enumerate(spawns):
+                for oi, o in enumerate(active):
+                    yield {
+                        "world_id": lvl["world_id"],
+                        "level_id": lvl["level_id"],
+                        "level_index": lvl["level_index"],
+                        "boss_id": lvl["boss_id"],
+                        "density_multiplier": d,
+                        "max_spawns": "" if m is None else m,
+                        "override_count": o,
+                        "score": round(float(scores[li, di, mi, oi]), 2),
+                    }
+
+
+CSV_FIELDS = ["world_id", "level_id", "level_index", "boss_id", "density_multiplier",
+              "max_spawns", "override_count", "score"]
+
+
+def write_csv(ds, scores, density, max_spawns, overrides, out):
+    """Meme contenu que iter_rows, mais les colonnes de sweep sont formatees une
+    seule fois : seul le score change d'un level a l'autre (gros sweeps)."""
+    dens = _axis(density, ds["config"]["density_mult"])
+    spawns = _axis(max_spawns, None)
+    active = _axis(overrides, 0)
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS)
+    buf = io.StringIO()
+    csv.writer(buf).writerows(
+        [d, "" if m is None else m, o] for d in dens for m in spawns for o in active)
+    sweep_cols = buf.getvalue().splitlines()
+    for li, lvl in enumerate(ds["levels"]):
+        buf = io.StringIO()
+        csv.writer(buf).writerow([lvl["world_id"], lvl["level_id"], lvl["level_index"], lvl["boss_id"]])
+        prefix = buf.getvalue().rstrip("\r\n") + ","
+        values = np.round(scores[li].reshape(-1), 2).tolist()
+        out.write("".join(prefix + cols + "," + repr(v) + "\n" for cols, v in zip(sweep_cols, values)))
+
+
+def write_npz(ds, scores, density, max_spawns, overrides, path):
+    """Matrice brute + axes, pour les sessions d'equilibrage (np.load)."""
+    np.savez_compressed(
+        path,
+        scores=scores,
+        level_id=np.asarray([lvl["level_id"] for lvl in ds["levels"]]),
+        world_id=np.asarray([lvl["world_id"] for lvl in ds["levels"]]),
+        density=np.asarray(_axis(density, ds["config"]["density_mult"]), dtype=np.float64),
+        max_spawns=np.asarray([-1 if m is None else m for m in _axis(max_spawns, None)], dtype=np.int64),
+        overrides=np.asarray(_axis(overrides, 0), dtype=np.int64),
+    )
+
+
+def write_json(rows, out):
+    json.dump(list(rows), out, ensure_ascii=False, indent=1)
+    out.write("\n")
+
+
+def print_markdown(ds, out=sys.stdout):
+    """Rapport historique (densite/max_spawns du jeu, sans override)."""
+    scores = score_matrix(ds)[:, 0, 0, 0].astype(np.int64)
+    counts = level_enemy_counts(ds)
+    worlds = {}
+    for li, lvl in enumerate(ds["levels"]):
+        worlds.setdefault(lvl["world_id"], []).append(li)
+
+    w = out.write
+    w("# Score baseline par level\n\n")
+    world_totals = {}
+    for world_id, indices in worlds.items():
+        first = ds["levels"][indices[0]]
+        d = first["defaults"]
+        w(f"\n## World {world_id.replace('world_', '')}: {first['world_name']}\n\n")
+        w(f"(force_duration={d.get('force_duration_sec')}, max_spawns={d.get('enemy_max_spawns_per_wave')}, "
+          f"target_interval={d.get('enemy_target_interval_sec')}, artillery_count={d.get('artillery_count')})\n\n")
+        w("| Niveau | Enemies (id x count) | Total ennemis | Score ennemis | Boss (score) | Total niveau | Cumulé |\n")
+        w("|---|---|---:|---:|---:|---:|---:|\n")
+        cum = 0
+        for li in indices:
+            lvl = ds["levels"][li]
+            enemy_breakdown = ", ".join(f"{eid}x{c}" for eid, c in counts[li].items())
+            boss_score = int(ds["level_boss_score"][li])
+            level_total = int(scores[li])
+            cum += level_total
+            boss_repr = f"{lvl['boss_id']} ({boss_score})" if lvl["boss_id"] else "-"
+            w(f"| lvl_{lvl['level_index']} ({lvl['level_name']}) | {enemy_breakdown} | "
+              f"{sum(counts[li].values())} | {level_total - boss_score} | {boss_repr} | "
+              f"{level_total} | {cum} |\n")
+        world_totals[world_id] = cum
+        w(f"\n**Total {world_id.replace('_', ' ').title()} : {cum}**\n\n")
+
+    w("\n## Récap: score baseline par world (somme des niveaux)\n\n")
+    w("| World | Total baseline |\n")
+    w("|---|---:|\n")
+    for world_id, t in world_totals.items():
+        w(f"| {world_id.replace('_', ' ').title()} | {t} |\n")
+
+
+def check_parity(ds, density, max_spawns):
+    """Compare le moteur vectorise a analyze_level, level par level."""
+    config = ds["config"]
+    mismatches = 0
+    levels_by_id = {}
+    for path in world_paths():
+        world = load_json(path)
+        for lvl in world.get("levels", []):
+            levels_by_id[lvl.get("id", "")] = (lvl, world.get("wave_runtime_defaults", {}))
+    scores = score_matrix(ds, density, max_spawns)
+    for di, d in enumerate(_axis(density, config["density_mult"])):
+        for mi, m in enumerate(_axis(max_spawns, None)):
+            for li, meta in enumerate(ds["levels"]):
+                lvl, defaults = levels_by_id[meta["level_id"]]
+                counts = analyze_level(lvl, defaults, config, dens_mult=d, max_spawns=m)
+                expected = sum(c * config["enemy_score"].get(eid, 0) for eid, c in counts.items())
+                expected += int(ds["level_boss_score"][li])
+                if expected != int(scores[li, di, mi, 0]):
+                    mismatches += 1
+                    print(f"MISMATCH {meta['level_id']} density={d} max_spawns={m}: "
+                          f"scalaire={expected} vectorise={int(scores[li, di, mi, 0])}")
+    return mismatches
+
+
+def parse_sweep(text, cast=float):
+    """'1.0,1.5,2' ou 'start:stop:step' (stop inclus) ; 'world' = defaut monde."""
+    if text is None:
+        return None
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        values = np.arange(start, stop + step / 2.0, step)
+        return [cast(round(float(v), 6)) for v in values]
+    return [None if v.strip() == "world" else cast(v) for v in text.split(",")]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Score baseline par level (worlds data/worlds)")
+    p.add_argument("--format", default="md", choices=["md", "csv", "json", "npz"])
+    p.add_argument("--out", help="Fichier de sortie (defaut stdout ; requis pour npz)")
+    p.add_argument("--density", help="Sweep enemy_density_multiplier: '1,1.5' ou '0.5:3:0.05'")
+    p.add_argument("--max-spawns",
+                   help="Sweep enemy_max_spawns_per_wave: '60,120,world' ou '40:220:20'")
+    p.add_argument("--overrides", help="Nombres de protocoles Override actifs: '0,3,10' ou '0:10:1'")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Ignore le cache par level (.cache/analysis, tools/analysis_cache.py)")
+    p.add_argument("--check", action="store_true",
+                   help="Verifie la parite moteur vectorise / analyze_level et sort")
+    args = p.parse_args()
+
+    density = parse_sweep(args.density)
+    max_spawns = parse_sweep(args.max_spawns, int)
+    overrides = parse_sweep(args.overrides, int)
+
+    t0 = time.perf_counter()
+    cache = None
+    if not args.no_cache:
+        cache = _analysis_cache().AnalysisCache("compute_scores")
+    ds = load_dataset(cache=cache)
+    if cache is not None:
+        print(cache.summary(), file=sys.stderr)
+    if args.check:
+        mismatches = check_parity(ds, density, max_spawns)
+        print(f"{len(ds['levels'])} levels, {mismatches} ecart(s)")
+        return 1 if mismatches else 0
+
+    if args.format == "md":
+        print_markdown(ds)
+        return 0
+    if args.format == "npz" and not args.out:
+        p.error("--out requis avec --format npz")
+
+    scores = score_matrix(ds, density, max_spawns, overrides)
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out and args.format != "npz" else sys.stdout
+    try:
+        if args.format == "npz":
+            write_npz(ds, scores, density, max_spawns, overrides, args.out)
+        elif args.format == "csv":
+            write_csv(ds, scores, density, max_spawns, overrides, out)
+        else:
+            write_json(iter_rows(ds, scores, density, max_spawns, overrides), out)
+        print(f"{scores.size} scores ({len(ds['levels'])} levels x {scores.shape[1]} densites x "
+              f"{scores.shape[2]} max_spawns x {scores.shape[3]} overrides) en "
+              f"{time.perf_counter() - t0:.3f}s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
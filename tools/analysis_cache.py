@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Content-hashed, size-bounded on-disk cache for the data analysis tools.
+
+Results are stored per level, keyed by a SHA-256 of the level object, its
+world's header (id, name, `wave_runtime_defaults`, ... : everything but the
+levels) and a digest of the shared config it depends
+on (enemies.json, bosses.json, game.json > gameplay, wave_types.json). A
+second tier maps a world file's raw bytes to its level keys, so an untouched
+world file is not even re-parsed. Editing one wave re-analyzes one level.
+
+Entries live under .cache/analysis/<namespace>/ (override with the
+PEWPEWLOOT_CACHE_DIR environment variable). When the cache grows past
+`max_bytes`, least recently used entries are evicted (hits refresh mtime).
+
+Run from repo root:
+    python tools/analysis_cache.py            # size / entry count per namespace
+    python tools/analysis_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.environ.get("PEWPEWLOOT_CACHE_DIR", REPO / ".cache" / "analysis"))
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CONFIG_FILES = ("enemies.json", "bosses.json", "wave_types.json")
+
+
+def digest(*parts):
+    """Stable SHA-256 of JSON-serialisable parts (key order independent)."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(json.dumps(part, sort_keys=True, ensure_ascii=False,
+                                separators=(",", ":")).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return digest(f.read())
+
+
+def config_digest(root=REPO):
+    """Digest of the shared config level analyses depend on."""
+    data_dir = Path(root) / "data"
+    parts = []
+    for name in CONFIG_FILES:
+        path = data_dir / name
+        parts.append(file_digest(path) if path.is_file() else "")
+    # Only the gameplay block of game.json matters; UI edits must not
+    # invalidate every level.
+    with open(data_dir / "game.json", encoding="utf-8") as f:
+        parts.append(json.load(f).get("gameplay", {}))
+    return digest(*parts)
+
+
+class AnalysisCache:
+    """One namespace (= one tool + result format version) of the cache."""
+
+    def __init__(self, namespace, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.namespace = namespace
+        self.root = Path(cache_dir or CACHE_DIR)
+        self.dir = self.root / namespace
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._written = 0
+
+    def _path(self, key):
+        return self.dir / key[:2] / (key + ".json")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU: a hit refreshes the entry
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic write: concurrent tools never read a half-written entry.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        self._written += path.stat().st_size
+        if self._written > self.max_bytes // 8:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the namespace fits max_bytes."""
+        self._written = 0
+        entries = []
+        total = 0
+        for path in self.dir.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def map_world_levels(self, world_path, deps, analyze, iter_levels=None):
+        """analyze(world, level) for every level of a world file, cached.
+
+        `deps` is the digest of everything besides the level itself that the
+        result depends on (config_digest() plus tool parameters). Returns the
+        list of results in level order. `iter_levels(world)` defaults to
+        world["levels"]. A level's key also covers the world header (every
+        key but "levels": id, name, multipliers, wave_runtime_defaults, ...),
+        which analyze() may copy into its result.
+        """
+        with open(world_path, "rb") as f:
+            raw = f.read()
+        file_key = digest("file", raw, deps)
+        level_keys = self.get(file_key)
+        if level_keys is not None:
+            cached = [self.get(k) for k in level_keys]
+            if all(v is not None for v in cached):
+                return [v["result"] for v in cached]
+
+        world = json.loads(raw.decode("utf-8"))
+        header = {k: v for k, v in world.items() if k != "levels"}
+        results, level_keys = [], []
+        levels = iter_levels(world) if iter_levels else world.get("levels", [])
+        for level in levels:
+            if not isinstance(level, dict):
+                continue
+            key = digest("level", level, header, deps)
+            entry = self.get(key)
+            if entry is None:
+                entry = {"result": analyze(world, level)}
+                self.put(key, entry)
+            results.append(entry["result"])
+            level_keys.append(key)
+        self.put(file_key, level_keys)
+        return results
+
+    def summary(self):
+        return f"cache {self.namespace}: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Inspect or clear the analysis cache")
+    p.add_argument("--clear", action="store_true", help="Delete every cached entry")
+    args = p.parse_args()
+    if args.clear:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"Cleared {CACHE_DIR}")
+        return 0
+    if not CACHE_DIR.is_dir():
+        print(f"No cache at {CACHE_DIR}")
+        return 0
+    for ns in sorted(d for d in CACHE_DIR.iterdir() if d.is_dir()):
+        files = list(ns.glob("*/*.json"))
+        size = sum(f.stat().st_size for f in files)
+        print(f"{ns.name}: {len(files)} entries, {size / 1024:.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
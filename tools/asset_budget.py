@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Asset size budgets: recompress PNG/JPG and report bytes per world and category.
+
+Every res:// file a world pulls in is attributed to it by walking the
+cross-reference index (tools/xref_index.py): the world JSON's own paths, then
+the enemies / bosses / obstacles / missiles / ... it references, their own
+references, and the ext_resources of every .tres / .tscn on the way. A file
+shared by several worlds counts in each of them (each world downloads and
+loads it). Each world row is followed by its per-category breakdown (the
+folder under assets/); the total counts every file once.
+
+Each image is also run through the cheapest encodings that stay within
+--min-psnr of the current pixels (premultiplied RGBA):
+    png  lossless re-encode (zlib level 9), then palette quantization to
+         256/128/64/32 colours (alpha kept through tRNS)
+    jpg  quality ladder 90..70 (optimised Huffman tables)
+and the smallest acceptable one is kept. Results are cached by file content
+(.cache/analysis/asset_budget-v1), so a rerun only re-encodes changed files;
+files are analysed in a process pool. --apply records what it wrote in
+tools/asset_budget_applied.json (path -> digest, encoding): a file still
+matching its record is never re-encoded, so lossy steps do not compound
+across runs (edit or replace the file and it is considered again).
+
+Budgets come from tools/asset_budgets.json: "world" (default per world),
+"worlds" (per world id overrides), "categories" (folder under assets/, per
+world) and "total", each with "bytes" and/or "decoded" (RGBA texture memory, the load
+time / RAM proxy). The exit status is 1 when a budget is exceeded.
+
+Godot re-imports textures (.ctex), so the APK gain of a lossless re-encode
+depends on the import mode; quantization shrinks both source and import.
+
+Run from repo root:
+    python tools/asset_budget.py                    # report, nothing written
+    python tools/asset_budget.py --apply            # write the smaller encodings
+    python tools/asset_budget.py --min-psnr 45 --no-quantize --json budget.json
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+import json_patch
+from analysis_cache import AnalysisCache, digest
+from xref_index import REPO, open_index
+
+BUDGETS = Path(__file__).resolve().parent / "asset_budgets.json"
+APPLIED = Path(__file__).resolve().parent / "asset_budget_applied.json"
+ASSET_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".ogg", ".wav", ".mp3", ".glb", ".ttf", ".otf")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+PALETTE_SIZES = (256, 128, 64, 32)
+JPG_QUALITIES = (90, 85, 80, 75, 70)
+SKIP_REF_KINDS = {"world", "level", "wave_type"}  # unlock chains and wave types carry no assets
+CACHE_VERSION = 1
+
+
+def res_to_rel(res):
+    return res[len("res://"):] if res.startswith("res://") else res
+
+
+def category(rel):
+    parts = rel.split("/")
+    return parts[1] if parts[0] == "assets" and len(parts) > 2 else parts[0]
+
+
+def _world_key(path):
+    return int(re.sub(r"\D", "", path.stem) or 0)
+
+
+def world_files(index, world_rel):
+    """Repo-relative paths of the files a world depends on (existing or not)."""
+    files, seen_ids, seen_res = set(), set(), set()
+    queue = list(index.references_in(world_rel))
+    while queue:
+        kind, ref_id, _, _ = queue.pop()
+        if kind == "res":
+            rel = res_to_rel(ref_id)
+            if rel in seen_res:
+                continue
+            seen_res.add(rel)
+            files.add(rel)
+            if rel.endswith((".tres", ".tscn")):
+                queue.extend(index.references_in(rel))
+        elif kind not in SKIP_REF_KINDS and (kind, ref_id) not in seen_ids:
+            seen_ids.add((kind, ref_id))
+            for _, _, def_file, def_loc in index.definitions(kind, ref_id):
+                queue.extend(index.references_in(def_file, def_loc))
+    return files
+
+
+# --- encodings ----------------------------------------------------------------
+
+def _premultiplied(img):
+    arr = np.asarray(img.convert("RGBA"), np.float32)
+    arr[..., :3] *= arr[..., 3:4] / 255.0
+    return arr
+
+
+def psnr(a, b):
+    mse = float(((a - b) ** 2).mean())
+    return 99.0 if mse == 0 else 10.0 * np.log10(255.0 * 255.0 / mse)
+
+
+def _encode(img, fmt, **opts):
+    buf = io.BytesIO()
+    img.save(buf, fmt, **opts)
+    return buf.getvalue()
+
+
+def candidates(img, ext, quantize):
+    """(label, bytes) encodings to try for one decoded image."""
+    if ext in (".jpg", ".jpeg"):
+        rgb = img.convert("RGB")
+        for q in JPG_QUALITIES:
+            yield f"jpg q{q}", _encode(rgb, "JPEG", quality=q, optimize=True)
+        return
+    if ext == ".webp":
+        yield "webp lossless", _encode(img, "WEBP", lossless=True, method=6)
+        return
+    yield "png lossless", _encode(img, "PNG", optimize=True)
+    if quantize:
+        rgba = img.convert("RGBA")
+        for colors in PALETTE_SIZES:
+            pal = rgba.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+            yield f"png {colors} colours", _encode(pal, "PNG", optimize=True)
+
+
+def analyze(path, min_psnr, quantize, recompress=True):
+    """Sizes of one file and its best acceptable encoding (not written).
+
+    recompress=False (file already rewritten by --apply) only measures it."""
+    raw = path.read_bytes()
+    result = {"bytes": len(raw), "decoded": 0, "best_bytes": len(raw), "encoding": "", "psnr": None}
+    ext = path.suffix.lower()
+    if ext not in IMAGE_EXTS:
+        return result
+    with Image.open(io.BytesIO(raw)) as img:
+        img.load()
+        result["decoded"] = img.width * img.height * 4
+        if not recompress:
+            return result
+        reference = _premultiplied(img)
+        for label, data in candidates(img, ext, quantize):
+            if len(data) >= result["best_bytes"]:
+                continue
+            with Image.open(io.BytesIO(data)) as out:
+                score = psnr(reference, _premultiplied(out))
+            if score >= min_psnr:
+                result.update(best_bytes=len(data), encoding=label, psnr=round(score, 1))
+    return result
+
+
+def encode_best(path, encoding):
+    """Re-run the chosen encoding of `path` (for --apply)."""
+    with Image.open(path) as img:
+        img.load()
+        for label, data in candidates(img, path.suffix.lower(), True):
+            if label == encoding:
+                return data
+    raise ValueError(f"{path}: unknown encoding {encoding}")
+
+
+def _analyze_job(job):
+    rel, min_psnr, quantize, recompress = job
+    return rel, analyze(REPO / rel, min_psnr, quantize, recompress)
+
+
+def load_applied(path=APPLIED):
+    """{rel: {"digest", "encoding"}} of the files --apply already rewrote."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def analyze_all(rels, min_psnr, quantize, workers, cache, applied=None):
+    params = {"min_psnr": min_psnr, "quantize": quantize, "version": CACHE_VERSION}
+    applied = applied or {}
+    results, todo, keys = {}, [], {}
+    for rel in rels:
+        raw_digest = digest((REPO / rel).read_bytes())
+        recompress = applied.get(rel, {}).get("digest") != raw_digest
+        key = digest("asset", raw_digest, params, recompress)
+        hit = cache.get(key)
+        if hit is not None:
+            results[rel] = hit
+        else:
+            keys[rel] = key
+            todo.append((rel, min_psnr, quantize, recompress))
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            done = list(pool.map(_analyze_job, todo, chunksize=4))
+    else:
+        done = [_analyze_job(job) for job in todo]
+    for rel, result in done:
+        cache.put(keys[rel], result)
+        results[rel] = result
+    return results, params
+
+
+# --- budgets ------------------------------------------------------------------
+
+def load_budgets(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check(totals, budget):
+    """List of 'metric used/limit' strings for the exceeded limits."""
+    over = []
+    for metric in ("bytes", "decoded"):
+        limit = (budget or {}).get(metric)
+        if limit and totals[metric] > limit:
+            over.append(f"{metric} {totals[metric] / 1e6:.1f}/{limit / 1e6:.1f} MB")
+    return over
+
+
+def summarize(rels, results):
+    return {"files": len(rels),
+            "bytes": sum(results[r]["bytes"] for r in rels),
+            "optimized": sum(results[r]["best_bytes"] for r in rels),
+            "decoded": sum(results[r]["decoded"] for r in rels)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Asset size budgets and lossless/perceptual recompression")
+    p.add_argument("--budgets", default=str(BUDGETS), help="Budget file (default tools/asset_budgets.json)")
+    p.add_argument("--min-psnr", type=float, default=40.0,
+                   help="Lowest PSNR (dB, premultiplied RGBA) accepted for a lossy encoding")
+    p.add_argument("--no-quantize", action="store_true", help="Lossless PNG re-encoding only")
+    p.add_argument("--min-gain", type=float, default=0.02, help="Minimum size reduction to rewrite a file")
+    p.add_argument("--apply", action="store_true", help="Write the smaller encodings in place")
+    p.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count, 1 = inline)")
+    p.add_argument("--no-cache", action="store_true", help="Ignore and do not fill the result cache")
+    p.add_argument("--json", help="Write the full report to this file")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    budgets = load_budgets(args.budgets)
+    with open_index() as index:
+        worlds = {path.stem: world_files(index, path.relative_to(REPO).as_posix())
+                  for path in sorted((REPO / "data" / "worlds").glob("world_*.json"), key=_world_key)}
+        referenced = {res_to_rel(row[0]) for row in index.db.execute("SELECT DISTINCT id FROM refs WHERE kind = 'res'")}
+    on_disk = {p.relative_to(REPO).as_posix() for p in (REPO / "assets").rglob("*")
+               if p.suffix.lower() in ASSET_EXTS} if (REPO / "assets").is_dir() else set()
+    all_files = sorted({r for r in referenced if r.lower().endswith(ASSET_EXTS) and (REPO / r).is_file()} | on_disk)
+    missing = sorted({r for files in worlds.values() for r in files
+                      if r.lower().endswith(ASSET_EXTS) and not (REPO / r).is_file()})
+
+    cache = AnalysisCache("asset_budget-v1", enabled=not args.no_cache)
+    ledger = load_applied()
+    results, params = analyze_all(all_files, args.min_psnr, not args.no_quantize,
+                                  args.workers or os.cpu_count() or 1, cache, ledger)
+
+    applied = []
+    if args.apply:
+        for rel, r in results.items():
+            if r["encoding"] and r["best_bytes"] <= r["bytes"] * (1 - args.min_gain):
+                data = encode_best(REPO / rel, r["encoding"])
+                tmp = REPO / (rel + ".tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, REPO / rel)
+                applied.append(rel)
+                ledger[rel] = {"digest": digest(data), "encoding": r["encoding"]}
+                new = dict(r, bytes=len(data), best_bytes=len(data), encoding="", psnr=None)
+                cache.put(digest("asset", digest(data), params, False), new)
+                results[rel] = new
+        if applied:
+            json_patch.write_json(APPLIED, dict(sorted(ledger.items())))
+
+    report = {"worlds": {}, "total": {}, "missing": missing, "applied": applied}
+    failures = []
+    print(f"{'group':<24} {'files':>5} {'MB':>7} {'optimal':>8} {'decoded':>8}  budget")
+    for world_id, files in worlds.items():
+        rels = sorted(r for r in files if r in results)
+        totals = summarize(rels, results)
+        budget = budgets.get("worlds", {}).get(world_id, budgets.get("world"))
+        over = check(totals, budget)
+        report["worlds"][world_id] = dict(totals, over=over, categories={})
+        failures += [f"{world_id}: {o}" for o in over]
+        print(f"{world_id:<24} {totals['files']:5d} {totals['bytes'] / 1e6:7.2f} {totals['optimized'] / 1e6:8.2f} "
+              f"{totals['decoded'] / 1e6:8.1f}  {'OVER ' + '; '.join(over) if over else 'ok'}")
+        by_category = {}
+        for rel in rels:
+            by_category.setdefault(category(rel), []).append(rel)
+        for name, cat_rels in sorted(by_category.items()):
+            totals = summarize(cat_rels, results)
+            over = check(totals, budgets.get("categories", {}).get(name))
+            report["worlds"][world_id]["categories"][name] = dict(totals, over=over)
+            failures += [f"{world_id}/{name}: {o}" for o in over]
+            print(f"{'  ' + name:<24} {totals['files']:5d} {totals['bytes'] / 1e6:7.2f} "
+                  f"{totals['optimized'] / 1e6:8.2f} {totals['decoded'] / 1e6:8.1f}  "
+                  f"{'OVER ' + '; '.join(over) if over else 'ok'}")
+    totals = summarize(all_files, results)
+    over = check(totals, budgets.get("total"))
+    report["total"] = dict(totals, over=over)
+    failures += [f"total: {o}" for o in over]
+    print(f"{'total':<24} {totals['files']:5d} {totals['bytes'] / 1e6:7.2f} {totals['optimized'] / 1e6:8.2f} "
+          f"{totals['decoded'] / 1e6:8.1f}  {'OVER ' + '; '.join(over) if over else 'ok'}")
+
+    if args.json:
+        report["files"] = results
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if missing:
+        print(f"{len(missing)} referenced asset(s) missing on disk (xref_index.py dangling --kind res)", file=sys.stderr)
+    for failure in failures:
+        print(f"over budget: {failure}", file=sys.stderr)
+    print(f"{len(all_files)} file(s), {len(applied)} rewritten, {cache.summary()}, "
+          f"{time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
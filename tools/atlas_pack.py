@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Pack the static obstacle sprites of each world into texture atlases.
+
+Every world's skin_overrides.obstacles lists small per-world PNGs (e.g.
+forest_obstacle_circle_1..4.png), each its own texture, file open and bind
+during level warmup. This packs the PNGs a world references into one (or a
+few, past --max-size) atlas pages with MaxRects (best short side fit) and
+writes one Godot AtlasTexture .tres per sprite, so the loaders keep getting
+a Texture2D of the original size:
+
+    assets/atlases/<group>_<page>.png
+    assets/atlases/<group>/<sprite>.tres    (atlas + region)
+
+Groups are the worlds (skin_overrides.obstacles) plus "obstacles" for the
+sprite_path lists of data/obstacles.json; a sprite used by several worlds
+is packed into each of their pages so a world's warmup only opens its own.
+Each sprite is extruded by --extrude px (edge pixels repeated) so bilinear
+filtering does not bleed neighbours in.
+
+Only static PNG obstacle skins are packed: enemy and boss skins are .tres
+SpriteFrames, and Game.gd / LoadingScreen.gd treat any .tres enemy/boss skin
+as animation frames, so an AtlasTexture there would be misread.
+
+--rewrite replaces the packed PNG paths in the JSON with their .tres
+(minimal-diff writes through tools/json_patch.py); without it the JSON is
+left untouched and the .tres can be wired by hand.
+
+Run from repo root:
+    python tools/atlas_pack.py --dry-run
+    python tools/atlas_pack.py --worlds world_1,world_3 --max-size 1024
+    python tools/atlas_pack.py --rewrite
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+import json_patch
+
+REPO = Path(__file__).resolve().parents[1]
+WORLDS_DIR = REPO / "data" / "worlds"
+OBSTACLES_JSON = REPO / "data" / "obstacles.json"
+DEFAULT_OUT = "res://assets/atlases"
+
+
+def res_to_path(res):
+    return REPO / res.replace("res://", "", 1)
+
+
+def _world_key(path):
+    return int(re.sub(r"\D", "", path.stem) or 0)
+
+
+def collect(worlds=None):
+    """group -> ordered unique res:// PNG paths referenced by that group."""
+    groups = {}
+    for path in sorted(WORLDS_DIR.glob("world_*.json"), key=_world_key):
+        if worlds and path.stem not in worlds:
+            continue
+        data = json.loads(path.read_text(encoding="utf-8"))
+        obstacles = data.get("skin_overrides", {}).get("obstacles", {})
+        found = groups.setdefault(path.stem, [])
+        for sprites in obstacles.values() if isinstance(obstacles, dict) else ():
+            for res in sprites if isinstance(sprites, list) else ():
+                if isinstance(res, str) and res.lower().endswith(".png") and res not in found:
+                    found.append(res)
+    if not worlds or "obstacles" in worlds:
+        data = json.loads(OBSTACLES_JSON.read_text(encoding="utf-8"))
+        found = groups.setdefault("obstacles", [])
+        for obstacle in data.get("obstacles", {}).values():
+            sprites = obstacle.get("sprite_path", [])
+            for res in sprites if isinstance(sprites, list) else [sprites]:
+                if isinstance(res, str) and res.lower().endswith(".png") and res not in found:
+                    found.append(res)
+    return {g: paths for g, paths in groups.items() if paths}
+
+
+# --- MaxRects -----------------------------------------------------------------
+
+class MaxRects:
+    """One page: free rectangles as (x, y, w, h), best-short-side-fit placement."""
+
+    def __init__(self, size):
+        self.size = size
+        self.free = [(0, 0, size, size)]
+        self.used = []
+
+    def find(self, w, h):
+        """(score, x, y) of the best free spot for a w x h box, or None."""
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                score = (min(fw - w, fh - h), max(fw - w, fh - h))
+                if best is None or score < best[0]:
+                    best = (score, fx, fy)
+        return best
+
+    def place(self, x, y, w, h):
+        new_free = []
+        for free in self.free:
+            new_free.extend(self._split(free, (x, y, w, h)))
+        # Prune free rectangles contained in another one.
+        new_free.sort(key=lambda r: -r[2] * r[3])
+        pruned = []
+        for r in new_free:
+            if not any(o[0] <= r[0] and o[1] <= r[1] and o[0] + o[2] >= r[0] + r[2]
+                       and o[1] + o[3] >= r[1] + r[3] for o in pruned):
+                pruned.append(r)
+        self.free = pruned
+        self.used.append((x, y, w, h))
+
+    @staticmethod
+    def _split(free, used):
+        fx, fy, fw, fh = free
+        ux, uy, uw, uh = used
+        if ux >= fx + fw or ux + uw <= fx or uy >= fy + fh or uy + uh <= fy:
+            return [free]
+        out = []
+        if ux > fx:
+            out.append((fx, fy, ux - fx, fh))
+        if ux + uw < fx + fw:
+            out.append((ux + uw, fy, fx + fw - ux - uw, fh))
+        if uy > fy:
+            out.append((fx, fy, fw, uy - fy))
+        if uy + uh < fy + fh:
+            out.append((fx, uy + uh, fw, fy + fh - uy - uh))
+        return out
+
+    def extent(self):
+        return (max((x + w for x, _, w, _ in self.used), default=1),
+                max((y + h for _, y, _, h in self.used), default=1))
+
+
+def pack(sizes, max_size, border):
+    """Place (w, h) boxes (each grown by `border` on every side) on as few pages as needed.
+
+    Returns ([(page, x, y)] per input in input order, [MaxRects pages]);
+    x, y is the top-left of the sprite itself, inside its border.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-max(sizes[i]), -sizes[i][0] * sizes[i][1]))
+    pages, placed = [], [None] * len(sizes)
+    for i in order:
+        w, h = sizes[i][0] + 2 * border, sizes[i][1] + 2 * border
+        if w > max_size or h > max_size:
+            raise ValueError(f"sprite {sizes[i][0]}x{sizes[i][1]} does not fit a {max_size}px page")
+        best = None
+        for p, page in enumerate(pages):
+            spot = page.find(w, h)
+            if spot and (best is None or spot[0] < best[0]):
+                best = (spot[0], p, spot[1], spot[2])
+        if best is None:
+            pages.append(MaxRects(max_size))
+            _, x, y = pages[-1].find(w, h)
+            best = (None, len(pages) - 1, x, y)
+        _, p, x, y = best
+        pages[p].place(x, y, w, h)
+        placed[i] = (p, x + border, y + border)
+    return placed, pages
+
+
+def _pot(n):
+    return 1 << max(0, int(n - 1).bit_length())
+
+
+def blit(page, sprite, x, y, extrude):
+    """Copy `sprite` at (x, y) and repeat its edge pixels `extrude` px outwards."""
+    h, w = sprite.shape[:2]
+    padded = np.pad(sprite, ((extrude, extrude), (extrude, extrude), (0, 0)), mode="edge") if extrude else sprite
+    page[y - extrude:y + h + extrude, x - extrude:x + w + extrude] = padded
+
+
+def atlas_tres(page_res, x, y, w, h):
+    return (f'[gd_resource type="AtlasTexture" load_steps=2 format=3]\n\n'
+            f'[ext_resource type="Texture2D" path="{page_res}" id="1_atlas"]\n\n'
+            f'[resource]\natlas = ExtResource("1_atlas")\nregion = Rect2({x}, {y}, {w}, {h})\n')
+
+
+def build_group(group, sprites, out_res, max_size, padding, extrude, pot, dry_run):
+    """Pack one group; returns (mapping png res -> tres res, report dict)."""
+    images, missing = {}, []
+    for res in sprites:
+        path = res_to_path(res)
+        if not path.is_file():
+            missing.append(res)
+            continue
+        with Image.open(path) as img:
+            images[res] = np.asarray(img.convert("RGBA"))
+    names = list(images)
+    sizes = [(images[r].shape[1], images[r].shape[0]) for r in names]
+    border = extrude + (padding + 1) // 2
+    placed, pages = pack(sizes, max_size, border) if names else ([], [])
+
+    mapping, page_files = {}, []
+    canvases = []
+    for page in pages:
+        w, h = page.extent()
+        if pot:
+            w, h = _pot(w), _pot(h)
+        canvases.append(np.zeros((h, w, 4), np.uint8))
+    for res, (p, x, y) in zip(names, placed):
+        blit(canvases[p], images[res], x, y, extrude)
+    stems = {}
+    for res, (p, x, y) in zip(names, placed):
+        stem = Path(res).stem
+        stems[stem] = stems.get(stem, 0) + 1
+        if stems[stem] > 1:  # same file name from two folders
+            stem = f"{stem}_{stems[stem]}"
+        page_res = f"{out_res}/{group}_{p}.png"
+        tres_res = f"{out_res}/{group}/{stem}.tres"
+        mapping[res] = tres_res
+        if not dry_run:
+            tres = res_to_path(tres_res)
+            tres.parent.mkdir(parents=True, exist_ok=True)
+            h, w = images[res].shape[:2]
+            tres.write_text(atlas_tres(page_res, x, y, w, h), encoding="utf-8")
+    for p, canvas in enumerate(canvases):
+        page_res = f"{out_res}/{group}_{p}.png"
+        page_files.append({"page": page_res, "size": f"{canvas.shape[1]}x{canvas.shape[0]}"})
+        if not dry_run:
+            dest = res_to_path(page_res)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(canvas, "RGBA").save(dest, "PNG", optimize=True)
+
+    sprite_area = sum(w * h for w, h in sizes)
+    page_area = sum(c.shape[0] * c.shape[1] for c in canvases)
+    return mapping, {"group": group, "sprites": len(names), "missing": missing, "pages": page_files,
+                     "fill": round(sprite_area / page_area, 3) if page_area else 0.0}
+
+
+def rewrite_json(mappings):
+    """Swap packed PNG paths for their .tres in the worlds / obstacles.json."""
+    changed = []
+    for group, mapping in mappings.items():
+        if not mapping:
+            continue
+        if group == "obstacles":
+            path = OBSTACLES_JSON
+            data = json.loads(path.read_text(encoding="utf-8"))
+            for obstacle in data.get("obstacles", {}).values():
+                sprites = obstacle.get("sprite_path")
+                if isinstance(sprites, list):
+                    obstacle["sprite_path"] = [mapping.get(s, s) for s in sprites]
+        else:
+            path = WORLDS_DIR / f"{group}.json"
+            data = json.loads(path.read_text(encoding="utf-8"))
+            obstacles = data.get("skin_overrides", {}).get("obstacles", {})
+            for key, sprites in obstacles.items():
+                if isinstance(sprites, list):
+                    obstacles[key] = [mapping.get(s, s) if isinstance(s, str) else s for s in sprites]
+        if json_patch.write_json(path, data):
+            changed.append(path.relative_to(REPO).as_posix())
+    return changed
+
+
+def main():
+    p = argparse.ArgumentParser(description="Pack world obstacle sprites into AtlasTexture pages")
+    p.add_argument("--worlds", default="",
+                   help="Comma-separated groups (world ids, 'obstacles' for obstacles.json; default: all)")
+    p.add_argument("--out", default=DEFAULT_OUT, help=f"res:// folder of the pages and .tres (default {DEFAULT_OUT})")
+    p.add_argument("--max-size", type=int, default=2048, help="Page side limit in px (default 2048)")
+    p.add_argument("--padding", type=int, default=2, help="Transparent gap between sprites (px)")
+    p.add_argument("--extrude", type=int, default=1, help="Edge pixels repeated around each sprite (px)")
+    p.add_argument("--pot", action="store_true", help="Round page sizes up to powers of two")
+    p.add_argument("--rewrite", action="store_true", help="Point the JSON at the generated .tres")
+    p.add_argument("--dry-run", action="store_true", help="Pack and report, write nothing")
+    p.add_argument("--json", help="Write the packing report to this file")
+    args = p.parse_args()
+    if not args.out.startswith("res://"):
+        p.error("--out must be a res:// path")
+
+    selected = {w.strip() for w in args.worlds.split(",") if w.strip()}
+    t0 = time.perf_counter()
+    mappings, reports = {}, []
+    for group, sprites in collect(selected).items():
+        try:
+            mapping, report = build_group(group, sprites, args.out.rstrip("/"), args.max_size,
+                                          args.padding, args.extrude, args.pot, args.dry_run)
+        except ValueError as exc:
+            print(f"{group}: {exc}", file=sys.stderr)
+            return 1
+        mappings[group] = mapping
+        reports.append(report)
+        pages = ", ".join(f"{pg['size']}" for pg in report["pages"]) or "-"
+        print(f"{group:<10} {report['sprites']:>3} sprite(s) -> {len(report['pages'])} page(s) [{pages}] "
+              f"fill {report['fill'] * 100:.0f}%" + (f", {len(report['missing'])} missing" if report["missing"] else ""))
+        for res in report["missing"]:
+            print(f"    missing: {res}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+    if args.rewrite and not args.dry_run:
+        for rel in rewrite_json(mappings):
+            print(f"W {rel}")
+    packed = sum(r["sprites"] for r in reports)
+    pages = sum(len(r["pages"]) for r in reports)
+    print(f"{packed} sprite(s) in {pages} page(s) in {time.perf_counter() - t0:.2f}s"
+          + (" (dry run)" if args.dry_run else ""), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
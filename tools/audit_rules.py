@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""Rule registry for the data audit (tools/audit_waves.py).
+
+A rule is a generator registered with @rule(rule_id, target, severity): it
+receives one parsed data file and the shared known-id context, and yields
+(json_path, message) pairs. Rule ids are stable - never renumber one, retire
+it instead - so editor integrations and CI filters can rely on them.
+
+Targets and the files they run on (TARGET_FILES):
+  world      data/worlds/world_*.json   (W0xx)
+  bosses     data/bosses.json           (B0xx)
+  enemies    data/enemies.json          (E0xx)
+  loot       data/loot_table.json, data/loot/uniques.json (L0xx)
+  skills     data/skills.json           (S0xx)
+  wave_types data/wave_types.json       (T0xx)
+
+X0xx findings are structural and always reported, whatever --rules selects:
+X001 invalid JSON (tools/audit_waves.py), X002 a top level that is not an
+object where the target needs one (run_rules).
+"""
+
+from pathlib import Path
+
+import xref_index
+
+REPO = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO / "data"
+
+SEVERITIES = ("error", "warning", "info")
+
+# WaveManager._start_wave dispatch; anything else plays as an enemy wave.
+RUNTIME_WAVE_TYPES = {
+    "enemy", "obstacle", "snake", "gate_runner", "pong", "breakout",
+    "ball_launcher", "vertical_climb", "lane_runner", "slice_rush", "match3",
+    "gravity_hole", "star_drift", "suika_up", "survivor", "asteroid_split",
+    "swarm", "tank", "artillery",
+}
+# Waves that spawn regular enemies and therefore need an enemy_id.
+ENEMY_WAVE_TYPES = {"enemy", "swarm", "tank", "artillery"}
+WAVE_PATTERN_KEYS = ("pattern_id", "move_pattern_id")
+# Keys of wave_types.json that are not wave types.
+WAVE_TYPES_META_KEYS = {"ship_swap_transition_anim", "effect_labels_enabled"}
+TARGET_FILES = {
+    "world": ("worlds/world_*.json",),
+    "bosses": ("bosses.json",),
+    "enemies": ("enemies.json",),
+    "loot": ("loot_table.json", "loot/uniques.json"),
+    "skills": ("skills.json",),
+    "wave_types": ("wave_types.json",),
+}
+
+# Targets whose files must be a JSON object (bosses / enemies also accept a bare list).
+OBJECT_TARGETS = {"world", "loot", "skills", "wave_types"}
+
+RULES = {}
+
+
+class Rule:
+    def __init__(self, rule_id, target, severity, summary, check):
+        self.id = rule_id
+        self.target = target
+        self.severity = severity
+        self.summary = summary
+        self.check = check
+
+
+def rule(rule_id, target, severity, summary):
+    """Register a rule. `check(data, ctx, rel_path)` yields (json_path, message)."""
+    if severity not in SEVERITIES:
+        raise ValueError(f"{rule_id}: unknown severity '{severity}'")
+    if target not in TARGET_FILES:
+        raise ValueError(f"{rule_id}: unknown target '{target}'")
+
+    def register(check):
+        if rule_id in RULES:
+            raise ValueError(f"duplicate rule id {rule_id}")
+        RULES[rule_id] = Rule(rule_id, target, severity, summary, check)
+        return check
+    return register
+
+
+# --- known-id context -------------------------------------------------------
+
+# ctx key -> xref_index kind.
+CONTEXT_KINDS = {
+    "enemy_ids": "enemy",
+    "obstacle_ids": "obstacle",
+    "pattern_ids": "move_pattern",
+    "missile_pattern_ids": "missile_pattern",
+    "missile_ids": "missile",
+    "boss_power_ids": "boss_power",
+    "unique_power_ids": "unique_power",
+    "boss_ids": "boss",
+    "unique_ids": "unique",
+    "slot_ids": "slot",
+}
+
+
+def build_context():
+    """Every id set the rules cross-check against, as sorted lists (picklable, hashable).
+
+    Read from the cross-reference index (tools/xref_index.py), which also
+    covers the move patterns built into Boss.gd / Enemy.gd.
+    """
+    with xref_index.open_index() as index:
+        ctx = {key: index.defined_ids(kind) for key, kind in CONTEXT_KINDS.items()}
+        # Sections of wave_types.json only, not the WaveManager built-ins.
+        ctx["wave_type_ids"] = index.defined_ids("wave_type", "data/wave_types.json")
+    return {k: sorted(v) for k, v in ctx.items()}
+
+
+def iter_levels(world_data):
+    levels = []
+    if isinstance(world_data, dict):
+        if "levels" in world_data and isinstance(world_data["levels"], list):
+            levels = world_data["levels"]
+        elif "_levels" in world_data and isinstance(world_data["_levels"], list):
+            levels = world_data["_levels"]
+        else:
+            for key in ("normal_levels", "boss_level"):
+                if key in world_data:
+                    val = world_data[key]
+                    if isinstance(val, list):
+                        levels.extend(val)
+                    elif isinstance(val, dict):
+                        levels.append(val)
+    return levels
+
+
+def _iter_waves(world):
+    for li, level in enumerate(iter_levels(world)):
+        if not isinstance(level, dict):
+            continue
+        waves = level.get("waves", [])
+        if not isinstance(waves, list):
+            continue
+        for wi, wave in enumerate(waves):
+            if isinstance(wave, dict):
+                yield f"levels[{li}].waves[{wi}]", level, wave
+
+
+def _effective_wave_type(wave):
+    """Type as WaveManager._start_wave resolves it."""
+    wave_type = str(wave.get("type", ""))
+    if wave_type == "":
+        if "obstacle_id" in wave:
+            return "obstacle"
+        if str(wave.get("enemy_id", "")) == "artillery":
+            return "artillery"
+        return "enemy"
+    return wave_type
+
+
+def _known_move_pattern(ctx, pattern_id):
+    return pattern_id in ctx["pattern_ids"]
+
+
+def prepare_context(ctx):
+    """Sets for fast lookups inside a worker (done once per process)."""
+    return {k: set(v) for k, v in ctx.items()}
+
+
+# --- world rules ------------------------------------------------------------
+
+@rule("W001", "world", "error", "wave type has no WaveManager handler")
+def unknown_wave_type(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        wave_type = _effective_wave_type(wave)
+        if wave_type not in RUNTIME_WAVE_TYPES:
+            yield f"{path}.type", f"unknown type '{wave_type}' -> played as an enemy wave"
+
+
+@rule("W002", "world", "error", "enemy wave without enemy_id")
+def missing_enemy_id(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        if _effective_wave_type(wave) == "enemy" and not wave.get("enemy_id"):
+            yield path, "no enemy_id -> WaveManager falls back to swarmer"
+
+
+@rule("W003", "world", "error", "enemy_id not in enemies.json")
+def unknown_enemy_id(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        enemy_id = wave.get("enemy_id")
+        if enemy_id and _effective_wave_type(wave) in ENEMY_WAVE_TYPES and enemy_id not in ctx["enemy_ids"]:
+            yield f"{path}.enemy_id", f"enemy_id '{enemy_id}' not in enemies.json"
+
+
+@rule("W004", "world", "error", "obstacle wave without obstacle_id")
+def missing_obstacle_id(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        if _effective_wave_type(wave) == "obstacle" and not wave.get("obstacle_id"):
+            yield path, "type=obstacle but no obstacle_id"
+
+
+@rule("W005", "world", "error", "obstacle_id not in obstacles.json")
+def unknown_obstacle_id(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        obstacle_id = wave.get("obstacle_id")
+        if obstacle_id and ctx["obstacle_ids"] and obstacle_id not in ctx["obstacle_ids"]:
+            yield f"{path}.obstacle_id", f"obstacle_id '{obstacle_id}' not in obstacles.json"
+
+
+@rule("W006", "world", "warning", "obstacle_id without explicit type")
+def implicit_obstacle_type(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        if "type" not in wave and wave.get("obstacle_id"):
+            yield path, "obstacle_id present but type missing -> auto-corrected at runtime"
+
+
+@rule("W007", "world", "warning", "spawn interval outside (0, duration]")
+def suspect_interval(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        interval = wave.get("interval")
+        duration = wave.get("duration", 20.0)
+        if _effective_wave_type(wave) == "enemy" and isinstance(interval, (int, float)) \
+                and (interval <= 0 or interval > duration):
+            yield f"{path}.interval", f"suspect interval={interval} duration={duration}"
+
+
+@rule("W008", "world", "error", "wave move pattern not in move_patterns.json nor built in")
+def unknown_wave_pattern(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        for key in WAVE_PATTERN_KEYS:
+            pattern_id = wave.get(key)
+            if pattern_id and not _known_move_pattern(ctx, pattern_id):
+                yield f"{path}.{key}", f"{key} '{pattern_id}' is not a known move pattern"
+
+
+@rule("W009", "world", "error", "boss_id not in bosses.json")
+def unknown_level_boss(world, ctx, rel):
+    for li, level in enumerate(iter_levels(world)):
+        if isinstance(level, dict) and level.get("boss_id") and level["boss_id"] not in ctx["boss_ids"]:
+            yield f"levels[{li}].boss_id", f"boss_id '{level['boss_id']}' not in bosses.json"
+
+
+@rule("W010", "world", "warning", "level without waves")
+def empty_level(world, ctx, rel):
+    for li, level in enumerate(iter_levels(world)):
+        if isinstance(level, dict) and not level.get("waves"):
+            yield f"levels[{li}]", f"level '{level.get('id', '?')}' has no waves"
+
+
+@rule("W011", "world", "error", "duplicate level id")
+def duplicate_level_id(world, ctx, rel):
+    seen = set()
+    for li, level in enumerate(iter_levels(world)):
+        level_id = level.get("id") if isinstance(level, dict) else None
+        if level_id in seen:
+            yield f"levels[{li}].id", f"level id '{level_id}' already used in this world"
+        seen.add(level_id)
+
+
+@rule("W012", "world", "info", "wave type without a wave_types.json section")
+def unconfigured_minigame(world, ctx, rel):
+    for path, _, wave in _iter_waves(world):
+        wave_type = _effective_wave_type(wave)
+        if wave_type in RUNTIME_WAVE_TYPES and wave_type not in ENEMY_WAVE_TYPES | {"obstacle"} \
+                and wave_type not in ctx["wave_type_ids"]:
+            yield f"{path}.type", f"'{wave_type}' runs on built-in defaults (no wave_types.json section)"
+
+
+# --- boss rules -------------------------------------------------------------
+
+def _bosses(data):
+    bosses = data.get("bosses", []) if isinstance(data, dict) else data
+    for bi, boss in enumerate(bosses if isinstance(bosses, list) else []):
+        if isinstance(boss, dict):
+            yield f"bosses[{bi}]", boss
+
+
+def _phases(boss_path, boss):
+    phases = boss.get("phases", [])
+    for pi, phase in enumerate(phases if isinstance(phases, list) else []):
+        if isinstance(phase, dict):
+            yield f"{boss_path}.phases[{pi}]", phase
+
+
+@rule("B001", "bosses", "error", "duplicate boss id")
+def duplicate_boss_id(data, ctx, rel):
+    seen = set()
+    for path, boss in _bosses(data):
+        if boss.get("id") in seen:
+            yield f"{path}.id", f"boss id '{boss.get('id')}' defined twice"
+        seen.add(boss.get("id"))
+
+
+@rule("B002", "bosses", "error", "boss hp/score not positive")
+def boss_stats(data, ctx, rel):
+    for path, boss in _bosses(data):
+        for key in ("hp", "score"):
+            value = boss.get(key)
+            if not isinstance(value, (int, float)) or value <= 0:
+                yield f"{path}.{key}", f"{boss.get('id', '?')}: {key}={value!r}"
+
+
+@rule("B003", "bosses", "error", "boss without phases")
+def boss_without_phases(data, ctx, rel):
+    for path, boss in _bosses(data):
+        if not boss.get("phases"):
+            yield f"{path}.phases", f"{boss.get('id', '?')} has no phases"
+
+
+@rule("B004", "bosses", "warning", "phase hp thresholds must start at 100 and decrease")
+def phase_thresholds(data, ctx, rel):
+    for path, boss in _bosses(data):
+        previous = None
+        for phase_path, phase in _phases(path, boss):
+            threshold = phase.get("hp_threshold")
+            if previous is None and threshold != 100:
+                yield f"{phase_path}.hp_threshold", f"{boss.get('id', '?')}: first phase starts at {threshold!r}"
+            elif previous is not None and (not isinstance(threshold, (int, float)) or threshold >= previous):
+                yield f"{phase_path}.hp_threshold", f"{boss.get('id', '?')}: {threshold!r} after {previous!r}"
+            previous = threshold if isinstance(threshold, (int, float)) else previous
+
+
+@rule("B005", "bosses", "error", "phase move pattern unknown")
+def boss_move_pattern(data, ctx, rel):
+    for path, boss in _bosses(data):
+        for phase_path, phase in _phases(path, boss):
+            pattern_id = phase.get("move_pattern_id")
+            if pattern_id and not _known_move_pattern(ctx, pattern_id):
+                yield f"{phase_path}.move_pattern_id", f"{boss.get('id', '?')}: move pattern '{pattern_id}' unknown"
+
+
+@rule("B006", "bosses", "error", "phase missile pattern not in missile_patterns_enemy.json")
+def boss_missile_pattern(data, ctx, rel):
+    for path, boss in _bosses(data):
+        for phase_path, phase in _phases(path, boss):
+            pattern_id = phase.get("missile_pattern_id")
+            if pattern_id and pattern_id not in ctx["missile_pattern_ids"]:
+                yield f"{phase_path}.missile_pattern_id", f"{boss.get('id', '?')}: missile pattern '{pattern_id}' unknown"
+
+
+@rule("B007", "bosses", "error", "special power not in boss_powers.json")
+def boss_special_power(data, ctx, rel):
+    for path, boss in _bosses(data):
+        for phase_path, phase in _phases(path, boss):
+            power_id = phase.get("special_power_id")
+            if power_id and power_id not in ctx["boss_power_ids"]:
+                yield f"{phase_path}.special_power_id", f"{boss.get('id', '?')}: power '{power_id}' unknown"
+
+
+@rule("B008", "bosses", "warning", "boss loot_table entry not in loot/uniques.json")
+def boss_loot_table(data, ctx, rel):
+    for path, boss in _bosses(data):
+        for i, unique_id in enumerate(boss.get("loot_table", []) or []):
+            if unique_id not in ctx["unique_ids"]:
+                yield f"{path}.loot_table[{i}]", f"{boss.get('id', '?')}: unique '{unique_id}' is not defined"
+
+
+@rule("B009", "bosses", "error", "boss missile_id not in missiles.json")
+def boss_missile_id(data, ctx, rel):
+    for path, boss in _bosses(data):
+        missile_id = boss.get("missile_id")
+        if missile_id and missile_id not in ctx["missile_ids"]:
+            yield f"{path}.missile_id", f"{boss.get('id', '?')}: missile '{missile_id}' unknown"
+
+
+@rule("B010", "bosses", "warning", "fire_profile rates empty or not positive")
+def boss_fire_profile(data, ctx, rel):
+    for path, boss in _bosses(data):
+        for phase_path, phase in _phases(path, boss):
+            profile = phase.get("fire_profile")
+            if not isinstance(profile, dict):
+                continue
+            rates = profile.get("rates", [])
+            if not rates or any(not isinstance(r, (int, float)) or r <= 0 for r in rates):
+                yield f"{phase_path}.fire_profile.rates", f"{boss.get('id', '?')}: rates={rates!r}"
+
+
+# --- enemy rules ------------------------------------------------------------
+
+def _enemies(data):
+    enemies = data.get("enemies", []) if isinstance(data, dict) else data
+    for ei, enemy in enumerate(enemies if isinstance(enemies, list) else []):
+        if isinstance(enemy, dict):
+            yield f"enemies[{ei}]", enemy
+
+
+@rule("E001", "enemies", "error", "duplicate enemy id")
+def duplicate_enemy_id(data, ctx, rel):
+    seen = set()
+    for path, enemy in _enemies(data):
+        if enemy.get("id") in seen:
+            yield f"{path}.id", f"enemy id '{enemy.get('id')}' defined twice"
+        seen.add(enemy.get("id"))
+
+
+@rule("E002", "enemies", "error", "enemy hp/score not positive")
+def enemy_stats(data, ctx, rel):
+    for path, enemy in _enemies(data):
+        for key in ("hp", "score"):
+            value = enemy.get(key)
+            if not isinstance(value, (int, float)) or value <= 0:
+                yield f"{path}.{key}", f"{enemy.get('id', '?')}: {key}={value!r}"
+
+
+@rule("E003", "enemies", "warning", "enemy move pattern unknown (default movement)")
+def enemy_move_pattern(data, ctx, rel):
+    for path, enemy in _enemies(data):
+        pattern_id = enemy.get("move_pattern_id")
+        if pattern_id and not _known_move_pattern(ctx, pattern_id):
+            yield f"{path}.move_pattern_id", f"{enemy.get('id', '?')}: move pattern '{pattern_id}' unknown"
+
+
+@rule("E004", "enemies", "error", "enemy missile pattern not in missile_patterns_enemy.json")
+def enemy_missile_pattern(data, ctx, rel):
+    for path, enemy in _enemies(data):
+        pattern_id = enemy.get("missile_pattern_id")
+        if pattern_id and pattern_id not in ctx["missile_pattern_ids"]:
+            yield f"{path}.missile_pattern_id", f"{enemy.get('id', '?')}: missile pattern '{pattern_id}' unknown"
+
+
+@rule("E005", "enemies", "error", "enemy missile_id not in missiles.json")
+def enemy_missile_id(data, ctx, rel):
+    for path, enemy in _enemies(data):
+        missile_id = enemy.get("missile_id")
+        if missile_id and missile_id not in ctx["missile_ids"]:
+            yield f"{path}.missile_id", f"{enemy.get('id', '?')}: missile '{missile_id}' unknown"
+
+
+@rule("E006", "enemies", "warning", "loot_chance outside [0, 1]")
+def enemy_loot_chance(data, ctx, rel):
+    for path, enemy in _enemies(data):
+        chance = enemy.get("loot_chance", 0.0)
+        if not isinstance(chance, (int, float)) or not 0.0 <= chance <= 1.0:
+            yield f"{path}.loot_chance", f"{enemy.get('id', '?')}: loot_chance={chance!r}"
+
+
+# --- loot rules -------------------------------------------------------------
+
+@rule("L001", "loot", "error", "rarity weights must be >= 0 with a positive total")
+def rarity_weights(data, ctx, rel):
+    rarities = data.get("rarity_config") if isinstance(data, dict) else None
+    if not isinstance(rarities, dict):
+        return
+    total = 0.0
+    for name, cfg in rarities.items():
+        weight = cfg.get("weight", 0) if isinstance(cfg, dict) else None
+        if not isinstance(weight, (int, float)) or weight < 0:
+            yield f"rarity_config.{name}.weight", f"rarity '{name}': weight={weight!r}"
+        else:
+            total += weight
+    if total <= 0:
+        yield "rarity_config", "rarity weights sum to 0"
+
+
+@rule("L002", "loot", "error", "affix group is not a slot id")
+def affix_slots(data, ctx, rel):
+    affixes = data.get("affixes") if isinstance(data, dict) else None
+    if not isinstance(affixes, dict):
+        return
+    for group in affixes:
+        if group != "global" and group not in ctx["slot_ids"]:
+            yield f"affixes.{group}", f"affix group '{group}' matches no slot in loot_table.json"
+
+
+@rule("L003", "loot", "error", "duplicate affix id")
+def duplicate_affix(data, ctx, rel):
+    affixes = data.get("affixes") if isinstance(data, dict) else None
+    if not isinstance(affixes, dict):
+        return
+    seen = set()
+    for group, entries in affixes.items():
+        for i, affix in enumerate(entries if isinstance(entries, list) else []):
+            affix_id = affix.get("id") if isinstance(affix, dict) else None
+            if affix_id in seen:
+                yield f"affixes.{group}[{i}].id", f"affix id '{affix_id}' defined twice"
+            seen.add(affix_id)
+
+
+def _uniques(data):
+    uniques = data.get("uniques") if isinstance(data, dict) else None
+    for ui, unique in enumerate(uniques if isinstance(uniques, list) else []):
+        if isinstance(unique, dict):
+            yield f"uniques[{ui}]", unique
+
+
+@rule("L004", "loot", "error", "unique slot not in loot_table.json")
+def unique_slot(data, ctx, rel):
+    for path, unique in _uniques(data):
+        if unique.get("slot") not in ctx["slot_ids"]:
+            yield f"{path}.slot", f"{unique.get('id', '?')}: slot '{unique.get('slot')}' unknown"
+
+
+@rule("L005", "loot", "warning", "unique source_boss not in bosses.json")
+def unique_source_boss(data, ctx, rel):
+    for path, unique in _uniques(data):
+        boss_id = unique.get("source_boss")
+        if boss_id and boss_id not in ctx["boss_ids"]:
+            yield f"{path}.source_boss", f"{unique.get('id', '?')}: boss '{boss_id}' unknown"
+
+
+@rule("L006", "loot", "error", "unique_power_id not in unique_powers.json")
+def unique_power(data, ctx, rel):
+    for path, unique in _uniques(data):
+        power_id = unique.get("unique_power_id")
+        if power_id and power_id not in ctx["unique_power_ids"]:
+            yield f"{path}.unique_power_id", f"{unique.get('id', '?')}: power '{power_id}' unknown"
+
+
+# --- skill rules ------------------------------------------------------------
+
+def _skills(data):
+    trees = data.get("trees") if isinstance(data, dict) else None
+    for tree_id, tree in (trees.items() if isinstance(trees, dict) else []):
+        branches = tree.get("branches", {}) if isinstance(tree, dict) else {}
+        for branch_id, branch in (branches.items() if isinstance(branches, dict) else []):
+            levels = branch.get("levels", []) if isinstance(branch, dict) else []
+            for i, skill in enumerate(levels):
+                if isinstance(skill, dict):
+                    yield f"trees.{tree_id}.branches.{branch_id}.levels[{i}]", skill
+
+
+@rule("S005", "skills", "error", "tree or branches not an object")
+def skill_tree_shape(data, ctx, rel):
+    trees = data.get("trees", {})
+    if not isinstance(trees, dict):
+        yield "trees", f"trees is a {type(trees).__name__}, expected an object"
+        return
+    for tree_id, tree in trees.items():
+        if not isinstance(tree, dict):
+            yield f"trees.{tree_id}", f"tree '{tree_id}' is a {type(tree).__name__}, expected an object"
+        elif not isinstance(tree.get("branches", {}), dict):
+            yield (f"trees.{tree_id}.branches",
+                   f"tree '{tree_id}': branches is a {type(tree['branches']).__name__}, expected an object")
+
+
+@rule("S001", "skills", "error", "duplicate skill id")
+def duplicate_skill(data, ctx, rel):
+    seen = set()
+    for path, skill in _skills(data):
+        if skill.get("id") in seen:
+            yield f"{path}.id", f"skill id '{skill.get('id')}' defined twice"
+        seen.add(skill.get("id"))
+
+
+@rule("S002", "skills", "error", "prerequisite is not a skill id")
+def skill_prerequisite(data, ctx, rel):
+    ids = {skill.get("id") for _, skill in _skills(data)}
+    for path, skill in _skills(data):
+        prerequisite = skill.get("prerequisite", "")
+        if prerequisite and prerequisite not in ids:
+            yield f"{path}.prerequisite", f"{skill.get('id', '?')}: prerequisite '{prerequisite}' unknown"
+
+
+@rule("S003", "skills", "error", "cost / max_rank below 1")
+def skill_cost(data, ctx, rel):
+    for path, skill in _skills(data):
+        for key in ("cost", "max_rank"):
+            value = skill.get(key, 1)
+            if not isinstance(value, (int, float)) or value < 1:
+                yield f"{path}.{key}", f"{skill.get('id', '?')}: {key}={value!r}"
+
+
+@rule("S004", "skills", "warning", "prerequisite defined after the skill needing it")
+def skill_prerequisite_order(data, ctx, rel):
+    seen = set()
+    ids = {skill.get("id") for _, skill in _skills(data)}
+    for path, skill in _skills(data):
+        prerequisite = skill.get("prerequisite", "")
+        if prerequisite and prerequisite in ids and prerequisite not in seen:
+            yield f"{path}.prerequisite", f"{skill.get('id', '?')}: '{prerequisite}' comes later in the file"
+        seen.add(skill.get("id"))
+
+
+# --- wave_types rules -------------------------------------------------------
+
+@rule("T001", "wave_types", "info", "config section for a type WaveManager no longer dispatches")
+def orphan_wave_type(data, ctx, rel):
+    for key, value in data.items():
+        if isinstance(value, dict) and key not in WAVE_TYPES_META_KEYS and key not in RUNTIME_WAVE_TYPES:
+            yield key, f"'{key}' is configured but never started by WaveManager"
+
+
+@rule("T002", "wave_types", "error", "default duration not positive")
+def wave_type_duration(data, ctx, rel):
+    for key, value in data.items():
+        if not isinstance(value, dict):
+            continue
+        for field in ("duration_sec_default", "round_duration_sec"):
+            if field in value and (not isinstance(value[field], (int, float)) or value[field] <= 0):
+                yield f"{key}.{field}", f"{key}: {field}={value[field]!r}"
+
+
+@rule("T003", "wave_types", "warning", "min/max pair inverted")
+def wave_type_ranges(data, ctx, rel):
+    for key, value in data.items():
+        if not isinstance(value, dict):
+            continue
+        for field, low in value.items():
+            if not field.endswith("_min") and "_min_" not in field:
+                continue
+            other = field[:-4] + "_max" if field.endswith("_min") else field.replace("_min_", "_max_")
+            high = value.get(other)
+            if isinstance(low, (int, float)) and isinstance(high, (int, float)) and low > high:
+                yield f"{key}.{field}", f"{key}: {field}={low} > {other}={high}"
+
+
+def run_rules(target, data, ctx, rel_path, rule_ids=None):
+    """Findings of every (selected) rule of `target` on one parsed file."""
+    if target in OBJECT_TARGETS and not isinstance(data, dict):
+        return [{"rule": "X002", "severity": "error", "file": rel_path, "path": "",
+                 "message": f"top level is a {type(data).__name__}, expected an object"}]
+    findings = []
+    for r in RULES.values():
+        if r.target != target or (rule_ids and r.id not in rule_ids):
+            continue
+        for json_path, message in r.check(data, ctx, rel_path):
+            findings.append({"rule": r.id, "severity": r.severity, "file": rel_path,
+                             "path": json_path, "message": message})
+    return findings
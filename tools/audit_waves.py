@@ -1,174 +1,140 @@
 #!/usr/bin/env python3
-"""Audit script: scan data/worlds/world_*.json and report waves likely to be empty.
+"""Audit data/: run the rules of tools/audit_rules.py over every data file.
+
+Worlds, bosses, enemies, loot, skills and wave_types are checked in a
+process pool (one task per file) and findings stream as JSONL, one object
+per line: {"rule", "severity", "file", "path", "message"}. Results are
+cached per file content + known-id context, so a re-run after one edit only
+re-audits that file. Exit code is 1 when an error-severity finding remains.
 
 Run from repo root:
-    python tools/audit_waves.py
+    python tools/audit_waves.py                        # JSONL on stdout
+    python tools/audit_waves.py --format text --min-severity warning
+    python tools/audit_waves.py --rules W001,W003 --out audit.jsonl
+    python tools/audit_waves.py --list-rules
 """
 
+import argparse
 import json
+import os
 import sys
-from pathlib import Path
-
-REPO = Path(__file__).resolve().parents[1]
-WORLDS_DIR = REPO / "data" / "worlds"
-ENEMIES_FILE = REPO / "data" / "enemies.json"
-PATTERNS_FILE = REPO / "data" / "patterns" / "move_patterns.json"
-
-
-def _ids_from_collection(collection):
-    ids = set()
-    if isinstance(collection, dict):
-        for k, v in collection.items():
-            if isinstance(v, dict):
-                ids.add(v.get("id", k))
-            else:
-                ids.add(k)
-    elif isinstance(collection, list):
-        for v in collection:
-            if isinstance(v, dict) and "id" in v:
-                ids.add(v["id"])
-    return ids
-
-
-def load_known_enemy_ids():
-    with open(ENEMIES_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    enemies = data.get("enemies", data) if isinstance(data, dict) else data
-    return _ids_from_collection(enemies)
-
-
-def load_known_obstacle_ids():
-    obstacles_file = REPO / "data" / "obstacles.json"
-    if not obstacles_file.exists():
-        return set()
-    with open(obstacles_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    obstacles = data.get("obstacles", data) if isinstance(data, dict) else data
-    return _ids_from_collection(obstacles)
-
-
-def load_known_pattern_ids():
-    patterns_file = REPO / "data" / "patterns" / "move_patterns.json"
-    if not patterns_file.exists():
-        return set()
-    with open(patterns_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    patterns = data.get("patterns", data) if isinstance(data, dict) else data
-    return _ids_from_collection(patterns)
-
-
-def iter_levels(world_data):
-    levels = []
-    if isinstance(world_data, dict):
-        if "levels" in world_data and isinstance(world_data["levels"], list):
-            levels = world_data["levels"]
-        elif "_levels" in world_data and isinstance(world_data["_levels"], list):
-            levels = world_data["_levels"]
-        else:
-            for key in ("normal_levels", "boss_level"):
-                if key in world_data:
-                    val = world_data[key]
-                    if isinstance(val, list):
-                        levels.extend(val)
-                    elif isinstance(val, dict):
-                        levels.append(val)
-    return levels
-
-
-def classify_wave(wave, enemy_ids, obstacle_ids, pattern_ids):
-    wave_type = wave.get("type")
-    enemy_id = wave.get("enemy_id")
-    obstacle_id = wave.get("obstacle_id")
-    pattern_id = wave.get("pattern_id")
-    interval = wave.get("interval")
-    duration = wave.get("duration", 20.0)
-
-    notes = []
-
-    if wave_type == "obstacle":
-        if not obstacle_id:
-            return ("missing_obstacle_id", "type=obstacle but no obstacle_id", notes)
-        if obstacle_ids and obstacle_id not in obstacle_ids:
-            return ("unknown_obstacle", f"obstacle_id '{obstacle_id}' not in obstacles.json", notes)
-        return ("ok_obstacle", "", notes)
-    if wave_type == "snake":
-        # Refonte 2026-07 : l'ex path_trial est devenu le mini-jeu snake
-        # (aucun pattern_id requis, tuning pur data).
-        return ("ok_snake", "", notes)
-
-    if wave_type is None and obstacle_id:
-        return ("missing_obstacle_type", "obstacle_id present but type missing -> falls into enemy branch", notes)
-
-    if wave_type in (None, "enemy"):
-        if not enemy_id:
-            return ("empty_default", "no enemy_id -> falls back to enemy_basic (does not exist)", notes)
-        if enemy_id not in enemy_ids:
-            return ("unknown_enemy", f"enemy_id '{enemy_id}' not in enemies.json", notes)
-        if interval is not None and (interval <= 0 or interval > duration):
-            notes.append(f"suspect interval={interval} duration={duration}")
-        return ("ok", "", notes)
-    return ("unknown_type", f"unknown type '{wave_type}'", notes)
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import audit_rules
+from analysis_cache import AnalysisCache, digest, file_digest
+
+REPO = audit_rules.REPO
+DATA_DIR = audit_rules.DATA_DIR
+
+_worker_ctx = None
+
+
+def _init_worker(ctx):
+    global _worker_ctx
+    _worker_ctx = audit_rules.prepare_context(ctx)
+
+
+def _audit_file(target, rel_path, raw, rule_ids):
+    try:
+        data = json.loads(raw.decode("utf-8"))
+    except ValueError as exc:
+        return [{"rule": "X001", "severity": "error", "file": rel_path, "path": "",
+                 "message": f"invalid JSON: {exc}"}]
+    return audit_rules.run_rules(target, data, _worker_ctx, rel_path, rule_ids)
+
+
+def collect_tasks(targets=None):
+    """(target, repo-relative path) for every file a rule target covers."""
+    tasks = []
+    for target, patterns in audit_rules.TARGET_FILES.items():
+        if targets and target not in targets:
+            continue
+        for pattern in patterns:
+            for path in sorted(DATA_DIR.glob(pattern)):
+                tasks.append((target, path.relative_to(REPO).as_posix()))
+    return tasks
 
 
 def main():
-    enemy_ids = load_known_enemy_ids()
-    obstacle_ids = load_known_obstacle_ids()
-    pattern_ids = load_known_pattern_ids()
-    print(f"Known enemy ids: {sorted(enemy_ids)}")
-    print(f"Known obstacle ids: {sorted(obstacle_ids)}")
-    print(f"Known pattern ids ({len(pattern_ids)}): {sorted(pattern_ids)}\n")
-
-    issues = 0
-    notes_count = 0
-    suggested_patches = {}
-    wave_summary = {"ok": 0, "ok_obstacle": 0, "ok_snake": 0}
-
-    for world_path in sorted(WORLDS_DIR.glob("world_*.json")):
-        with open(world_path, "r", encoding="utf-8") as f:
-            world = json.load(f)
-        levels = iter_levels(world)
-        printed_world = False
-        for level in levels:
-            if not isinstance(level, dict):
-                continue
-            level_id = level.get("id", "?")
-            waves = level.get("waves", [])
-            if not isinstance(waves, list):
-                continue
-            for idx, wave in enumerate(waves):
-                if not isinstance(wave, dict):
+    p = argparse.ArgumentParser(description="Rule-based audit of data/ (JSONL findings)")
+    p.add_argument("--rules", default="", help="Comma-separated rule ids to run (default: all)")
+    p.add_argument("--targets", default="", help="Comma-separated targets: " + ",".join(audit_rules.TARGET_FILES))
+    p.add_argument("--min-severity", default="info", choices=audit_rules.SEVERITIES)
+    p.add_argument("--format", default="jsonl", choices=["jsonl", "text"])
+    p.add_argument("--out", help="Write findings to this file instead of stdout")
+    p.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count, 1 = inline)")
+    p.add_argument("--no-cache", action="store_true", help="Re-audit every file")
+    p.add_argument("--list-rules", action="store_true", help="Print the rule registry and exit")
+    args = p.parse_args()
+
+    if args.list_rules:
+        for r in audit_rules.RULES.values():
+            print(f"{r.id}  {r.severity:<7} {r.target:<10} {r.summary}")
+        return 0
+
+    rule_ids = {r.strip() for r in args.rules.split(",") if r.strip()}
+    unknown = rule_ids - set(audit_rules.RULES)
+    if unknown:
+        p.error(f"unknown rule id(s): {', '.join(sorted(unknown))}")
+    targets = {t.strip() for t in args.targets.split(",") if t.strip()}
+    max_rank = audit_rules.SEVERITIES.index(args.min_severity)
+
+    t0 = time.perf_counter()
+    ctx = audit_rules.build_context()
+    cache = AnalysisCache("audit", enabled=not args.no_cache)
+    # Any edit to the rules module invalidates cached findings.
+    deps = digest("audit", file_digest(audit_rules.__file__), ctx, sorted(rule_ids))
+
+    # Cache lookups happen here; only changed files go to the pool.
+    pending = []
+    results = {}
+    tasks = collect_tasks(targets)
+    for target, rel_path in tasks:
+        with open(REPO / rel_path, "rb") as f:
+            raw = f.read()
+        key = digest(target, rel_path, raw, deps)
+        cached = cache.get(key)
+        if cached is not None:
+            results[rel_path] = cached
+        else:
+            pending.append((key, target, rel_path, raw))
+
+    workers = args.workers or min(len(pending), os.cpu_count() or 1)
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(ctx,)) as pool:
+            futures = [pool.submit(_audit_file, target, rel_path, raw, rule_ids)
+                       for _, target, rel_path, raw in pending]
+            for (key, _, rel_path, _), future in zip(pending, futures):
+                results[rel_path] = future.result()
+                cache.put(key, results[rel_path])
+    else:
+        _init_worker(ctx)
+        for key, target, rel_path, raw in pending:
+            results[rel_path] = _audit_file(target, rel_path, raw, rule_ids)
+            cache.put(key, results[rel_path])
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    counts = {s: 0 for s in audit_rules.SEVERITIES}
+    try:
+        for _, rel_path in tasks:
+            for finding in results[rel_path]:
+                counts[finding["severity"]] += 1
+                if audit_rules.SEVERITIES.index(finding["severity"]) > max_rank:
                     continue
-                status, reason, notes = classify_wave(wave, enemy_ids, obstacle_ids, pattern_ids)
-                wave_summary[status] = wave_summary.get(status, 0) + 1
-                if status not in ("ok", "ok_obstacle", "ok_snake") or notes:
-                    if not printed_world:
-                        print(f"=== {world_path.name} ===")
-                        printed_world = True
-                    print(f"  level={level_id} wave#{idx} status={status} :: {reason}")
-                    if notes:
-                        print(f"    notes: {notes}")
-                        notes_count += 1
-                    print(f"    raw: {json.dumps(wave, ensure_ascii=False)}")
-                    if status not in ("ok", "ok_obstacle", "ok_snake"):
-                        issues += 1
-                        suggested_patches.setdefault(world_path.name, []).append({
-                            "level_id": level_id,
-                            "wave_index": idx,
-                            "status": status,
-                            "reason": reason,
-                            "wave": wave,
-                        })
-        if printed_world:
-            print()
-
-    print(f"Wave counts by status: {wave_summary}")
-    print(f"Total hard issues: {issues}, notes-only: {notes_count}")
-    if issues:
-        out_file = REPO / "tools" / "audit_waves_report.json"
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(suggested_patches, f, indent=2, ensure_ascii=False)
-        print(f"Detailed report written to {out_file}")
-    return 0
+                if args.format == "jsonl":
+                    out.write(json.dumps(finding, ensure_ascii=False) + "\n")
+                else:
+                    out.write(f"{finding['file']}:{finding['path']} [{finding['rule']} {finding['severity']}] "
+                              f"{finding['message']}\n")
+    finally:
+        if args.out:
+            out.close()
+
+    print(f"{len(tasks)} file(s), {len(pending)} audited, "
+          + ", ".join(f"{n} {s}" for s, n in counts.items())
+          + f" in {time.perf_counter() - t0:.2f}s ({cache.summary()})", file=sys.stderr)
+    return 1 if counts["error"] else 0
 
 
 if __name__ == "__main__":
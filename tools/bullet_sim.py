@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""Boss bullet-density simulator for sizing the enemy projectile pool.
+
+Plays every boss fight of data/worlds/ (bosses.json phases, resolved against
+data/patterns/missile_patterns_enemy.json and data/missiles/boss_powers.json)
+for a range of player DPS values and counts the enemy projectiles alive at
+once, i.e. the instances ProjectileManager must have in its enemy pool.
+Mirrors:
+  - Boss.gd: hp_threshold phase switches (HP x world multipliers.hp),
+    fire_rate / fire_profile.rates stepping every step_interval (loop or hold
+    last), the fire interval clamp (game_balance.fire_rate_max),
+    cooldown_after_salve, the random first fire timer, _fire() spawn
+    strategies (shooter spread, radial, screen_top / screen_bottom, corners,
+    flanking, target_circle, random_edge) and aim_target;
+  - special powers (PowerManager._handle_projectiles): `waves` volleys every
+    wave_delay from the boss, radial with random safe_zones, spiral,
+    rain_down; the power timer restarts on phase change and invincible powers
+    pause the player's damage until the first pending "off" timer fires
+    (fights the invincibility keeps alive are cut at --max-fight);
+  - Projectile.gd lifetime: despawn_after_sec / max_lifetime (20 s default),
+    off-screen once 500 px outside the viewport (project.godot size),
+    homing turn (homing_turn_rate, homing_duration) then straight flight.
+Spiral and sine trajectories are flown straight (their lateral wobble is a
+few dozen px). Bullets are never absorbed by the player, shields or
+obstacles, so counts are an upper bound: the right side to size a pool on.
+
+The phase / power schedule of a (boss, DPS) pair is deterministic; the runs
+differ by first fire timer, player and boss positions and safe zones. Salvo
+times, spawn geometry and lifetimes (ray / viewport exit, vectorised Euler
+steps for homing) are computed for a batch of runs at once in NumPy, then the
+live count is swept over spawn / despawn events (peak) and sampled every
+--sample seconds (p99). Fights fan out over a process pool with SeedSequence
+children, so results do not depend on --workers.
+
+Run from repo root:
+    python tools/bullet_sim.py                         # fights lasting 60 / 120 / 240 s
+    python tools/bullet_sim.py --dps 2500 10000 40000 --worlds world_1,world_2
+    python tools/bullet_sim.py --runs 400 --quantile 0.999 --json bullets.json
+    python tools/bullet_sim.py --check
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wave_timeline import REPO, compute_scores, iter_world_levels
+
+OFFSCREEN_MARGIN = 500.0          # Projectile._process
+DEFAULT_LIFETIME = 20.0           # Projectile._max_lifetime
+DEFAULT_MAX_FIRE_RATE = 80.0      # Boss.DEFAULT_MAX_FIRE_RATE
+BOSS_POWER_SPEED = 400.0          # PowerManager.DEFAULT_BOSS_POWER_PROJECTILE_SPEED
+HORIZONTAL_LIMIT = 70.0           # Boss._get_horizontal_min_limit
+PLAYER_Y_RATIO = 0.8              # Game._setup_player
+FRAME = 1.0 / 60.0
+RUN_BATCH = 25                    # runs swept together (memory bound)
+# Boss._legacy_boss_move_pattern: (type, x_offset, x_range, advance_distance)
+BOSS_MOVES = {
+    "boss_hold_center": ("hold", 0.0, 0.0, 0.0),
+    "boss_hold_left": ("hold", -150.0, 0.0, 0.0),
+    "boss_hold_right": ("hold", 150.0, 0.0, 0.0),
+    "boss_strafe_narrow": ("strafe", 0.0, 90.0, 0.0),
+    "boss_strafe_medium": ("strafe", 0.0, 140.0, 0.0),
+    "boss_strafe_wide": ("strafe", 0.0, 220.0, 0.0),
+    "boss_strafe_stop": ("strafe", 0.0, 180.0, 0.0),
+    "boss_strafe_erratic": ("strafe", 0.0, 240.0, 0.0),
+    "boss_strafe_hold": ("strafe", 0.0, 150.0, 0.0),
+    "boss_advance_short": ("advance", 0.0, 100.0, 95.0),
+    "boss_advance_medium": ("advance", 0.0, 130.0, 150.0),
+    "boss_advance_long": ("advance", 0.0, 160.0, 220.0),
+}
+
+
+def viewport_size(root=REPO):
+    text = (root / "project.godot").read_text(encoding="utf-8")
+    w = re.search(r"^window/size/viewport_width=(\d+)", text, re.M)
+    h = re.search(r"^window/size/viewport_height=(\d+)", text, re.M)
+    return float(w.group(1)) if w else 720.0, float(h.group(1)) if h else 1280.0
+
+
+def load_data(root=REPO):
+    game = compute_scores.load_json(root / "data" / "game.json")
+    patterns = {p["id"]: p for p in compute_scores.load_json(root / "data" / "patterns" / "missile_patterns_enemy.json")["patterns"]}
+    powers = {p["id"]: p for p in compute_scores.load_json(root / "data" / "missiles" / "boss_powers.json")["powers"]}
+    bosses = {b["id"]: b for b in compute_scores.load_json(root / "data" / "bosses.json")["bosses"]}
+    balance = game.get("game_balance", {})
+    spawn = game.get("gameplay", {}).get("boss_spawn", {})
+    return {"patterns": patterns, "powers": powers, "bosses": bosses,
+            "min_interval": 1.0 / max(0.01, float(balance.get("fire_rate_max", DEFAULT_MAX_FIRE_RATE))),
+            "top_margin": float(spawn.get("top_margin_px", 28.0)),
+            "pools": game.get("projectile_pools", {}), "viewport": viewport_size(root)}
+
+
+def world_bosses(root=REPO, worlds=None):
+    """[(world_id, hp multiplier, boss_id)] in play order, one entry per distinct boss."""
+    seen, out = set(), []
+    for world, level in iter_world_levels(root):
+        wid = world.get("id", "")
+        if worlds and wid not in worlds:
+            continue
+        boss_id = level.get("boss_id")
+        if boss_id and (wid, boss_id) not in seen:
+            seen.add((wid, boss_id))
+            out.append((wid, float((world.get("multipliers") or {}).get("hp", 1.0)), str(boss_id)))
+    return out
+
+
+# --- fight schedule -----------------------------------------------------------------
+
+def fight_schedule(boss, hp, dps, powers, limit=math.inf):
+    """Deterministic phase and power timeline for a constant DPS.
+
+    PowerManager arms one "invincible off" timer per cast, so a cast whose
+    duration outlasts the power interval is cut short by its predecessor's
+    timer rather than chaining into permanent immunity. A fight that still
+    cannot finish is cut at `limit`.
+
+    Returns (phase starts [(t, phase)], power casts [(t, power)], end time,
+    seconds the boss spent invincible)."""
+    phases = [p for p in boss.get("phases", []) if isinstance(p, dict)] or [{}]
+    t, life, current = 0.0, float(hp), 0
+    shielded, invincible, offs = False, 0.0, []
+    starts, casts = [(0.0, phases[0])], []
+
+    def power_of(phase):
+        power = powers.get(str(phase.get("special_power_id", "")))
+        return power, float(phase.get("special_power_interval", 10.0))
+
+    power, interval = power_of(phases[0])
+    next_power = interval if power else math.inf
+    thresholds = [float(int(p.get("hp_threshold", 0))) / 100.0 * hp for p in phases]
+    while True:
+        # _check_phase_transition: first phase after `current` whose threshold the HP reaches
+        later = thresholds[current + 1:]
+        target = max(later) if later else 0.0
+        t_hit = math.inf if shielded else t + max(0.0, life - target) / dps
+        t_off = offs[0] if offs else math.inf
+        t_next = min(t_hit, t_off, next_power)
+        if t_next > limit:
+            return starts, casts, limit, invincible + (limit - t if shielded else 0.0)
+        if shielded:
+            invincible += t_next - t
+        else:
+            life -= dps * (t_next - t)
+        t = t_next
+        if t == t_hit:
+            life = min(life, target)
+            if not later or life <= 0.0:
+                return starts, casts, t, invincible
+            current = next(i for i in range(current + 1, len(phases)) if thresholds[i] >= life)
+            starts.append((t, phases[current]))
+            power, interval = power_of(phases[current])
+            next_power = t + interval if power else math.inf
+        elif t == t_off:
+            heapq.heappop(offs)
+            shielded = False
+        else:
+            casts.append((t, power))
+            if bool(power.get("invincibility", False)):
+                shielded = True
+                heapq.heappush(offs, t + float(power.get("duration", 2.0)))
+            next_power = t + interval
+
+
+def cadence(starts, end, patterns, min_interval):
+    """Piecewise (start time, interval, cooldown, pattern id) of the fire cadence."""
+    out = []
+    for k, (t0, phase) in enumerate(starts):
+        t1 = starts[k + 1][0] if k + 1 < len(starts) else end
+        pattern_id = str(phase.get("missile_pattern_id", "circle_8"))
+        cooldown = float(patterns.get(pattern_id, {}).get("cooldown_after_salve", 0.0))
+        base = max(min_interval, max(0.05, float(phase.get("fire_rate", 2.0))))
+        profile = phase.get("fire_profile")
+        rates = [max(min_interval, max(0.05, float(r))) for r in (profile or {}).get("rates", [])] \
+            if isinstance(profile, dict) else []
+        step = max(0.0, float(profile.get("step_interval", 0.0))) if rates else 0.0
+        if not rates or step <= 0.0 or len(rates) == 1:
+            out.append((t0, rates[0] if rates else base, cooldown, pattern_id))
+            continue
+        loop, idx, t = bool(profile.get("loop", False)), 0, t0
+        while t < t1:
+            out.append((t, rates[idx], cooldown, pattern_id))
+            if idx < len(rates) - 1:
+                idx += 1
+            elif loop:
+                idx = 0
+            else:
+                break
+            t += step
+    return out
+
+
+# --- geometry -----------------------------------------------------------------------
+
+def exit_time(px, py, dx, dy, speed, width, height):
+    """Seconds until a straight mover leaves the viewport + OFFSCREEN_MARGIN."""
+    vx, vy = dx * speed, dy * speed
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tx = np.where(vx > 0, (width + OFFSCREEN_MARGIN - px) / vx,
+                      np.where(vx < 0, (-OFFSCREEN_MARGIN - px) / vx, np.inf))
+        ty = np.where(vy > 0, (height + OFFSCREEN_MARGIN - py) / vy,
+                      np.where(vy < 0, (-OFFSCREEN_MARGIN - py) / vy, np.inf))
+    return np.maximum(0.0, np.minimum(tx, ty))
+
+
+def homing_lifetime(px, py, dx, dy, speed, tx, ty, turn_rate, duration, lifetime, width, height):
+    """Projectile._move_homing stepped per frame for every bullet at once, then straight."""
+    edge = np.minimum.reduce([px + OFFSCREEN_MARGIN, width + OFFSCREEN_MARGIN - px,
+                              py + OFFSCREEN_MARGIN, height + OFFSCREEN_MARGIN - py])
+    out = np.full(px.shape, float(lifetime))
+    far = speed * lifetime >= edge  # the others despawn before they can leave the screen
+    if not far.any():
+        return out
+    px, py, dx, dy, tx, ty = (a[far] for a in (px, py, dx, dy, tx, ty))
+    steps = int(min(duration, lifetime) / FRAME)
+    alive = np.full(px.shape, np.inf)
+    for k in range(steps):
+        to_x, to_y = tx - px, ty - py
+        norm = np.hypot(to_x, to_y)
+        norm[norm == 0] = 1.0
+        dx = dx + (to_x / norm - dx) * turn_rate * FRAME
+        dy = dy + (to_y / norm - dy) * turn_rate * FRAME
+        n = np.hypot(dx, dy)
+        n[n == 0] = 1.0
+        dx, dy = dx / n, dy / n
+        px, py = px + dx * speed * FRAME, py + dy * speed * FRAME
+        off = (px < -OFFSCREEN_MARGIN) | (px > width + OFFSCREEN_MARGIN) | \
+              (py < -OFFSCREEN_MARGIN) | (py > height + OFFSCREEN_MARGIN)
+        alive = np.where(off & np.isinf(alive), (k + 1) * FRAME, alive)
+    rest = steps * FRAME + exit_time(px, py, dx, dy, speed, width, height)
+    out[far] = np.minimum(np.minimum(alive, rest), lifetime)
+    return out
+
+
+def normalise(x, y):
+    n = np.hypot(x, y)
+    n = np.where(n == 0, 1.0, n)
+    return x / n, y / n
+
+
+def salvo_projectiles(rng, pattern, bx, by, player_x, player_y, width, height):
+    """Boss._fire for a batch of salvos -> (salvo index, px, py, dx, dy) per bullet."""
+    n = len(bx)
+    count = int(pattern.get("projectile_count", 1))
+    spread = math.radians(float(pattern.get("spread_angle", 0)))
+    trajectory = str(pattern.get("trajectory", "straight"))
+    strategy = str(pattern.get("spawn_strategy", "shooter"))
+    aimed = trajectory == "aimed" or bool(pattern.get("aim_target", False))
+    if trajectory == "radial" and strategy == "shooter":
+        angles = np.arange(count) / count * 2 * math.pi
+        idx = np.repeat(np.arange(n), count)
+        return idx, bx[idx], by[idx], np.tile(np.cos(angles), n), np.tile(np.sin(angles), n)
+    if strategy == "shooter":
+        sx, sy = np.repeat(bx, count), np.repeat(by, count)
+        slot = np.tile(np.arange(count), n)
+    elif strategy in ("screen_bottom", "screen_top"):
+        xs = 50.0 + (width - 100.0) / max(1, count - 1) * np.arange(count) if count > 1 else np.array([width / 2])
+        sx = np.tile(xs, n)
+        sy = np.full(sx.shape, height + 20.0 if strategy == "screen_bottom" else -20.0)
+        slot = np.tile(np.arange(count), n)
+    elif strategy == "target_circle":
+        radius = float(pattern.get("spawn_radius", 150))
+        a = np.arange(count) / count * 2 * math.pi
+        sx = np.repeat(player_x, count) + np.tile(np.cos(a), n) * radius
+        sy = np.repeat(player_y, count) + np.tile(np.sin(a), n) * radius
+        slot = np.tile(np.arange(count), n)
+    elif strategy == "corners":
+        xs = np.array([30.0, width - 30.0, 30.0, width - 30.0])
+        ys = np.array([30.0, 30.0, height - 30.0, height - 30.0])
+        sx, sy, slot = np.tile(xs, n), np.tile(ys, n), np.tile(np.arange(4), n)
+    elif strategy == "flanking":
+        half = count // 2
+        step = height / max(1, half)
+        ys = np.repeat(step * np.arange(half) + step / 2, 2)
+        xs = np.tile([-20.0, width + 20.0], half)
+        sx, sy, slot = np.tile(xs, n), np.tile(ys, n), np.tile(np.arange(2 * half), n)
+    elif strategy == "random_edge":
+        edge = rng.integers(0, 4, n * count)
+        u = rng.random(n * count)
+        sx = np.select([edge == 0, edge == 1, edge == 2], [u * width, u * width, -20.0], width + 20.0)
+        sy = np.select([edge == 0, edge == 1, edge == 2], [-20.0, height + 20.0, u * height], u * height)
+        slot = np.tile(np.arange(count), n)
+    else:
+        sx, sy = np.repeat(bx, count), np.repeat(by, count)
+        slot = np.tile(np.arange(count), n)
+    per = len(sx) // max(1, n)
+    idx = np.repeat(np.arange(n), per)
+    if aimed:
+        dx, dy = normalise(player_x[idx] - sx, player_y[idx] - sy)
+    elif strategy == "screen_bottom":
+        dx, dy = np.zeros(sx.shape), -np.ones(sx.shape)
+    elif strategy in ("corners", "flanking", "random_edge"):
+        dx, dy = normalise(width / 2 - sx, height / 2 - sy)
+    elif strategy == "target_circle":
+        dx, dy = normalise(player_x[idx] - sx, player_y[idx] - sy)
+    else:
+        dx, dy = np.zeros(sx.shape), np.ones(sx.shape)
+    if strategy == "shooter" and count > 1:
+        angle = -spread / 2 + spread / max(1, count - 1) * slot
+        c, s = np.cos(angle), np.sin(angle)
+        dx, dy = dx * c - dy * s, dx * s + dy * c
+    return idx, sx, sy, dx, dy
+
+
+def power_projectiles(rng, proj, n, bx, by, player_x, player_y, width):
+    """PowerManager._spawn_wave for one wave across n runs -> (run, px, py, dx, dy)."""
+    count = max(1, int(proj.get("count", 10)))
+    trajectory = str(proj.get("trajectory", "radial"))
+    if bool(proj.get("aim_target", False)):
+        tx, ty = normalise(player_x - bx, player_y - by)
+    else:
+        tx, ty = np.zeros(n), np.ones(n)
+    if trajectory in ("radial", "spiral"):
+        angle = np.tile(np.arange(count) / count * 2 * math.pi, (n, 1))
+        keep = np.ones(angle.shape, bool)
+        zones = proj.get("safe_zones") if trajectory == "radial" else None
+        if isinstance(zones, dict):
+            width_rad = math.radians(float(zones.get("width_degrees", 20)))
+            for _ in range(int(zones.get("count", 1))):
+                center = rng.random((n, 1)) * 2 * math.pi
+                s = np.mod(center - width_rad / 2, 2 * math.pi)
+                e = np.mod(center + width_rad / 2, 2 * math.pi)
+                a = np.mod(angle, 2 * math.pi)
+                keep &= ~np.where(s < e, (a >= s) & (a <= e), (a >= s) | (a <= e))
+        run, j = np.nonzero(keep)
+        a = angle[run, j]
+        c, s = np.cos(a), np.sin(a)
+        return run, bx[run], by[run], tx[run] * c - ty[run] * s, tx[run] * s + ty[run] * c
+    run = np.repeat(np.arange(n), count)
+    if trajectory == "rain_down":
+        return run, rng.random(len(run)) * width, np.full(len(run), -50.0), np.zeros(len(run)), np.ones(len(run))
+    if bool(proj.get("aim_target", False)):
+        return run, bx[run], by[run], tx[run], ty[run]
+    a = rng.uniform(-0.5, 0.5, len(run))
+    return run, bx[run], by[run], -np.sin(a), np.cos(a)
+
+
+# --- simulation ---------------------------------------------------------------------
+
+def boss_positions(rng, boss, phase, n, data):
+    width, _ = data["viewport"]
+    half_h = max(1.0, float((boss.get("size") or {}).get("height", 100.0))) * 0.5
+    kind, offset, x_range, advance = BOSS_MOVES.get(str(phase.get("move_pattern_id", "")), ("hold", 0.0, 0.0, 0.0))
+    x = np.full(n, width / 2 + offset) + (rng.uniform(-x_range, x_range, n) if x_range else 0.0)
+    x = np.clip(x, HORIZONTAL_LIMIT, width - HORIZONTAL_LIMIT)
+    y = np.full(n, half_h + data["top_margin"]) + (rng.random(n) * advance if advance else 0.0)
+    return x, y
+
+
+def simulate_runs(rng, data, boss, starts, casts, end, steps, runs, player_spread, sample):
+    """A batch of runs of one fight schedule -> (per-run peaks, live-count histogram, bullets)."""
+    width, height = data["viewport"]
+    step_t = np.array([s[0] for s in steps])
+    spawn_run, spawn_t, life = [], [], []
+
+    def player_pos(n):
+        x = width / 2 + (rng.random(n) - 0.5) * player_spread * width
+        return x, np.full(n, height * PLAYER_Y_RATIO)
+
+    def add(run, t, px, py, dx, dy, speed, pattern):
+        trajectory = str(pattern.get("trajectory", "straight"))
+        lifetime = max(0.1, float(pattern.get("despawn_after_sec", pattern.get("max_lifetime", DEFAULT_LIFETIME))))
+        if trajectory == "spiral":
+            speed = speed * max(0.05, float(pattern.get("helix_forward_speed_scale", 1.0)))
+        if trajectory == "homing":
+            duration = float(pattern.get("homing_duration", 1.5))
+            tx, ty = player_pos(len(px))
+            alive = homing_lifetime(px, py, dx, dy, speed, tx, ty, float(pattern.get("homing_turn_rate", 3.0)),
+                                    duration, lifetime, width, height)
+        else:
+            alive = np.minimum(exit_time(px, py, dx, dy, speed, width, height), lifetime)
+        spawn_run.append(run)
+        spawn_t.append(t)
+        life.append(alive)
+
+    # boss salvos: every run advances its own fire timer through the shared cadence
+    gap = np.array([s[1] + s[2] for s in steps])
+    t = rng.random(runs) * steps[0][1]
+    salvo_run, salvo_t = [], []
+    active = np.flatnonzero(t < end)
+    while active.size:
+        salvo_run.append(active)
+        salvo_t.append(t[active])
+        t[active] += gap[np.searchsorted(step_t, t[active], side="right") - 1]
+        active = active[t[active] < end]
+    salvo_run = np.concatenate(salvo_run) if salvo_run else np.zeros(0, int)
+    salvo_t = np.concatenate(salvo_t) if salvo_t else np.zeros(0)
+    salvo_phase = np.searchsorted([t0 for t0, _ in starts], salvo_t, side="right") - 1
+    for ph in np.unique(salvo_phase):
+        phase = starts[ph][1]
+        pattern = data["patterns"].get(str(phase.get("missile_pattern_id", "circle_8")))
+        if not pattern:
+            continue  # DataManager returns {}: _fire() does nothing
+        sel = salvo_phase == ph
+        n = int(sel.sum())
+        bx, by = boss_positions(rng, boss, phase, n, data)
+        player_x, player_y = player_pos(n)
+        idx, px, py, dx, dy = salvo_projectiles(rng, pattern, bx, by, player_x, player_y, width, height)
+        add(salvo_run[sel][idx], salvo_t[sel][idx], px, py, dx, dy, float(pattern.get("speed", 200)), pattern)
+
+    # special powers: same schedule for every run, geometry drawn per run
+    for cast_t, power in casts:
+        proj = power.get("projectile")
+        if not isinstance(proj, dict):
+            continue
+        ph = int(np.searchsorted([s for s, _ in starts], cast_t, side="right") - 1)
+        pattern = {"trajectory": str(proj.get("trajectory", "radial")),
+                   "despawn_after_sec": max(0.1, float(proj.get("despawn_after_sec", proj.get("max_lifetime", 20.0)))),
+                   "homing_duration": float(proj.get("homing_duration", 1.5)),
+                   "homing_turn_rate": float(proj.get("homing_turn_rate", 3.0))}
+        speed = max(1.0, float(proj.get("speed", BOSS_POWER_SPEED)))
+        for w in range(max(1, int(proj.get("waves", 1)))):
+            wt = cast_t + w * max(0.0, float(proj.get("wave_delay", 0.2)))
+            bx, by = boss_positions(rng, boss, starts[ph][1], runs, data)
+            player_x, player_y = player_pos(runs)
+            run, px, py, dx, dy = power_projectiles(rng, proj, runs, bx, by, player_x, player_y, width)
+            add(run, np.full(len(run), wt), px, py, dx, dy, speed, pattern)
+
+    run = np.concatenate(spawn_run) if spawn_run else np.zeros(0, int)
+    born = np.concatenate(spawn_t) if spawn_t else np.zeros(0)
+    dead = born + (np.concatenate(life) if life else np.zeros(0))
+    horizon = end + DEFAULT_LIFETIME
+    # one time axis for all runs: run r lives on [r * horizon, (r + 1) * horizon)
+    born_key = np.sort(run * horizon + born)
+    dead_key = np.sort(run * horizon + dead)
+    events = np.concatenate([born_key, dead_key])
+    delta = np.concatenate([np.ones(len(born_key), np.int32), -np.ones(len(dead_key), np.int32)])
+    order = np.lexsort((delta, events))  # a despawn at the same instant frees its slot first
+    live = np.cumsum(delta[order])
+    event_run = (events[order] // horizon).astype(int)
+    peaks = np.zeros(runs, np.int64)
+    np.maximum.at(peaks, event_run, live)
+    frames = np.arange(0.0, end, sample)
+    grid = (np.arange(runs)[:, None] * horizon + frames[None, :]).ravel()
+    counts = np.searchsorted(born_key, grid, side="right") - np.searchsorted(dead_key, grid, side="right")
+    return peaks, np.bincount(counts, minlength=1), len(born)
+
+
+def simulate_fight(task):
+    """One (boss, DPS) pair over `runs` runs -> per-run peaks and pooled frame counts."""
+    data, world_id, hp_mult, boss_id, dps, runs, player_spread, sample, max_fight, seq = task
+    rng = np.random.default_rng(seq)
+    boss = data["bosses"][boss_id]
+    hp = float(int(float(boss.get("hp", 500)) * hp_mult))
+    starts, casts, end, invincible = fight_schedule(boss, hp, dps, data["powers"], max_fight)
+    steps = cadence(starts, end, data["patterns"], data["min_interval"])
+
+    peaks, hist, bullets = [], np.zeros(1, np.int64), 0
+    for lo in range(0, runs, RUN_BATCH):
+        batch_peaks, batch_hist, born = simulate_runs(rng, data, boss, starts, casts, end, steps,
+                                                      min(RUN_BATCH, runs - lo), player_spread, sample)
+        peaks.append(batch_peaks)
+        size = max(len(hist), len(batch_hist))
+        hist = np.pad(hist, (0, size - len(hist))) + np.pad(batch_hist, (0, size - len(batch_hist)))
+        bullets += born
+    return {"world": world_id, "boss": boss_id, "dps": dps, "hp": hp, "fight": end, "capped": end >= max_fight,
+            "invincible": invincible, "phases": len(starts), "powers": len(casts), "bullets": bullets / max(1, runs), "peaks": np.concatenate(peaks), "frames": hist}
+
+
+def run_check(data):
+    """Lifetime sanity suite; returns the list of failures."""
+    failures = []
+
+    def expect(cond, label):
+        print(f"  {'ok  ' if cond else 'FAIL'} {label}")
+        if not cond:
+            failures.append(label)
+
+    width, height = data["viewport"]
+    print("straight lifetimes")
+    t = exit_time(np.array([360.0]), np.array([640.0]), np.array([0.0]), np.array([1.0]), 100.0, width, height)
+    expect(np.isclose(t[0], (height + OFFSCREEN_MARGIN - 640.0) / 100.0), "exit_time: straight down to the bottom margin")
+    print("homing lifetimes")
+    n = 200
+    rng = np.random.default_rng(0)
+    px, py = rng.uniform(0, width, n), rng.uniform(0, height * 0.3, n)
+    dx, dy = normalise(rng.normal(size=n), rng.normal(size=n))
+    tx, ty = np.full(n, width / 2), np.full(n, height * PLAYER_Y_RATIO)
+    for speed, lifetime in ((120.0, 4.5), (400.0, 20.0), (900.0, 3.0)):
+        life = homing_lifetime(px, py, dx, dy, speed, tx, ty, 3.0, 1.5, lifetime, width, height)
+        expect(life.dtype.kind == "f", f"speed {speed:g}: float lifetimes")
+        expect(bool(((life > 0.0) & (life <= lifetime + 1e-9)).all()), f"speed {speed:g}: within (0, {lifetime:g}]")
+    life = homing_lifetime(px, py, dx, dy, 120.0, tx, ty, 3.0, 1.5, 4.5, width, height)
+    expect(bool(np.isclose(life, 4.5).mean() > 0.9), "homing_barrage speed: most bullets live their full 4.5 s")
+    if "homing_barrage" in data["patterns"]:
+        pattern = data["patterns"]["homing_barrage"]
+        lifetime = float(pattern.get("despawn_after_sec", pattern.get("max_lifetime", DEFAULT_LIFETIME)))
+        life = homing_lifetime(px, py, dx, dy, float(pattern.get("speed", 200)), tx, ty,
+                               float(pattern.get("homing_turn_rate", 3.0)), float(pattern.get("homing_duration", 1.5)),
+                               lifetime, width, height)
+        expect(bool(life.max() > 1.0 + FRAME), "homing_barrage: lifetimes are seconds, not booleans")
+    return failures
+
+
+def summarise(result, pool, expand):
+    peaks = result["peaks"]
+    hist = result["frames"]
+    cdf = np.cumsum(hist) / max(1, hist.sum())
+    p99 = int(np.searchsorted(cdf, 0.99))
+    expansions = np.maximum(0, np.ceil((peaks - pool) / expand)).astype(int)
+    return {"peak": int(peaks.max()), "mean_peak": float(peaks.mean()), "p99": p99,
+            "runs_expanding": float((expansions > 0).mean()), "mean_expansions": float(expansions.mean())}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Boss bullet-density simulator (enemy projectile pool)")
+    p.add_argument("--dps", nargs="+", type=float, help="Player DPS values (default: derived from --ttk)")
+    p.add_argument("--ttk", nargs="+", type=float, default=[60.0, 120.0, 240.0],
+                   help="Fight lengths (s, ignoring invincibility) the DPS values are derived from, per boss")
+    p.add_argument("--runs", type=int, default=200, help="Runs per boss and DPS")
+    p.add_argument("--worlds", default="", help="Comma-separated world ids")
+    p.add_argument("--player-spread", type=float, default=0.6,
+                   help="Fraction of the screen width the player roams (aim targets)")
+    p.add_argument("--max-fight", type=float, default=900.0,
+                   help="Cut fights the boss's invincibility keeps from ending at this length (s)")
+    p.add_argument("--sample", type=float, default=0.1, help="Live-count sampling step for p99 (s)")
+    p.add_argument("--quantile", type=float, default=0.999,
+                   help="Per-run peak quantile the recommended pool must cover")
+    p.add_argument("--headroom", type=float, default=0.1, help="Extra fraction on top of the quantile")
+    p.add_argument("--round", type=int, default=16, help="Round recommendations up to this multiple")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all cores, 1 = serial)")
+    p.add_argument("--json", help="Write the full report to this file")
+    p.add_argument("--check", action="store_true", help="Run the lifetime sanity suite and exit")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    data = load_data()
+    if args.check:
+        failures = run_check(data)
+        print(f"\n{'FAILED: ' + str(len(failures)) if failures else 'all checks passed'} "
+              f"({time.perf_counter() - t0:.1f}s)")
+        return 1 if failures else 0
+    worlds = {w for w in args.worlds.split(",") if w} or None
+    fights = world_bosses(REPO, worlds)
+    if not fights:
+        p.error("no boss level matches --worlds")
+    missing = sorted({b for _, _, b in fights if b not in data["bosses"]})
+    fights = [f for f in fights if f[2] not in missing]
+    root = np.random.SeedSequence(args.seed)
+    tasks = []
+    for fi, (world_id, hp_mult, boss_id) in enumerate(fights):
+        hp = float(int(float(data["bosses"][boss_id].get("hp", 500)) * hp_mult))
+        values = args.dps or [hp / ttk for ttk in args.ttk]
+        for di, dps in enumerate(values):
+            tasks.append((data, world_id, hp_mult, boss_id, dps, args.runs, args.player_spread, args.sample, args.max_fight,
+                          np.random.SeedSequence(root.entropy, spawn_key=(fi, di))))
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = list(map(simulate_fight, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_fight, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    elapsed = time.perf_counter() - t0
+
+    pools = data["pools"]
+    pool_size = int(pools.get("pool_size_enemy", 200))
+    expand = max(1, int(pools.get("enemy_pool_expand_step", 64)))
+    print(f"## Live enemy projectiles per boss (pool {pool_size}, expand step {expand})\n")
+    print("| World | Boss | DPS | Fight | Invincible | Powers | Bullets/run | Mean peak | Peak | p99 "
+          "| Runs expanding |")
+    print("|---|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|")
+    rows = []
+    for r in results:
+        s = summarise(r, pool_size, expand)
+        rows.append(dict(s, world=r["world"], boss=r["boss"], dps=round(r["dps"], 1), fight_sec=round(r["fight"], 1), capped=r["capped"],
+                         invincible_share=round(r["invincible"] / max(r["fight"], 1e-9), 3),
+                         phases=r["phases"], powers=r["powers"], bullets_per_run=round(r["bullets"], 1)))
+        print(f"| {r['world']} | {r['boss']} | {r['dps']:.0f} | {'>' if r['capped'] else ''}{r['fight']:.0f}s "
+              f"| {r['invincible'] / max(r['fight'], 1e-9):.0%} | {r['powers']} "
+              f"| {r['bullets']:.0f} | {s['mean_peak']:.0f} | {s['peak']} | {s['p99']} | {s['runs_expanding']:.0%} |")
+
+    print(f"\n## Recommended pool_size_enemy (q{args.quantile:g} of run peaks + {args.headroom:.0%})\n")
+    print("| World | Fights | Worst boss | Peak | Quantile | Recommended | Runs expanding now |")
+    print("|---|---:|---|---:|---:|---:|---:|")
+    recommend = {}
+    for world_id in dict.fromkeys(r["world"] for r in results):
+        mine = [r for r in results if r["world"] == world_id]
+        peaks = np.concatenate([r["peaks"] for r in mine])
+        q = float(np.quantile(peaks, args.quantile))
+        size = int(math.ceil(q * (1.0 + args.headroom) / args.round) * args.round)
+        worst = max(mine, key=lambda r: r["peaks"].max())
+        recommend[world_id] = size
+        print(f"| {world_id} | {len(mine)} | {worst['boss']} | {int(peaks.max())} | {q:.0f} | {size} "
+              f"| {(peaks > pool_size).mean():.1%} |")
+    overall = max(recommend.values())
+    print(f"\npool_size_enemy is global (game.json projectile_pools): {overall} covers every world "
+          f"(currently {pool_size}).")
+    capped = sorted({f"{r['world']}/{r['boss']}" for r in results if r["capped"]})
+    if capped:
+        print(f"Fights cut at {args.max_fight:.0f}s (invincibility outpaces the DPS): {', '.join(capped)}")
+    if missing:
+        print(f"Bosses referenced by levels but missing from bosses.json: {', '.join(missing)}")
+    print(f"\n{len(results)} fights x {args.runs} runs in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": {k: v for k, v in vars(args).items() if k != "json"},
+                       "pool": {"pool_size_enemy": pool_size, "enemy_pool_expand_step": expand},
+                       "fights": rows, "recommended": recommend, "recommended_global": overall},
+                      f, indent=1, ensure_ascii=False)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
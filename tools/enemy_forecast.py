@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Concurrent-enemy forecaster and per-level enemy prewarm manifest.
+
+compute_scores.py counts the enemies a level spawns; this forecasts how many
+of each enemy_id are alive at once. That is what a pooled spawner has to hold
+and what the runtime enemy prewarm (Game._build_runtime_enemy_warmup_payloads,
+one instance per enemy_id | skin today) should build before the level starts.
+Mirrors:
+  - WaveManager: spawn schedules (tools/wave_timeline.py), one random
+    move_patterns.json entry per `enemy` wave shared by all of its spawns
+    (_pick_random_move_pattern_id), the random spawn point, elite
+    replacement (--elite-chance), skins (world skin_overrides.enemies, then
+    the wave's enemy_skin) and the wave-end fly-off (at most
+    WAVE_END_FLYOFF_DURATION_SEC);
+  - Enemy.gd path movement: move speed = pattern speed x base_speed x
+    modifier speed_mult; Curve2D resources (.tres) and proc curves,
+    _fit_curve_to_viewport with its forced top-to-bottom mapping, loop wrap;
+    despawn PATH_END_DESPAWN_DELAY after a non-loop path ends, or once
+    OFFSCREEN_MARGIN off-screen after 2 s of movement;
+  - tank waves fly straight down at speed_px_sec from spawn_y; swarm and
+    artillery units hold their zone until the wave ends.
+Nobody is killed and waves run to their hard timeout (no early clear), so
+counts are an upper bound: the right side to prewarm on. Mini-game waves
+spawn through their own managers and are not forecast; legacy procedural
+move types (no `type`) fly the straight fallback line.
+
+Lifetimes are tabulated once per (enemy_id, move pattern) by stepping the
+path frame by frame for a batch of spawn points in NumPy. Each level then
+draws --runs pattern / elite / spawn-point combinations and sweeps the
+spawn / despawn events of every enemy_id | skin at once; p95 and the
+manifest counts are quantiles of the per-run peaks. Levels fan out over a
+process pool with SeedSequence children, so results do not depend on
+--workers.
+
+Run from repo root:
+    python tools/enemy_forecast.py
+    python tools/enemy_forecast.py --levels world_3 --runs 4000
+    python tools/enemy_forecast.py --manifest enemy_prewarm.json --quantile 0.99
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import wave_timeline
+from bullet_sim import viewport_size
+from score_sim import DEFAULT_LIFETIME_SEC, STATIONARY_WAVE_TYPES
+from wave_timeline import REPO, compute_scores
+
+FRAME = 1.0 / 60.0
+OFFSCREEN_MARGIN = 120.0               # Enemy.OFFSCREEN_MARGIN
+OFFSCREEN_GRACE_SEC = 2.0              # Enemy._process: _move_time > 2.0
+PATH_END_DESPAWN_DELAY = 0.5           # Enemy.PATH_END_DESPAWN_DELAY
+RESOURCE_PATH_TOP_SPAWN_MARGIN = 260.0  # Enemy.RESOURCE_PATH_TOP_SPAWN_MARGIN
+WAVE_END_FLYOFF_DURATION_SEC = 1.6     # WaveManager.WAVE_END_FLYOFF_DURATION_SEC
+DEFAULT_MOVE_PATTERN_ID = "linear_cross_fast"  # WaveManager.DEFAULT_MOVE_PATTERN_ID
+BEZIER_STEPS = 32                      # samples per Curve2D segment
+SPAWN_SAMPLES = 64                     # spawn points tabulated for spawn-anchored paths
+MAX_PATH_SEC = 300.0                   # a path still on screen by then holds until the wave ends
+FRAME_CHUNK = 600
+
+
+def _vec(data, fallback):
+    """Enemy._dict_to_vector."""
+    if isinstance(data, dict):
+        return float(data.get("x", fallback[0])), float(data.get("y", fallback[1]))
+    return fallback
+
+
+def load_curve(res_path):
+    """(positions, in handles, out handles) of a Curve2D .tres (Godot stores in, out, position)."""
+    text = (REPO / res_path.replace("res://", "", 1)).read_text(encoding="utf-8")
+    m = re.search(r'"points":\s*PackedVector2Array\(([^)]*)\)', text)
+    values = [float(v) for v in m.group(1).split(",") if v.strip()] if m else []
+    v = np.array(values[:len(values) // 6 * 6]).reshape(-1, 3, 2)
+    return v[:, 2], v[:, 0], v[:, 1]
+
+
+def proc_curve(pattern, height):
+    """Enemy._build_proc_curve: point list of a proc_func, or None if unknown."""
+    def distance(mult):
+        return max(float(pattern.get("distance", max(height * mult, 350.0))), 1.0)
+
+    func = str(pattern.get("proc_func", ""))
+    tau = 2.0 * math.pi
+    if func == "sine_wave_vertical":
+        amplitude, frequency = float(pattern.get("amplitude", 120.0)), float(pattern.get("frequency", 2.0))
+        t = np.linspace(0.0, 1.0, max(24, int(pattern.get("steps", 96))) + 1)
+        return np.stack([np.sin(t * tau * frequency) * amplitude, t * distance(1.8)], axis=1)
+    if func == "figure_eight_vertical":
+        radius, vertical = float(pattern.get("radius", 90.0)), float(pattern.get("vertical_scale", 1.5))
+        drift = float(pattern.get("drift_y", 0.0 if bool(pattern.get("loop", True)) else distance(0.9)))
+        a = np.linspace(0.0, 1.0, max(32, int(pattern.get("steps", 96))) + 1) * tau
+        return np.stack([np.sin(a) * np.cos(a) * radius * 1.2, np.sin(a) * radius * vertical + drift * a / tau], axis=1)
+    if func == "impatient_circle":
+        radius = float(pattern.get("radius", 80.0))
+        turns = max(float(pattern.get("orbit_turns", 1.5)), 0.25)
+        cx, cy = _vec(pattern.get("center_offset"), (0.0, 140.0))
+        charge = float(pattern.get("charge_distance", distance(1.4)))
+        a = np.linspace(0.0, 1.0, max(30, int(pattern.get("steps", 96))) + 1) * tau * turns
+        orbit = np.stack([cx + np.cos(a) * radius, cy + np.sin(a) * radius], axis=1)
+        return np.vstack([orbit, [[0.0, cy + radius + charge]]])
+    if func == "heart_shape":
+        scale = float(pattern.get("scale", 10.0))
+        cx, cy = _vec(pattern.get("center_offset"), (0.0, 200.0))
+        t = np.linspace(0.0, 1.0, max(40, int(pattern.get("steps", 140))) + 1) * tau
+        y = 13.0 * np.cos(t) - 5.0 * np.cos(2 * t) - 2.0 * np.cos(3 * t) - np.cos(4 * t)
+        return np.stack([cx + 16.0 * np.sin(t) ** 3 * scale, cy - y * scale], axis=1)
+    if func == "dna_helix":
+        primary, secondary = float(pattern.get("amplitude", 90.0)), float(pattern.get("secondary_amplitude", 35.0))
+        tightness = float(pattern.get("tightness", 5.0))
+        t = np.linspace(0.0, 1.0, max(40, int(pattern.get("steps", 120))) + 1)
+        a = t * tau * tightness
+        return np.stack([np.sin(a) * primary + np.sin(a * 2.0 + math.pi / 2) * secondary, t * distance(2.0)], axis=1)
+    if func == "spirograph_flower":
+        big, small = float(pattern.get("spiro_R", 90.0)), max(float(pattern.get("spiro_r", 30.0)), 1.0)
+        d, scale = float(pattern.get("spiro_d", 55.0)), float(pattern.get("scale", 1.0))
+        cx, cy = _vec(pattern.get("center_offset"), (0.0, 260.0))
+        t = np.linspace(0.0, 1.0, max(60, int(pattern.get("steps", 220))) + 1) * tau * max(float(pattern.get("turns", 6.0)), 1.0)
+        k = (big - small) / small
+        return np.stack([cx + ((big - small) * np.cos(t) + d * np.cos(k * t)) * scale,
+                         cy + ((big - small) * np.sin(t) - d * np.sin(k * t)) * scale], axis=1)
+    return None
+
+
+def fit_to_viewport(pos, hin, hout, pattern, anchor, width, height):
+    """Enemy._fit_curve_to_viewport (bounds include the handles)."""
+    corners = np.vstack([pos, pos + hin, pos + hout])
+    lo = corners.min(axis=0)
+    size = np.maximum(corners.max(axis=0) - lo, 1.0)
+    target_w = width * max(0.001, float(pattern.get("fit_width_ratio", 1.0)))
+    target_h = height * max(0.001, float(pattern.get("fit_height_ratio", 1.0)))
+    sx, sy = target_w / size[0], target_h / size[1]
+    force_top = anchor == "viewport" and bool(pattern.get("force_spawn_outside_top", True)) and (
+        str(pattern.get("type", "")) == "resource"
+        or str(pattern.get("path", pattern.get("resource", ""))).lower().endswith((".tres", ".res")))
+    if bool(pattern.get("fit_preserve_aspect", False)) and not force_top:
+        sx = sy = min(sx, sy)
+        target_w, target_h = size[0] * sx, size[1] * sy
+    ox = (width - target_w) * min(1.0, max(0.0, float(pattern.get("fit_align_x", 0.0))))
+    oy = (height - target_h) * min(1.0, max(0.0, float(pattern.get("fit_align_y", 0.0))))
+    direct = False
+    if force_top and abs(pos[-1, 1] - pos[0, 1]) > 0.001:
+        top = -abs(max(40.0, float(pattern.get("spawn_top_margin", RESOURCE_PATH_TOP_SPAWN_MARGIN))))
+        bottom = height + abs(max(40.0, float(pattern.get("exit_bottom_margin", OFFSCREEN_MARGIN))))
+        sy = (bottom - top) / (pos[-1, 1] - pos[0, 1])
+        oy = top - pos[0, 1] * sy
+        direct = True
+    out = np.empty_like(pos)
+    out[:, 0] = (pos[:, 0] - lo[0]) * sx + ox
+    out[:, 1] = pos[:, 1] * sy + oy if direct else (pos[:, 1] - lo[1]) * sy + oy
+    scale = np.array([sx, sy])
+    return out, hin * scale, hout * scale
+
+
+def bake(pos, hin, hout):
+    """Dense polyline of the cubic segments and its cumulative arc length."""
+    if len(pos) < 2:
+        return pos, np.zeros(len(pos))
+    t = np.linspace(0.0, 1.0, BEZIER_STEPS, endpoint=False)[:, None, None]
+    p0, p3 = pos[None, :-1], pos[None, 1:]
+    p1, p2 = p0 + hout[None, :-1], p3 + hin[None, 1:]
+    u = 1.0 - t
+    seg = u ** 3 * p0 + 3 * u * u * t * p1 + 3 * u * t * t * p2 + t ** 3 * p3
+    points = np.vstack([seg.transpose(1, 0, 2).reshape(-1, 2), pos[-1:]])
+    cum = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+    return points, cum
+
+
+def pattern_path(pattern, width, height):
+    """Enemy.setup_movement -> (baked points, arc length, loop, anchor)."""
+    loop = bool(pattern.get("loop", False))
+    anchor = str(pattern.get("path_anchor", "")) or ("viewport" if bool(pattern.get("fit_to_viewport", False)) else "spawn")
+    kind = str(pattern.get("type", ""))
+    pos = None
+    if kind == "resource" or (kind != "proc" and pattern.get("resource")):
+        pos, hin, hout = load_curve(str(pattern.get("path", pattern.get("resource", ""))))
+    elif kind == "proc":
+        pos = proc_curve(pattern, height)
+        if pos is not None:
+            hin = hout = np.zeros_like(pos)
+    if pos is not None and len(pos) >= 2 and bool(pattern.get("fit_to_viewport", False)):
+        pos, hin, hout = fit_to_viewport(pos, hin, hout, pattern, anchor, width, height)
+    if pos is None or len(pos) < 2:
+        # _generate_fallback_path; proc_line without `distance` is the same line
+        pos = np.array([[0.0, 0.0], [0.0, max(height * 1.4, 500.0)]])
+        hin = hout = np.zeros_like(pos)
+        loop = loop and kind == ""
+    points, cum = bake(pos, hin, hout)
+    return points, cum, loop, anchor
+
+
+def path_lifetimes(points, cum, loop, origins, speed, width, height):
+    """Seconds until Enemy._process frees each spawn (inf: still on screen after MAX_PATH_SEC)."""
+    length = max(cum[-1], 0.001)
+    n = len(origins)
+    life = np.full(n, np.inf)
+    open_ = np.ones(n, bool)
+    end_frames = int(math.ceil(PATH_END_DESPAWN_DELAY / FRAME - 1e-9)) - 1
+    grace = OFFSCREEN_GRACE_SEC
+    for k0 in range(1, int(MAX_PATH_SEC / FRAME) + 1, FRAME_CHUNK):
+        t = np.arange(k0, k0 + FRAME_CHUNK) * FRAME
+        progress = speed * t
+        progress = np.mod(progress, length) if loop else np.minimum(progress, length)
+        x = np.interp(progress, cum, points[:, 0])[:, None] + origins[None, :, 0]
+        y = np.interp(progress, cum, points[:, 1])[:, None] + origins[None, :, 1]
+        off = (x < -OFFSCREEN_MARGIN) | (x > width + OFFSCREEN_MARGIN) | (y < -OFFSCREEN_MARGIN) | (y > height + OFFSCREEN_MARGIN)
+        gone = off & (t > grace)[:, None]
+        if not loop:
+            ended = np.flatnonzero(progress >= length - 0.5)
+            if ended.size and ended[0] + end_frames < len(t):
+                gone[ended[0] + end_frames:] = True
+        hit = gone[:, open_]
+        first = np.where(hit.any(axis=0), hit.argmax(axis=0), -1)
+        idx = np.flatnonzero(open_)
+        done = first >= 0
+        life[idx[done]] = t[first[done]]
+        open_[idx[done]] = False
+        if not open_.any():
+            break
+    return life
+
+
+def spawn_points(rng, n, width):
+    """WaveManager._get_random_spawn_position."""
+    return np.stack([rng.uniform(50.0, max(50.0, width - 50.0), n), rng.uniform(0.0, 80.0, n)], axis=1)
+
+
+class Lifetimes:
+    """Per (enemy_id, move pattern | wave mode) lifetime samples, tabulated on demand."""
+
+    def __init__(self, config, patterns, modifiers, width, height, seed):
+        self.config, self.patterns, self.modifiers = config, patterns, modifiers
+        self.width, self.height = width, height
+        self.rng = np.random.default_rng(seed)
+        self.paths = {}
+        self.table = {}
+        self.rows = {}
+
+    def speed_mult(self, enemy_id, modifier_id):
+        enemy = self.config["enemies"].get(enemy_id, {})
+        modifier = self.modifiers.get(modifier_id or str(enemy.get("modifier_id", "")), {})
+        return float(modifier.get("stats", {}).get("speed_mult", 1.0))
+
+    def path(self, enemy_id, pattern_id, modifier_id=""):
+        key = (enemy_id, pattern_id, modifier_id)
+        if key not in self.table:
+            pattern = self.patterns.get(pattern_id, {})
+            if pattern_id not in self.paths:
+                self.paths[pattern_id] = pattern_path(pattern, self.width, self.height)
+            points, cum, loop, anchor = self.paths[pattern_id]
+            enemy = self.config["enemies"].get(enemy_id, {})
+            speed = float(pattern.get("speed", 100.0)) * max(float(enemy.get("base_speed", 1.0)), 0.0)
+            speed *= self.speed_mult(enemy_id, modifier_id)
+            if anchor == "viewport":
+                origins = np.zeros((1, 2))
+            else:
+                origins = spawn_points(self.rng, SPAWN_SAMPLES, self.width) - points[0]
+            life = path_lifetimes(points, cum, loop, origins, speed, self.width, self.height)
+            self.table[key] = life
+            self.rows[key] = {"speed": round(speed, 1), "path_px": round(float(cum[-1]), 1), "loop": loop,
+                              "anchor": anchor, "lifetime_sec": round(float(np.median(life)), 2),
+                              # first frame past the grace: the path never came on screen
+                              "never_on_screen": bool(np.median(life) < OFFSCREEN_GRACE_SEC + 1.5 * FRAME)}
+        return self.table[key]
+
+    def tank(self, enemy_id, speed, spawn_y, modifier_id=""):
+        key = (enemy_id, f"tank@{speed:g}/{spawn_y:g}", modifier_id)
+        if key not in self.table:
+            speed *= self.speed_mult(enemy_id, modifier_id)
+            points = np.array([[0.0, 0.0], [0.0, self.height * 4.0]])
+            cum = np.array([0.0, self.height * 4.0])
+            origins = np.array([[self.width / 2.0, spawn_y]])
+            self.table[key] = path_lifetimes(points, cum, False, origins, speed, self.width, self.height)
+        return self.table[key]
+
+
+def build_plan(world, level, config, lifetimes, args):
+    """Pre-expand one level into spawn arrays and lifetime tables (picklable for the pool)."""
+    defaults = world.get("wave_runtime_defaults", {})
+    skins = (world.get("skin_overrides", {}) or {}).get("enemies", {}) or {}
+    tank_cfg = compute_scores.wave_type_config(config["wave_types"], config["gameplay"], "tank")
+    pattern_ids = list(lifetimes.patterns) or [DEFAULT_MOVE_PATTERN_ID]
+    waves, start = [], 0.0
+    for entry in wave_timeline.level_timeline(level, defaults, config):
+        end = start + entry["duration"]
+        if entry["enemy_id"] and len(entry["delays"]):
+            wave = entry["wave"]
+            enemy_id = entry["enemy_id"]
+            modifier = str(wave.get("enemy_modifier_id", ""))
+            skin = str(skins.get(enemy_id, "")) or str(wave.get("enemy_skin", ""))
+            plan = {"born": start + entry["delays"], "end": end, "enemy_id": enemy_id, "skin": skin,
+                    "elite_chance": args.elite_chance if entry["elite_eligible"] else 0.0,
+                    "elite_skin": str(skins.get("elite", ""))}
+            if entry["type"] in STATIONARY_WAVE_TYPES:
+                plan["tables"] = [np.array([np.inf])]
+                plan["elite_tables"] = plan["tables"]
+            elif entry["type"] == "tank":
+                speed = max(1.0, float(wave.get("speed_px_sec", tank_cfg.get("speed_px_sec", 150.0))))
+                spawn_y = float(wave.get("spawn_y", tank_cfg.get("spawn_y", -110.0)))
+                plan["tables"] = [lifetimes.tank(enemy_id, speed, spawn_y, modifier)]
+                plan["elite_tables"] = plan["tables"]
+            else:
+                plan["tables"] = [lifetimes.path(enemy_id, pid, modifier) for pid in pattern_ids]
+                plan["elite_tables"] = [lifetimes.path("elite", pid, modifier) for pid in pattern_ids]
+            waves.append(plan)
+        start = end
+    return {"world_id": world.get("id", ""), "level_id": level.get("id", ""), "duration": start, "waves": waves}
+
+
+def simulate_level(task):
+    """One level over `runs` runs -> per-run peak alive count per enemy_id | skin and overall."""
+    plan, runs, seq = task
+    rng = np.random.default_rng(seq)
+    events = {}
+    for wave in plan["waves"]:
+        born = wave["born"]
+        n = len(born)
+        run = np.repeat(np.arange(runs), n)
+        t = np.tile(born, runs)
+        # the pattern is drawn once per wave and shared by all its spawns
+        pick = np.repeat(rng.integers(len(wave["tables"]), size=runs), n)
+        elite = rng.random(runs * n) < wave["elite_chance"] if wave["elite_chance"] > 0.0 else np.zeros(runs * n, bool)
+        life = np.empty(runs * n)
+        for is_elite, tables in ((False, wave["tables"]), (True, wave["elite_tables"])):
+            for p, table in enumerate(tables):
+                sel = np.flatnonzero((pick == p) & (elite == is_elite))
+                if sel.size:
+                    life[sel] = table[rng.integers(len(table), size=sel.size)]
+        gone = t + life
+        dead = np.where(gone > wave["end"], wave["end"] + WAVE_END_FLYOFF_DURATION_SEC, gone)
+        for is_elite, key in ((False, (wave["enemy_id"], wave["skin"])), (True, ("elite", wave["elite_skin"]))):
+            sel = elite == is_elite
+            if sel.any():
+                events.setdefault(key, []).append((run[sel], t[sel], dead[sel]))
+
+    horizon = plan["duration"] + WAVE_END_FLYOFF_DURATION_SEC + 1.0
+
+    def peaks(chunks):
+        run = np.concatenate([c[0] for c in chunks])
+        born = run * horizon + np.concatenate([c[1] for c in chunks])
+        dead = run * horizon + np.concatenate([c[2] for c in chunks])
+        times = np.concatenate([born, dead])
+        delta = np.concatenate([np.ones(len(born), np.int32), -np.ones(len(dead), np.int32)])
+        order = np.lexsort((delta, times))  # a despawn at the same instant frees its slot first
+        live = np.cumsum(delta[order])
+        out = np.zeros(runs, np.int64)
+        np.maximum.at(out, (times[order] // horizon).astype(np.int64), live)
+        return out
+
+    per_key = {key: peaks(chunks) for key, chunks in events.items()}
+    everything = [c for chunks in events.values() for c in chunks]
+    return {"world": plan["world_id"], "level_id": plan["level_id"], "duration": plan["duration"],
+            "spawns": sum(len(c[1]) for c in everything) / max(1, runs),
+            "peaks": per_key, "total": peaks(everything) if everything else np.zeros(runs, np.int64)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Concurrent-enemy forecaster and per-level prewarm manifest")
+    p.add_argument("--runs", type=int, default=1000, help="Runs per level (move pattern / elite / spawn draws)")
+    p.add_argument("--levels", default="", help="Comma-separated world_id / level_id prefixes")
+    p.add_argument("--elite-chance", type=float, default=0.0,
+                   help="Elite replacement chance per spawn (override protocols)")
+    p.add_argument("--quantile", type=float, default=0.95, help="Per-run peak quantile the manifest covers")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all cores, 1 = serial)")
+    p.add_argument("--manifest", help="Write the per-level prewarm manifest to this file")
+    p.add_argument("--json", help="Write the full report to this file")
+    args = p.parse_args()
+    if args.runs < 1:
+        p.error("--runs must be >= 1")
+    if not 0.0 < args.quantile <= 1.0:
+        p.error("--quantile must be in (0, 1]")
+
+    t0 = time.perf_counter()
+    config = compute_scores.load_config(str(REPO))
+    patterns = {m["id"]: m for m in compute_scores.load_json(
+        str(REPO / "data" / "patterns" / "move_patterns.json")).get("patterns", []) if m.get("id")}
+    modifiers_path = REPO / "data" / "enemy_modifiers.json"
+    modifiers = compute_scores.load_json(str(modifiers_path)) if modifiers_path.is_file() else {}
+    width, height = viewport_size()
+    root = np.random.SeedSequence(args.seed)
+    lifetimes = Lifetimes(config, patterns, modifiers, width, height,
+                          np.random.SeedSequence(root.entropy, spawn_key=(0,)))
+    prefixes = [s.strip() for s in args.levels.split(",") if s.strip()]
+    tasks = []
+    for world, level in wave_timeline.iter_world_levels():
+        level_id = level.get("id", "")
+        if prefixes and not any(level_id.startswith(pfx) for pfx in prefixes):
+            continue
+        plan = build_plan(world, level, config, lifetimes, args)
+        tasks.append((plan, args.runs, np.random.SeedSequence(root.entropy, spawn_key=(1, len(tasks)))))
+    if not tasks:
+        print("no level matched", file=sys.stderr)
+        return 1
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = list(map(simulate_level, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_level, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    elapsed = time.perf_counter() - t0
+
+    path_rows = lifetimes.rows
+    enemy_ids = sorted({k[0] for k in path_rows})
+    pattern_ids = sorted({k[1] for k in path_rows})
+    print("## On-screen lifetime per enemy and move pattern (s, median over spawn points)\n")
+    print("| Enemy | " + " | ".join(pattern_ids) + " | score_sim |")
+    print("|---|" + "---:|" * (len(pattern_ids) + 1))
+    for enemy_id in enemy_ids:
+        cells = []
+        for pattern_id in pattern_ids:
+            row = next((v for k, v in path_rows.items() if k[0] == enemy_id and k[1] == pattern_id), None)
+            cells.append("-" if row is None else ("hold" if math.isinf(row["lifetime_sec"]) else f"{row['lifetime_sec']:.1f}"))
+        print(f"| {enemy_id} | " + " | ".join(cells) + f" | {DEFAULT_LIFETIME_SEC.get(enemy_id, '-')} |")
+    early = sorted({k[1] for k, v in path_rows.items() if v["never_on_screen"]})
+    if early:
+        print(f"\nFreed by the off-screen check right after the {OFFSCREEN_GRACE_SEC:g} s grace "
+              f"(the fitted path never enters the screen): {', '.join(early)}")
+
+    def q(values):
+        return int(math.ceil(float(np.quantile(values, args.quantile)) - 1e-9))
+
+    label = f"p{args.quantile * 100:g}"
+    print(f"\n## Enemies alive at once per level ({label} / peak of per-run peaks)\n")
+    print(f"| Level | Duration | Spawns | All {label} | All peak | Per enemy_id {label} / peak |")
+    print("|---|---:|---:|---:|---:|---|")
+    levels, manifest = [], {}
+    for r in results:
+        per_enemy = []
+        for (enemy_id, skin), peaks in sorted(r["peaks"].items()):
+            per_enemy.append({"enemy_id": enemy_id, "enemy_skin": skin, "count": q(peaks),
+                              "peak": int(peaks.max()), "mean_peak": round(float(peaks.mean()), 2)})
+        merged = {}
+        for e in per_enemy:
+            counts = merged.setdefault(e["enemy_id"], [0, 0])
+            counts[0] += e["count"]
+            counts[1] += e["peak"]
+        cells = ", ".join(f"{eid} {c}/{pk}" for eid, (c, pk) in merged.items()) or "-"
+        total = r["total"]
+        print(f"| {r['level_id']} | {r['duration']:.0f}s | {r['spawns']:.0f} | {q(total)} | {int(total.max())} | {cells} |")
+        levels.append({"level_id": r["level_id"], "world_id": r["world"], "duration_sec": round(r["duration"], 1),
+                       "spawns": round(r["spawns"], 1), "alive_quantile": q(total), "alive_peak": int(total.max()),
+                       "enemies": per_enemy})
+        manifest[r["level_id"]] = {"total": q(total),
+                                   "enemies": [{k: e[k] for k in ("enemy_id", "enemy_skin", "count")}
+                                               for e in per_enemy if e["count"] > 0]}
+    worst = max(levels, key=lambda lv: lv["alive_peak"])
+    print(f"\nMost enemies alive at once: {worst['alive_peak']} ({worst['level_id']}); "
+          f"the runtime prewarm builds one instance per enemy_id | skin.")
+    print(f"\n{len(results)} levels x {args.runs} runs in {elapsed:.1f}s")
+
+    params = {k: v for k, v in vars(args).items() if k not in ("json", "manifest")}
+    if args.manifest:
+        with open(args.manifest, "w", encoding="utf-8") as f:
+            json.dump({"generated_by": "tools/enemy_forecast.py", "quantile": args.quantile, "runs": args.runs,
+                       "levels": manifest}, f, indent=1, ensure_ascii=False)
+        print(f"Prewarm manifest written to {args.manifest}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": params,
+                       "lifetimes": [dict(v, enemy_id=k[0], move_pattern_id=k[1], modifier_id=k[2])
+                                     for k, v in path_rows.items()],
+                       "levels": levels}, f, indent=1, ensure_ascii=False)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,29 @@
 #!/usr/bin/env python3
-"""Generate all 9 world JSON files for pewpewloot."""
-import json, os, random
+"""Generate all 9 world JSON files for pewpewloot.
+
+Without options, writes the single deterministic layout per level built from
+WAVE_COUNTS / DURATIONS / build_waves (same output as always). Files are
+patched in place (tools/json_patch.py): unchanged files are not touched.
+
+--search N samples N candidate layouts per level instead: each candidate
+draws its layout parameters (obstacle cadence, enemy counts and interval,
+slot jitter) and its obstacles from its own RNG stream, a SeedSequence child
+keyed by (world, level, candidate), so the result depends only on --seed,
+not on --workers. Candidates are scored against a target pressure curve
+(see TARGET_* below) and the best --keep per level are reported; --write
+also writes the world files with the best layout of each level.
+
+Run from repo root:
+    python tools/gen_worlds.py
+    python tools/gen_worlds.py --search 5000 --keep 5 --seed 7 --out gen_report.json
+    python tools/gen_worlds.py --search 5000 --write
+"""
+import argparse, heapq, json, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import json_patch
 
 WORLDS_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "worlds")
 
@@ -166,10 +189,12 @@ level_names = [
 ]
 
 
-def pick_obstacle(world_order: int, level_index: int, obs_index: int) -> dict:
-    """Pick an obstacle from pools based on world + level difficulty."""
-    random.seed(world_order * 1000 + level_index * 100 + obs_index)
+def pick_obstacle(world_order: int, level_index: int, obs_index: int, rng=None) -> dict:
+    """Pick an obstacle from pools based on world + level difficulty.
 
+    `rng` is a numpy Generator (search mode); without it the pick is seeded
+    from the position, on a private Random so the global one is untouched.
+    """
     # Early worlds = easy obstacles, later = harder mix
     if world_order <= 2:
         pool = OBSTACLE_POOL_EASY + OBSTACLE_POOL_MEDIUM[:2]
@@ -182,35 +207,53 @@ def pick_obstacle(world_order: int, level_index: int, obs_index: int) -> dict:
     if level_index >= 3 and world_order >= 3:
         pool = pool + OBSTACLE_POOL_HARD
 
-    return random.choice(pool)
+    if rng is not None:
+        return pool[int(rng.integers(len(pool)))]
+    return random.Random(world_order * 1000 + level_index * 100 + obs_index).choice(pool)
+
 
+# Layout parameters; the defaults give the historical E E E O layout.
+DEFAULT_LAYOUT = {
+    "obstacle_every": 4,    # every Nth slot is an obstacle wave
+    "count_base": 3,        # enemies in the first wave (+ level_index)
+    "count_step": 3,        # +1 enemy every N enemy waves
+    "interval": 0.7,        # seconds between two spawns of a wave
+    "jitter": 0.0,          # slot time jitter, fraction of the spacing
+}
 
-def build_waves(wave_count, duration, level_index, world_order):
+
+def build_waves(wave_count, duration, level_index, world_order, layout=None, rng=None):
     """Build interleaved enemy + obstacle waves.
     
-    Every 3 enemy waves, insert 1 obstacle wave.
-    Pattern: E E E O E E E O ...
+    Every (obstacle_every - 1) enemy waves, insert 1 obstacle wave.
+    Default pattern: E E E O E E E O ...
     """
+    layout = {**DEFAULT_LAYOUT, **(layout or {})}
+    every = layout["obstacle_every"]
     total_wave_slots = wave_count  # total enemy waves requested
     
     # Calculate how many obstacle waves we'll insert
-    obstacle_count = max(0, (total_wave_slots - 1) // 3)
+    obstacle_count = max(0, (total_wave_slots - 1) // (every - 1))
     total_entries = total_wave_slots + obstacle_count
     
     # Time spacing based on total entries
     spacing = (duration - 6.0) / max(total_entries, 1)
+    times = 3.0 + np.arange(total_entries) * spacing
+    if layout["jitter"] and rng is not None:
+        times = np.sort(times + rng.uniform(-1.0, 1.0, total_entries) * layout["jitter"] * spacing)
+        times = np.clip(times, 1.0, duration - 3.0)
     
     waves = []
     enemy_idx = 0
     obs_idx = 0
     
     for slot in range(total_entries):
-        t = round(3.0 + slot * spacing, 1)
+        t = round(float(times[slot]), 1)
         
-        # Every 4th slot (index 3, 7, 11...) is an obstacle
-        if slot > 0 and slot % 4 == 3:
+        # Every Nth slot (index 3, 7, 11... by default) is an obstacle
+        if slot > 0 and slot % every == every - 1:
             # Obstacle wave
-            obs_template = pick_obstacle(world_order, level_index, obs_idx)
+            obs_template = pick_obstacle(world_order, level_index, obs_idx, rng)
             obs_wave = {
                 "time": t,
                 "type": "obstacle",
@@ -232,13 +275,13 @@ def build_waves(wave_count, duration, level_index, world_order):
             obs_idx += 1
         else:
             # Enemy wave
-            count = 3 + level_index + (enemy_idx // 3)
+            count = layout["count_base"] + level_index + (enemy_idx // layout["count_step"])
             waves.append({
                 "time": t,
                 "enemy_id": "scout_basic",
                 "enemy_skin": "",
                 "count": count,
-                "interval": 0.7,
+                "interval": layout["interval"],
                 "enemy_modifier_id": ""
             })
             enemy_idx += 1
@@ -246,72 +289,238 @@ def build_waves(wave_count, duration, level_index, world_order):
     return waves
 
 
-def main():
-    os.makedirs(WORLDS_DIR, exist_ok=True)
+# --- Candidate scoring -------------------------------------------------------
+# Pressure = enemies on screen (scaled by the world's hp/damage multipliers)
+# + obstacle density (speed / gap / row interval, scaled by multipliers.speed),
+# binned per second. The target is the level's ramp times the pacing shape;
+# gear is assumed to absorb half of the world multipliers (on a log scale).
 
-    for idx, biome in enumerate(biomes):
-        base_bg = f"res://assets/backgrounds/worlds/{biome['folder']}/"
-
-        world = {
-            "id": biome["id"],
-            "name": biome["name"],
-            "description": biome["description"],
-            "order": biome["order"],
-            "multipliers": biome["mult"],
-            "theme": {
-                "background": "",
-                "music": f"res://assets/music/{biome['music']}",
-                "color_palette": biome["color"]
-            },
-            "levels": [],
-            "unlock_condition": biome["unlock"]
-        }
+# Shape of the pressure over a level (x = fraction of the duration): build-up,
+# breather around the middle, climax before the end.
+TARGET_PACING = [(0.0, 0.55), (0.35, 0.9), (0.5, 0.7), (0.85, 1.0), (1.0, 0.9)]
+TARGET_LEVEL_RAMP = [1.0, 1.2, 1.4, 1.6, 1.8, 1.5]
+TARGET_GEAR_ABSORB = 0.5
+ENEMY_LINGER_SEC = 4.0       # time an enemy stays a threat after spawning
+OBSTACLE_WEIGHT = 600.0      # obstacle density -> enemy-equivalents
+DEAD_AIR_RATIO = 0.25        # bins under this fraction of the target
+DEAD_AIR_PENALTY = 0.5
+
+
+def world_threat(mult):
+    return (mult.get("hp", 1.0) * mult.get("damage", 1.0)) ** 0.5
+
+
+def pressure_curve(waves, duration, mult):
+    """Per-second pressure of a generated layout."""
+    bins = np.zeros(int(duration))
+    last = len(bins) - 1
+    enemy_scale = world_threat(mult)
+    for wave in waves:
+        start = wave["time"]
+        if wave.get("type") == "obstacle":
+            end = start + wave["duration"]
+            value = OBSTACLE_WEIGHT * wave["speed"] * mult.get("speed", 1.0) / (wave["gap_width"] * wave["row_interval"] * 100.0)
+        else:
+            end = start + wave["count"] * wave["interval"] + ENEMY_LINGER_SEC
+            value = wave["count"] * enemy_scale / (end - start) * ENEMY_LINGER_SEC
+        lo, hi = min(int(start), last), min(int(np.ceil(end)), len(bins))
+        bins[lo:max(hi, lo + 1)] += value
+    return bins
+
+
+def target_curve(duration, level_index, mult, base):
+    x = (np.arange(int(duration)) + 0.5) / duration
+    px, py = zip(*TARGET_PACING)
+    scale = base * TARGET_LEVEL_RAMP[level_index] * world_threat(mult) ** (1.0 - TARGET_GEAR_ABSORB)
+    return np.interp(x, px, py) * scale
+
+
+def score_layout(waves, target, mult):
+    """Normalised RMS distance to the target plus a dead-air penalty (lower is better)."""
+    p = pressure_curve(waves, len(target), mult)
+    mean = target.mean()
+    nrmse = np.sqrt(np.mean((p - target) ** 2)) / mean
+    dead_air = np.mean(p < DEAD_AIR_RATIO * target)
+    return float(nrmse + DEAD_AIR_PENALTY * dead_air)
+
+
+def default_target_base():
+    """Calibrate the target on the historical world_1 first level."""
+    mult = biomes[0]["mult"]
+    waves = build_waves(WAVE_COUNTS[0], DURATIONS[0], 0, biomes[0]["order"])
+    unit = target_curve(DURATIONS[0], 0, mult, 1.0)
+    return float(pressure_curve(waves, DURATIONS[0], mult).mean() / unit.mean())
+
+
+def sample_layout(rng):
+    return {
+        "obstacle_every": int(rng.integers(3, 7)),
+        "count_base": int(rng.integers(1, 6)),
+        "count_step": int(rng.integers(2, 6)),
+        "interval": round(float(rng.uniform(0.4, 1.0)), 2),
+        "jitter": round(float(rng.uniform(0.0, 0.35)), 2),
+    }
 
-        for lvl_idx in range(6):
-            wave_count = WAVE_COUNTS[lvl_idx]
-            duration  = DURATIONS[lvl_idx]
-            is_boss   = (lvl_idx == 5)
 
-            far_file = biome["far_files"][lvl_idx]
-            mid_file = biome["mid_files"][lvl_idx % len(biome["mid_files"])]
+def candidate(seed, biome_idx, level_index, index):
+    """Layout + waves of one candidate, from its own RNG stream."""
+    biome = biomes[biome_idx]
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(biome_idx, level_index, index)))
+    layout = sample_layout(rng)
+    waves = build_waves(WAVE_COUNTS[level_index], DURATIONS[level_index], level_index, biome["order"], layout, rng)
+    return layout, waves
 
+
+def _search_chunk(seed, biome_idx, level_index, start, stop, keep, base):
+    """Best `keep` (score, index) of candidates [start, stop) for one level."""
+    mult = biomes[biome_idx]["mult"]
+    target = target_curve(DURATIONS[level_index], level_index, mult, base)
+    scored = []
+    for index in range(start, stop):
+        _, waves = candidate(seed, biome_idx, level_index, index)
+        scored.append((score_layout(waves, target, mult), index))
+    return biome_idx, level_index, heapq.nsmallest(keep, scored)
+
+
+def search(seed, n_candidates, keep, workers, chunk, base):
+    """{(biome_idx, level_index): [(score, index)] best first}, independent of `workers`."""
+    tasks = [(seed, b, l, start, min(start + chunk, n_candidates), keep, base)
+             for b in range(len(biomes)) for l in range(len(WAVE_COUNTS))
+             for start in range(0, n_candidates, chunk)]
+    best = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_search_chunk, *zip(*tasks)))
+    else:
+        results = [_search_chunk(*task) for task in tasks]
+    for b, l, top in results:
+        best[(b, l)] = heapq.nsmallest(keep, best.get((b, l), []) + top)
+    return best
+
+
+def build_world(idx, biome, level_waves=None):
+    """World dict; `level_waves[lvl_idx]` overrides the default waves."""
+    base_bg = f"res://assets/backgrounds/worlds/{biome['folder']}/"
+
+    world = {
+        "id": biome["id"],
+        "name": biome["name"],
+        "description": biome["description"],
+        "order": biome["order"],
+        "multipliers": biome["mult"],
+        "theme": {
+            "background": "",
+            "music": f"res://assets/music/{biome['music']}",
+            "color_palette": biome["color"]
+        },
+        "levels": [],
+        "unlock_condition": biome["unlock"]
+    }
+
+    for lvl_idx in range(6):
+        wave_count = WAVE_COUNTS[lvl_idx]
+        duration  = DURATIONS[lvl_idx]
+        is_boss   = (lvl_idx == 5)
+
+        far_file = biome["far_files"][lvl_idx]
+        mid_file = biome["mid_files"][lvl_idx % len(biome["mid_files"])]
+
+        if level_waves:
+            waves = level_waves[lvl_idx]
+        else:
             waves = build_waves(wave_count, duration, lvl_idx, biome["order"])
 
-            level = {
-                "index": lvl_idx,
-                "id": f"{biome['id']}_lvl_{lvl_idx}",
-                "name": level_names[idx][lvl_idx],
-                "type": "boss" if is_boss else "normal",
-                "duration_sec": duration,
-                "backgrounds": {
-                    "card": base_bg + far_file,
-                    "far_layer": base_bg + far_file,
-                    "mid_layer": [
-                        [
-                            {
-                                "asset": base_bg + mid_file,
-                                "opacity": 1.0
-                            }
-                        ]
-                    ],
-                    "near_layer": []
-                },
-                "waves": waves,
-                "events": []
-            }
+        level = {
+            "index": lvl_idx,
+            "id": f"{biome['id']}_lvl_{lvl_idx}",
+            "name": level_names[idx][lvl_idx],
+            "type": "boss" if is_boss else "normal",
+            "duration_sec": duration,
+            "backgrounds": {
+                "card": base_bg + far_file,
+                "far_layer": base_bg + far_file,
+                "mid_layer": [
+                    [
+                        {
+                            "asset": base_bg + mid_file,
+                            "opacity": 1.0
+                        }
+                    ]
+                ],
+                "near_layer": []
+            },
+            "waves": waves,
+            "events": []
+        }
+
+        if is_boss:
+            level["boss_id"] = "boss_world1"
 
-            if is_boss:
-                level["boss_id"] = "boss_world1"
+        world["levels"].append(level)
+    return world
 
-            world["levels"].append(level)
 
+def write_worlds(level_waves=None):
+    os.makedirs(WORLDS_DIR, exist_ok=True)
+
+    for idx, biome in enumerate(biomes):
+        world = build_world(idx, biome, level_waves and level_waves[idx])
         filepath = os.path.join(WORLDS_DIR, f"{biome['id']}.json")
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(world, f, indent="\t", ensure_ascii=False)
-        print(f"Created {os.path.basename(filepath)}")
+        if json_patch.write_json(filepath, world):
+            print(f"Written {os.path.basename(filepath)}")
+        else:
+            print(f"Unchanged {os.path.basename(filepath)}")
+
+    print(f"\nDone! {len(biomes)} world files in {WORLDS_DIR}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generate the world JSON files")
+    p.add_argument("--search", type=int, default=0, metavar="N", help="Candidate layouts sampled per level")
+    p.add_argument("--keep", type=int, default=3, help="Best candidates kept per level")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all cores, 1 = serial)")
+    p.add_argument("--chunk", type=int, default=500, help="Candidates per pool task")
+    p.add_argument("--target-base", type=float, default=None,
+                   help="Target pressure scale (default: calibrated on the historical world_1 level 0)")
+    p.add_argument("--out", help="Write the best candidates (layout, score, waves) to this JSON file")
+    p.add_argument("--write", action="store_true", help="With --search: write worlds using the best layouts")
+    args = p.parse_args()
+
+    if not args.search:
+        write_worlds()
+        return 0
+
+    t0 = time.perf_counter()
+    base = args.target_base or default_target_base()
+    workers = args.workers or os.cpu_count() or 1
+    best = search(args.seed, args.search, args.keep, workers, args.chunk, base)
+
+    report = {"seed": args.seed, "candidates": args.search, "target_base": base, "levels": []}
+    level_waves = [[None] * len(WAVE_COUNTS) for _ in biomes]
+    print(f"{'level':<16} {'default':>8} {'best':>8}  layout")
+    for (b, l), top in sorted(best.items()):
+        biome = biomes[b]
+        target = target_curve(DURATIONS[l], l, biome["mult"], base)
+        default = score_layout(build_waves(WAVE_COUNTS[l], DURATIONS[l], l, biome["order"]), target, biome["mult"])
+        entries = []
+        for score, index in top:
+            layout, waves = candidate(args.seed, b, l, index)
+            entries.append({"candidate": index, "score": round(score, 4), "layout": layout, "waves": waves})
+        level_waves[b][l] = entries[0]["waves"]
+        level_id = f"{biome['id']}_lvl_{l}"
+        report["levels"].append({"level_id": level_id, "default_score": round(default, 4), "best": entries})
+        print(f"{level_id:<16} {default:8.3f} {entries[0]['score']:8.3f}  {entries[0]['layout']}")
+    print(f"{args.search} candidate(s) x {len(best)} level(s) in {time.perf_counter() - t0:.1f}s "
+          f"({workers} worker(s), seed {args.seed})", file=sys.stderr)
 
-    print(f"\nDone! {len(biomes)} world files created in {WORLDS_DIR}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent="\t", ensure_ascii=False)
+    if args.write:
+        write_worlds(level_waves)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""GLB inspection and budget gate for the generated 3D models.
+
+ludo_generate_3d.py only knows what it asked Ludo.ai for (target_num_faces,
+texture_size); this reads what actually arrived. The file is mmapped and the
+binary chunk is walked through memoryview slices, nothing is copied except
+the (small) JSON chunk:
+    meshes, primitives, triangles (per primitive mode), vertices (POSITION
+    counts), index count, accessor bytes per attribute semantic,
+    embedded images: mime, width x height (PNG / JPEG / WebP headers),
+    encoded bytes and decoded RGBA memory with mipmaps (x 4/3).
+
+Budgets come from the "glb" section of tools/asset_budgets.json (per model:
+bytes, triangles, vertices, primitives, texture_bytes, texture_size,
+texture_memory); --limit metric=value overrides one. ludo_generate_3d.py
+runs `inspect` + `check` after each download and refuses to install a model
+that is over budget. Without paths, every .glb under assets/ is scanned in a
+process pool. The exit status is 1 when a model is over budget or malformed.
+
+Run from repo root:
+    python tools/glb_inspect.py                              # every assets/**/*.glb
+    python tools/glb_inspect.py assets/ultimate/fragment_l.glb --verbose
+    python tools/glb_inspect.py --limit triangles=8000 --json glb_report.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+BUDGETS = Path(__file__).resolve().parent / "asset_budgets.json"
+MAGIC = b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+COMPONENT_BYTES = {5120: 1, 5121: 1, 5122: 2, 5123: 2, 5125: 4, 5126: 4}
+TYPE_COMPONENTS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT2": 4, "MAT3": 9, "MAT4": 16}
+METRICS = ("bytes", "triangles", "vertices", "primitives", "texture_bytes", "texture_size", "texture_memory")
+
+
+class GLBError(ValueError):
+    """Malformed or unsupported GLB container."""
+
+
+# --- image headers --------------------------------------------------------------
+
+def image_size(data):
+    """(mime, width, height) from the first bytes of a PNG / JPEG / WebP buffer, or None."""
+    head = bytes(data[:32])
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and len(head) >= 24:
+        w, h = struct.unpack(">II", head[16:24])
+        return "image/png", w, h
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+        kind = head[12:16]
+        if kind == b"VP8 ":
+            w, h = struct.unpack("<HH", head[26:30])
+            return "image/webp", w & 0x3FFF, h & 0x3FFF
+        if kind == b"VP8L":
+            bits = int.from_bytes(head[21:25], "little")
+            return "image/webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if kind == b"VP8X":
+            return "image/webp", int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    if head[:2] == b"\xff\xd8":
+        i, n = 2, len(data)
+        while i + 9 < n:
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 1 if marker == 0xFF else 2
+                continue
+            length = (data[i + 2] << 8) | data[i + 3]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                h, w = struct.unpack(">HH", bytes(data[i + 5:i + 9]))
+                return "image/jpeg", w, h
+            i += 2 + length
+        return "image/jpeg", 0, 0
+    return None
+
+
+# --- GLB ------------------------------------------------------------------------
+
+def parse(buf):
+    """(gltf json, BIN chunk memoryview or None) from a GLB buffer."""
+    view = memoryview(buf)
+    if len(view) < 12 or bytes(view[:4]) != MAGIC:
+        raise GLBError("not a GLB (bad magic)")
+    version, length = struct.unpack_from("<II", view, 4)
+    if version != 2:
+        raise GLBError(f"GLB version {version} (2 expected)")
+    if length > len(view):
+        raise GLBError(f"truncated: header says {length} bytes, file has {len(view)}")
+    gltf, binary, offset = None, None, 12
+    while offset + 8 <= length:
+        size, kind = struct.unpack_from("<II", view, offset)
+        start, offset = offset + 8, offset + 8 + size
+        if offset > length:
+            raise GLBError(f"chunk at {start - 8} overruns the file")
+        if kind == CHUNK_JSON and gltf is None:
+            gltf = json.loads(bytes(view[start:offset]).decode("utf-8"))
+        elif kind == CHUNK_BIN and binary is None:
+            binary = view[start:offset]
+    if gltf is None:
+        raise GLBError("no JSON chunk")
+    return gltf, binary
+
+
+def _view_slice(gltf, binary, index):
+    bv = gltf["bufferViews"][index]
+    if bv.get("buffer", 0) != 0 or binary is None:
+        return None
+    start = bv.get("byteOffset", 0)
+    end = start + bv["byteLength"]
+    if end > len(binary):
+        raise GLBError(f"bufferView {index} overruns the BIN chunk")
+    return binary[start:end]
+
+
+def accessor_bytes(accessor):
+    return accessor["count"] * TYPE_COMPONENTS[accessor["type"]] * COMPONENT_BYTES[accessor["componentType"]]
+
+
+def primitive_triangles(mode, count):
+    if mode == 4:
+        return count // 3
+    if mode in (5, 6):
+        return max(0, count - 2)
+    return 0
+
+
+def inspect(buf, root=None):
+    """Stats of a GLB buffer (bytes, bytearray or mmap); `root` resolves external image uris."""
+    gltf, binary = parse(buf)
+    accessors = gltf.get("accessors", [])
+    stats = {"bytes": len(buf), "meshes": len(gltf.get("meshes", [])), "primitives": 0,
+             "triangles": 0, "vertices": 0, "indices": 0, "accessor_bytes": {},
+             "images": [], "texture_bytes": 0, "texture_size": 0, "texture_memory": 0,
+             "extensions": sorted(gltf.get("extensionsUsed", []))}
+    seen_vertices, seen_accessors = set(), set()
+    for mesh in gltf.get("meshes", []):
+        for prim in mesh.get("primitives", []):
+            stats["primitives"] += 1
+            attributes = prim.get("attributes", {})
+            position = attributes.get("POSITION")
+            vertex_count = accessors[position]["count"] if position is not None else 0
+            if position is not None and position not in seen_vertices:
+                seen_vertices.add(position)
+                stats["vertices"] += vertex_count
+            if prim.get("indices") is not None:
+                count = accessors[prim["indices"]]["count"]
+                stats["indices"] += count
+            else:
+                count = vertex_count
+            stats["triangles"] += primitive_triangles(prim.get("mode", 4), count)
+            for semantic, index in list(attributes.items()) + [("indices", prim.get("indices"))]:
+                if index is not None and index not in seen_accessors:
+                    seen_accessors.add(index)
+                    name = semantic.split("_")[0] if semantic[-1].isdigit() else semantic
+                    sizes = stats["accessor_bytes"]
+                    sizes[name] = sizes.get(name, 0) + accessor_bytes(accessors[index])
+    for i, image in enumerate(gltf.get("images", [])):
+        entry = {"index": i, "name": image.get("name", ""), "mime": image.get("mimeType", ""),
+                 "width": 0, "height": 0, "bytes": 0}
+        data = None
+        if image.get("bufferView") is not None:
+            data = _view_slice(gltf, binary, image["bufferView"])
+        elif image.get("uri", "").startswith("data:"):
+            entry["bytes"] = len(image["uri"].split(",", 1)[-1]) * 3 // 4
+            entry["mime"] = entry["mime"] or image["uri"][5:].split(";")[0]
+        elif image.get("uri") and root is not None and (root / image["uri"]).is_file():
+            data = (root / image["uri"]).read_bytes()
+        if data is not None:
+            entry["bytes"] = len(data)
+            found = image_size(data)
+            if found:
+                entry["mime"] = entry["mime"] or found[0]
+                entry["width"], entry["height"] = found[1], found[2]
+        stats["images"].append(entry)
+        stats["texture_bytes"] += entry["bytes"]
+        stats["texture_size"] = max(stats["texture_size"], entry["width"], entry["height"])
+        stats["texture_memory"] += entry["width"] * entry["height"] * 4 * 4 // 3
+    return stats
+
+
+def inspect_file(path):
+    """Stats of a .glb on disk, parsed through an mmap (no read of the BIN chunk)."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise GLBError("empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                return inspect(mm, path.parent)
+            except (ValueError, KeyError, IndexError, TypeError, struct.error) as e:
+                # re-raised outside the mmap: the traceback pins memoryview slices of it
+                error = GLBError(str(e) if isinstance(e, GLBError) else f"{type(e).__name__}: {e}")
+    raise error
+
+
+# --- budgets ------------------------------------------------------------------
+
+def load_budget(path=BUDGETS, overrides=()):
+    """The "glb" section of the budget file, with metric=value overrides applied."""
+    budget = {}
+    if path and Path(path).is_file():
+        with open(path, encoding="utf-8") as f:
+            budget = dict(json.load(f).get("glb", {}))
+    for item in overrides:
+        metric, _, value = item.partition("=")
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r} (one of {', '.join(METRICS)})")
+        budget[metric] = int(float(value))
+    return budget
+
+
+def check(stats, budget):
+    """List of 'metric used/limit' strings for the exceeded limits."""
+    return [f"{metric} {stats[metric]}/{budget[metric]}" for metric in METRICS
+            if budget.get(metric) and stats[metric] > budget[metric]]
+
+
+def _scan_job(rel):
+    try:
+        return rel, inspect_file(REPO / rel), None
+    except GLBError as e:
+        return rel, None, str(e)
+    except OSError as e:
+        return rel, None, f"{type(e).__name__}: {e}"
+
+
+def scan(rels, workers):
+    if workers > 1 and len(rels) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(_scan_job, rels, chunksize=4))
+    return [_scan_job(rel) for rel in rels]
+
+
+def main():
+    p = argparse.ArgumentParser(description="GLB inspection and budget gate")
+    p.add_argument("paths", nargs="*", help=".glb files (default: every assets/**/*.glb)")
+    p.add_argument("--budgets", default=str(BUDGETS), help="Budget file (default tools/asset_budgets.json)")
+    p.add_argument("--limit", action="append", default=[], metavar="METRIC=VALUE",
+                   help=f"Override one budget ({', '.join(METRICS)})")
+    p.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count, 1 = inline)")
+    p.add_argument("--verbose", action="store_true", help="Also list accessors and images per model")
+    p.add_argument("--json", help="Write the full report to this file")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        budget = load_budget(args.budgets, args.limit)
+    except ValueError as e:
+        p.error(str(e))
+    if args.paths:
+        rels = [path.replace("\\", "/") for path in args.paths]
+    else:
+        rels = sorted(path.relative_to(REPO).as_posix() for path in (REPO / "assets").rglob("*.glb")) \
+            if (REPO / "assets").is_dir() else []
+    results = scan(rels, args.workers or os.cpu_count() or 1)
+
+    report, failures, errors = {}, [], []
+    print(f"{'model':<48} {'KB':>7} {'prims':>5} {'tris':>7} {'verts':>7} {'tex':>9} {'texKB':>6}  budget")
+    for rel, stats, error in results:
+        if error:
+            errors.append(f"{rel}: {error}")
+            report[rel] = {"error": error}
+            print(f"{rel:<48} {'':>7} {'':>5} {'':>7} {'':>7} {'':>9} {'':>6}  ERROR {error}")
+            continue
+        over = check(stats, budget)
+        report[rel] = dict(stats, over=over)
+        failures += [f"{rel}: {o}" for o in over]
+        tex = f"{stats['texture_size']}px" if stats["images"] else "-"
+        print(f"{rel:<48} {stats['bytes'] / 1024:7.0f} {stats['primitives']:5d} {stats['triangles']:7d} "
+              f"{stats['vertices']:7d} {tex:>9} {stats['texture_bytes'] / 1024:6.0f}  "
+              f"{'OVER ' + '; '.join(over) if over else 'ok'}")
+        if args.verbose:
+            for name, size in sorted(stats["accessor_bytes"].items()):
+                print(f"    accessor {name:<12} {size / 1024:9.1f} KB")
+            for image in stats["images"]:
+                print(f"    image {image['index']} {image['mime'] or '?':<11} {image['width']}x{image['height']} "
+                      f"{image['bytes'] / 1024:.1f} KB {image['name']}")
+            if stats["extensions"]:
+                print(f"    extensions {', '.join(stats['extensions'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"budget": budget, "models": report}, f, indent=2, ensure_ascii=False)
+    for error in errors:
+        print(f"invalid: {error}", file=sys.stderr)
+    for failure in failures:
+        print(f"over budget: {failure}", file=sys.stderr)
+    print(f"{len(rels)} model(s), {len(errors)} invalid, {len(failures)} over budget, "
+          f"{time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 1 if failures or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
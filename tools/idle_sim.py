@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""Fast-forward simulator and upgrade-path optimiser for the idle factory.
+
+Mirrors autoload/IdleFactoryManager.gd on data/idle_factory.json:
+  - base_production = base_production_per_second * production_growth^(L-1)
+    and next_upgrade_cost = ceil(base_upgrade_cost * upgrade_cost_growth^(L-1)),
+    or the explicit levels[] table when present;
+  - unlock / upgrade debit cost_resource_id plus crystal_flat_cost crystals
+    (one crystal debit when the cost itself is in crystals), a generator can
+    only be unlocked once the previous one runs, max_level > 0 caps upgrades;
+  - Overdrive multiplies production by 1 + steps_to_overdrive * tap_percent
+    for overdrive_duration_seconds; apply_elapsed_time splits an elapsed
+    segment into Overdrive and normal seconds and caps it at
+    offline_cap_seconds (0 = no cap);
+  - the run ends with final_unlock (cost in final_unlock.resource_id).
+The 5 s tap charge is runtime-only and ignored. Crystals only come from
+gameplay, so the player model supplies them (--crystals, --crystals-per-day).
+
+Player model: --visits 0 is a player who is always there (buys the moment a
+purchase is affordable, re-arms Overdrive as soon as it ends); --visits H is
+an offline player who opens the game every H hours, re-arms Overdrive on
+every generator and buys what the strategy wants, production in between
+being one capped apply_elapsed_time segment.
+
+Nothing is ticked: production is linear between purchases, so each step
+jumps straight to the moment (or the visit) the chosen purchase becomes
+affordable. Strategies:
+  - unlock_only: no upgrades, unlock the chain then buy final_unlock;
+  - cheapest:    always the purchase affordable soonest;
+  - greedy:      the purchase that most reduces the ETA of final_unlock
+                 (ETA = unlock the rest of the chain and buy the final
+                 without further upgrades), or no purchase when none helps;
+  - lookahead:   same objective over every sequence of --depth purchases
+                 (branch and bound), then replays only the first move.
+Strategies x --visits x config variants (--sweep) fan out over a process
+pool; a run covering months of idle time takes a few milliseconds (tens
+for lookahead at depth 3).
+
+Run from repo root:
+    python tools/idle_sim.py
+    python tools/idle_sim.py --visits 0 4 8 24 --strategies greedy lookahead --depth 3
+    python tools/idle_sim.py --sweep upgrade_cost_growth=1.15,1.18,1.22 --sweep final_unlock.cost=500000,1000000
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from loot_sim import apply_override
+from wave_timeline import REPO
+
+DAY = 86400.0
+STRATEGIES = ("unlock_only", "cheapest", "greedy", "lookahead")
+FINAL = -1
+EPS = 1e-9
+
+
+def load_config(path=None, overrides=()):
+    with open(path or REPO / "data" / "idle_factory.json", encoding="utf-8") as f:
+        cfg = json.load(f)
+    for item in overrides:
+        apply_override(cfg, item)
+    return cfg
+
+
+def expand_override(item, cfg):
+    """A bare generator key (`upgrade_cost_growth=1.2`) applies to every generator."""
+    path, _, value = item.partition("=")
+    if "." in path or path in cfg:
+        return [item]
+    return [f"generators.{i}.{path}={value}" for i in range(len(cfg.get("generators", [])))]
+
+
+class Economy:
+    """idle_factory.json compiled for one player model; rates are per step
+    (1 s for a present player, one visit otherwise)."""
+
+    def __init__(self, cfg, visit_hours, crystals_per_day, overdrive):
+        gens = [g for g in cfg.get("generators", []) if isinstance(g, dict)]
+        self.gens = gens
+        self.n = len(gens)
+        index = {str(g.get("resource_id", "")): i for i, g in enumerate(gens)}
+        self.cost_res = [-1 if str(g.get("cost_resource_id", "")) == "crystals"
+                         else index.get(str(g.get("cost_resource_id", "")), -2) for g in gens]
+        self.unlock_cost = [int(g.get("unlock_cost", 0)) for g in gens]
+        self.flat = [int(g.get("crystal_flat_cost", 0)) for g in gens]
+        self.max_level = [int(g.get("max_level", 0)) for g in gens]
+        final = cfg.get("final_unlock", {})
+        self.final_res = index.get(str(final.get("resource_id", "tritanium")), -2)
+        self.final_cost = int(final.get("cost", 1000000))
+        boost = cfg.get("boost", {})
+        od_mult = 1.0 + float(boost.get("steps_to_overdrive", 20)) * float(boost.get("tap_percent", 10.0)) / 100.0
+        od_seconds = float(boost.get("overdrive_duration_seconds", 14400))
+        cap = int(cfg.get("offline_cap_seconds", 0))
+        if visit_hours > 0:
+            self.step = visit_hours * 3600.0
+            elapsed = min(self.step, cap) if cap > 0 else self.step
+            od = min(od_seconds, elapsed) if overdrive else 0.0
+            self.gain = od * od_mult + (elapsed - od)  # base-rate seconds produced per visit
+        else:
+            self.step = 1.0
+            self.gain = od_mult if overdrive else 1.0
+        self.discrete = visit_hours > 0
+        self.crystal_gain = crystals_per_day / DAY * self.step
+        self._prod = [[0.0] for _ in gens]
+        self._cost = [[] for _ in gens]
+
+    def production(self, g, level):
+        """IdleFactoryManager.base_production, cached per level."""
+        table = self._prod[g]
+        while len(table) <= level:
+            lvl, cfg = len(table), self.gens[g]
+            levels = cfg.get("levels") or []
+            if levels:
+                table.append(float(levels[min(lvl - 1, len(levels) - 1)].get("production_per_second", 0.0)))
+            else:
+                table.append(float(cfg.get("base_production_per_second", 0.0))
+                             * float(cfg.get("production_growth", 1.0)) ** (lvl - 1))
+        return table[level]
+
+    def upgrade_cost(self, g, level):
+        """IdleFactoryManager.next_upgrade_cost (level -> level + 1)."""
+        table = self._cost[g]
+        while len(table) <= level:
+            lvl, cfg = len(table), self.gens[g]
+            levels = cfg.get("levels") or []
+            if levels:
+                table.append(int(levels[min(lvl, len(levels) - 1)].get("upgrade_cost", 0)))
+            else:
+                table.append(int(math.ceil(float(cfg.get("base_upgrade_cost", 0.0))
+                                           * float(cfg.get("upgrade_cost_growth", 1.0)) ** (lvl - 1))))
+        return table[level]
+
+
+class State:
+    __slots__ = ("t", "levels", "amounts", "crystals", "done")
+
+    def __init__(self, n, crystals):
+        self.t, self.levels, self.amounts, self.crystals, self.done = 0.0, [0] * n, [0.0] * n, float(crystals), False
+
+    def copy(self):
+        s = State.__new__(State)
+        s.t, s.levels, s.amounts, s.crystals, s.done = self.t, self.levels[:], self.amounts[:], self.crystals, self.done
+        return s
+
+
+def price(eco, st, move):
+    """(resource index or -1 for crystals, cost, crystals needed)."""
+    if move == FINAL:
+        return eco.final_res, eco.final_cost, eco.final_cost if eco.final_res == -1 else 0
+    level = st.levels[move]
+    cost = eco.unlock_cost[move] if level <= 0 else eco.upgrade_cost(move, level)
+    res = eco.cost_res[move]
+    return res, cost, eco.flat[move] + (cost if res == -1 else 0)
+
+
+def wait(eco, st, move):
+    """Steps until `move` is affordable (math.inf if never)."""
+    res, cost, crystals = price(eco, st, move)
+    w = 0.0
+    if res >= 0:
+        deficit = cost - st.amounts[res]
+        if deficit > EPS:
+            rate = eco.production(res, st.levels[res]) * eco.gain
+            if rate <= 0:
+                return math.inf
+            w = deficit / rate
+    elif res < -1:
+        return math.inf
+    deficit = crystals - st.crystals
+    if deficit > EPS:
+        if eco.crystal_gain <= 0:
+            return math.inf
+        w = max(w, deficit / eco.crystal_gain)
+    return math.ceil(w - EPS) if eco.discrete else w
+
+
+def advance(eco, st, steps):
+    if steps <= 0:
+        return
+    st.t += steps
+    for g in range(eco.n):
+        if st.levels[g] > 0:
+            st.amounts[g] += eco.production(g, st.levels[g]) * eco.gain * steps
+    st.crystals += eco.crystal_gain * steps
+
+
+def buy(eco, st, move):
+    res, cost, crystals = price(eco, st, move)
+    st.crystals = max(0.0, st.crystals - crystals)
+    if res >= 0:
+        st.amounts[res] = max(0.0, st.amounts[res] - cost)
+    if move == FINAL:
+        st.done = True
+    else:
+        st.levels[move] += 1
+
+
+def moves(eco, st):
+    """Purchases available now: next unlock of the chain, upgrades, final."""
+    out = []
+    for g in range(eco.n):
+        level = st.levels[g]
+        if level <= 0:
+            if g == 0 or st.levels[g - 1] > 0:
+                out.append(g)
+        elif eco.max_level[g] <= 0 or level < eco.max_level[g]:
+            out.append(g)
+    out.append(FINAL)
+    return out
+
+
+def next_without_upgrades(eco, st):
+    return next((g for g in range(eco.n) if st.levels[g] <= 0), FINAL)
+
+
+def eta(eco, st, bound=math.inf):
+    """Time of final_unlock if no more upgrades are bought (unlocks + final only)."""
+    s = st.copy()
+    while True:
+        move = next_without_upgrades(eco, s)
+        w = wait(eco, s, move)
+        if s.t + w >= bound:
+            return math.inf
+        advance(eco, s, w)
+        if move == FINAL:
+            return s.t
+        buy(eco, s, move)
+
+
+def search(eco, st, move, depth, bound):
+    """Best ETA reachable by playing `move` then up to depth - 1 more purchases."""
+    w = wait(eco, st, move)
+    if st.t + w >= bound:
+        return math.inf
+    s = st.copy()
+    advance(eco, s, w)
+    if move == FINAL:
+        return s.t
+    buy(eco, s, move)
+    best = eta(eco, s, bound)
+    if depth > 1:
+        for m in moves(eco, s):
+            best = min(best, search(eco, s, m, depth - 1, min(bound, best)))
+    return best
+
+
+def decide(eco, st, strategy, depth):
+    if strategy == "unlock_only":
+        return next_without_upgrades(eco, st)
+    if strategy == "cheapest":
+        # ties: final first, then the higher tier
+        return min(moves(eco, st), key=lambda m: (wait(eco, st, m), m != FINAL, -m))
+    best_move = next_without_upgrades(eco, st)
+    best = eta(eco, st)
+    for m in moves(eco, st):
+        if m == best_move:
+            continue
+        score = search(eco, st, m, depth if strategy == "lookahead" else 1, best)
+        if score < best - EPS:
+            best_move, best = m, score
+    return best_move
+
+
+def simulate(cfg, strategy, visit_hours, depth=3, crystals=1000.0, crystals_per_day=3000.0,
+             overdrive=True, horizon_days=365.0):
+    """One run -> dict(time_to_final seconds or None, purchases, final levels, unlock times)."""
+    eco = Economy(cfg, visit_hours, crystals_per_day, overdrive)
+    st = State(eco.n, crystals)
+    horizon = horizon_days * DAY / eco.step
+    purchases, unlocked = 0, []
+    while not st.done:
+        move = decide(eco, st, strategy, depth)
+        w = wait(eco, st, move)
+        if st.t + w > horizon:
+            break
+        advance(eco, st, w)
+        if move != FINAL and st.levels[move] == 0:
+            unlocked.append(st.t * eco.step)
+        buy(eco, st, move)
+        purchases += 1
+    return {"time_to_final": st.t * eco.step if st.done else None, "purchases": purchases,
+            "levels": st.levels, "unlocks": unlocked}
+
+
+def run_task(task):
+    variant, cfg, strategy, visits, opts = task
+    t0 = time.perf_counter()
+    result = simulate(cfg, strategy, visits, **opts)
+    return dict(result, variant=variant, strategy=strategy, visits=visits,
+                ms=round((time.perf_counter() - t0) * 1000.0, 2))
+
+
+def fmt_time(seconds):
+    if seconds is None:
+        return "never"
+    if seconds >= DAY:
+        return f"{seconds / DAY:.1f} d"
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} h"
+    if seconds >= 60:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds:.0f} s"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Idle factory fast-forward simulator")
+    p.add_argument("--config", help="Alternative idle_factory.json")
+    p.add_argument("--set", action="append", default=[], metavar="PATH=JSON",
+                   help="Override a config value (a bare generator key applies to every generator)")
+    p.add_argument("--sweep", action="append", default=[], metavar="PATH=V1,V2",
+                   help="Config variants; several --sweep form a grid")
+    p.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=STRATEGIES)
+    p.add_argument("--depth", type=int, default=3, help="Purchases looked ahead by the lookahead strategy")
+    p.add_argument("--visits", nargs="+", type=float, default=[0.0, 8.0],
+                   help="Hours between game openings (0 = player always present)")
+    p.add_argument("--crystals", type=float, default=1000.0, help="Crystal stock when the factory opens")
+    p.add_argument("--crystals-per-day", type=float, default=3000.0, help="Crystal income from gameplay")
+    p.add_argument("--no-overdrive", action="store_true", help="Player never taps to Overdrive")
+    p.add_argument("--horizon-days", type=float, default=365.0, help="Give up after this much idle time")
+    p.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all cores, 1 = serial)")
+    p.add_argument("--json", help="Write every run to this file")
+    args = p.parse_args()
+
+    try:
+        current = load_config(args.config)
+        base = [o for item in args.set for o in expand_override(item, current)]
+        axes = []
+        for item in args.sweep:
+            path, _, values = item.partition("=")
+            axes.append([f"{path}={v}" for v in values.split(",")])
+        variants = []
+        for combo in itertools.product(*axes):
+            overrides = base + [o for item in combo for o in expand_override(item, current)]
+            cfg = load_config(args.config, overrides)
+            Economy(cfg, 0.0, 0.0, True).upgrade_cost(0, 1)  # surface bad values before the pool
+            variants.append((" ".join(combo) or "current", cfg))
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        p.error(f"--set/--sweep: {e}")
+
+    opts = {"depth": args.depth, "crystals": args.crystals, "crystals_per_day": args.crystals_per_day,
+            "overdrive": not args.no_overdrive, "horizon_days": args.horizon_days}
+    tasks = [(name, cfg, strategy, visits, opts)
+             for name, cfg in variants for visits in args.visits for strategy in args.strategies]
+    workers = args.workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    if workers == 1 or len(tasks) == 1:
+        results = list(map(run_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_task, tasks))
+    elapsed = time.perf_counter() - t0
+
+    gen_ids = [str(g.get("id", "")).replace("_generator", "") for g in variants[0][1].get("generators", [])]
+    print(f"| Variant | Visits | Strategy | final_unlock | Unlocks ({' / '.join(gen_ids)}) | Purchases "
+          f"| Final levels | ms |")
+    print("|---|---|---|---:|---|---:|---|---:|")
+    for r in results:
+        visits = "present" if r["visits"] <= 0 else f"every {r['visits']:g} h"
+        unlocks = " / ".join(fmt_time(t) for t in r["unlocks"])
+        print(f"| {r['variant']} | {visits} | {r['strategy']} | {fmt_time(r['time_to_final'])} | {unlocks} "
+              f"| {r['purchases']} | {'/'.join(map(str, r['levels']))} | {r['ms']:.1f} |")
+    slowest = max(r["ms"] for r in results)
+    print(f"\n{len(results)} runs ({len(variants)} variants) in {elapsed:.2f}s, slowest run {slowest:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": {k: v for k, v in vars(args).items() if k != "json"}, "runs": results},
+                      f, indent=1, ensure_ascii=False)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Format-preserving, minimal-diff writer for the JSON files of data/.
+
+`patch_text(text, new_data)` returns `text` with only the spans whose value
+changed rewritten: a changed scalar replaces its own token, added / removed
+object members and array items are spliced in with the separator and
+indentation of their siblings, and reordered members are moved with their
+original text. Only new values (and containers that were empty) are
+serialised, indented like the line they sit on; a filled {} / [] is laid
+out on several lines when its parent spans several lines.
+Everything else - hand-aligned sections, mixed tabs/spaces, compact arrays -
+is kept byte for byte.
+
+`write_json(path, data)` skips the write when the bytes are identical, so
+no-op runs leave mtimes alone (no Godot reimport, no git noise).
+
+Run from repo root:
+    python tools/json_patch.py --check     # round-trip + synthetic edits over data/
+"""
+
+import argparse
+import difflib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO / "data"
+
+_WS = " \t\n\r"
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+
+
+class Node:
+    """Span of one JSON value; containers keep their items' spans."""
+    __slots__ = ("start", "end", "kind", "items")
+
+    def __init__(self, start, end, kind, items=None):
+        self.start = start
+        self.end = end
+        self.kind = kind  # "object", "array" or "scalar"
+        # object: [(key, key_start, value Node)], array: [value Node]
+        self.items = items
+
+
+def _skip(text, i):
+    while i < len(text) and text[i] in _WS:
+        i += 1
+    return i
+
+
+def parse_spans(text):
+    """Span tree of a JSON document (the document must already be valid JSON)."""
+    node, end = _parse(text, _skip(text, 0))
+    return node
+
+
+def _parse(text, i):
+    c = text[i]
+    if c == "{":
+        items = []
+        j = _skip(text, i + 1)
+        if text[j] == "}":
+            return Node(i, j + 1, "object", items), j + 1
+        while True:
+            m = _STRING.match(text, j)
+            key = json.loads(m.group())
+            j = _skip(text, m.end())
+            j = _skip(text, j + 1)  # ':'
+            value, j = _parse(text, j)
+            items.append((key, m.start(), value))
+            j = _skip(text, j)
+            if text[j] == "}":
+                return Node(i, j + 1, "object", items), j + 1
+            j = _skip(text, j + 1)  # ','
+    if c == "[":
+        items = []
+        j = _skip(text, i + 1)
+        if text[j] == "]":
+            return Node(i, j + 1, "array", items), j + 1
+        while True:
+            value, j = _parse(text, j)
+            items.append(value)
+            j = _skip(text, j)
+            if text[j] == "]":
+                return Node(i, j + 1, "array", items), j + 1
+            j = _skip(text, j + 1)
+    if c == '"':
+        m = _STRING.match(text, i)
+        return Node(i, m.end(), "scalar"), m.end()
+    for literal in ("true", "false", "null"):
+        if text.startswith(literal, i):
+            return Node(i, i + len(literal), "scalar"), i + len(literal)
+    m = _NUMBER.match(text, i)
+    if not m:
+        raise ValueError(f"unexpected character {c!r} at offset {i}")
+    return Node(i, m.end(), "scalar"), m.end()
+
+
+def _same(a, b):
+    """Equal including types and key order (True != 1, {a,b} != {b,a})."""
+    return a is b or json.dumps(a, ensure_ascii=False) == json.dumps(b, ensure_ascii=False)
+
+
+def detect_indent(text):
+    match = re.search(r"\n([ \t]+)\S", text)
+    return match.group(1) if match else "\t"
+
+
+class _Patcher:
+    def __init__(self, text):
+        self.text = text
+        self.unit = detect_indent(text)
+        self.edits = []  # (start, end, replacement), non-overlapping
+
+    def line_indent(self, pos):
+        line_start = self.text.rfind("\n", 0, pos) + 1
+        prefix = self.text[line_start:pos]
+        return prefix if not prefix.strip() else re.match(r"[ \t]*", prefix).group()
+
+    def render(self, value, indent, compact=False):
+        if compact or not isinstance(value, (dict, list)) or not value:
+            return json.dumps(value, ensure_ascii=False)
+        out = json.dumps(value, ensure_ascii=False, indent=self.unit)
+        return out.replace("\n", "\n" + indent)
+
+    def replace_node(self, node, value, parent=None):
+        if node.kind != "scalar" and not node.items:
+            # An empty {} / [] has no layout of its own: follow its parent's.
+            compact = parent is not None and "\n" not in self.text[parent.start:parent.end]
+        else:
+            compact = node.kind != "scalar" and "\n" not in self.text[node.start:node.end]
+        self.edits.append((node.start, node.end, self.render(value, self.line_indent(node.start), compact)))
+
+    def patch(self, node, old, new, parent=None):
+        if _same(old, new):
+            return
+        if node.kind == "object" and isinstance(new, dict) and isinstance(old, dict) and node.items:
+            self._patch_object(node, old, new)
+        elif node.kind == "array" and isinstance(new, list) and isinstance(old, list) and node.items:
+            self._patch_array(node, old, new)
+        else:
+            self.replace_node(node, new, parent)
+
+    def _patch_object(self, node, old, new):
+        old_keys = [key for key, _, _ in node.items]
+        new_keys = list(new)
+        spans = [(key_start, value.end) for _, key_start, value in node.items]
+        kv_sep = self.text[self.text.find('"', node.items[0][1] + 1) + 1:node.items[0][2].start]
+        kv_sep = kv_sep[kv_sep.index(":"):]
+        if [k for k in new_keys if k in old] != [k for k in old_keys if k in new]:
+            self._reorder_object(node, old, new, spans, kv_sep)
+            return
+        matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+        compact = "\n" not in self.text[node.start:node.end]
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == "equal":
+                for k in range(i1, i2):
+                    key, _, value_node = node.items[k]
+                    self.patch(value_node, old[key], new[key], node)
+                continue
+            indent = self.line_indent(spans[0][0])
+            rendered = [json.dumps(key, ensure_ascii=False) + kv_sep + self.render(new[key], indent, compact)
+                        for key in new_keys[j1:j2]]
+            self._splice(node, spans, i1, i2, rendered)
+
+    def _reorder_object(self, node, old, new, spans, kv_sep):
+        """Members moved: re-emit them in the new order, each keeping its own text."""
+        text = self.text
+        indent = self.line_indent(spans[0][0])
+        by_key = {key: (k, value) for k, (key, _, value) in enumerate(node.items)}
+        compact = "\n" not in text[node.start:node.end]
+        members = []
+        for key in new:
+            if key not in by_key:
+                members.append(json.dumps(key, ensure_ascii=False) + kv_sep + self.render(new[key], indent, compact))
+                continue
+            k, value_node = by_key[key]
+            sub = _Patcher(text)
+            sub.unit = self.unit
+            sub.patch(value_node, old[key], new[key], node)
+            start, end = spans[k]
+            members.append(_apply(text[start:end], [(a - start, b - start, r) for a, b, r in sub.edits]))
+        if len(spans) >= 2:
+            sep = text[spans[0][1]:spans[1][0]]
+        else:
+            inner = text[node.start + 1:spans[0][0]]
+            sep = "," + inner if "\n" in inner else ", "
+        self.edits.append((spans[0][0], spans[-1][1], sep.join(members)))
+
+    def _patch_array(self, node, old, new):
+        spans = [(item.start, item.end) for item in node.items]
+        keys_old = [json.dumps(v, ensure_ascii=False, sort_keys=True) for v in old]
+        keys_new = [json.dumps(v, ensure_ascii=False, sort_keys=True) for v in new]
+        matcher = difflib.SequenceMatcher(None, keys_old, keys_new, autojunk=False)
+        compact = "\n" not in self.text[node.start:node.end]
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == "equal" or (op == "replace" and i2 - i1 == j2 - j1):
+                # Same slot count: patch in place (also catches key reorders).
+                for k, v in zip(range(i1, i2), range(j1, j2)):
+                    self.patch(node.items[k], old[k], new[v], node)
+                continue
+            indent = self.line_indent(spans[0][0])
+            rendered = [self.render(v, indent, compact) for v in new[j1:j2]]
+            self._splice(node, spans, i1, i2, rendered)
+
+    def _splice(self, node, spans, i, j, rendered):
+        """Replace items [i, j) of a non-empty container with `rendered` items."""
+        text = self.text
+        n = len(spans)
+        if n >= 2:
+            sep = text[spans[0][1]:spans[1][0]]
+        else:
+            inner = text[node.start + 1:spans[0][0]]
+            sep = "," + inner if "\n" in inner else ", "
+        if not rendered:
+            if j < n:
+                self.edits.append((spans[i][0], spans[j][0], ""))
+            elif i > 0:
+                self.edits.append((spans[i - 1][1], spans[j - 1][1], ""))
+            else:
+                self.edits.append((node.start, node.end, "{}" if node.kind == "object" else "[]"))
+            return
+        segment = sep.join(rendered)
+        if i < j:
+            self.edits.append((spans[i][0], spans[j - 1][1], segment))
+        elif i < n:
+            self.edits.append((spans[i][0], spans[i][0], segment + sep))
+        else:
+            self.edits.append((spans[n - 1][1], spans[n - 1][1], sep + segment))
+
+    def apply(self):
+        return _apply(self.text, self.edits)
+
+
+def _apply(text, edits):
+    parts = []
+    pos = 0
+    for start, end, replacement in sorted(edits, key=lambda e: (e[0], e[1])):
+        parts.append(text[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def _patcher(text, new_data, old_data):
+    patcher = _Patcher(text)
+    if not _same(old_data, new_data):
+        patcher.patch(parse_spans(text), old_data, new_data)
+    return patcher
+
+
+def patch_text(text, new_data, old_data=None):
+    """`text` with the minimal edits that make it parse to `new_data`."""
+    if old_data is None:
+        old_data = json.loads(text)
+    return _patcher(text, new_data, old_data).apply()
+
+
+def dumps(data, indent="\t"):
+    """Serialisation for files that do not exist yet (repo style: tabs)."""
+    return json.dumps(data, indent=indent, ensure_ascii=False) + "\n"
+
+
+def write_json(path, data, indent="\t"):
+    """Patch (or create) a JSON file; returns False when nothing had to be written."""
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            old_text = f.read()
+    except FileNotFoundError:
+        old_text = None
+    if old_text is None:
+        new_text = dumps(data, indent)
+    else:
+        try:
+            new_text = patch_text(old_text, data)
+        except ValueError:
+            new_text = dumps(data, indent)  # unparsable file: rewrite it whole
+        if new_text == old_text:
+            return False
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(new_text)
+    return True
+
+
+# --- self-check ---------------------------------------------------------------
+
+def _edits_for(data):
+    """Synthetic small edits (value, member add / delete / reorder, list append / delete)."""
+    def first_path(value, want, path=()):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                if want(v):
+                    return path + (k,)
+                found = first_path(v, want, path + (k,))
+                if found:
+                    return found
+        elif isinstance(value, list):
+            for k, v in enumerate(value):
+                if want(v):
+                    return path + (k,)
+                found = first_path(v, want, path + (k,))
+                if found:
+                    return found
+        return None
+
+    def at(value, path):
+        for k in path:
+            value = value[k]
+        return value
+
+    edits = []
+    p = first_path(data, lambda v: isinstance(v, (int, float)) and not isinstance(v, bool))
+    if p:
+        edits.append(("scalar", lambda d, p=p: at(d, p[:-1]).__setitem__(p[-1], at(d, p) + 1)))
+    p = first_path(data, lambda v: isinstance(v, dict) and len(v) >= 2)
+    if p:
+        edits.append(("add key", lambda d, p=p: at(d, p).__setitem__("_added", {"x": [1, 2]})))
+        edits.append(("del key", lambda d, p=p: at(d, p).pop(next(iter(at(d, p))))))
+        edits.append(("reorder", lambda d, p=p: at(d, p[:-1]).__setitem__(
+            p[-1], dict(reversed(list(at(d, p).items()))))))
+    p = first_path(data, lambda v: isinstance(v, list) and len(v) >= 2)
+    if p:
+        edits.append(("append", lambda d, p=p: at(d, p).append(json.loads(json.dumps(at(d, p)[0])))))
+        edits.append(("del item", lambda d, p=p: at(d, p).pop(len(at(d, p)) // 2)))
+    return edits
+
+
+def check():
+    files = sorted(DATA_DIR.rglob("*.json"))
+    failures = 0
+    full_bytes = patched_bytes = diff_lines = 0
+    t0 = time.perf_counter()
+    for path in files:
+        rel = path.relative_to(REPO).as_posix()
+        text = path.read_text(encoding="utf-8")
+        try:
+            data = json.loads(text)
+        except ValueError:
+            continue
+        if patch_text(text, json.loads(text)) != text:
+            print(f"FAIL {rel}: no-op patch changed the text")
+            failures += 1
+        for name, edit in _edits_for(data):
+            new = json.loads(text)
+            edit(new)
+            patcher = _patcher(text, new, data)
+            out = patcher.apply()
+            if not _same(json.loads(out), new):
+                print(f"FAIL {rel}: {name} does not round-trip")
+                failures += 1
+                continue
+            changed = sum(len(r.encode("utf-8")) for _, _, r in patcher.edits)
+            full = len(json.dumps(new, indent="\t", ensure_ascii=False).encode("utf-8"))
+            diff_lines += sum(1 for line in difflib.unified_diff(text.splitlines(), out.splitlines(), n=0,
+                                                                  lineterm="") if line[:1] in "+-")
+            full_bytes += full
+            patched_bytes += changed
+    text = '{\n\t"a": {},\n\t"b": [1, []]\n}\n'
+    out = patch_text(text, {"a": {"x": 1}, "b": [1, [2]]})
+    if out != '{\n\t"a": {\n\t\t"x": 1\n\t},\n\t"b": [1, [2]]\n}\n':
+        print(f"FAIL filled empty containers: {out!r}")
+        failures += 1
+    text = '{\n\t"a": {"x": 1},\n\t"b": {"x": 1, "y": 2}\n}\n'
+    out = patch_text(text, {"a": {"x": 1, "z": {"k": [1]}}, "b": {"y": 2, "x": 1, "z": [3]}})
+    if out != '{\n\t"a": {"x": 1, "z": {"k": [1]}},\n\t"b": {"y": 2, "x": 1, "z": [3]}\n}\n':
+        print(f"FAIL member added to a one-line object: {out!r}")
+        failures += 1
+    print(f"{len(files)} file(s) checked in {time.perf_counter() - t0:.1f}s, {failures} failure(s); "
+          f"synthetic edits rewrite {patched_bytes} bytes ({diff_lines} diff lines) vs {full_bytes} with a full dump")
+    return failures
+
+
+def main():
+    p = argparse.ArgumentParser(description="Format-preserving JSON writer for data/")
+    p.add_argument("--check", action="store_true", help="Round-trip and synthetic-edit check over data/")
+    args = p.parse_args()
+    if not args.check:
+        p.print_help()
+        return 0
+    return 1 if check() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,764 @@
+#!/usr/bin/env python3
+"""Vectorised loot drop simulator mirroring autoload/LootGenerator.gd.
+
+Draws millions of items from data/loot_table.json, data/loot/uniques.json
+and the bosses.json unique pools, the way LootGenerator does in game:
+  - rarity: base weights biased by the quality bonus (common x(1-0.05q),
+    uncommon x(1-0.04q), rare x(1+0.04q), epic x(1+0.08q), legendary
+    x(1+0.12q), unique x(1+0.18q); q > 10 forbids common/uncommon), then a
+    cumulative `roll <= cumulative` pick. Enemy drops roll with q = quality
+    (1.0 in Enemy.gd) + skill loot_quality_bonus; boss kills with
+    boss_loot_quality_bonus + skill bonus;
+  - procedural items: random slot, max(default, affix_count) (<= 6) affixes
+    picked from the shuffled slot + global pool without duplicate stats,
+    value = randf_range(range[rarity]) * power_multiplier * (1 + 0.1 (level-1)),
+    percent stats floored by _ITEM_PERCENT_FLOORS, then rounded like Godot
+    (int(round()) for flat max_hp/power/special_damage/move_speed,
+    snapped 0.1 for percent, snapped 0.01 otherwise);
+  - uniques: any unique for enemy drops; for bosses only the boss pool, with
+    the legendary fallbacks (no pool -> legendary at the boss level; pool
+    whose ids are missing from uniques.json -> legendary at level 1).
+
+Items are rolled in batches: one NumPy pass per (slot, rarity) group, the
+affix shuffle being an argsort of a uniform matrix. Chunks fan out over a
+process pool, each with its own SeedSequence child (results do not depend on
+--workers). Rarity probabilities and boss-kill expectations are also
+computed exactly, so a --set / --table balance change is compared against
+the current table in seconds.
+
+--check runs the parity suite instead: documented LootGenerator behaviour
+(weights, strict rule, affix counts, no duplicate stats, floors, Godot
+rounding, boss fallbacks) plus a chi-square / mean comparison against a
+line-by-line scalar transcription of the GDScript (`reference_item`).
+
+Run from repo root:
+    python tools/loot_sim.py                                # 1M enemy drops + every boss
+    python tools/loot_sim.py --items 4000000 --level 6 --quality 6
+    python tools/loot_sim.py --set rarity_config.legendary.weight=4 --set boss_loot_quality_bonus=20
+    python tools/loot_sim.py --check
+"""
+
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wave_timeline import REPO, iter_world_levels
+
+RARITY_ORDER = ("common", "uncommon", "rare", "epic", "legendary", "unique")
+LEGENDARY, UNIQUE = 4, 5
+QUALITY_SLOPES = np.array([-0.05, -0.04, 0.04, 0.08, 0.12, 0.18])
+SLOTS = ("primary", "reactor", "engine", "armor", "shield", "missiles", "targeting", "utility")
+DEFAULT_AFFIX_COUNT = (1, 2, 3, 4, 5, 6)
+# ProfileManager.ITEM_PERCENT_STATS / ITEM_PERCENT_FLOORS (LootGenerator keeps a copy).
+ITEM_PERCENT_STATS = {"crit_chance", "crit_damage", "dodge_chance", "damage_reduction", "fire_rate",
+                      "missile_damage", "missile_speed_pct", "loot_radius", "xp_multiplier", "mark_damage_bonus"}
+ITEM_PERCENT_FLOORS = np.array([0.1, 0.3, 0.5, 0.8, 1.5, 2.0])
+INT_STATS = {"max_hp", "power", "special_damage", "move_speed"}
+KIND_INT, KIND_PERCENT, KIND_SNAP = 0, 1, 2
+HIST_BINS = 20
+
+
+# --- data ---------------------------------------------------------------------
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def apply_override(table, item):
+    """`a.b.0.c=<json>` ; a list segment may also be the `id` of one of its dicts."""
+    path, _, raw = item.partition("=")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    node, keys = table, path.split(".")
+    for i, key in enumerate(keys):
+        last = i == len(keys) - 1
+        if isinstance(node, list):
+            if key.lstrip("-").isdigit():
+                key = int(key)
+            else:
+                key = next((j for j, e in enumerate(node) if isinstance(e, dict) and e.get("id") == key), None)
+                if key is None:
+                    raise KeyError(f"{path}: no entry with id {keys[i]!r}")
+        elif not isinstance(node, dict):
+            raise KeyError(f"{path}: {keys[i - 1]!r} is not a container")
+        if last:
+            node[key] = value
+        else:
+            node = node[key]
+
+
+def load_table(path=None, overrides=()):
+    table = load_json(path or REPO / "data" / "loot_table.json")
+    for item in overrides:
+        apply_override(table, item)
+    return table
+
+
+def load_uniques(root=REPO):
+    """uniques.json as DataManager sanitises it (<= 6 non-zero stats, else power 10)."""
+    uniques = []
+    for raw in load_json(root / "data" / "loot" / "uniques.json").get("uniques", []):
+        if not isinstance(raw, dict) or not str(raw.get("id", "")).strip():
+            continue
+        stats = {}
+        for key, value in (raw.get("stats") or {}).items():
+            if len(stats) >= 6:
+                break
+            if abs(float(value)) >= 0.001:
+                stats[str(key)] = float(value)
+        uniques.append(dict(raw, stats=stats or {"power": 10.0}))
+    return uniques
+
+
+def load_boss_levels(root=REPO):
+    """(level_id, boss_id, target_level) for every level with a boss (Game.gd: index + 1)."""
+    rows = []
+    for _, level in iter_world_levels(root):
+        if level.get("boss_id"):
+            rows.append((level["id"], str(level["boss_id"]), max(1, int(level.get("index", 0)) + 1)))
+    return rows
+
+
+def boss_pools(root, uniques):
+    """boss_id -> (listed unique ids, the ones that exist in uniques.json)."""
+    known = {u["id"] for u in uniques}
+    pools = {}
+    for boss in load_json(root / "data" / "bosses.json").get("bosses", []):
+        listed = [str(e).strip() for e in boss.get("loot_table", []) or [] if str(e).strip()]
+        pools[str(boss.get("id", ""))] = (listed, [i for i in listed if i in known])
+    return pools
+
+
+# --- rarity ---------------------------------------------------------------------
+
+def base_weights(table):
+    cfg = table.get("rarity_config", {})
+    return np.array([float((cfg.get(r) or {}).get("weight", 0.0)) for r in RARITY_ORDER])
+
+
+def adjusted_weights(table, quality):
+    q = max(0.0, quality)
+    factors = 1.0 + QUALITY_SLOPES * q
+    factors[:2] = np.maximum(0.0, factors[:2])
+    weights = base_weights(table) * factors
+    if q > 10.0:
+        weights[:2] = 0.0
+    return weights
+
+
+def rarity_probabilities(table, quality):
+    weights = adjusted_weights(table, quality)
+    total = weights.sum()
+    if total <= 0:
+        probs = np.zeros(6)
+        probs[2] = 1.0  # _roll_rarity falls back to "rare"
+        return probs
+    return weights / total
+
+
+def roll_rarity(rng, table, quality, n):
+    weights = adjusted_weights(table, quality)
+    total = weights.sum()
+    if total <= 0:
+        return np.full(n, 2, np.int8)
+    cumulative = np.cumsum(weights)
+    # first rarity with roll <= cumulative; a float overshoot lands on "rare" like the GDScript
+    idx = np.searchsorted(cumulative, rng.random(n) * total, side="left")
+    idx[idx >= 6] = 2
+    return idx.astype(np.int8)
+
+
+# --- Godot rounding -------------------------------------------------------------
+
+def godot_round(x):
+    return np.sign(x) * np.floor(np.abs(x) + 0.5)
+
+
+def snapped(x, step):
+    return np.floor(x / step + 0.5) * step
+
+
+# --- procedural items -------------------------------------------------------------
+
+def compile_table(table):
+    """Affix pools as arrays: per slot (slot affixes first, then global)."""
+    cfg = table.get("rarity_config", {})
+    affix_count = np.array([min(6, max(DEFAULT_AFFIX_COUNT[i], int((cfg.get(r) or {}).get("affix_count",
+                                                                                       DEFAULT_AFFIX_COUNT[i]))))
+                            for i, r in enumerate(RARITY_ORDER)])
+    power = np.array([float((cfg.get(r) or {}).get("power_multiplier", 1.0)) for r in RARITY_ORDER])
+    affixes_data = table.get("affixes", {})
+    affixes, stats, pools = [], [], []
+    for slot in SLOTS:
+        entries = [a for group in (affixes_data.get(slot, []), affixes_data.get("global", []))
+                   for a in (group if isinstance(group, list) else []) if isinstance(a, dict)]
+        ids, stat_idx, lo, hi, valid, kind = [], [], [], [], [], []
+        for affix in entries:
+            key = (slot if affix in (affixes_data.get(slot) or []) else "global", str(affix.get("id", "")))
+            if key not in affixes:
+                affixes.append(key)
+            stat = str(affix.get("stat", ""))
+            if stat not in stats:
+                stats.append(stat)
+            ranges = affix.get("range", {})
+            row_lo, row_hi, row_ok = [], [], []
+            for r in RARITY_ORDER:
+                pair = ranges.get(r, [0, 0]) if isinstance(ranges, dict) else None
+                ok = isinstance(pair, list) and len(pair) >= 2
+                a, b = (float(pair[0]), float(pair[1])) if ok else (0.0, 0.0)
+                row_lo.append(min(a, b))
+                row_hi.append(max(a, b))
+                row_ok.append(ok)
+            affix_type = str(affix.get("type", "flat"))
+            ids.append(affixes.index(key))
+            stat_idx.append(stats.index(stat))
+            lo.append(row_lo)
+            hi.append(row_hi)
+            valid.append(row_ok)
+            kind.append(KIND_PERCENT if affix_type == "percent" else
+                        KIND_INT if affix_type == "flat" and stat in INT_STATS else KIND_SNAP)
+        pools.append({"affix": np.array(ids, np.int32), "stat": np.array(stat_idx, np.int32),
+                      "lo": np.array(lo).reshape(-1, 6), "hi": np.array(hi).reshape(-1, 6),
+                      "valid": np.array(valid, bool).reshape(-1, 6), "kind": np.array(kind, np.int8)})
+    for pool in pools:
+        pool["floored"] = np.array([pool["kind"][i] == KIND_PERCENT and stats[s] in ITEM_PERCENT_STATS
+                                    for i, s in enumerate(pool["stat"])], bool)
+    return {"affix_count": affix_count, "power": power, "affixes": affixes, "stats": stats, "pools": pools}
+
+
+def roll_items(rng, comp, rarity, level, slot=None):
+    """Procedural items -> (slot, stats (n, n_stats) NaN when absent, affixes (n, 6) index or -1)."""
+    n = len(rarity)
+    if slot is None:
+        slot = rng.integers(0, len(SLOTS), n).astype(np.int8)
+    level_mult = 1.0 + (np.broadcast_to(np.asarray(level, float), (n,)) - 1.0) * 0.1
+    stats = np.full((n, len(comp["stats"])), np.nan)
+    chosen = np.full((n, 6), -1, np.int32)
+    for s, pool in enumerate(comp["pools"]):
+        size = len(pool["affix"])
+        if not size:
+            continue
+        for r in range(6):
+            rows = np.flatnonzero((slot == s) & (rarity == r))
+            if not rows.size:
+                continue
+            k = int(comp["affix_count"][r])
+            order = np.argsort(rng.random((rows.size, size)), axis=1)  # Array.shuffle()
+            used = np.zeros((rows.size, len(comp["stats"])), bool)
+            taken = np.zeros(rows.size, np.int32)
+            picks = np.full((rows.size, k), -1, np.int32)
+            line = np.arange(rows.size)
+            for j in range(size):
+                a = order[:, j]
+                st = pool["stat"][a]
+                ok = (taken < k) & ~used[line, st]
+                picks[line[ok], taken[ok]] = a[ok]
+                used[line[ok], st[ok]] = True
+                taken += ok
+            # k >= 1 always, so the "at least one stat" safety net never triggers.
+            for j in range(k):
+                a = picks[:, j]
+                has = a >= 0
+                a = np.where(has, a, 0)
+                has &= pool["valid"][a, r]
+                lo, hi = pool["lo"][a, r], pool["hi"][a, r]
+                value = (lo + (hi - lo) * rng.random(rows.size)) * comp["power"][r] * level_mult[rows]
+                value = np.where(pool["floored"][a], np.maximum(value, ITEM_PERCENT_FLOORS[r]), value)
+                kind = pool["kind"][a]
+                value = np.where(kind == KIND_INT, godot_round(value),
+                                 np.where(kind == KIND_PERCENT, snapped(value, 0.1), snapped(value, 0.01)))
+                stats[rows[has], pool["stat"][a[has]]] = value[has]
+                chosen[rows[has], j] = pool["affix"][a[has]]
+    return slot, stats, chosen
+
+
+def stat_bounds(comp, level):
+    """(lo, hi) per (slot, stat) reachable at `level`, for fixed histogram bins."""
+    bounds = np.zeros((len(SLOTS), len(comp["stats"]), 2))
+    mult = comp["power"] * (1.0 + (level - 1.0) * 0.1)
+    for s, pool in enumerate(comp["pools"]):
+        for i, st in enumerate(pool["stat"]):
+            lo = pool["lo"][i] * mult
+            hi = pool["hi"][i] * mult
+            if pool["floored"][i]:
+                lo, hi = np.maximum(lo, ITEM_PERCENT_FLOORS), np.maximum(hi, ITEM_PERCENT_FLOORS)
+            bounds[s, st] = (min(lo.min(), bounds[s, st, 0]), max(hi.max(), bounds[s, st, 1]))
+    return np.floor(bounds[..., 0]) - 0.5, np.ceil(bounds[..., 1]) + 0.5
+
+
+# --- drops ------------------------------------------------------------------------
+
+def drop_chunk(task):
+    """Enemy drops (generate_loot): aggregates of one chunk."""
+    table, n_uniques, level, quality, n, seq = task
+    rng = np.random.default_rng(seq)
+    comp = compile_table(table)
+    rarity = roll_rarity(rng, table, quality, n)
+    unique = rarity == UNIQUE
+    picks = np.bincount(rng.integers(0, n_uniques, unique.sum()), minlength=n_uniques) if n_uniques else None
+    levels = np.full(n, level)
+    if n_uniques:
+        procedural = ~unique
+    else:
+        rarity[unique] = LEGENDARY  # no uniques at all: legendary at level 1
+        levels[unique] = 1
+        procedural = np.ones(n, bool)
+    slot, stats, chosen = roll_items(rng, comp, rarity[procedural], levels[procedural])
+    lo, hi = stat_bounds(comp, max(1, level))
+    n_stats = len(comp["stats"])
+    hist = np.zeros((len(SLOTS), n_stats, HIST_BINS), np.int64)
+    sums = np.zeros((len(SLOTS), n_stats, 3))  # count, sum, sum of squares
+    extremes = np.full((len(SLOTS), n_stats, 2), np.nan)
+    affix_counts = np.zeros((len(SLOTS), len(comp["affixes"])), np.int64)
+    slot_counts = np.bincount(slot, minlength=len(SLOTS))
+    for s in range(len(SLOTS)):
+        mask = slot == s
+        sub, sub_chosen = stats[mask], chosen[mask]
+        affix_counts[s] = np.bincount(sub_chosen[sub_chosen >= 0], minlength=len(comp["affixes"]))
+        for st in range(n_stats):
+            v = sub[:, st]
+            v = v[~np.isnan(v)]
+            if not v.size:
+                continue
+            hist[s, st] = np.histogram(v, bins=HIST_BINS, range=(lo[s, st], hi[s, st]))[0]
+            sums[s, st] = (v.size, v.sum(), (v * v).sum())
+            extremes[s, st] = (v.min(), v.max())
+    return {"rarity": np.bincount(rarity, minlength=6), "uniques": picks, "slots": slot_counts,
+            "affixes": affix_counts, "hist": hist, "sums": sums, "extremes": extremes}
+
+
+def boss_chunk(task):
+    """Boss kills (generate_boss_loot): delivered rarity counts and unique picks of one chunk."""
+    table, quality, pool_size, n, seq = task
+    rng = np.random.default_rng(seq)
+    rarity = roll_rarity(rng, table, quality, n)
+    unique = rarity == UNIQUE
+    picks = np.bincount(rng.integers(0, pool_size, unique.sum()), minlength=pool_size) if pool_size else None
+    if not pool_size:
+        rarity[unique] = LEGENDARY
+    return {"rarity": np.bincount(rarity, minlength=6), "uniques": picks}
+
+
+def run_tasks(fn, tasks, workers):
+    if workers == 1 or len(tasks) == 1:
+        return list(map(fn, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+
+def merge(parts):
+    out = {}
+    for key in parts[0]:
+        values = [p[key] for p in parts]
+        if values[0] is None:
+            out[key] = None
+        elif key == "extremes":
+            stack = np.stack(values)  # fmin / fmax skip the NaN of empty cells
+            out[key] = np.stack([np.fmin.reduce(stack[..., 0]), np.fmax.reduce(stack[..., 1])], -1)
+        else:
+            out[key] = sum(values)
+    return out
+
+
+def chunks(total, size):
+    return [min(size, total - start) for start in range(0, total, size)]
+
+
+# --- boss kill expectations ---------------------------------------------------------
+
+def boss_odds(table, quality, pool, extra_chance):
+    """Exact per-kill odds and expected kills for one boss."""
+    probs = rarity_probabilities(table, quality)
+    listed, found = pool
+    p_unique = probs[UNIQUE] if found else 0.0
+    p_legendary = probs[LEGENDARY] + (probs[UNIQUE] if not found else 0.0)
+    p_top = p_legendary + p_unique
+
+    def per_kill(p):  # the Jackpot skill adds a second roll with probability extra_chance
+        return 1.0 - (1.0 - p) * (1.0 - extra_chance * p)
+
+    def kills(p):
+        return 1.0 / per_kill(p) if p > 0 else math.inf
+
+    k = len(found)
+    harmonic = sum(1.0 / i for i in range(1, k + 1))
+    return {"p_legendary": p_legendary, "p_unique": p_unique,
+            "kills_legendary_plus": kills(p_top),
+            "kills_unique": kills(p_unique),
+            "kills_specific_unique": kills(p_unique / k) if k else math.inf,
+            # coupon collector over roll draws (1 + extra_chance per kill)
+            "kills_full_pool": (k * harmonic / p_unique) / (1.0 + extra_chance) if k and p_unique else math.inf,
+            "pool_listed": len(listed), "pool_found": k}
+
+
+# --- scalar reference (parity) ------------------------------------------------------
+
+def reference_item(table, uniques, level, quality, rnd, boss_pool=None):
+    """Line-by-line transcription of LootGenerator.gd for one item (rnd = random.Random).
+
+    Returns (rarity, slot, {stat: value}, [affix names]) ; unique items come
+    back as ("unique", slot, stats, [id])."""
+    cfg = table.get("rarity_config", {})
+    weights = {r: float((cfg.get(r) or {}).get("weight", 0.0)) for r in RARITY_ORDER}
+    q = max(0.0, quality)
+    weights["common"] *= max(0.0, 1.0 - q * 0.05)
+    weights["uncommon"] *= max(0.0, 1.0 - q * 0.04)
+    weights["rare"] *= 1.0 + q * 0.04
+    weights["epic"] *= 1.0 + q * 0.08
+    weights["legendary"] *= 1.0 + q * 0.12
+    weights["unique"] *= 1.0 + q * 0.18
+    if q > 10.0:
+        weights["common"] = weights["uncommon"] = 0.0
+    total = sum(weights[r] for r in RARITY_ORDER)
+    rarity = "rare"
+    if total > 0.0:
+        roll, cumulative = rnd.random() * total, 0.0
+        for r in RARITY_ORDER:
+            cumulative += weights[r]
+            if roll <= cumulative:
+                rarity = r
+                break
+
+    if rarity == "unique":
+        allowed = boss_pool if boss_pool is not None else []
+        if boss_pool is not None and not boss_pool:
+            return reference_procedural(table, level, "", "legendary", rnd)
+        if not uniques:
+            return reference_procedural(table, 1, "", "legendary", rnd)
+        candidates = [u for u in uniques if not allowed or u["id"] in allowed]
+        if not candidates:
+            if allowed:
+                return reference_procedural(table, 1, "", "legendary", rnd)
+            candidates = list(uniques)
+        u = candidates[rnd.randrange(len(candidates))]
+        return "unique", u.get("slot", ""), dict(u["stats"]), [u["id"]]
+    return reference_procedural(table, level, "", rarity, rnd)
+
+
+def reference_procedural(table, level, slot, rarity, rnd):
+    if slot == "":
+        slot = SLOTS[rnd.randrange(len(SLOTS))]
+    cfg = (table.get("rarity_config", {}).get(rarity) or {})
+    default = DEFAULT_AFFIX_COUNT[RARITY_ORDER.index(rarity)] if rarity in RARITY_ORDER else 1
+    affix_count = min(6, max(default, int(cfg.get("affix_count", default))))
+    power = float(cfg.get("power_multiplier", 1.0))
+    level_mult = 1.0 + (float(level) - 1.0) * 0.1
+    affixes_data = table.get("affixes", {})
+    available = list(affixes_data.get(slot, []) or []) + list(affixes_data.get("global", []) or [])
+    rnd.shuffle(available)
+    selected, used = [], []
+    for affix in available:
+        if len(selected) >= affix_count:
+            break
+        if isinstance(affix, dict) and str(affix.get("stat", "")) not in used:
+            selected.append(affix)
+            used.append(str(affix.get("stat", "")))
+    stats, names = {}, []
+    floor = float(ITEM_PERCENT_FLOORS[RARITY_ORDER.index(rarity)])
+    for affix in selected:
+        stat, kind = str(affix.get("stat", "")), str(affix.get("type", "flat"))
+        ranges = affix.get("range", {})
+        if not isinstance(ranges, dict):
+            continue
+        pair = ranges.get(rarity, [0, 0])
+        if not isinstance(pair, list) or len(pair) < 2:
+            continue
+        lo, hi = sorted((float(pair[0]), float(pair[1])))
+        value = (lo + (hi - lo) * rnd.random()) * power * level_mult
+        if kind == "percent" and stat in ITEM_PERCENT_STATS:
+            value = max(value, floor)
+        if kind == "flat" and stat in INT_STATS:
+            stats[stat] = float(godot_round(value))
+        elif kind == "percent":
+            stats[stat] = float(snapped(value, 0.1))
+        else:
+            stats[stat] = float(snapped(value, 0.01))
+        names.append(str(affix.get("name", "")))
+    return rarity, slot, stats, names
+
+
+def _chi2_ok(observed, expected, z=5.0):
+    """Pearson chi-square below mean + z * sd (df = non-empty cells - 1)."""
+    mask = expected > 0
+    chi2 = float((((observed - expected) ** 2)[mask] / expected[mask]).sum())
+    df = max(1, int(mask.sum()) - 1)
+    return chi2 <= df + z * math.sqrt(2 * df), chi2, df
+
+
+def run_check(table, uniques, pools, seed):
+    """Parity suite; returns the list of failures."""
+    failures = []
+
+    def expect(cond, label):
+        print(f"  {'ok  ' if cond else 'FAIL'} {label}")
+        if not cond:
+            failures.append(label)
+
+    rng = np.random.default_rng(seed)
+    comp = compile_table(table)
+    base = base_weights(table)
+    print("rarity weights")
+    expect(np.allclose(rarity_probabilities(table, 0.0), base / base.sum()), "q=0 -> raw loot_table weights")
+    w = adjusted_weights(table, 1.0)
+    expect(np.allclose(w, base * [0.95, 0.96, 1.04, 1.08, 1.12, 1.18]), "q=1 (enemy drop) bias factors")
+    w = adjusted_weights(table, 25.0)
+    expect(w[0] == 0 and w[1] == 0 and np.allclose(w[2:], base[2:] * [2.0, 3.0, 4.0, 5.5]),
+           "q=25 (boss): common/uncommon forbidden, rare x2 epic x3 legendary x4 unique x5.5")
+    expect(adjusted_weights(table, 10.0)[0] > 0 and adjusted_weights(table, 10.01)[0] == 0,
+           "strict rule starts strictly above q=10")
+    expect(np.allclose(adjusted_weights(table, -3.0), base), "negative quality clamps to 0")
+    zero = copy.deepcopy(table)
+    for r in RARITY_ORDER:
+        zero["rarity_config"].setdefault(r, {})["weight"] = 0
+    expect((roll_rarity(rng, zero, 1.0, 1000) == 2).all(), "all-zero weights fall back to rare")
+    for q in (0.0, 1.0, 5.0, 25.0):
+        n = 400_000
+        counts = np.bincount(roll_rarity(rng, table, q, n), minlength=6)
+        ok, chi2, df = _chi2_ok(counts, rarity_probabilities(table, q) * n)
+        expect(ok, f"q={q:g}: {n} rolls match the exact distribution (chi2 {chi2:.1f}, df {df})")
+
+    print("procedural items")
+    n = 200_000
+    rarity = rng.integers(0, 5, n).astype(np.int8)
+    slot, stats, chosen = roll_items(rng, comp, rarity, 3)
+    pool_stats = [len(set(p["stat"].tolist())) for p in comp["pools"]]
+    count = (chosen >= 0).sum(axis=1)
+    expected = np.minimum(comp["affix_count"][rarity], np.array(pool_stats)[slot])
+    expect((count == expected).all(), "affix count = min(max(default, affix_count), distinct pool stats)")
+    expect(((~np.isnan(stats)).sum(axis=1) == count).all(), "one stat per affix, no duplicate stat")
+    mult = comp["power"][rarity] * 1.2
+    ok = True
+    for s, pool in enumerate(comp["pools"]):
+        for i, st in enumerate(pool["stat"]):
+            rows = (slot == s) & ~np.isnan(stats[:, st])
+            lo = pool["lo"][i, rarity[rows]] * mult[rows]
+            hi = pool["hi"][i, rarity[rows]] * mult[rows]
+            if pool["floored"][i]:
+                lo = np.maximum(lo, ITEM_PERCENT_FLOORS[rarity[rows]])
+                hi = np.maximum(hi, ITEM_PERCENT_FLOORS[rarity[rows]])
+            v = stats[rows, st]
+            ok &= bool(((v >= lo - 0.51) & (v <= hi + 0.51)).all())
+    expect(ok, "values within range x power_multiplier x level multiplier (level 3)")
+    for kind, step, label in ((KIND_INT, 1.0, "int(round())"), (KIND_PERCENT, 0.1, "snapped 0.1"),
+                              (KIND_SNAP, 0.01, "snapped 0.01")):
+        cols = sorted({int(p["stat"][i]) for p in comp["pools"] for i in range(len(p["stat"])) if p["kind"][i] == kind})
+        v = stats[:, cols]
+        v = v[~np.isnan(v)]
+        expect(v.size == 0 or np.allclose(v / step, np.round(v / step), atol=1e-6), f"{label} rounding")
+    expect(list(godot_round(np.array([2.5, -2.5, 0.49]))) == [3.0, -3.0, 0.0] and
+           abs(snapped(0.25, 0.1) - 0.3) < 1e-9 and abs(snapped(-0.25, 0.1) + 0.2) < 1e-9,
+           "Godot round (half away from zero) and snapped (floor(x/step + 0.5))")
+    floor_table = copy.deepcopy(table)
+    floor_table["affixes"] = {"global": [{"id": "f", "name": "F", "stat": "crit_chance", "type": "percent",
+                                          "range": {r: [0, 0] for r in RARITY_ORDER}}]}
+    fcomp = compile_table(floor_table)
+    r = np.arange(6, dtype=np.int8).repeat(100)
+    _, fstats, _ = roll_items(rng, fcomp, r, 1)
+    expect(np.allclose(fstats[:, 0], snapped(ITEM_PERCENT_FLOORS[r], 0.1)),
+           "percent stats floored per rarity (0.1 / 0.3 / 0.5 / 0.8 / 1.5 / 2.0)")
+
+    print("boss fallbacks")
+    boss_quality = float(table.get("boss_loot_quality_bonus", 25.0))
+    rnd = random.Random(seed)
+    forced = copy.deepcopy(table)
+    for r in RARITY_ORDER[:-1]:
+        forced["rarity_config"][r]["weight"] = 0
+    item = reference_item(forced, uniques, 4, boss_quality, rnd, boss_pool=[])
+    expect(item[0] == "legendary", "boss without loot_table: unique roll -> legendary")
+    missing = reference_item(forced, uniques, 4, boss_quality, rnd, boss_pool=["nope"])
+    expect(missing[0] == "legendary", "boss pool ids missing from uniques.json -> legendary (level 1)")
+    found = next((b for b, (_, ids) in pools.items() if ids), None)
+    if found:
+        item = reference_item(forced, uniques, 4, boss_quality, rnd, boss_pool=pools[found][1])
+        expect(item[0] == "unique" and item[3][0] in pools[found][1], f"{found}: unique comes from its pool")
+
+    print("vectorised vs scalar transcription")
+    n = 60_000
+    for level, quality in ((1, 1.0), (5, 25.0)):
+        ref = [reference_item(table, uniques, level, quality, rnd) for _ in range(n)]
+        # uniques exist, so the scalar rarity is the rolled one: compare to the exact law the batch matches
+        rcounts = np.bincount([RARITY_ORDER.index(x[0]) for x in ref], minlength=6)
+        ok, chi2, df = _chi2_ok(rcounts, rarity_probabilities(table, quality) * n)
+        expect(ok, f"level {level} q={quality:g}: scalar rarity counts agree (chi2 {chi2:.1f}, df {df})")
+        for rarity_id in ("rare", "legendary"):
+            r = RARITY_ORDER.index(rarity_id)
+            items = [x for x in ref if x[0] == rarity_id]
+            if len(items) < 500:
+                continue
+            _, vstats, _ = roll_items(rng, comp, np.full(len(items) * 4, r, np.int8), level)
+            agree = True
+            for st, name in enumerate(comp["stats"]):
+                rv = np.array([x[2][name] for x in items if name in x[2]])
+                vv = vstats[:, st][~np.isnan(vstats[:, st])]
+                if rv.size < 200:
+                    continue
+                share_r, share_v = rv.size / len(items), vv.size / (len(items) * 4)
+                se = math.sqrt(rv.var() / rv.size + vv.var() / vv.size) + 1e-9
+                same = abs(rv.mean() - vv.mean()) <= 5 * se and abs(share_r - share_v) <= 5 * math.sqrt(
+                    share_v * (1 - share_v) / len(items)) + 1e-9
+                if not same:
+                    agree = False
+                    print(f"       {name}: mean {rv.mean():.3f} vs {vv.mean():.3f}, "
+                          f"share {share_r:.3f} vs {share_v:.3f}")
+            expect(agree, f"level {level} {rarity_id}: per-stat share and mean agree")
+    return failures
+
+
+# --- report -------------------------------------------------------------------------
+
+def fmt_kills(value):
+    return "never" if math.isinf(value) else f"{value:.1f}"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Vectorised LootGenerator drop simulator")
+    p.add_argument("--items", type=int, default=1_000_000, help="Enemy drops to simulate")
+    p.add_argument("--kills", type=int, default=200_000, help="Simulated kills per boss")
+    p.add_argument("--level", type=int, default=1, help="target_level of enemy drops (stat scaling)")
+    p.add_argument("--quality", type=float, default=1.0,
+                   help="Enemy loot_quality_multiplier (Enemy.gd default 1.0)")
+    p.add_argument("--skill-quality", type=float, default=0.0, help="Skill tree loot_quality_bonus")
+    p.add_argument("--extra-loot-chance", type=float, default=0.0,
+                   help="Skill boss_extra_loot_chance (second boss roll)")
+    p.add_argument("--table", help="Alternative loot_table.json")
+    p.add_argument("--set", action="append", default=[], metavar="PATH=JSON",
+                   help="Override a loot_table value, e.g. rarity_config.epic.weight=9 or "
+                        "affixes.engine.move_speed.range.rare=[15,35]")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all cores, 1 = serial)")
+    p.add_argument("--chunk", type=int, default=250_000, help="Items per pool task")
+    p.add_argument("--check", action="store_true", help="Run the LootGenerator parity suite and exit")
+    p.add_argument("--json", help="Write the full report to this file")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        table = load_table(args.table, args.set)
+    except (KeyError, IndexError, TypeError) as e:
+        p.error(f"--set: {e}")
+    current = load_table() if args.table or args.set else None
+    uniques = load_uniques()
+    pools = boss_pools(REPO, uniques)
+    if args.check:
+        failures = run_check(table, uniques, pools, args.seed)
+        print(f"\n{'FAILED: ' + str(len(failures)) if failures else 'all checks passed'} "
+              f"({time.perf_counter() - t0:.1f}s)")
+        return 1 if failures else 0
+
+    workers = args.workers or os.cpu_count() or 1
+    root = np.random.SeedSequence(args.seed)
+    enemy_quality = args.quality + args.skill_quality
+    boss_quality = max(0.0, float(table.get("boss_loot_quality_bonus", 25.0)) + args.skill_quality)
+    tasks = [(table, len(uniques), args.level, enemy_quality, n, np.random.SeedSequence(root.entropy, spawn_key=(0, i)))
+             for i, n in enumerate(chunks(args.items, args.chunk))]
+    drops = merge(run_tasks(drop_chunk, tasks, workers))
+    boss_levels = load_boss_levels()
+    distinct = sorted({b for _, b, _ in boss_levels})
+    boss_tasks = [(table, boss_quality, len(pools.get(b, ([], []))[1]), n,
+                   np.random.SeedSequence(root.entropy, spawn_key=(1, bi, i)))
+                  for bi, b in enumerate(distinct) for i, n in enumerate(chunks(args.kills, args.chunk))]
+    boss_parts = run_tasks(boss_chunk, boss_tasks, workers)
+    per_chunk = len(chunks(args.kills, args.chunk))
+    per_boss = {b: merge(boss_parts[bi * per_chunk:(bi + 1) * per_chunk]) for bi, b in enumerate(distinct)}
+    comp = compile_table(table)
+    elapsed = time.perf_counter() - t0
+
+    exact_enemy = rarity_probabilities(table, enemy_quality)
+    exact_boss = rarity_probabilities(table, boss_quality)
+    cur_enemy = rarity_probabilities(current, enemy_quality) if current else None
+    print(f"## Rarity (enemy drop q={enemy_quality:g}, boss q={boss_quality:g})\n")
+    print("| Rarity | Weight | Enemy exact | Enemy sim | Boss exact |" + (" Enemy before |" if current else ""))
+    print("|---|---:|---:|---:|---:|" + ("---:|" if current else ""))
+    weights = base_weights(table)
+    for i, r in enumerate(RARITY_ORDER):
+        line = (f"| {r} | {weights[i]:g} | {exact_enemy[i]:.4%} | {drops['rarity'][i] / args.items:.4%} "
+                f"| {exact_boss[i]:.4%} |")
+        print(line + (f" {cur_enemy[i]:.4%} |" if current else ""))
+
+    print("\n## Affixes (share of items of the slot carrying the affix)\n")
+    report_affixes = {}
+    for s, slot in enumerate(SLOTS):
+        n_slot = max(1, int(drops["slots"][s]))
+        shares = {f"{g}:{a}": drops["affixes"][s, i] / n_slot for i, (g, a) in enumerate(comp["affixes"])
+                  if drops["affixes"][s, i]}
+        report_affixes[slot] = shares
+        print(f"- {slot} ({n_slot} items): " + ", ".join(f"{k.split(':')[1]} {v:.1%}" for k, v in shares.items()))
+
+    print(f"\n## Stat values per slot (level {args.level})\n")
+    print("| Slot | Stat | Items | Mean | SD | Min | Max | Histogram |")
+    print("|---|---|---:|---:|---:|---:|---:|---|")
+    lo, hi = stat_bounds(comp, max(1, args.level))
+    report_stats = {}
+    bars = " .:-=+*#%@"
+    for s, slot in enumerate(SLOTS):
+        for st, name in enumerate(comp["stats"]):
+            count, total, squares = drops["sums"][s, st]
+            if not count:
+                continue
+            mean = total / count
+            sd = math.sqrt(max(0.0, squares / count - mean * mean))
+            hist = drops["hist"][s, st]
+            spark = "".join(bars[min(9, int(9 * h / hist.max()))] for h in hist) if hist.max() else ""
+            vmin, vmax = drops["extremes"][s, st]
+            report_stats.setdefault(slot, {})[name] = {
+                "items": int(count), "mean": round(mean, 4), "sd": round(sd, 4), "min": float(vmin),
+                "max": float(vmax), "bins": [float(lo[s, st]), float(hi[s, st])], "histogram": hist.tolist()}
+            print(f"| {slot} | {name} | {int(count)} | {mean:.2f} | {sd:.2f} | {vmin:g} | {vmax:g} | `{spark}` |")
+
+    print(f"\n## Boss kills (extra loot chance {args.extra_loot_chance:g})\n")
+    print("| Level | Boss | Pool (found/listed) | P(legendary) | P(unique) | Sim legendary+ | Kills to legendary+ "
+          "| to a unique | to a given unique | full pool |" + (" Legendary+ before |" if current else ""))
+    print("|---|---|---|---:|---:|---:|---:|---:|---:|---:|" + ("---:|" if current else ""))
+    report_bosses = []
+    for level_id, boss_id, target_level in boss_levels:
+        pool = pools.get(boss_id, ([], []))
+        odds = boss_odds(table, boss_quality, pool, args.extra_loot_chance)
+        sim = per_boss[boss_id]
+        sim_top = (sim["rarity"][LEGENDARY] + sim["rarity"][UNIQUE]) / args.kills
+        row = dict(odds, level_id=level_id, boss_id=boss_id, target_level=target_level,
+                   sim_legendary_plus=round(float(sim_top), 5),
+                   fallback_level=(1 if pool[0] and not pool[1] else target_level))
+        before = ""
+        if current:
+            prev = boss_odds(current, max(0.0, float(current.get("boss_loot_quality_bonus", 25.0))
+                                          + args.skill_quality), pool, args.extra_loot_chance)
+            row["kills_legendary_plus_before"] = prev["kills_legendary_plus"]
+            before = f" {fmt_kills(prev['kills_legendary_plus'])} |"
+        report_bosses.append(row)
+        print(f"| {level_id} | {boss_id} | {odds['pool_found']}/{odds['pool_listed']} | {odds['p_legendary']:.2%} "
+              f"| {odds['p_unique']:.2%} | {sim_top:.2%} | {fmt_kills(odds['kills_legendary_plus'])} "
+              f"| {fmt_kills(odds['kills_unique'])} | {fmt_kills(odds['kills_specific_unique'])} "
+              f"| {fmt_kills(odds['kills_full_pool'])} |" + before)
+    hollow = sorted({b for _, b, _ in boss_levels if pools.get(b, ([], []))[0] and not pools[b][1]})
+    if hollow:
+        print(f"\n{len(hollow)} boss(es) list uniques missing from data/loot/uniques.json: unique rolls become "
+              f"level-1 legendaries ({', '.join(hollow[:6])}{', ...' if len(hollow) > 6 else ''})")
+    print(f"\n{args.items} drops + {len(distinct)} bosses x {args.kills} kills in {elapsed:.2f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": {k: v for k, v in vars(args).items() if k != "json"},
+                       "rarity": {"enemy_exact": dict(zip(RARITY_ORDER, exact_enemy.round(6).tolist())),
+                                  "enemy_sim": dict(zip(RARITY_ORDER, (drops["rarity"] / args.items).tolist())),
+                                  "boss_exact": dict(zip(RARITY_ORDER, exact_boss.round(6).tolist()))},
+                       "affixes": report_affixes, "stats": report_stats,
+                       "bosses": [{k: (None if isinstance(v, float) and math.isinf(v) else v) for k, v in row.items()}
+                                  for row in report_bosses]},
+                      f, indent=1, ensure_ascii=False)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
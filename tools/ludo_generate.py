@@ -4,42 +4,89 @@
 Genere (ou reprend un fichier local), convertit et installe une image dans le
 projet :
   1. POST https://api.ludo.ai/api/assets/image (synchrone, ~60-90 s, 0.5 credit/image)
-  2. Sauvegarde du .webp brut dans markdown/ludo_raw/ (gitignore, retraitement gratuit)
-  3. ImageMagick : fond -> transparent (floodfill depuis les bords, PAS un simple
-     "couleur = transparent" qui trouerait le sujet), trim du vide, resize <= 600px
+  2. Sauvegarde du .webp brut dans markdown/ludo_raw/ (gitignore, retraitement gratuit),
+     telecharge en flux (tools/ludo_http.py : .part + reprise Range + rename atomique)
+  3. Post-traitement en memoire (tools/ludo_image.py, Pillow + NumPy) : fond ->
+     transparent (floodfill depuis les bords, PAS un simple "couleur =
+     transparent" qui trouerait le sujet), trim du vide, resize <= 600px
   4. Ecriture au chemin cible assets/...
 
 La cle API n'est PAS dans ce fichier (tools/ est committe) : la passer via
 --api-key ou la variable d'environnement LUDO_API_KEY (cle disponible dans
 markdown/ludoAI_ImageGeneration.md, gitignore).
 
+Mode lot (--batch) : un fichier spec (liste JSON ou JSONL) d'entrees
+{"prompt", "out", "image-type", "format", ...} — memes cles que les options
+de la ligne de commande, qui servent de valeurs par defaut. Les jobs passent
+dans un pool borne (--jobs) avec retries et backoff exponentiel (--retries,
+--backoff ; Retry-After respecte sur 429). L'etat de chaque job est persiste
+dans <spec>.state.json apres chaque transition : un lot interrompu reprend la
+ou il s'est arrete, un job dont les bruts sont deja telecharges est
+seulement retraite et un job deja paye (URLs notees des la reponse de l'API)
+est seulement retelecharge : les retries ne rejouent jamais le POST une fois
+la generation payee. La protection already_done
+s'applique a chaque job (statut "skipped", --force pour outrepasser).
+
+--api-url (ou LUDO_API_URL) pointe vers un autre serveur, par exemple le stub
+local tools/ludo_stub_server.py.
+
+Le manifest (markdown/ludo_manifest.jsonl, tools/ludo_manifest.py) est
+append-only et indexe par cible, brut et empreinte de requete : une requete
+identique deja payee sous un autre nom de sortie est refusee avant l'appel.
+
 Exemples :
   python tools/ludo_generate.py --prompt "..." --out assets/waves/pong/ball.png
   python tools/ludo_generate.py --from-file markdown/ludo_raw/ball.webp --out assets/waves/pong/ball.png
   python tools/ludo_generate.py --prompt "..." --out assets/waves/suika/reactor_background.jpg --format jpg
+  python tools/ludo_generate.py --batch markdown/world_3_assets.json --jobs 4
+  python tools/ludo_generate.py --batch lot.jsonl --api-url http://127.0.0.1:8765/api/assets/image --api-key x
 """
 
 import argparse
 import datetime
-import glob
 import json
 import os
-import subprocess
+import random
 import sys
+import threading
+import time
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import ludo_http
+import ludo_image
+import ludo_manifest
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 API_URL = "https://api.ludo.ai/api/assets/image"
 RAW_DIR = os.path.join(PROJECT_ROOT, "markdown", "ludo_raw")
-MANIFEST = os.path.join(PROJECT_ROOT, "markdown", "ludo_manifest.json")
 
 IMAGE_TYPES = ["sprite", "icon", "item-icon", "ui_asset", "sprite-vfx", "texture",
                "tile", "horizontal_tile", "fixed_background", "side_scrolling_background",
                "portrait", "card-art", "splash", "art", "asset", "screenshot", "3d", "generic"]
 
 
+# HTTP rejoue en mode lot (quota, surcharge, erreurs serveur).
+RETRYABLE_HTTP = {408, 425, 429, 500, 502, 503, 504}
+
+_print_lock = threading.Lock()
+_job_ctx = threading.local()  # .prefix : cle du job en mode lot
+
+
+class LudoError(Exception):
+    """Echec d'une etape ; `retryable` si un nouvel essai a une chance d'aboutir."""
+
+    def __init__(self, msg, retryable=False, retry_after=None):
+        super().__init__(msg)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
 def log(msg):
-    print(msg, flush=True)
+    prefix = getattr(_job_ctx, "prefix", "")
+    with _print_lock:
+        print(prefix + msg, flush=True)
 
 
 def fail(msg):
@@ -47,28 +94,12 @@ def fail(msg):
     sys.exit(1)
 
 
-def magick(*args):
-    cmd = ["magick"] + [str(a) for a in args]
-    res = subprocess.run(cmd, capture_output=True, text=True)
-    if res.returncode != 0:
-        fail("ImageMagick a echoue: " + " ".join(cmd) + "\n" + res.stderr.strip())
-    return res.stdout.strip()
-
-
-def manifest_load():
-    if not os.path.isfile(MANIFEST):
-        return []
-    with open(MANIFEST, encoding="utf-8") as f:
-        return json.load(f)
+manifest = ludo_manifest.Manifest(log=log)  # markdown/ludo_manifest.jsonl, commun avec la 3D
 
 
 def manifest_append(entry):
-    entries = manifest_load()
-    entries.append(entry)
-    os.makedirs(os.path.dirname(MANIFEST), exist_ok=True)
-    with open(MANIFEST, "w", encoding="utf-8") as f:
-        json.dump(entries, f, ensure_ascii=False, indent=1)
-    log("Manifest mis a jour: %s (%d entrees)" % (MANIFEST, len(entries)))
+    count = manifest.append(entry)
+    log("Manifest mis a jour: %s (%d entrees)" % (manifest.path, count))
 
 
 def raw_key(out_rel):
@@ -81,25 +112,30 @@ def raw_key(out_rel):
     return (parent + "_" + stem) if parent else stem
 
 
-def already_done(out_rel, out_abs, key):
-    """Retourne la raison si l'asset a deja ete genere, sinon None."""
+def already_done(out_rel, out_abs, key, digest=None):
+    """Retourne la raison si l'asset (ou la meme requete) a deja ete genere, sinon None."""
     if os.path.isfile(out_abs):
         return "le fichier cible existe deja (%s)" % out_rel
-    raws = glob.glob(os.path.join(RAW_DIR, key + ".webp")) + \
-        glob.glob(os.path.join(RAW_DIR, key + "_v*.webp"))
+    raws = manifest.raws(RAW_DIR, key)
     if raws:
         return ("une generation a deja ete payee pour ce nom (bruts: %s) — retraiter "
                 "gratuitement avec --from-file plutot que regenerer"
                 % ", ".join(os.path.basename(r) for r in raws))
-    for e in manifest_load():
-        if e.get("out") == out_rel:
-            return "present dans le manifest (genere le %s)" % e.get("date", "?")
+    for e in manifest.find_out(out_rel):
+        return "present dans le manifest (genere le %s)" % e.get("date", "?")
+    for e in manifest.find_raw(key):
+        return ("une generation a deja ete payee pour ce nom sous %s le %s (bruts absents de %s)"
+                % (e.get("out"), e.get("date", "?"), os.path.relpath(RAW_DIR, PROJECT_ROOT)))
+    for e in manifest.find_hash(digest) if digest else ():
+        return ("requete identique (prompt + parametres) deja payee pour %s le %s (bruts: %s) — "
+                "retraiter ces bruts avec --from-file" % (e.get("out"), e.get("date", "?"),
+                                                          ", ".join(e.get("raw", [])) or "?"))
     return None
 
 
-def call_api(payload, api_key):
+def call_api(payload, api_key, api_url=API_URL):
     req = urllib.request.Request(
-        API_URL,
+        api_url,
         data=json.dumps(payload).encode("utf-8"),
         headers={"Content-Type": "application/json",
                  "Authorization": "ApiKey " + api_key},
@@ -110,59 +146,279 @@ def call_api(payload, api_key):
             body = resp.read().decode("utf-8")
     except urllib.error.HTTPError as e:
         detail = e.read().decode("utf-8", "replace")[:500]
-        fail("HTTP %d sur l'API: %s" % (e.code, detail))
-    results = json.loads(body)
+        retry_after = e.headers.get("Retry-After") if e.headers else None
+        raise LudoError("HTTP %d sur l'API: %s" % (e.code, detail), e.code in RETRYABLE_HTTP,
+                        float(retry_after) if retry_after and retry_after.isdigit() else None)
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        raise LudoError("appel API: %s" % e, retryable=True)
+    try:
+        results = json.loads(body)
+    except ValueError:
+        results = None
     if not isinstance(results, list) or not results or "url" not in results[0]:
-        fail("Reponse API inattendue: " + body[:500])
+        raise LudoError("Reponse API inattendue: " + body[:500])
     return [r["url"] for r in results]
 
 
 def download(url, dest):
-    os.makedirs(os.path.dirname(dest), exist_ok=True)
-    urllib.request.urlretrieve(url, dest)
-    log("Telecharge: %s (%d octets)" % (dest, os.path.getsize(dest)))
+    """Brut par blocs (tools/ludo_http.py) : .part, reprise par Range, sha256, rename atomique."""
+    try:
+        size, digest = ludo_http.download(url, dest, log=log)
+    except ludo_http.TRANSIENT as e:
+        raise LudoError("telechargement %s: %s" % (url, e), retryable=True)
+    except ValueError as e:
+        raise LudoError(str(e), retryable=True)
+    manifest.note_raw(dest)
+    log("Telecharge: %s (%d octets, sha256 %s)" % (dest, size, digest[:16]))
 
 
 def process_image(src, dest, fmt, max_size, fuzz, pad, no_bg, no_trim, jpg_quality):
     """webp brut -> image finale optimisee (png transparent trime, ou jpg opaque)."""
     os.makedirs(os.path.dirname(dest), exist_ok=True)
-    w, h = (int(v) for v in magick("identify", "-format", "%w %h", src).split())
-
-    if fmt == "jpg":
-        # Backgrounds/tiles opaques : aplatir sur blanc, pas de trim ni transparence.
-        magick(src, "-background", "white", "-alpha", "remove", "-alpha", "off",
-               "-resize", "%dx%d>" % (max_size, max_size),
-               "-quality", str(jpg_quality), dest)
-    else:
-        args = [src, "-alpha", "set"]
-        if not no_bg:
-            # Transparence par floodfill depuis 8 points du bord : la couleur de
-            # reference est celle DU point (coins + milieux de bords), et seuls les
-            # pixels connectes au bord sont vides — un element de meme couleur A
-            # L'INTERIEUR du sujet n'est pas touche.
-            args += ["-fuzz", "%s%%" % fuzz, "-fill", "none"]
-            for x, y in [(0, 0), (w - 1, 0), (0, h - 1), (w - 1, h - 1),
-                         (w // 2, 0), (w // 2, h - 1), (0, h // 2), (w - 1, h // 2)]:
-                args += ["-draw", "alpha %d,%d floodfill" % (x, y)]
-        if not no_trim:
-            args += ["-trim", "+repage"]
-            if pad > 0:
-                args += ["-bordercolor", "none", "-border", str(pad)]
-        args += ["-resize", "%dx%d>" % (max_size, max_size), "PNG32:" + dest]
-        magick(*args)
-
-    info = magick("identify", "-format", "%wx%h %b", dest)
-    log("Final: %s (%s)" % (dest, info))
+    try:
+        info = ludo_image.process(src, dest, fmt, max_size, fuzz, pad, no_bg, no_trim, jpg_quality)
+    except (OSError, ValueError) as e:
+        raise LudoError("traitement de %s: %s" % (src, e))
+    log("Final: %s (%dx%d %d octets)" % (dest, info["width"], info["height"], info["bytes"]))
 
     if fmt != "jpg":
-        fw, fh = (int(v) for v in info.split()[0].split("x"))
-        mean_alpha = float(magick("identify", "-format", "%[fx:mean.a]", dest))
-        log("Alpha moyen: %.2f (1.0 = opaque)" % mean_alpha)
-        if fw < 8 or fh < 8 or mean_alpha < 0.02:
+        log("Alpha moyen: %.2f (1.0 = opaque)" % info["mean_alpha"])
+        if info["width"] < 8 or info["height"] < 8 or info["mean_alpha"] < 0.02:
             log("ATTENTION: resultat quasi vide — le floodfill a probablement mange le sujet.")
             log("  Retraiter avec --fuzz plus bas (ex. 4), ou --no-bg si le sujet touche les bords.")
 
 
+def resolve_target(out, fmt):
+    """--out -> (chemin relatif projet, chemin absolu, cle brute, format effectif)."""
+    out_rel = out.replace("res://", "").replace("\\", "/")
+    out_abs = os.path.normpath(os.path.join(PROJECT_ROOT, out_rel))
+    if fmt == "auto":
+        fmt = "jpg" if out_abs.lower().endswith((".jpg", ".jpeg")) else "png"
+    return out_rel, out_abs, raw_key(out_rel), fmt
+
+
+def request_payload(opts):
+    return {"image_type": opts.image_type, "prompt": opts.prompt,
+            "art_style": opts.style, "perspective": opts.perspective,
+            "aspect_ratio": opts.ratio, "n": opts.n,
+            "augment_prompt": not opts.no_augment}
+
+
+def generate(opts, key, api_key, api_url):
+    """Appel API + telechargement des bruts -> liste des chemins .webp."""
+    return fetch_raws(call_api(request_payload(opts), api_key, api_url), key)
+
+
+def fetch_raws(urls, key):
+    """Telecharge les URLs deja payees vers markdown/ludo_raw/ -> liste des chemins .webp."""
+    raws = []
+    for i, url in enumerate(urls):
+        suffix = "" if len(urls) == 1 else "_v%d" % (i + 1)
+        raw = os.path.join(RAW_DIR, key + suffix + ".webp")
+        download(url, raw)
+        raws.append(raw)
+    return raws
+
+
+def install(raws, out_abs, fmt, opts):
+    """Traite les bruts vers la cible (ou en variantes _vN) ; retourne le statut d'installation."""
+    if len(raws) == 1:
+        process_image(raws[0], out_abs, fmt, opts.max_size, opts.fuzz, opts.pad,
+                      opts.no_bg, opts.no_trim, opts.jpg_quality)
+        return "installe"
+    # Plusieurs variantes : traiter en _v1.._vN A COTE de la cible, ne rien installer.
+    log("%d variantes generees — traiter puis choisir :" % len(raws))
+    stem = os.path.splitext(os.path.basename(out_abs))[0]
+    ext = ".jpg" if fmt == "jpg" else ".png"
+    for i, raw in enumerate(raws):
+        variant = os.path.join(os.path.dirname(out_abs), "%s_v%d%s" % (stem, i + 1, ext))
+        process_image(raw, variant, fmt, opts.max_size, opts.fuzz, opts.pad,
+                      opts.no_bg, opts.no_trim, opts.jpg_quality)
+    log("Choisir la meilleure variante, la renommer en %s et supprimer les autres."
+        % os.path.basename(out_abs))
+    return "variantes a departager"
+
+
+def record(out_rel, raws, install_status, action, prompt, digest=None):
+    entry = {
+        "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "out": out_rel,
+        "action": action,
+        "n": len(raws),
+        "install": install_status,
+        "raw": [os.path.relpath(r, PROJECT_ROOT).replace("\\", "/") for r in raws],
+        "prompt": prompt or "",
+    }
+    if digest:
+        entry["request_hash"] = digest
+    manifest_append(entry)
+
+
+# --- mode lot -----------------------------------------------------------------
+
+# Cles d'une entree de spec (memes noms que les options CLI, tirets ou underscores).
+BATCH_KEYS = {"prompt", "out", "image_type", "style", "perspective", "ratio", "n", "format",
+              "max_size", "fuzz", "pad", "no_bg", "no_trim", "jpg_quality", "no_augment", "force"}
+FINAL_STATUSES = ("done", "skipped")
+
+
+def load_batch(path, defaults):
+    """Spec (liste JSON ou JSONL) -> liste de Namespace, options CLI en valeurs par defaut."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    jobs, seen, raw_keys, requests = [], set(), {}, {}
+    for i, entry in enumerate(entries):
+        where = "%s: entree %d" % (path, i + 1)
+        if not isinstance(entry, dict):
+            raise ValueError(where + ": objet attendu")
+        entry = {k.replace("-", "_"): v for k, v in entry.items()}
+        unknown = sorted(set(entry) - BATCH_KEYS)
+        if unknown:
+            raise ValueError(where + ": cle(s) inconnue(s) " + ", ".join(unknown))
+        if not entry.get("out") or not entry.get("prompt"):
+            raise ValueError(where + ": 'out' et 'prompt' requis")
+        opts = argparse.Namespace(**{k: getattr(defaults, k) for k in BATCH_KEYS if k != "out"})
+        for k, v in entry.items():
+            setattr(opts, k, v)
+        if opts.image_type not in IMAGE_TYPES:
+            raise ValueError(where + ": image-type inconnu '%s'" % opts.image_type)
+        if opts.format not in ("auto", "png", "jpg"):
+            raise ValueError(where + ": format inconnu '%s'" % opts.format)
+        opts.out = resolve_target(opts.out, "auto")[0]
+        if opts.out in seen:
+            raise ValueError(where + ": cible en double " + opts.out)
+        seen.add(opts.out)
+        key = raw_key(opts.out)
+        if key in raw_keys:
+            raise ValueError(where + ": meme brut markdown/ludo_raw/%s.webp que %s (bruts ecrases, "
+                             "credits payes deux fois)" % (key, raw_keys[key]))
+        raw_keys[key] = opts.out
+        digest = ludo_manifest.request_hash(request_payload(opts))
+        if digest in requests:
+            raise ValueError(where + ": meme prompt et parametres que %s (credits payes deux fois)"
+                             % requests[digest])
+        requests[digest] = opts.out
+        jobs.append(opts)
+    return jobs
+
+
+class BatchState:
+    """Etat persistant d'un lot : out -> {status, attempts, error, urls, raws, updated}.
+
+    Reecrit atomiquement (tmp + os.replace) a chaque transition, pour qu'un
+    lot interrompu (Ctrl-C, crash, coupure) reprenne sans repayer les jobs
+    deja payes : les URLs renvoyees par l'API sont notees des la reponse, un
+    echec de telechargement ne rejoue donc que le telechargement.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.jobs = {}
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                self.jobs = json.load(f).get("jobs", {})
+
+    def get(self, out):
+        with self.lock:
+            return dict(self.jobs.get(out, {}))
+
+    def update(self, out, **fields):
+        with self.lock:
+            job = self.jobs.setdefault(out, {"status": "pending", "attempts": 0})
+            job.update(fields)
+            job["updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"jobs": self.jobs}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+
+
+def run_job(opts, state, api_key, api_url, retries, backoff):
+    """Un job du lot jusqu'a un statut final ; retourne ce statut."""
+    out_rel, out_abs, key, fmt = resolve_target(opts.out, opts.format)
+    _job_ctx.prefix = "[%s] " % out_rel
+    try:
+        prev = state.get(out_rel)
+        if prev.get("status") in FINAL_STATUSES:
+            log("deja %s (etat du lot), ignore" % prev["status"])
+            return prev["status"]
+        raws = [os.path.join(PROJECT_ROOT, r) for r in prev.get("raws", [])]
+        reused = bool(raws) and all(os.path.isfile(r) for r in raws)
+        urls = prev.get("urls") or []
+        if reused:
+            log("bruts deja telecharges lors d'un essai precedent — retraitement seul")
+        elif urls:
+            log("generation deja payee lors d'un essai precedent — telechargement seul")
+        else:
+            reason = already_done(out_rel, out_abs, key, ludo_manifest.request_hash(request_payload(opts)))
+            if reason and not opts.force:
+                log("ASSET DEJA GENERE, ignore: %s" % reason)
+                state.update(out_rel, status="skipped", error=reason)
+                return "skipped"
+            if reason:
+                log("AVERTISSEMENT force: regeneration malgre: %s" % reason)
+        attempts = prev.get("attempts", 0)
+        for attempt in range(retries + 1):
+            attempts += 1
+            state.update(out_rel, status="running", attempts=attempts, error=None)
+            try:
+                if not reused:
+                    if not urls:
+                        # Seul un echec AVANT la reponse de l'API rejoue le POST (payant).
+                        urls = call_api(request_payload(opts), api_key, api_url)
+                        state.update(out_rel, urls=urls)
+                    raws = fetch_raws(urls, key)
+                    reused = True
+                    state.update(out_rel, raws=[os.path.relpath(r, PROJECT_ROOT).replace("\\", "/")
+                                                for r in raws])
+                status = install(raws, out_abs, fmt, opts)
+                record(out_rel, raws, status, "generate", opts.prompt,
+                       ludo_manifest.request_hash(request_payload(opts)))
+                state.update(out_rel, status="done")
+                return "done"
+            except LudoError as e:
+                if not e.retryable or attempt == retries:
+                    log("ECHEC: %s" % e)
+                    state.update(out_rel, status="failed", error=str(e))
+                    return "failed"
+                delay = e.retry_after or backoff * 2 ** attempt * (0.5 + random.random())
+                log("%s — nouvel essai dans %.1f s (%d/%d)" % (e, delay, attempt + 1, retries))
+                state.update(out_rel, status="pending", error=str(e))
+                time.sleep(delay)
+    finally:
+        _job_ctx.prefix = ""
+
+
+def run_batch(args):
+    try:
+        jobs = load_batch(args.batch, args)
+    except (OSError, ValueError) as e:
+        fail(str(e))
+    state = BatchState(args.state or os.path.splitext(args.batch)[0] + ".state.json")
+    pending = sum(state.get(j.out).get("status") not in FINAL_STATUSES for j in jobs)
+    if pending and not args.api_key:
+        fail("Cle API manquante: --api-key ou variable d'environnement LUDO_API_KEY")
+    log("Lot %s: %d job(s), %d a traiter, %d en parallele (etat: %s)"
+        % (args.batch, len(jobs), pending, args.jobs, state.path))
+    with ThreadPoolExecutor(max(1, args.jobs)) as pool:
+        statuses = list(pool.map(lambda j: run_job(j, state, args.api_key, args.api_url,
+                                                   args.retries, args.backoff), jobs))
+    counts = {s: statuses.count(s) for s in ("done", "skipped", "failed")}
+    log("Lot termine: %d fait(s), %d ignore(s), %d en echec" % (counts["done"], counts["skipped"], counts["failed"]))
+    for j, s in zip(jobs, statuses):
+        if s == "failed":
+            log("  ECHEC %s: %s" % (j.out, state.get(j.out).get("error")))
+    if counts["done"]:
+        log("Ne pas oublier : regarder les images, cabler les chemins res:// dans les JSON, "
+            "mettre a jour missing_assets.md, godot --headless --import.")
+    return 1 if counts["failed"] else 0
+
+
 def main():
     p = argparse.ArgumentParser(description="Genere/convertit/installe un asset Ludo.ai")
     p.add_argument("--prompt", help="Prompt EN de la fiche missing_assets.md")
@@ -184,6 +440,8 @@ def main():
     p.add_argument("--jpg-quality", type=int, default=85)
     p.add_argument("--from-file", help="Retraiter un .webp/.png local (aucun appel API)")
     p.add_argument("--api-key", default=os.environ.get("LUDO_API_KEY", ""))
+    p.add_argument("--api-url", default=os.environ.get("LUDO_API_URL", API_URL),
+                   help="Endpoint image (defaut Ludo.ai ; ex. stub local tools/ludo_stub_server.py)")
     p.add_argument("--no-augment", action="store_true",
                    help="Desactive l'enrichissement automatique du prompt par Ludo "
                         "(indispensable pour les styles minimaux/flat : l'augment rajoute des details)")
@@ -191,82 +449,60 @@ def main():
                    help="Regenerer meme si l'asset existe deja (consomme des credits)")
     p.add_argument("--list", action="store_true",
                    help="Afficher le manifest des assets deja generes et sortir")
+    p.add_argument("--batch", help="Spec de lot (liste JSON ou JSONL d'entrees prompt/out/...)")
+    p.add_argument("--state", help="Fichier d'etat du lot (defaut <spec>.state.json)")
+    p.add_argument("--jobs", type=int, default=4, help="Jobs du lot en parallele (defaut 4)")
+    p.add_argument("--retries", type=int, default=3,
+                   help="Nouveaux essais par job sur erreur transitoire (defaut 3)")
+    p.add_argument("--backoff", type=float, default=5.0,
+                   help="Delai de base du backoff exponentiel en s (defaut 5)")
     args = p.parse_args()
 
     if args.list:
-        entries = manifest_load()
-        log("%d asset(s) generes (manifest %s):" % (len(entries), MANIFEST))
+        entries = manifest.entries()
+        log("%d asset(s) generes (manifest %s):" % (len(entries), manifest.path))
         for e in entries:
             log("  [%s] %s  (%s, %s)" % (e.get("date", "?"), e.get("out"),
                                          e.get("action"), e.get("install", "?")))
         return
 
+    if args.batch:
+        sys.exit(run_batch(args))
+
     if not args.out:
-        fail("--out requis (sauf avec --list)")
+        fail("--out requis (sauf avec --list ou --batch)")
 
-    out_rel = args.out.replace("res://", "").replace("\\", "/")
-    out_abs = os.path.normpath(os.path.join(PROJECT_ROOT, out_rel))
-    stem = os.path.splitext(os.path.basename(out_abs))[0]
-    key = raw_key(out_rel)
-    fmt = args.format
-    if fmt == "auto":
-        fmt = "jpg" if out_abs.lower().endswith((".jpg", ".jpeg")) else "png"
+    out_rel, out_abs, key, fmt = resolve_target(args.out, args.format)
 
-    if args.from_file:
-        raws = [os.path.normpath(os.path.join(PROJECT_ROOT, args.from_file))
-                if not os.path.isabs(args.from_file) else args.from_file]
-        if not os.path.isfile(raws[0]):
-            fail("Fichier introuvable: " + raws[0])
-    else:
-        if not args.prompt:
-            fail("--prompt requis (ou --from-file pour retraiter un fichier local)")
-        if not args.api_key:
-            fail("Cle API manquante: --api-key ou variable d'environnement LUDO_API_KEY "
-                 "(cle dans markdown/ludoAI_ImageGeneration.md)")
-        reason = already_done(out_rel, out_abs, key)
-        if reason and not args.force:
-            fail("ASSET DEJA GENERE — regeneration refusee pour ne pas consommer de credits.\n"
-                 "  Raison: %s\n"
-                 "  Outrepasser volontairement: --force" % reason)
-        if reason and args.force:
-            log("AVERTISSEMENT --force: regeneration malgre: %s" % reason)
-        payload = {"image_type": args.image_type, "prompt": args.prompt,
-                   "art_style": args.style, "perspective": args.perspective,
-                   "aspect_ratio": args.ratio, "n": args.n,
-                   "augment_prompt": not args.no_augment}
-        urls = call_api(payload, args.api_key)
-        raws = []
-        for i, url in enumerate(urls):
-            suffix = "" if len(urls) == 1 else "_v%d" % (i + 1)
-            raw = os.path.join(RAW_DIR, key + suffix + ".webp")
-            download(url, raw)
-            raws.append(raw)
+    try:
+        if args.from_file:
+            raws = [os.path.normpath(os.path.join(PROJECT_ROOT, args.from_file))
+                    if not os.path.isabs(args.from_file) else args.from_file]
+            if not os.path.isfile(raws[0]):
+                fail("Fichier introuvable: " + raws[0])
+        else:
+            if not args.prompt:
+                fail("--prompt requis (ou --from-file pour retraiter un fichier local)")
+            if not args.api_key:
+                fail("Cle API manquante: --api-key ou variable d'environnement LUDO_API_KEY "
+                     "(cle dans markdown/ludoAI_ImageGeneration.md)")
+            digest = ludo_manifest.request_hash(request_payload(args))
+            reason = already_done(out_rel, out_abs, key, digest)
+            if reason and not args.force:
+                fail("ASSET DEJA GENERE — regeneration refusee pour ne pas consommer de credits.\n"
+                     "  Raison: %s\n"
+                     "  Outrepasser volontairement: --force" % reason)
+            if reason and args.force:
+                log("AVERTISSEMENT --force: regeneration malgre: %s" % reason)
+            raws = generate(args, key, args.api_key, args.api_url)
+        status = install(raws, out_abs, fmt, args)
+    except LudoError as e:
+        fail(str(e))
 
-    if len(raws) == 1:
-        process_image(raws[0], out_abs, fmt, args.max_size, args.fuzz, args.pad,
-                      args.no_bg, args.no_trim, args.jpg_quality)
-        install = "installe"
+    if args.from_file:
+        record(out_rel, raws, status, "reprocess", args.prompt)
     else:
-        # Plusieurs variantes : traiter en _v1.._vN A COTE de la cible, ne rien installer.
-        log("%d variantes generees — traiter puis choisir :" % len(raws))
-        ext = ".jpg" if fmt == "jpg" else ".png"
-        for i, raw in enumerate(raws):
-            variant = os.path.join(os.path.dirname(out_abs), "%s_v%d%s" % (stem, i + 1, ext))
-            process_image(raw, variant, fmt, args.max_size, args.fuzz, args.pad,
-                          args.no_bg, args.no_trim, args.jpg_quality)
-        log("Choisir la meilleure variante, la renommer en %s et supprimer les autres."
-            % os.path.basename(out_abs))
-        install = "variantes a departager"
-
-    manifest_append({
-        "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "out": out_rel,
-        "action": "reprocess" if args.from_file else "generate",
-        "n": len(raws),
-        "install": install,
-        "raw": [os.path.relpath(r, PROJECT_ROOT).replace("\\", "/") for r in raws],
-        "prompt": args.prompt or "",
-    })
+        record(out_rel, raws, status, "generate", args.prompt, digest)
 
     log("OK. Ne pas oublier : (1) regarder l'image, (2) cabler le chemin res://%s dans le JSON, "
         "(3) ajouter '- Statut: OK -> res://%s' a la fiche missing_assets.md, "
@@ -10,33 +10,74 @@ Pipeline:
   2. Si la reponse ne contient pas d'URL .glb: poll
      GET /api/assets/3d-models/results?request_id=... (gratuit) jusqu'a
      obtention (--poll-timeout, defaut 600 s).
-  3. Telechargement du GLB vers --out (+ previews eventuelles ignorees).
-  4. Entree ajoutee au manifest commun markdown/ludo_manifest.json
-     (action "generate3d") — meme anti-doublon que le 2D.
+  3. Telechargement du GLB vers --out (+ previews eventuelles ignorees), en
+     flux (tools/ludo_http.py) : .part, sha256 note au manifest, reprise par
+     Range apres coupure, rename atomique. L'image locale part elle aussi en
+     flux (base64 encode par blocs), memoire constante par job.
+  3b. Inspection du GLB recu (tools/glb_inspect.py : triangles, sommets,
+     primitives, textures embarquees) contre la section glb de
+     tools/asset_budgets.json (--limit, --no-budget) : hors budget, le modele
+     est garde sous <cible>.rejected.glb et n'est pas installe. Le meme
+     budget est applique AVANT le POST : --faces ramene au budget de
+     triangles, texture qui ne peut pas tenir refusee (aucun credit).
+  4. Entree ajoutee au manifest commun markdown/ludo_manifest.jsonl
+     (action "generate3d", tools/ludo_manifest.py) — meme anti-doublon que le
+     2D, y compris la meme image + parametres deja payee sous un autre --out.
+
+Mode lot (--batch spec.json, liste JSON ou JSONL d'entrees image/out/faces/
+texture-size/texture-type/request-id/force) : asyncio, tous les jobs sont
+soumis puis tous les request_id en cours sont polles en parallele, chacun
+avec un intervalle adaptatif (--poll-interval, x1.5 a chaque poll vide
+jusqu'a --poll-max, avec gigue) ; les GLB prets se telechargent en parallele
+(--jobs appels HTTP simultanes au plus). Chaque transition est ecrite dans
+un journal append-only (<spec>.journal.jsonl, fsync) : un lot interrompu
+reprend le poll des request_id deja soumis au lieu de repayer 3 credits.
+--api-base (env LUDO_API_BASE) pointe vers un faux serveur pour les tests
+(tools/ludo_stub_server.py).
 
 Usage type (racine du projet):
   python tools/ludo_generate_3d.py --api-key <cle> \
     --image assets/waves/asteroid_split/asteroid_xl.png \
     --out assets/ultimate/fragment_l.glb --faces 3000
+  python tools/ludo_generate_3d.py --api-key <cle> --batch markdown/lot_3d.json --jobs 8
 
 La cle API n'est JAMAIS ecrite ici (tools/ est versionne) : --api-key ou
 env LUDO_API_KEY. Cf. markdown/ludoAI_ImageGeneration.md §1.
 """
 import argparse
-import base64
+import asyncio
 import json
 import mimetypes
 import os
+import random
 import sys
 import time
 import urllib.error
+import urllib.parse
 import urllib.request
 
+import glb_inspect
+import ludo_http
+import ludo_manifest
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
-API_3D_URL = "https://api.ludo.ai/api/assets/3d-model"
-API_RESULTS_URL = "https://api.ludo.ai/api/assets/3d-models/results"
-MANIFEST = os.path.join(PROJECT_ROOT, "markdown", "ludo_manifest.json")
+API_BASE = "https://api.ludo.ai/api/assets"
+API_3D_PATH = "/3d-model"
+API_RESULTS_PATH = "/3d-models/results"
+# HTTP rejoue (poll) ; seul 429 est rejoue sur le POST payant (jamais traite).
+RETRYABLE_HTTP = {408, 425, 429, 500, 502, 503, 504}
+FINAL_STATUSES = ("done", "skipped", "rejected")
+
+
+class LudoError(Exception):
+    """Echec d'une etape ; `retryable` si un nouvel essai a une chance d'aboutir."""
+
+    def __init__(self, msg, retryable=False, retry_after=None, code=None):
+        super().__init__(msg)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.code = code
 
 
 def log(msg):
@@ -48,52 +89,51 @@ def fail(msg):
     sys.exit(1)
 
 
-def manifest_load():
-    if not os.path.isfile(MANIFEST):
-        return []
-    with open(MANIFEST, encoding="utf-8") as f:
-        return json.load(f)
+manifest = ludo_manifest.Manifest(log=log)
 
 
 def manifest_append(entry):
-    entries = manifest_load()
-    entries.append(entry)
-    os.makedirs(os.path.dirname(MANIFEST), exist_ok=True)
-    with open(MANIFEST, "w", encoding="utf-8") as f:
-        json.dump(entries, f, ensure_ascii=False, indent=1)
-    log("Manifest mis a jour: %s (%d entrees)" % (MANIFEST, len(entries)))
+    count = manifest.append(entry)
+    log("Manifest mis a jour: %s (%d entrees)" % (manifest.path, count))
+
 
+def request_digest(image_arg, faces, texture_size, texture_type):
+    """Empreinte de la requete : contenu de l'image locale (ou URL) + parametres."""
+    path = image_arg if os.path.isabs(image_arg) else os.path.join(PROJECT_ROOT, image_arg)
+    source = ludo_manifest.file_hash(path) if os.path.isfile(path) else image_arg
+    return ludo_manifest.request_hash({"image": source, "target_num_faces": faces,
+                                       "texture_size": texture_size, "texture_type": texture_type})
 
-def already_done(out_rel, out_abs):
+
+def already_done(out_rel, out_abs, digest=None):
     if os.path.isfile(out_abs):
         return "le fichier cible existe deja (%s)" % out_rel
-    for e in manifest_load():
-        if e.get("out") == out_rel and e.get("action") == "generate3d":
-            return "present dans le manifest (genere le %s)" % e.get("date", "?")
+    for e in manifest.find_out(out_rel, "generate3d"):
+        return "present dans le manifest (genere le %s)" % e.get("date", "?")
+    for e in manifest.find_hash(digest) if digest else ():
+        return "meme image et parametres deja generes vers %s le %s" % (e.get("out"), e.get("date", "?"))
     return None
 
 
-def image_payload(image_arg):
-    """URL http(s) telle quelle ; fichier local -> data-URI base64."""
+def image_body(payload, image_arg):
+    """Corps du POST 3D : URL http(s) telle quelle ; fichier local -> data-URI
+    base64 encode en flux (ludo_http.JsonImageBody, memoire constante)."""
     if image_arg.startswith("http://") or image_arg.startswith("https://"):
-        return image_arg
+        return json.dumps(dict(payload, image=image_arg)).encode("utf-8")
     path = image_arg if os.path.isabs(image_arg) else os.path.join(PROJECT_ROOT, image_arg)
     if not os.path.isfile(path):
-        fail("image source introuvable: " + path)
-    mime = mimetypes.guess_type(path)[0] or "image/png"
-    with open(path, "rb") as f:
-        data = base64.b64encode(f.read()).decode("ascii")
-    return "data:%s;base64,%s" % (mime, data)
+        raise LudoError("image source introuvable: " + path)
+    return ludo_http.JsonImageBody(payload, "image", path, mimetypes.guess_type(path)[0] or "image/png")
 
 
-def api_call(url, api_key, payload=None, timeout=300):
+def api_call(url, api_key, body=None, timeout=300):
+    """GET, ou POST de `body` (bytes ou JsonImageBody) ; reponse JSON decodee."""
     headers = {"Authorization": "ApiKey " + api_key}
-    data = None
-    if payload is not None:
+    if body is not None:
         headers["Content-Type"] = "application/json"
-        data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers=headers,
-                                 method="POST" if payload is not None else "GET")
+        headers["Content-Length"] = str(len(body))
+    req = urllib.request.Request(url, data=body, headers=headers,
+                                 method="POST" if body is not None else "GET")
     try:
         with urllib.request.urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode("utf-8"))
@@ -103,9 +143,13 @@ def api_call(url, api_key, payload=None, timeout=300):
             body = e.read().decode("utf-8")[:600]
         except Exception:
             pass
-        fail("HTTP %d sur %s — %s" % (e.code, url, body))
+        retry_after = e.headers.get("Retry-After") if e.headers else None
+        raise LudoError("HTTP %d sur %s — %s" % (e.code, url, body), e.code in RETRYABLE_HTTP,
+                        float(retry_after) if retry_after and retry_after.isdigit() else None, e.code)
+    except ValueError as e:
+        raise LudoError("reponse non JSON de %s: %s" % (url, e))
     except Exception as e:  # timeout, reseau
-        fail("appel API %s: %s" % (url, e))
+        raise LudoError("appel API %s: %s" % (url, e), retryable=True)
 
 
 def find_glb_urls(node, found):
@@ -122,12 +166,364 @@ def find_glb_urls(node, found):
             found.append(node)
 
 
-def download(url, dest):
-    os.makedirs(os.path.dirname(dest), exist_ok=True)
-    req = urllib.request.Request(url, headers={"User-Agent": "pewpewloot-tools"})
-    with urllib.request.urlopen(req, timeout=300) as resp, open(dest, "wb") as f:
-        f.write(resp.read())
-    log("Telecharge: %s (%d octets)" % (dest, os.path.getsize(dest)))
+def failed_status(node):
+    """Statut d'echec explicite ("failed"/"error") n'importe ou dans la reponse, sinon None."""
+    if isinstance(node, dict):
+        status = str(node.get("status", "")).lower()
+        if status in ("failed", "error"):
+            return node.get("error") or node.get("message") or status
+        node = list(node.values())
+    if isinstance(node, list):
+        for v in node:
+            found = failed_status(v)
+            if found:
+                return found
+    return None
+
+
+def download(url, dest, retries=3):
+    """GLB par blocs vers un .part, reprise par Range, rename atomique ; retourne le sha256."""
+    try:
+        size, digest = ludo_http.download(url, dest, retries=retries, log=log)
+    except ludo_http.TRANSIENT as e:
+        raise LudoError("telechargement %s: %s (reprise au prochain essai)" % (url, e), retryable=True)
+    except ValueError as e:
+        raise LudoError(str(e), retryable=True)
+    log("Telecharge: %s (%d octets, sha256 %s)" % (dest, size, digest[:16]))
+    return digest
+
+
+# Textures embarquees par modele selon texture_type (pbr : couleur + normales + metal/rugosite).
+TEXTURE_MAPS = {"none": 0, "simple": 1, "pbr": 3}
+
+
+def request_gate(faces, texture_size, texture_type, budget):
+    """Pre-controle AVANT le POST paye : target_num_faces ramene au budget de
+    triangles, texture prevue (taille, memoire RGBA + mipmaps comme
+    glb_inspect) comparee au budget. Retourne (faces, liste des depassements) ;
+    budget_gate reste le controle du GLB effectivement recu."""
+    limit = budget.get("triangles")
+    if limit and faces > limit:
+        faces = max(1000, limit)
+    maps = TEXTURE_MAPS[texture_type]
+    planned = {"triangles": faces, "texture_size": texture_size if maps else 0,
+               "texture_memory": maps * texture_size * texture_size * 4 * 4 // 3}
+    over = ["%s %d/%d (%s/%d)" % (metric, value, budget[metric], texture_type, texture_size)
+            for metric, value in planned.items() if budget.get(metric) and value > budget[metric]]
+    return faces, over
+
+
+def budget_gate(out_abs, budget):
+    """Inspecte le GLB recu (tools/glb_inspect.py) ; hors budget ou invalide, il
+    est renomme en <cible>.rejected.glb (credits payes, rien de cable).
+    Retourne (stats ou None, liste des depassements)."""
+    try:
+        stats = glb_inspect.inspect_file(out_abs)
+    except glb_inspect.GLBError as e:
+        stats, over = None, ["GLB invalide: %s" % e]
+    else:
+        over = glb_inspect.check(stats, budget)
+        log("GLB %s: %d primitive(s), %d triangles, %d sommets, %d image(s) %d px / %d octets"
+            % (os.path.basename(out_abs), stats["primitives"], stats["triangles"], stats["vertices"],
+               len(stats["images"]), stats["texture_size"], stats["texture_bytes"]))
+    if over:
+        rejected = out_abs[:-len(".glb")] + ".rejected.glb"
+        os.replace(out_abs, rejected)
+        log("HORS BUDGET (%s) — non installe, garde sous %s" % ("; ".join(over), rejected))
+    return stats, over
+
+
+def manifest_entry(out_rel, image, faces, texture_type, texture_size, request_id, digest, sha256,
+                   stats=None, over=()):
+    return {
+        "date": time.strftime("%Y-%m-%d %H:%M"),
+        "out": out_rel,
+        "action": "generate3d",
+        "image_source": image.replace("\\", "/"),
+        "faces": faces,
+        "texture_type": texture_type,
+        "texture_size": texture_size,
+        "request_id": request_id,
+        "install": "rejete (budget: %s)" % "; ".join(over) if over else "depose",
+        "request_hash": digest,
+        "sha256": sha256,
+        "glb": {k: stats[k] for k in ("triangles", "vertices", "primitives", "texture_size", "texture_bytes")}
+        if stats else None,
+    }
+
+
+# --- Mode lot --------------------------------------------------------------
+
+BATCH_KEYS = {"image", "out", "faces", "texture_size", "texture_type", "request_id", "force"}
+
+
+def load_batch(path, defaults):
+    """Spec (liste JSON ou JSONL) -> liste de Namespace, options CLI en valeurs par defaut."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    jobs, outs, ids, requests = [], set(), {}, {}
+    for i, entry in enumerate(entries):
+        where = "%s: entree %d" % (path, i + 1)
+        if not isinstance(entry, dict):
+            raise ValueError(where + ": objet attendu")
+        entry = {k.replace("-", "_"): v for k, v in entry.items()}
+        unknown = sorted(set(entry) - BATCH_KEYS)
+        if unknown:
+            raise ValueError(where + ": cle(s) inconnue(s) " + ", ".join(unknown))
+        if not entry.get("out") or not entry.get("image"):
+            raise ValueError(where + ": 'out' et 'image' requis")
+        job = argparse.Namespace(faces=defaults.faces, texture_size=defaults.texture_size,
+                                 texture_type=defaults.texture_type, request_id="", force=defaults.force)
+        for k, v in entry.items():
+            setattr(job, k, v)
+        job.out = job.out.replace("\\", "/")
+        if not job.out.lower().endswith(".glb"):
+            raise ValueError(where + ": 'out' doit finir en .glb")
+        if job.texture_size not in (1024, 2048):
+            raise ValueError(where + ": texture-size 1024 ou 2048")
+        if job.texture_type not in ("pbr", "simple", "none"):
+            raise ValueError(where + ": texture-type inconnu '%s'" % job.texture_type)
+        if job.out in outs:
+            raise ValueError(where + ": cible en double " + job.out)
+        outs.add(job.out)
+        faces = max(1000, min(200000, int(job.faces)))
+        job.faces, over = request_gate(faces, job.texture_size, job.texture_type, defaults.budget)
+        if job.faces != faces:
+            log("%s: faces %d ramenees au budget triangles (%d)" % (job.out, faces, job.faces))
+        if over:
+            raise ValueError(where + ": hors budget avant generation (%s) — baisser texture-size / "
+                             "texture-type ou relever les limites (--limit)" % "; ".join(over))
+        job.request_id = job.request_id or os.path.splitext(os.path.basename(job.out))[0]
+        if job.request_id in ids:
+            raise ValueError(where + ": request_id '%s' deja utilise par %s (resultats melanges) — "
+                             "preciser request-id" % (job.request_id, ids[job.request_id]))
+        ids[job.request_id] = job.out
+        job.digest = request_digest(job.image, job.faces, job.texture_size, job.texture_type)
+        if job.digest in requests:
+            raise ValueError(where + ": meme image et parametres que %s (credits payes deux fois)"
+                             % requests[job.digest])
+        requests[job.digest] = job.out
+        jobs.append(job)
+    return jobs
+
+
+class Journal:
+    """Journal append-only d'un lot 3D : une ligne JSON par transition
+    {t, out, event, ...} ; event = submitting (request_id, avant le POST) |
+    submitted | ready (glb) | done | skipped | timeout | failed (error) |
+    reset (--force sur un job en echec : request_id oublie).
+
+    Chaque ligne est fsync-ee avant de continuer : le request_id d'un POST
+    paye survit a un crash, meme si la reponse du POST n'est jamais arrivee. Au chargement, les evenements d'un meme out sont
+    fusionnes dans l'ordre (le dernier fixe le statut, le request_id reste) ;
+    une derniere ligne tronquee est ignoree.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.jobs = {}
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        continue
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _apply(self, event):
+        job = self.jobs.setdefault(event["out"], {})
+        job.update({k: v for k, v in event.items() if k not in ("out", "event")})
+        job["status"] = event["event"]
+
+    def get(self, out):
+        return dict(self.jobs.get(out, {}))
+
+    def write(self, out, event, **fields):
+        entry = {"t": time.strftime("%Y-%m-%d %H:%M:%S"), "out": out, "event": event}
+        entry.update(fields)
+        self._apply(entry)
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+async def submit(job, args, sem):
+    """POST payant ; ne rejoue que les 429 (requete refusee, donc non facturee)."""
+    body = image_body({
+        "target_num_faces": job.faces,
+        "texture_size": job.texture_size,
+        "texture_type": job.texture_type,
+        "request_id": job.request_id,
+    }, job.image)
+    for attempt in range(args.retries + 1):
+        try:
+            async with sem:
+                return await asyncio.to_thread(api_call, args.api_base + API_3D_PATH, args.api_key, body)
+        except LudoError as e:
+            if e.code != 429 or attempt == args.retries:
+                raise
+            delay = e.retry_after or args.poll_interval * (0.5 + random.random())
+            log("[%s] quota (429), nouvel essai du POST dans %.1f s" % (job.out, delay))
+            await asyncio.sleep(delay)
+
+
+async def poll(job, args, sem):
+    """Poll adaptatif du request_id : intervalle x1.5 par poll vide, plafonne a
+    --poll-max, gigue +-20 % ; Retry-After respecte. URL .glb ou None (timeout)."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + args.poll_timeout
+    url = args.api_base + API_RESULTS_PATH + "?" + urllib.parse.urlencode({"request_id": job.request_id})
+    interval = args.poll_interval
+    polls = 0
+    while True:
+        wait = min(interval * random.uniform(0.8, 1.2), deadline - loop.time())
+        if wait <= 0:
+            return None
+        await asyncio.sleep(wait)
+        polls += 1
+        try:
+            async with sem:
+                results = await asyncio.to_thread(api_call, url, args.api_key)
+        except LudoError as e:
+            if not e.retryable:
+                raise
+            log("[%s] poll %d: %s" % (job.out, polls, e))
+            interval = max(interval, e.retry_after or 0)
+            continue
+        error = failed_status(results)
+        if error:
+            raise LudoError("generation en echec cote Ludo (request_id=%s): %s" % (job.request_id, error))
+        urls = []
+        find_glb_urls(results, urls)
+        if urls:
+            log("[%s] GLB pret apres %d poll(s)" % (job.out, polls))
+            return urls[0]
+        interval = min(interval * 1.5, args.poll_max)
+
+
+async def accepted(job, args, sem):
+    """Un GET immediat des resultats : False si Ludo ne connait pas le request_id
+    (404, POST jamais recu), True sinon."""
+    url = args.api_base + API_RESULTS_PATH + "?" + urllib.parse.urlencode({"request_id": job.request_id})
+    try:
+        async with sem:
+            await asyncio.to_thread(api_call, url, args.api_key)
+    except LudoError as e:
+        if e.code == 404:
+            return False
+        raise
+    return True
+
+
+async def run_job(job, journal, args, sem):
+    """Un job du lot jusqu'a un statut (done/skipped/timeout/failed)."""
+    out_abs = job.out if os.path.isabs(job.out) else os.path.join(PROJECT_ROOT, job.out)
+    prev = journal.get(job.out)
+    if prev.get("status") in FINAL_STATUSES:
+        log("[%s] deja %s (journal), ignore" % (job.out, prev["status"]))
+        return prev["status"]
+    request_id = prev.get("request_id")
+    if request_id and job.force and prev.get("status") == "failed":
+        log("[%s] --force: request_id=%s en echec abandonne, nouveau POST" % (job.out, request_id))
+        journal.write(job.out, "reset", request_id=None, glb=None, pending_post=False)
+        request_id = None
+    url = prev.get("glb") if prev.get("status") == "ready" else None
+    try:
+        if request_id and prev.get("pending_post"):
+            # POST interrompu avant sa reponse (timeout, crash) : Ludo l'a peut-etre accepte.
+            job.request_id = request_id
+            if await accepted(job, args, sem):
+                journal.write(job.out, "submitted", pending_post=False)
+            else:
+                log("[%s] request_id=%s inconnu de Ludo — le POST n'est pas passe" % (job.out, request_id))
+                request_id = None
+        if request_id:
+            job.request_id = request_id
+            log("[%s] reprise de request_id=%s (%s) — aucun nouveau credit"
+                % (job.out, request_id, "telechargement" if url else "poll"))
+        else:
+            reason = already_done(job.out, out_abs, job.digest)
+            if reason and not job.force:
+                log("[%s] deja fait, ignore: %s" % (job.out, reason))
+                journal.write(job.out, "skipped", error=reason)
+                return "skipped"
+            log("[%s] POST (request_id=%s, faces=%d, %s/%d) — 3 credits"
+                % (job.out, job.request_id, job.faces, job.texture_type, job.texture_size))
+            # Journalise AVANT le POST : le request_id est deterministe, une reprise
+            # le verifie par un poll au lieu de repayer un POST dont la reponse s'est perdue.
+            journal.write(job.out, "submitting", request_id=job.request_id, request_hash=job.digest,
+                          pending_post=True)
+            resp = await submit(job, args, sem)
+            journal.write(job.out, "submitted", pending_post=False)
+            urls = []
+            find_glb_urls(resp, urls)
+            url = urls[0] if urls else None
+        if not url:
+            url = await poll(job, args, sem)
+            if not url:
+                log("[%s] pas de GLB apres %ds — relancer le lot pour reprendre le poll"
+                    % (job.out, args.poll_timeout))
+                journal.write(job.out, "timeout")
+                return "timeout"
+            journal.write(job.out, "ready", glb=url)
+        async with sem:
+            sha256 = await asyncio.to_thread(download, url, out_abs, args.retries)
+        stats, over = await asyncio.to_thread(budget_gate, out_abs, args.budget)
+        manifest_append(manifest_entry(job.out, job.image, job.faces, job.texture_type,
+                                       job.texture_size, job.request_id, job.digest, sha256, stats, over))
+        if over:
+            journal.write(job.out, "rejected", error="; ".join(over))
+            return "rejected"
+        journal.write(job.out, "done")
+        return "done"
+    except LudoError as e:
+        log("[%s] ECHEC: %s" % (job.out, e))
+        journal.write(job.out, "failed", error=str(e))
+        return "failed"
+
+
+async def run_batch_async(jobs, journal, args):
+    sem = asyncio.Semaphore(max(1, args.jobs))
+    return await asyncio.gather(*(run_job(job, journal, args, sem) for job in jobs))
+
+
+def run_batch(args):
+    try:
+        jobs = load_batch(args.batch, args)
+    except (OSError, ValueError) as e:
+        fail(str(e))
+    journal = Journal(args.journal or os.path.splitext(args.batch)[0] + ".journal.jsonl")
+    pending = [j for j in jobs if journal.get(j.out).get("status") not in FINAL_STATUSES]
+    resumed = sum(bool(journal.get(j.out).get("request_id")) for j in pending)
+    if pending and not args.api_key:
+        fail("cle API manquante (--api-key ou env LUDO_API_KEY)")
+    log("Lot %s: %d job(s), %d a traiter dont %d deja soumis (reprise), %d appels HTTP en parallele "
+        "(journal: %s)" % (args.batch, len(jobs), len(pending), resumed, args.jobs, journal.path))
+    t0 = time.time()
+    try:
+        statuses = asyncio.run(run_batch_async(jobs, journal, args))
+    finally:
+        journal.close()
+    counts = {s: statuses.count(s) for s in ("done", "skipped", "rejected", "timeout", "failed")}
+    log("Lot termine en %.0f s: %d fait(s), %d ignore(s), %d hors budget, %d en attente (timeout), "
+        "%d en echec" % (time.time() - t0, counts["done"], counts["skipped"], counts["rejected"],
+                         counts["timeout"], counts["failed"]))
+    for j, s in zip(jobs, statuses):
+        if s in ("failed", "rejected"):
+            log("  %s %s: %s" % ("ECHEC" if s == "failed" else "HORS BUDGET", j.out,
+                                 journal.get(j.out).get("error")))
+    if counts["done"]:
+        log("Ne pas oublier: (1) godot --headless --import, (2) cabler les res://, "
+            "(3) statut dans missing_assets_3D.md.")
+    return 1 if counts["failed"] or counts["timeout"] or counts["rejected"] else 0
 
 
 def main():
@@ -140,22 +536,45 @@ def main():
     p.add_argument("--texture-type", default="simple", choices=["pbr", "simple", "none"])
     p.add_argument("--request-id", default="", help="Defaut: nom du fichier --out")
     p.add_argument("--api-key", default=os.environ.get("LUDO_API_KEY", ""))
-    p.add_argument("--poll-interval", type=int, default=12, help="Secondes entre polls")
+    p.add_argument("--api-base", default=os.environ.get("LUDO_API_BASE", API_BASE),
+                   help="Racine des endpoints (defaut Ludo.ai ; ex. stub local tools/ludo_stub_server.py)")
+    p.add_argument("--poll-interval", type=float, default=12, help="Secondes avant le premier poll")
+    p.add_argument("--poll-max", type=float, default=60,
+                   help="Intervalle max entre polls en mode lot (s, defaut 60)")
     p.add_argument("--poll-timeout", type=int, default=600, help="Timeout total du poll (s)")
-    p.add_argument("--force", action="store_true", help="Regenerer meme si deja fait")
+    p.add_argument("--force", action="store_true",
+                   help="Regenerer meme si deja fait ; en lot, abandonne le request_id d'un job en echec")
     p.add_argument("--list", action="store_true", help="Lister les generations 3D du manifest")
+    p.add_argument("--batch", help="Spec de lot (liste JSON ou JSONL d'entrees image/out/...)")
+    p.add_argument("--journal", help="Journal du lot (defaut <spec>.journal.jsonl)")
+    p.add_argument("--jobs", type=int, default=4, help="Appels HTTP simultanes en mode lot (defaut 4)")
+    p.add_argument("--retries", type=int, default=3,
+                   help="Nouveaux essais du POST sur 429 et reprises de telechargement (defaut 3)")
+    p.add_argument("--budgets", default=str(glb_inspect.BUDGETS),
+                   help="Budgets GLB (section glb, defaut tools/asset_budgets.json)")
+    p.add_argument("--limit", action="append", default=[], metavar="METRIQUE=VALEUR",
+                   help="Surcharge une limite (%s)" % ", ".join(glb_inspect.METRICS))
+    p.add_argument("--no-budget", action="store_true", help="Installer sans verifier les budgets GLB")
     args = p.parse_args()
+    args.api_base = args.api_base.rstrip("/")
+    try:
+        args.budget = {} if args.no_budget else glb_inspect.load_budget(args.budgets, args.limit)
+    except (OSError, ValueError) as e:
+        fail(str(e))
 
     if args.list:
-        entries = [e for e in manifest_load() if e.get("action") == "generate3d"]
+        entries = [e for e in manifest.entries() if e.get("action") == "generate3d"]
         log("%d modele(s) 3D generes:" % len(entries))
         for e in entries:
             log("  [%s] %s  (source %s, %s faces)" % (
                 e.get("date", "?"), e.get("out", "?"), e.get("image_source", "?"), e.get("faces", "?")))
         return
 
+    if args.batch:
+        sys.exit(run_batch(args))
+
     if not args.image or not args.out:
-        fail("--image et --out sont requis (ou --list)")
+        fail("--image et --out sont requis (ou --list / --batch)")
     if not args.api_key:
         fail("cle API manquante (--api-key ou env LUDO_API_KEY)")
     if not args.out.lower().endswith(".glb"):
@@ -163,48 +582,55 @@ def main():
 
     out_rel = args.out.replace("\\", "/")
     out_abs = out_rel if os.path.isabs(out_rel) else os.path.join(PROJECT_ROOT, out_rel)
+    faces, over = request_gate(max(1000, min(200000, args.faces)), args.texture_size,
+                               args.texture_type, args.budget)
+    if faces != args.faces:
+        log("faces ramenees a %d (bornes API 1000-200000, budget triangles)" % faces)
+    if over:
+        fail("hors budget avant generation (%s) — baisser --texture-size / --texture-type, "
+             "ou relever les limites (--limit, --no-budget)" % "; ".join(over))
+    digest = request_digest(args.image, faces, args.texture_size, args.texture_type)
     if not args.force:
-        reason = already_done(out_rel, out_abs)
+        reason = already_done(out_rel, out_abs, digest)
         if reason:
             fail("deja fait: %s — utiliser --force pour regenerer (3 credits)" % reason)
 
+    api_3d_url = args.api_base + API_3D_PATH
+    api_results_url = args.api_base + API_RESULTS_PATH
     request_id = args.request_id or os.path.splitext(os.path.basename(out_rel))[0]
-    payload = {
-        "image": image_payload(args.image),
-        "target_num_faces": max(1000, min(200000, args.faces)),
-        "texture_size": args.texture_size,
-        "texture_type": args.texture_type,
-        "request_id": request_id,
-    }
-    log("POST %s (request_id=%s, faces=%d, %s/%d) — 3 credits, generation longue..."
-        % (API_3D_URL, request_id, payload["target_num_faces"], args.texture_type, args.texture_size))
-    resp = api_call(API_3D_URL, args.api_key, payload)
-
-    urls = []
-    find_glb_urls(resp, urls)
-    deadline = time.time() + args.poll_timeout
-    while not urls and time.time() < deadline:
-        log("  ...pas encore de GLB, poll dans %ds (reste %ds)"
-            % (args.poll_interval, int(deadline - time.time())))
-        time.sleep(args.poll_interval)
-        results = api_call(API_RESULTS_URL + "?request_id=" + request_id, args.api_key)
-        find_glb_urls(results, urls)
-    if not urls:
-        fail("aucune URL .glb obtenue apres %ds — verifier credits/statut via GET %s?request_id=%s"
-             % (args.poll_timeout, API_RESULTS_URL, request_id))
-
-    download(urls[0], out_abs)
-    manifest_append({
-        "date": time.strftime("%Y-%m-%d %H:%M"),
-        "out": out_rel,
-        "action": "generate3d",
-        "image_source": args.image.replace("\\", "/"),
-        "faces": payload["target_num_faces"],
-        "texture_type": args.texture_type,
-        "texture_size": args.texture_size,
-        "request_id": request_id,
-        "install": "depose",
-    })
+    try:
+        body = image_body({
+            "target_num_faces": faces,
+            "texture_size": args.texture_size,
+            "texture_type": args.texture_type,
+            "request_id": request_id,
+        }, args.image)
+        log("POST %s (request_id=%s, faces=%d, %s/%d, %d octets) — 3 credits, generation longue..."
+            % (api_3d_url, request_id, faces, args.texture_type, args.texture_size, len(body)))
+        resp = api_call(api_3d_url, args.api_key, body)
+
+        urls = []
+        find_glb_urls(resp, urls)
+        deadline = time.time() + args.poll_timeout
+        while not urls and time.time() < deadline:
+            log("  ...pas encore de GLB, poll dans %gs (reste %ds)"
+                % (args.poll_interval, int(deadline - time.time())))
+            time.sleep(args.poll_interval)
+            results = api_call(api_results_url + "?request_id=" + request_id, args.api_key)
+            find_glb_urls(results, urls)
+        if not urls:
+            fail("aucune URL .glb obtenue apres %ds — verifier credits/statut via GET %s?request_id=%s"
+                 % (args.poll_timeout, api_results_url, request_id))
+
+        sha256 = download(urls[0], out_abs, args.retries)
+    except LudoError as e:
+        fail(str(e))
+    stats, over = budget_gate(out_abs, args.budget)
+    manifest_append(manifest_entry(out_rel, args.image, faces, args.texture_type,
+                                   args.texture_size, request_id, digest, sha256, stats, over))
+    if over:
+        fail("modele hors budget, non installe — ajuster --faces / --texture-size puis --force, "
+             "ou relever les limites (--limit, section glb de tools/asset_budgets.json)")
     log("OK. Ne pas oublier: (1) godot --headless --import, (2) cabler le res://%s, "
         "(3) statut dans missing_assets_3D.md." % out_rel)
 
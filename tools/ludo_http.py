@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Transferts HTTP a memoire bornee pour les outils Ludo.ai.
+
+Utilise par ludo_generate.py (bruts .webp) et ludo_generate_3d.py (GLB de
+plusieurs Mo, image source envoyee en base64) ; la memoire reste constante
+quelle que soit la taille de l'asset, y compris avec beaucoup de jobs en
+parallele :
+
+  - `JsonImageBody` : corps JSON d'un POST dont un champ est une image locale
+    en data-URI base64, encodee a la volee par blocs (ni le fichier ni sa
+    version base64 ne sont jamais entierement en memoire). Longueur connue
+    d'avance (Content-Length) et re-iterable : un POST rejoue relit le disque.
+  - `download` : telechargement par blocs vers `<dest>.<cle>.part`, sha256
+    calcule au fil de l'eau, taille verifiee contre Content-Length /
+    Content-Range, puis os.replace atomique (jamais de cible a moitie ecrite).
+    Une coupure laisse le .part : l'essai suivant — dans le meme process ou
+    apres relance — reprend par `Range: bytes=N-` si le serveur repond 206,
+    sinon repart de zero. La cle du .part derive de l'URL sans query string
+    (les URLs signees changent a chaque poll, le fichier non).
+"""
+
+import base64
+import glob
+import hashlib
+import http.client
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+
+CHUNK = 1 << 16            # 64 Kio par lecture reseau / disque
+B64_CHUNK = 3 * (1 << 14)  # 48 Kio source -> 64 Kio base64 (multiple de 3 : pas de padding interne)
+USER_AGENT = "pewpewloot-tools"
+# Erreurs de transport apres lesquelles le .part est garde pour reprise.
+TRANSIENT = (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError)
+
+
+class TruncatedDownload(ConnectionError):
+    """Connexion fermee avant la taille annoncee ; le .part permet la reprise."""
+
+
+class JsonImageBody:
+    """Corps JSON `payload` + `field` = data-URI base64 du fichier `path`, en flux."""
+
+    def __init__(self, payload, field, path, mime="image/png", chunk=B64_CHUNK):
+        marker = "\x00%s\x00" % field
+        head, tail = json.dumps(dict(payload, **{field: marker})).split(json.dumps(marker))
+        self.head = (head + '"data:%s;base64,' % mime).encode("utf-8")
+        self.tail = ('"' + tail).encode("utf-8")
+        self.path = path
+        self.chunk = chunk - chunk % 3
+        self.size = os.path.getsize(path)
+
+    def __len__(self):
+        return len(self.head) + 4 * ((self.size + 2) // 3) + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(self.chunk), b""):
+                yield base64.b64encode(block)
+        yield self.tail
+
+
+def part_path(url, dest):
+    key = hashlib.sha1(url.split("?")[0].encode("utf-8")).hexdigest()[:10]
+    return "%s.%s.part" % (dest, key)
+
+
+def _hash_file(path, h):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK), b""):
+            h.update(block)
+
+
+def _fetch(url, part, timeout):
+    """Un essai : complete `part` ; retourne (taille, sha256 hex)."""
+    have = os.path.getsize(part) if os.path.isfile(part) else 0
+    headers = {"User-Agent": USER_AGENT}
+    if have:
+        headers["Range"] = "bytes=%d-" % have
+    try:
+        resp = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 416 and have:  # .part plus long que la ressource : repartir de zero
+            os.remove(part)
+            return _fetch(url, part, timeout)
+        raise
+    with resp:
+        h = hashlib.sha256()
+        length = resp.headers.get("Content-Length")
+        total = int(length) if length and length.isdigit() else None
+        span = re.match(r"bytes (\d+)-\d+/(\d+|\*)", resp.headers.get("Content-Range") or "")
+        if resp.status == 206 and span and int(span.group(1)) == have:
+            _hash_file(part, h)
+            mode = "ab"
+            if span.group(2) != "*":
+                total = int(span.group(2))
+            elif total is not None:
+                total += have
+        else:
+            have, mode = 0, "wb"
+        got = have
+        with open(part, mode) as f:
+            for block in iter(lambda: resp.read(CHUNK), b""):
+                f.write(block)
+                h.update(block)
+                got += len(block)
+    if total is not None and got != total:
+        raise TruncatedDownload("recu %d/%d octets" % (got, total))
+    return got, h.hexdigest()
+
+
+def download(url, dest, retries=3, backoff=2.0, timeout=300, sha256=None, log=None):
+    """Telecharge `url` vers `dest` (atomique, reprise par Range) ; retourne
+    (taille, sha256 hex). Leve une erreur de TRANSIENT apres `retries`
+    reprises, ValueError si `sha256` est donne et ne correspond pas."""
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    part = part_path(url, dest)
+    for attempt in range(retries + 1):
+        try:
+            size, digest = _fetch(url, part, timeout)
+            break
+        except TRANSIENT as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code < 500 and e.code not in (408, 429):
+                raise
+            if attempt == retries:
+                raise
+            have = os.path.getsize(part) if os.path.isfile(part) else 0
+            delay = backoff * 2 ** attempt
+            if log:
+                log("telechargement interrompu (%s) — reprise a %d octets dans %.0f s" % (e, have, delay))
+            time.sleep(delay)
+    if sha256 and digest != sha256:
+        os.remove(part)
+        raise ValueError("sha256 inattendu pour %s: %s (attendu %s)" % (url, digest, sha256))
+    os.replace(part, dest)
+    for stale in glob.glob(glob.escape(dest) + ".*.part"):
+        os.remove(stale)
+    return size, digest
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""Post-traitement des images Ludo.ai en memoire (Pillow + NumPy).
+
+Remplace la chaine ImageMagick de ludo_generate.py (identify, convert,
+identify, identify mean.a = 4 processus et autant de decodages par asset) :
+l'image est decodee une fois, toutes les etapes et les controles tournent
+sur le tableau en memoire. Semantique reprise d'ImageMagick 7 :
+
+  - floodfill depuis 8 points du bord (coins + milieux), couleur de reference
+    = celle DU point, 4-connexe, tolerance -fuzz (distance RGB moyenne
+    quadratique, canaux ponderes par l'alpha comme IsFuzzyEquivalencePixel) ;
+    seul l'alpha est mis a 0 ("alpha x,y floodfill" avec -fill none)
+  - trim : boite englobante des pixels differents des coins (haut-gauche pour
+    gauche/haut, haut-droit pour la droite, bas-gauche pour le bas), meme fuzz
+  - marge transparente (-border), resize borne "NxN>" (reduction seulement,
+    Lanczos sans alpha, bicubique avec alpha comme le Mitchell d'IM)
+  - jpg : aplati sur blanc, sans alpha
+
+--check compare a la chaine ImageMagick d'origine (si `magick` est installe)
+et verifie sur des images synthetiques les invariants du floodfill (un
+element de la couleur du fond A L'INTERIEUR du sujet reste opaque) ; --bench
+mesure les deux chemins.
+
+Usage (depuis la racine du projet) :
+  python tools/ludo_image.py --check                       # bruts de markdown/ludo_raw + synthetiques
+  python tools/ludo_image.py --check markdown/ludo_raw/ball.webp
+  python tools/ludo_image.py --bench 5
+"""
+
+import argparse
+import bisect
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(PROJECT_ROOT, "markdown", "ludo_raw")
+MAGICK_SQ1_2 = 0.7071067811865476  # fuzz minimal d'IM (MagickSQ1_2)
+
+
+def load(src):
+    """Fichier -> tableau RGBA uint8 (h, w, 4)."""
+    with Image.open(src) as img:
+        return np.asarray(img.convert("RGBA")).copy()
+
+
+def fuzzy_equal(px, color, fuzz):
+    """Masque des pixels de `px` (RGBA float32) equivalents a `color` a `fuzz` % pres.
+
+    Meme test qu'IsFuzzyEquivalencePixel : ecart d'alpha d'abord, puis ecart
+    RGB pondere par le produit des alphas (deux transparents sont egaux).
+    """
+    f = max(fuzz / 100.0 * 255.0, MAGICK_SQ1_2)
+    c = np.asarray(color, np.float32)
+    da = px[..., 3] - c[3]
+    da *= da
+    d = px[..., :3] - c[:3]
+    drgb = np.einsum("ijk,ijk->ij", d, d)
+    drgb *= px[..., 3] * (c[3] / (255.0 * 255.0))
+    drgb += 3.0 * da
+    return (da <= f * f) & (drgb <= 3.0 * f * f)
+
+
+def _runs(mask):
+    """Segments horizontaux d'un masque : (debuts, fins exclues) par ligne, en listes."""
+    h, w = mask.shape
+    padded = np.zeros((h, w + 2), np.int8)
+    padded[:, 1:-1] = mask
+    d = np.diff(padded, axis=1)
+    ys, xs = np.nonzero(d == 1)
+    _, xe = np.nonzero(d == -1)
+    ptr = np.searchsorted(ys, np.arange(h + 1))
+    starts = [xs[ptr[y]:ptr[y + 1]].tolist() for y in range(h)]
+    ends = [xe[ptr[y]:ptr[y + 1]].tolist() for y in range(h)]
+    return starts, ends
+
+
+def flood(mask, x, y):
+    """Composante 4-connexe de `mask` contenant (x, y), par parcours des segments."""
+    out = np.zeros(mask.shape, bool)
+    if not mask[y, x]:
+        return out
+    starts, ends = _runs(mask)
+    seen = set()
+    i = bisect.bisect_right(starts[y], x) - 1
+    stack = [(y, i)]
+    seen.add((y, i))
+    h = mask.shape[0]
+    while stack:
+        ry, ri = stack.pop()
+        s, e = starts[ry][ri], ends[ry][ri]
+        out[ry, s:e] = True
+        for ny in (ry - 1, ry + 1):
+            if 0 <= ny < h:
+                # Segments voisins qui chevauchent [s, e) : fin > s et debut < e.
+                j = bisect.bisect_right(ends[ny], s)
+                stop = bisect.bisect_left(starts[ny], e)
+                for nj in range(j, stop):
+                    if (ny, nj) not in seen:
+                        seen.add((ny, nj))
+                        stack.append((ny, nj))
+    return out
+
+
+def edge_points(w, h):
+    return [(0, 0), (w - 1, 0), (0, h - 1), (w - 1, h - 1),
+            (w // 2, 0), (w // 2, h - 1), (0, h // 2), (w - 1, h // 2)]
+
+
+def clear_background(arr, fuzz):
+    """Alpha a 0 sur les zones connectees aux 8 points du bord (en place)."""
+    h, w = arr.shape[:2]
+    px = arr.astype(np.float32)
+    filled = np.zeros((h, w), bool)
+    for x, y in edge_points(w, h):
+        if filled[y, x]:
+            # IM : la reference serait alors transparente -> rien de nouveau.
+            continue
+        filled |= flood(fuzzy_equal(px, arr[y, x], fuzz) & ~filled, x, y)
+    arr[filled, 3] = 0
+    return arr
+
+
+def trim_box(arr, fuzz):
+    """(x0, y0, x1, y1) du contenu, ou None si l'image est uniforme."""
+    h, w = arr.shape[:2]
+    px = arr.astype(np.float32)
+    masks = {}
+
+    def differs(color):
+        key = tuple(color.tolist())
+        if key not in masks:
+            masks[key] = ~fuzzy_equal(px, color, fuzz)
+        return masks[key]
+
+    diff_tl = differs(arr[0, 0])
+    cols = np.nonzero(diff_tl.any(axis=0))[0]
+    if not len(cols):
+        return None
+    rows = np.nonzero(diff_tl.any(axis=1))[0]
+    right = np.nonzero(differs(arr[0, w - 1]).any(axis=0))[0]
+    bottom = np.nonzero(differs(arr[h - 1, 0]).any(axis=1))[0]
+    x1 = int(right[-1]) + 1 if len(right) else w
+    y1 = int(bottom[-1]) + 1 if len(bottom) else h
+    return int(cols[0]), int(rows[0]), max(x1, int(cols[0]) + 1), max(y1, int(rows[0]) + 1)
+
+
+def fit_size(w, h, max_size):
+    """Dimensions apres "-resize NxN>" (reduction seulement, arrondi d'IM)."""
+    if w <= max_size and h <= max_size:
+        return w, h
+    factor = min(max_size / w, max_size / h)
+    return max(1, int(w * factor + 0.5)), max(1, int(h * factor + 0.5))
+
+
+def cutout(arr, fuzz, no_bg, no_trim):
+    """Floodfill du fond puis trim (avant marge et resize) ; `arr` n'est pas modifie."""
+    arr = arr.copy()
+    if not no_bg:
+        clear_background(arr, fuzz)
+    if not no_trim:
+        # -fuzz n'est passe a IM qu'avec le floodfill : trim exact sinon.
+        box = trim_box(arr, 0 if no_bg else fuzz)
+        if box is None:
+            return np.zeros((1, 1, 4), np.uint8)
+        x0, y0, x1, y1 = box
+        arr = arr[y0:y1, x0:x1]
+    return arr
+
+
+def finish(arr, max_size, pad):
+    """Marge transparente + resize borne -> Image RGBA."""
+    if pad > 0:
+        arr = np.pad(arr, ((pad, pad), (pad, pad), (0, 0)))
+    img = Image.fromarray(np.ascontiguousarray(arr), "RGBA")
+    size = fit_size(img.width, img.height, max_size)
+    if size != img.size:
+        img = img.resize(size, Image.BICUBIC)
+    return img
+
+
+def flatten(arr, max_size):
+    """Aplati sur blanc + resize borne -> Image RGB (backgrounds/tiles jpg)."""
+    alpha = arr[..., 3:4].astype(np.float32) / 255.0
+    rgb = arr[..., :3] * alpha + 255.0 * (1.0 - alpha)
+    img = Image.fromarray(np.rint(rgb).astype(np.uint8), "RGB")
+    size = fit_size(img.width, img.height, max_size)
+    if size != img.size:
+        img = img.resize(size, Image.LANCZOS)
+    return img
+
+
+def mean_alpha(img):
+    return float(np.asarray(img)[..., 3].mean()) / 255.0 if img.mode == "RGBA" else 1.0
+
+
+def process(src, dest, fmt, max_size, fuzz, pad, no_bg, no_trim, jpg_quality):
+    """webp brut -> image finale ; retourne {width, height, bytes, mean_alpha}."""
+    arr = load(src)
+    if fmt == "jpg":
+        # Backgrounds/tiles opaques : aplatir sur blanc, pas de trim ni transparence.
+        img = flatten(arr, max_size)
+        img.save(dest, "JPEG", quality=jpg_quality)
+    else:
+        img = finish(cutout(arr, fuzz, no_bg, no_trim), max_size, 0 if no_trim else pad)
+        img.save(dest, "PNG")
+    return {"width": img.width, "height": img.height,
+            "bytes": os.path.getsize(dest), "mean_alpha": mean_alpha(img)}
+
+
+# --- reference ImageMagick (parite / bench) -----------------------------------
+
+def magick(*args):
+    res = subprocess.run(["magick"] + [str(a) for a in args], capture_output=True, text=True)
+    if res.returncode != 0:
+        raise RuntimeError("ImageMagick a echoue: " + res.stderr.strip())
+    return res.stdout.strip()
+
+
+def process_magick(src, dest, fmt, max_size, fuzz, pad, no_bg, no_trim, jpg_quality):
+    """La chaine d'origine de ludo_generate.py (4 appels a magick)."""
+    w, h = (int(v) for v in magick("identify", "-format", "%w %h", src).split())
+    if fmt == "jpg":
+        magick(src, "-background", "white", "-alpha", "remove", "-alpha", "off",
+               "-resize", "%dx%d>" % (max_size, max_size), "-quality", str(jpg_quality), dest)
+    else:
+        args = [src, "-alpha", "set"]
+        if not no_bg:
+            args += ["-fuzz", "%s%%" % fuzz, "-fill", "none"]
+            for x, y in edge_points(w, h):
+                args += ["-draw", "alpha %d,%d floodfill" % (x, y)]
+        if not no_trim:
+            args += ["-trim", "+repage"]
+            if pad > 0:
+                args += ["-bordercolor", "none", "-border", str(pad)]
+        args += ["-resize", "%dx%d>" % (max_size, max_size), "PNG32:" + dest]
+        magick(*args)
+    fw, fh = (int(v) for v in magick("identify", "-format", "%w %h", dest).split())
+    mean_alpha = float(magick("identify", "-format", "%[fx:mean.a]", dest)) if fmt != "jpg" else 1.0
+    return {"width": fw, "height": fh, "bytes": os.path.getsize(dest), "mean_alpha": mean_alpha}
+
+
+def synthetic_samples(directory):
+    """Bruts de test : sujet sur fond uni ou bruite, avec un trou de la couleur du fond."""
+    rng = np.random.default_rng(7)
+    specs = [("disc_flat", (512, 512), 0), ("ring_noise", (640, 480), 6), ("wide_bar", (768, 432), 3)]
+    paths = []
+    for name, (w, h), noise in specs:
+        bg = np.array([236, 240, 245], np.float32)
+        img = Image.new("RGB", (w, h), tuple(int(v) for v in bg))
+        draw = ImageDraw.Draw(img)
+        r = min(w, h) * 0.3
+        draw.ellipse((w / 2 - r, h / 2 - r, w / 2 + r, h / 2 + r), fill=(200, 60, 40))
+        # Trou interieur de la couleur du fond : ne doit PAS etre rendu transparent.
+        draw.ellipse((w / 2 - r / 3, h / 2 - r / 3, w / 2 + r / 3, h / 2 + r / 3), fill=tuple(int(v) for v in bg))
+        arr = np.asarray(img).astype(np.float32)
+        if noise:
+            arr += rng.normal(0, noise, arr.shape)
+        path = os.path.join(directory, name + ".webp")
+        Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8), "RGB").save(path, "WEBP", lossless=True)
+        paths.append(path)
+    return paths
+
+
+def check_invariants(src, tmpdir):
+    """Controles independants d'IM sur un brut synthetique ; liste d'erreurs."""
+    errors = []
+    dest = os.path.join(tmpdir, "inv.png")
+    raw = load(src)
+    h, w = raw.shape[:2]
+    info = process(src, dest, "png", max(w, h), 8, 2, False, False, 85)
+    out = load(dest)
+    if out[0, 0, 3] != 0:
+        errors.append("coin non transparent")
+    cy, cx = out.shape[0] // 2, out.shape[1] // 2
+    if out[cy, cx, 3] != 255:
+        errors.append("trou interieur rendu transparent (floodfill non connexe)")
+    r = min(w, h) * 0.3
+    expected = int(2 * r) + 2 * 2
+    if abs(info["width"] - expected) > 3 or abs(info["height"] - expected) > 3:
+        errors.append("trim %dx%d, attendu ~%dx%d" % (info["width"], info["height"], expected, expected))
+    if not 0.3 < info["mean_alpha"] < 0.95:
+        errors.append("alpha moyen %.2f" % info["mean_alpha"])
+    info = process(src, dest, "png", 256, 8, 2, False, False, 85)
+    if max(info["width"], info["height"]) != 256:
+        errors.append("resize borne: %dx%d" % (info["width"], info["height"]))
+    info = process(src, os.path.join(tmpdir, "inv.jpg"), "jpg", 300, 8, 2, False, False, 85)
+    if max(info["width"], info["height"]) != 300:
+        errors.append("jpg: %dx%d" % (info["width"], info["height"]))
+    return errors
+
+
+def compare(a_path, b_path):
+    """(ecart de taille max, accord du masque alpha, ecart RGB moyen sur l'opaque)."""
+    a, b = load(a_path), load(b_path)
+    dims = max(abs(a.shape[0] - b.shape[0]), abs(a.shape[1] - b.shape[1]))
+    h, w = min(a.shape[0], b.shape[0]), min(a.shape[1], b.shape[1])
+    a, b = a[:h, :w].astype(np.int16), b[:h, :w].astype(np.int16)
+    ma, mb = a[..., 3] > 127, b[..., 3] > 127
+    agree = float((ma == mb).mean())
+    both = ma & mb
+    rgb = float(np.abs(a[both, :3] - b[both, :3]).mean()) if both.any() else 0.0
+    return dims, agree, rgb
+
+
+VARIANTS = [("png", {"fuzz": 8, "pad": 2, "no_bg": False, "no_trim": False}),
+            ("png", {"fuzz": 4, "pad": 0, "no_bg": False, "no_trim": False}),
+            ("png", {"fuzz": 8, "pad": 2, "no_bg": True, "no_trim": False}),
+            ("jpg", {"fuzz": 8, "pad": 2, "no_bg": False, "no_trim": True})]
+
+
+def run_check(paths, tmpdir, synthetic):
+    failures = 0
+    for src in synthetic:
+        errors = check_invariants(src, tmpdir)
+        failures += bool(errors)
+        print("%-28s invariants %s" % (os.path.basename(src), "; ".join(errors) or "OK"))
+    if not shutil.which("magick"):
+        print("ImageMagick introuvable : parite non verifiee (invariants seulement)")
+        return failures
+    for src in paths:
+        for fmt, opts in VARIANTS:
+            ext = "." + fmt
+            ours, ref = os.path.join(tmpdir, "ours" + ext), os.path.join(tmpdir, "ref" + ext)
+            process(src, ours, fmt, 600, jpg_quality=85, **opts)
+            process_magick(src, ref, fmt, 600, jpg_quality=85, **opts)
+            dims, agree, rgb = compare(ours, ref)
+            ok = dims <= 1 and agree >= 0.99 and rgb <= 4.0
+            failures += not ok
+            label = "%s fuzz=%s%s" % (fmt, opts["fuzz"], " no-bg" if opts["no_bg"] else "")
+            print("%-28s %-18s taille +-%d  alpha %.2f%%  rgb %.2f  %s"
+                  % (os.path.basename(src), label, dims, agree * 100, rgb, "OK" if ok else "ECART"))
+    return failures
+
+
+def run_bench(paths, tmpdir, repeat):
+    dest = os.path.join(tmpdir, "bench.png")
+    chains = [("memoire", process)]
+    if shutil.which("magick"):
+        chains.append(("magick", process_magick))
+    timings = {}
+    for name, fn in chains:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for src in paths:
+                fn(src, dest, "png", 600, 8, 2, False, False, 85)
+        timings[name] = (time.perf_counter() - t0) / (repeat * len(paths))
+        print("%-8s %7.1f ms/image (%d images x %d)" % (name, timings[name] * 1000, len(paths), repeat))
+    if "magick" in timings:
+        print("acceleration x%.1f" % (timings["magick"] / timings["memoire"]))
+    else:
+        print("ImageMagick introuvable : pas de reference a comparer")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Post-traitement des images Ludo.ai en memoire")
+    p.add_argument("files", nargs="*", help="Bruts .webp/.png (defaut: markdown/ludo_raw/*.webp)")
+    p.add_argument("--check", action="store_true", help="Parite avec ImageMagick + invariants")
+    p.add_argument("--bench", type=int, default=0, metavar="N", help="Chronometrer N passes")
+    args = p.parse_args()
+    if not args.check and not args.bench:
+        p.error("--check et/ou --bench requis")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        synthetic = synthetic_samples(tmpdir)
+        paths = args.files or sorted(glob.glob(os.path.join(RAW_DIR, "*.webp"))) or synthetic
+        status = 0
+        if args.check:
+            failures = run_check(paths, tmpdir, synthetic)
+            print("%d echec(s)" % failures)
+            status = 1 if failures else 0
+        if args.bench:
+            run_bench(paths, tmpdir, args.bench)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
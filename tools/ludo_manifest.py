@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""Manifest commun des generations Ludo.ai (2D et 3D), en JSONL append-only.
+
+markdown/ludo_manifest.json etait relu et reecrit en entier a chaque asset,
+et already_done rescannait toute la liste plus un glob de markdown/ludo_raw
+a chaque appel. Ici :
+
+  - markdown/ludo_manifest.jsonl : une entree par ligne, ajoutee en O(1)
+    (O_APPEND + verrou de fichier, sur pour plusieurs process et threads) ;
+  - index en memoire par `out`, par cle de brut et par empreinte de requete
+    (`request_hash` : prompt + parametres), rafraichi en ne lisant que les
+    lignes ajoutees depuis (par ce process ou un autre) ;
+  - markdown/ludo_raw liste une seule fois puis tenu a jour par note_raw().
+
+Migration : au premier acces, si seul l'ancien ludo_manifest.json existe, il
+est converti en JSONL (ordre conserve) puis renomme en .json.migrated.
+
+L'empreinte sert l'anti-doublon avant depense : une requete identique
+(memes prompt et parametres) deja payee sous un autre nom de sortie est
+signalee avant l'appel API. Les entrees migrees n'ont pas d'empreinte
+(parametres non enregistres a l'epoque).
+
+Usage (depuis la racine du projet) :
+  python tools/ludo_manifest.py               # resume (migre si besoin)
+  python tools/ludo_manifest.py --bench 2000  # ancien JSON vs JSONL indexe
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST = os.path.join(PROJECT_ROOT, "markdown", "ludo_manifest.jsonl")
+LEGACY_MANIFEST = os.path.join(PROJECT_ROOT, "markdown", "ludo_manifest.json")
+RAW_VARIANT_RE = re.compile(r"^(.*)_v\d+$")
+
+
+def request_hash(params):
+    """Empreinte stable d'une requete (dict JSON des parametres envoyes)."""
+    canon = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()[:20]
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+def raw_stem_keys(name):
+    """Nom de brut (x.webp, x_v2.webp) -> cles sous lesquelles il est indexe."""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    m = RAW_VARIANT_RE.match(stem)
+    return (stem, m.group(1)) if m else (stem,)
+
+
+class _FileLock:
+    """Verrou exclusif inter-process sur <path>.lock (flock / msvcrt)."""
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.fd = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+        self.fd = None
+
+
+class Manifest:
+    """Manifest JSONL indexe ; charge paresseusement, partageable entre threads."""
+
+    def __init__(self, path=MANIFEST, legacy=LEGACY_MANIFEST, log=None):
+        self.path = path
+        self.legacy = legacy
+        self.log = log or (lambda msg: None)  # log(msg) de l'outil appelant
+        self._lock = threading.RLock()
+        self._entries = []
+        self._offset = None
+        self.by_out = {}
+        self.by_raw = {}
+        self.by_hash = {}
+        self._raw_files = {}  # raw_dir -> {cle: [chemins]}
+
+    # --- chargement -----------------------------------------------------------
+
+    def _migrate(self):
+        if os.path.isfile(self.path) or not os.path.isfile(self.legacy):
+            return
+        with _FileLock(self.path):
+            if os.path.isfile(self.path):
+                return
+            with open(self.legacy, encoding="utf-8") as f:
+                entries = json.load(f)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for e in entries:
+                    f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+            os.replace(self.legacy, self.legacy + ".migrated")
+        self.log("Manifest migre: %s -> %s (%d entrees)" % (self.legacy, self.path, len(entries)))
+
+    def _index(self, entry):
+        self._entries.append(entry)
+        self.by_out.setdefault(entry.get("out"), []).append(entry)
+        for raw in entry.get("raw", []):
+            for key in raw_stem_keys(raw):
+                self.by_raw.setdefault(key, []).append(entry)
+        if entry.get("request_hash"):
+            self.by_hash.setdefault(entry["request_hash"], []).append(entry)
+
+    def refresh(self):
+        """Indexe les lignes ajoutees depuis le dernier passage (tous ecrivains confondus)."""
+        with self._lock:
+            if self._offset is None:
+                self._migrate()
+                self._offset = 0
+            if not os.path.isfile(self.path):
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # une ligne en cours d'ecriture attend le prochain passage
+            for line in data[:end].splitlines():
+                if line.strip():
+                    self._index(json.loads(line))
+            self._offset += end
+
+    # --- lecture --------------------------------------------------------------
+
+    def entries(self):
+        self.refresh()
+        return list(self._entries)
+
+    def find_out(self, out_rel, action=None):
+        self.refresh()
+        found = self.by_out.get(out_rel, [])
+        return [e for e in found if action is None or e.get("action") == action]
+
+    def find_raw(self, key):
+        """Entrees dont un brut porte la cle `key` (meme si le fichier a disparu depuis)."""
+        self.refresh()
+        return list(self.by_raw.get(key, []))
+
+    def find_hash(self, digest):
+        self.refresh()
+        return list(self.by_hash.get(digest, []))
+
+    def raws(self, raw_dir, key):
+        """Bruts de `key` (key.webp, key_vN.webp) : dossier liste une fois, puis note_raw()."""
+        with self._lock:
+            index = self._raw_files.get(raw_dir)
+            if index is None:
+                index = self._raw_files[raw_dir] = {}
+                if os.path.isdir(raw_dir):
+                    for entry in os.scandir(raw_dir):
+                        if entry.name.endswith(".webp"):
+                            for k in raw_stem_keys(entry.name):
+                                index.setdefault(k, []).append(entry.path)
+            return sorted(p for p in index.get(key, []) if os.path.isfile(p))
+
+    def note_raw(self, path):
+        with self._lock:
+            index = self._raw_files.get(os.path.dirname(path))
+            if index is not None:
+                for k in raw_stem_keys(path):
+                    if path not in index.setdefault(k, []):
+                        index[k].append(path)
+
+    # --- ecriture -------------------------------------------------------------
+
+    def append(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self.refresh()
+            with _FileLock(self.path):
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+            self.refresh()
+            return len(self._entries)
+
+
+# --- bench --------------------------------------------------------------------
+
+def _bench_legacy(path, entries, keys):
+    """Ancien schema : relire/reecrire le JSON et rescanner la liste a chaque asset."""
+    for e, key in zip(entries, keys):
+        done = json.load(open(path, encoding="utf-8")) if os.path.isfile(path) else []
+        any(x.get("out") == e["out"] for x in done)
+        done.append(e)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(done, f, ensure_ascii=False, indent=1)
+
+
+def _bench_jsonl(path, entries, keys, raw_dir):
+    m = Manifest(path, path + ".legacy")
+    for e, key in zip(entries, keys):
+        m.find_out(e["out"])
+        m.raws(raw_dir, key)
+        m.find_hash(e["request_hash"])
+        m.append(e)
+
+
+def bench(n):
+    entries, keys = [], []
+    for i in range(n):
+        key = "waves_w%d_asset_%d" % (i % 9, i)
+        payload = {"prompt": "asset %d, anime style, clean outline" % i, "n": 1, "image_type": "sprite"}
+        entries.append({"date": "2026-01-01 00:00", "out": "assets/waves/w%d/asset_%d.png" % (i % 9, i),
+                        "action": "generate", "n": 1, "install": "installe",
+                        "raw": ["markdown/ludo_raw/%s.webp" % key], "prompt": payload["prompt"],
+                        "request_hash": request_hash(payload)})
+        keys.append(key)
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        _bench_legacy(os.path.join(tmp, "legacy.json"), entries, keys)
+        legacy = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _bench_jsonl(os.path.join(tmp, "manifest.jsonl"), entries, keys, tmp)
+        indexed = time.perf_counter() - t0
+        loaded = Manifest(os.path.join(tmp, "manifest.jsonl"), "").entries()
+        assert loaded == entries, "relecture JSONL differente des entrees ecrites"
+    print("%d assets : JSON reecrit %.2f s, JSONL indexe %.2f s (x%.0f)"
+          % (n, legacy, indexed, legacy / max(indexed, 1e-9)))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Manifest Ludo.ai (JSONL indexe)")
+    p.add_argument("--bench", type=int, default=0, metavar="N",
+                   help="Comparer N enregistrements ancien JSON / JSONL indexe")
+    args = p.parse_args()
+    if args.bench:
+        bench(args.bench)
+        return 0
+    m = Manifest(log=print)
+    entries = m.entries()
+    actions = {}
+    for e in entries:
+        actions[e.get("action", "?")] = actions.get(e.get("action", "?"), 0) + 1
+    print("%s : %d entree(s) — %s" % (m.path, len(entries),
+                                      ", ".join("%s %d" % kv for kv in sorted(actions.items())) or "vide"))
+    print("  %d cible(s), %d empreinte(s) de requete" % (len(m.by_out), len(m.by_hash)))
+    dupes = {h: es for h, es in m.by_hash.items() if len({e.get("out") for e in es}) > 1}
+    for h, es in dupes.items():
+        print("  meme requete payee plusieurs fois (%s): %s" % (h, ", ".join(e.get("out", "?") for e in es)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
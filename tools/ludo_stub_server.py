@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Stub local de l'API Ludo.ai, pour tester ludo_generate.py et
+ludo_generate_3d.py sans credits.
+
+Repond a POST /api/assets/image comme l'API reelle : une liste JSON de
+{"url": ...} (n elements), chaque URL servant un .webp genere a la volee
+(un disque colore sur fond uni, pour exercer le floodfill et le trim).
+--delay simule la latence de generation, --fail-rate renvoie au hasard des
+500/429 (avec Retry-After) pour exercer les retries du mode lot.
+
+Cote 3D, POST /api/assets/3d-model enregistre le request_id et repond sans
+URL ; GET /api/assets/3d-models/results?request_id=... reste "processing"
+pendant --glb-delay secondes puis renvoie l'URL d'un petit .glb valide.
+Les polls subissent aussi --fail-rate ; les compteurs (POST payants, polls)
+sont affiches a chaque appel pour verifier qu'une reprise ne repaie rien.
+L'image data-URI d'un POST 3D est decodee (400 si le base64 est invalide).
+
+Les fichiers (/files/...) honorent `Range: bytes=N-` (206 + Content-Range) ;
+--cut-rate coupe au hasard la connexion a mi-fichier pour exercer la reprise
+des telechargements (tools/ludo_http.py). Les GLB servis portent un vrai
+maillage indexe (--glb-triangles) et une texture PNG ; --glb-size les gonfle.
+
+Usage (depuis la racine du projet) :
+  python tools/ludo_stub_server.py --port 8765 --delay 2 --fail-rate 0.3
+  python tools/ludo_generate.py --batch lot.json --api-key x \\
+      --api-url http://127.0.0.1:8765/api/assets/image
+  python tools/ludo_generate_3d.py --batch lot_3d.json --api-key x \\
+      --api-base http://127.0.0.1:8765/api/assets --poll-interval 1
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import io
+import json
+import random
+import struct
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageDraw
+
+SIZES = {"ar_1_1": (512, 512), "default": (512, 512), "ar_4_3": (640, 480),
+         "ar_16_9": (768, 432), "ar_3_4": (480, 640), "ar_9_16": (432, 768),
+         "ar_19_9": (912, 432), "ar_9_19": (432, 912)}
+
+
+def render(seed, size):
+    """Disque colore sur fond uni clair, deterministe pour une graine donnee."""
+    rng = random.Random(seed)
+    w, h = size
+    img = Image.new("RGB", size, (240 + rng.randrange(16), 240 + rng.randrange(16), 240))
+    color = tuple(rng.randrange(20, 200) for _ in range(3))
+    r = min(w, h) * rng.uniform(0.25, 0.4)
+    ImageDraw.Draw(img).ellipse((w / 2 - r, h / 2 - r, w / 2 + r, h / 2 + r), fill=color)
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=90)
+    return buf.getvalue()
+
+
+def tiny_glb(name, size=0, triangles=12):
+    """GLB 2.0 valide : une grille de `triangles` triangles indexes + une texture
+    PNG 64x64 embarquee, le tout dans un chunk BIN ; `size` > 0 le complete par
+    un bufferView de remplissage pseudo-aleatoire pour atteindre ~size octets."""
+    cols = max(1, (triangles + 1) // 2)
+    positions = [(x, y, 0.0) for y in (0.0, 1.0) for x in range(cols + 1)]
+    indices = []
+    for x in range(cols):
+        indices += [x, x + 1, cols + 1 + x, x + 1, cols + 2 + x, cols + 1 + x]
+    indices = indices[:triangles * 3]
+    index_bin = struct.pack("<%dI" % len(indices), *indices)
+    position_bin = struct.pack("<%df" % (3 * len(positions)), *(c for p in positions for c in p))
+    png = io.BytesIO()
+    Image.new("RGBA", (64, 64), (200, 120, 40, 255)).save(png, "PNG")
+    views, blob = [], b""
+    for data in (index_bin, position_bin, png.getvalue()):
+        views.append({"buffer": 0, "byteOffset": len(blob), "byteLength": len(data)})
+        blob += data + b"\x00" * (-len(data) % 4)
+    if size > len(blob) + 2048:
+        filler = random.Random(name).randbytes((size - len(blob) - 2048) // 4 * 4)
+        views.append({"buffer": 0, "byteOffset": len(blob), "byteLength": len(filler)})
+        blob += filler
+    doc = json.dumps({
+        "asset": {"version": "2.0", "generator": "ludo_stub_server"},
+        "scene": 0, "scenes": [{"nodes": [0]}], "nodes": [{"name": name, "mesh": 0}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 1}, "indices": 0, "material": 0}]}],
+        "materials": [{"pbrMetallicRoughness": {"baseColorTexture": {"index": 0}}}],
+        "textures": [{"source": 0}],
+        "images": [{"bufferView": 2, "mimeType": "image/png"}],
+        "accessors": [{"bufferView": 0, "componentType": 5125, "count": len(indices), "type": "SCALAR"},
+                      {"bufferView": 1, "componentType": 5126, "count": len(positions), "type": "VEC3",
+                       "min": [0, 0, 0], "max": [cols, 1, 0]}],
+        "bufferViews": views,
+        "buffers": [{"byteLength": len(blob)}]}).encode("utf-8")
+    doc += b" " * (-len(doc) % 4)
+    body = struct.pack("<I4s", len(doc), b"JSON") + doc + struct.pack("<I4s", len(blob), b"BIN\x00") + blob
+    return struct.pack("<4sII", b"glTF", 2, 12 + len(body)) + body
+
+
+class Handler(BaseHTTPRequestHandler):
+    images = {}
+    lock = threading.Lock()
+    delay = 0.0
+    fail_rate = 0.0
+    glb_delay = 5.0
+    glb_size = 0
+    glb_triangles = 12
+    cut_rate = 0.0
+    calls = 0
+    models = {}   # request_id -> instant du POST 3D
+    polls = 0
+
+    def _send(self, code, body, ctype="application/json", headers=()):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, data, ctype):
+        """Fichier complet, ou suite a partir de `Range: bytes=N-` ; coupe au hasard (--cut-rate)."""
+        start = 0
+        span = self.headers.get("Range", "")
+        if span.startswith("bytes=") and span.endswith("-") and span[6:-1].isdigit():
+            start = int(span[6:-1])
+            if start >= len(data):
+                return self._send(416, b"", headers=[("Content-Range", "bytes */%d" % len(data))])
+        part = data[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(part)))
+        self.send_header("Accept-Ranges", "bytes")
+        if start:
+            self.send_header("Content-Range", "bytes %d-%d/%d" % (start, len(data) - 1, len(data)))
+        self.end_headers()
+        if len(part) > 1 and random.random() < self.cut_rate:
+            self.wfile.write(part[:len(part) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(part)
+
+    def _chaos(self):
+        """Echec simule (--fail-rate) ; True si une reponse d'erreur a ete envoyee."""
+        roll = random.random()
+        if roll < self.fail_rate / 2:
+            self._send(429, b'{"error": "rate limited"}', headers=[("Retry-After", "1")])
+            return True
+        if roll < self.fail_rate:
+            self._send(500, b'{"error": "internal"}')
+            return True
+        return False
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path not in ("/api/assets/image", "/api/assets/3d-model"):
+            return self._send(404, b'{"error": "not found"}')
+        if not self.headers.get("Authorization", "").startswith("ApiKey "):
+            return self._send(401, b'{"error": "missing api key"}')
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            return self._send(400, b'{"error": "invalid json"}')
+        if path == "/api/assets/3d-model":
+            return self._post_3d(payload)
+        with Handler.lock:
+            Handler.calls += 1
+        if self._chaos():
+            return
+        threading.Event().wait(self.delay)
+        n = max(1, min(8, int(payload.get("n", 1))))
+        size = SIZES.get(payload.get("aspect_ratio"), SIZES["default"])
+        host = "http://%s:%d" % self.server.server_address[:2]
+        results = []
+        for i in range(n):
+            digest = hashlib.sha1(("%s/%d/%d" % (payload.get("prompt", ""), Handler.calls, i))
+                                  .encode("utf-8")).hexdigest()[:16]
+            with Handler.lock:
+                Handler.images[digest] = render(digest, size)
+            results.append({"url": "%s/files/%s.webp" % (host, digest)})
+        self._send(200, json.dumps(results).encode("utf-8"))
+
+    def _post_3d(self, payload):
+        request_id = str(payload.get("request_id") or "")
+        image = str(payload.get("image", ""))
+        if not request_id or not image:
+            return self._send(400, b'{"error": "image and request_id required"}')
+        if image.startswith("data:"):
+            try:
+                base64.b64decode(image.split(",", 1)[1], validate=True)
+            except (IndexError, binascii.Error):
+                return self._send(400, b'{"error": "invalid data uri"}')
+        if random.random() < self.fail_rate / 2:  # seul le 429 : un POST 3D paye n'echoue pas a moitie
+            return self._send(429, b'{"error": "rate limited"}', headers=[("Retry-After", "1")])
+        with Handler.lock:
+            Handler.calls += 1
+            Handler.models[request_id] = time.time()
+        print("stub: 3D soumis %s (%d POST payant(s))" % (request_id, Handler.calls), flush=True)
+        self._send(200, json.dumps({"request_id": request_id, "status": "processing"}).encode("utf-8"))
+
+    def _results_3d(self, query):
+        if not self.headers.get("Authorization", "").startswith("ApiKey "):
+            return self._send(401, b'{"error": "missing api key"}')
+        with Handler.lock:
+            Handler.polls += 1
+        if self._chaos():
+            return
+        request_id = urllib.parse.parse_qs(query).get("request_id", [""])[0]
+        with Handler.lock:
+            submitted = Handler.models.get(request_id)
+        if submitted is None:
+            return self._send(404, b'{"error": "unknown request_id"}')
+        result = {"request_id": request_id, "status": "processing"}
+        if time.time() - submitted >= self.glb_delay:
+            host = "http://%s:%d" % self.server.server_address[:2]
+            result = {"request_id": request_id, "status": "completed",
+                      "model_urls": {"glb": "%s/files/%s.glb" % (host, urllib.parse.quote(request_id)),
+                                     "preview": "%s/files/%s.webp" % (host, urllib.parse.quote(request_id))}}
+        self._send(200, json.dumps([result]).encode("utf-8"))
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path.rstrip("/") == "/api/assets/3d-models/results":
+            return self._results_3d(url.query)
+        name = urllib.parse.unquote(url.path.rsplit("/", 1)[-1])
+        digest, _, ext = name.rpartition(".")
+        if ext == "glb":
+            with Handler.lock:
+                known = digest in Handler.models
+            if not known:
+                return self._send(404, b'{"error": "not found"}')
+            return self._send_file(tiny_glb(digest, self.glb_size, self.glb_triangles), "model/gltf-binary")
+        with Handler.lock:
+            data = Handler.images.get(digest)
+        if data is None:
+            return self._send(404, b'{"error": "not found"}')
+        self._send_file(data, "image/webp")
+
+    def log_message(self, fmt, *args):
+        print("stub: " + fmt % args, flush=True)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Stub local de l'API Ludo.ai (image et 3D)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--delay", type=float, default=0.0, help="Latence simulee par generation (s)")
+    p.add_argument("--fail-rate", type=float, default=0.0,
+                   help="Fraction des appels en echec (moitie 429, moitie 500)")
+    p.add_argument("--glb-delay", type=float, default=5.0,
+                   help="Duree de generation 3D simulee avant que le GLB soit pret (s)")
+    p.add_argument("--glb-size", type=int, default=0, help="Taille approximative des GLB servis (octets)")
+    p.add_argument("--glb-triangles", type=int, default=12, help="Triangles du maillage des GLB servis")
+    p.add_argument("--cut-rate", type=float, default=0.0,
+                   help="Fraction des telechargements coupes a mi-fichier")
+    args = p.parse_args()
+    Handler.delay = args.delay
+    Handler.fail_rate = args.fail_rate
+    Handler.glb_delay = args.glb_delay
+    Handler.glb_size = args.glb_size
+    Handler.glb_triangles = args.glb_triangles
+    Handler.cut_rate = args.cut_rate
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print("Stub Ludo sur http://%s:%d/api/assets (image, 3d-model, 3d-models/results)"
+          % (args.host, args.port), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Retraitement en masse des bruts Ludo.ai sur une grille de parametres.
+
+Re-regler --fuzz / --pad / --max-size pour une famille de sprites demandait
+un `ludo_generate.py --from-file` par brut et par reglage. Ici, chaque brut
+d'un glob passe sur toutes les combinaisons de la grille, dans un pool de
+process (un brut par tache) :
+
+  - le brut est decode une fois par tache ; le floodfill + trim
+    (tools/ludo_image.py) est calcule une fois par (fuzz, no-bg) et reutilise
+    pour toutes les marges et tailles ;
+  - chaque resultat est mesure (dimensions, alpha moyen, couverture = part
+    des pixels non transparents) et signale s'il est quasi vide (memes seuils
+    que ludo_generate.py) ;
+  - une planche contact par brut (<sortie>/<brut>_sheet.png) montre toutes
+    les combinaisons sur damier, pour choisir le reglage d'un coup d'oeil ;
+  - sweep.csv recapitule tout ; --keep ecrit aussi chaque image.
+
+Le reglage retenu s'installe ensuite avec
+`ludo_generate.py --from-file <brut> --out ... --fuzz F --pad P --max-size M`.
+
+Usage (depuis la racine du projet) :
+  python tools/ludo_sweep.py "markdown/ludo_raw/pong_*.webp" --fuzz 2,4,8,12 --pad 0,2
+  python tools/ludo_sweep.py "markdown/ludo_raw/*.webp" --max-size 300,600 --no-bg both --workers 4
+"""
+
+import argparse
+import csv
+import glob
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import ludo_image
+
+PROJECT_ROOT = ludo_image.PROJECT_ROOT
+DEFAULT_OUT = os.path.join(PROJECT_ROOT, ".cache", "ludo_sweep")
+CELL = 200       # cote d'une vignette de la planche (px)
+LABEL_H = 30     # bandeau de legende sous chaque vignette
+COLUMNS = ("raw", "fuzz", "pad", "max_size", "no_bg", "width", "height",
+           "mean_alpha", "coverage", "empty")
+
+
+def parse_list(text, cast):
+    return [cast(v) for v in text.split(",") if v.strip()]
+
+
+def grid(fuzzes, pads, sizes, no_bgs):
+    """Combinaisons (fuzz, pad, max_size, no_bg) ; fuzz sans objet quand no_bg."""
+    combos = []
+    for no_bg, fuzz, pad, size in itertools.product(no_bgs, fuzzes, pads, sizes):
+        combo = (0.0 if no_bg else fuzz, pad, size, no_bg)
+        if combo not in combos:
+            combos.append(combo)
+    return combos
+
+
+def checkerboard(w, h, tile=10):
+    yy, xx = np.mgrid[0:h, 0:w]
+    light = ((yy // tile + xx // tile) % 2).astype(bool)
+    board = np.where(light[..., None], 205, 150).astype(np.uint8)
+    return Image.fromarray(np.repeat(board, 3, axis=2), "RGB")
+
+
+def contact_sheet(raw_name, cells, dest):
+    """Planche : une vignette par combinaison, legende (reglage, taille, alpha)."""
+    cols = min(len(cells), 4)
+    rows = (len(cells) + cols - 1) // cols
+    sheet = Image.new("RGB", (cols * CELL, rows * (CELL + LABEL_H) + 20), (40, 40, 40))
+    draw = ImageDraw.Draw(sheet)
+    draw.text((6, 4), raw_name, fill=(230, 230, 230))
+    for i, (img, row) in enumerate(cells):
+        x, y = (i % cols) * CELL, (i // cols) * (CELL + LABEL_H) + 20
+        sheet.paste(checkerboard(CELL - 4, CELL - 4), (x + 2, y + 2))
+        thumb = img.copy()
+        thumb.thumbnail((CELL - 8, CELL - 8))
+        sheet.paste(thumb, (x + (CELL - thumb.width) // 2, y + (CELL - thumb.height) // 2), thumb)
+        setting = "no-bg" if row["no_bg"] else "fuzz %g" % row["fuzz"]
+        color = (255, 110, 90) if row["empty"] else (230, 230, 230)
+        draw.text((x + 6, y + CELL), "%s pad %d max %d" % (setting, row["pad"], row["max_size"]), fill=color)
+        draw.text((x + 6, y + CELL + 13), "%dx%d a=%.2f cov=%.2f" % (
+            row["width"], row["height"], row["mean_alpha"], row["coverage"]), fill=color)
+    sheet.save(dest, "PNG")
+
+
+def sweep_raw(src, combos, out_dir, keep):
+    """Une tache : toutes les combinaisons d'un brut ; retourne les lignes du CSV."""
+    arr = ludo_image.load(src)
+    name = os.path.splitext(os.path.basename(src))[0]
+    cutouts = {}
+    rows, cells = [], []
+    for fuzz, pad, size, no_bg in combos:
+        key = (fuzz, no_bg)
+        if key not in cutouts:
+            cutouts[key] = ludo_image.cutout(arr, fuzz, no_bg, False)
+        img = ludo_image.finish(cutouts[key], size, pad)
+        alpha = np.asarray(img)[..., 3]
+        row = {"raw": os.path.relpath(src, PROJECT_ROOT).replace("\\", "/"), "fuzz": fuzz, "pad": pad,
+               "max_size": size, "no_bg": no_bg, "width": img.width, "height": img.height,
+               "mean_alpha": round(float(alpha.mean()) / 255.0, 4),
+               "coverage": round(float((alpha > 0).mean()), 4)}
+        row["empty"] = img.width < 8 or img.height < 8 or row["mean_alpha"] < 0.02
+        if keep:
+            img.save(os.path.join(out_dir, "%s__%s_p%d_m%d.png" % (
+                name, "nobg" if no_bg else "f%g" % fuzz, pad, size)), "PNG")
+        rows.append(row)
+        cells.append((img, row))
+    contact_sheet(os.path.basename(src), cells, os.path.join(out_dir, name + "_sheet.png"))
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser(description="Retraitement en masse des bruts Ludo.ai (grille de parametres)")
+    p.add_argument("patterns", nargs="+", help="Globs de bruts .webp/.png (ex. \"markdown/ludo_raw/*.webp\")")
+    p.add_argument("--fuzz", default="4,8,12", help="Tolerances %% du floodfill (defaut 4,8,12)")
+    p.add_argument("--pad", default="2", help="Marges apres trim (defaut 2)")
+    p.add_argument("--max-size", default="600", help="Dimensions max (defaut 600)")
+    p.add_argument("--no-bg", choices=["no", "yes", "both"], default="no",
+                   help="Avec/sans suppression du fond (defaut: avec)")
+    p.add_argument("--out", default=DEFAULT_OUT, help="Dossier des planches et du CSV (defaut .cache/ludo_sweep)")
+    p.add_argument("--keep", action="store_true", help="Ecrire aussi chaque image de la grille")
+    p.add_argument("--workers", type=int, default=0, help="Process (defaut: nb de coeurs, 1 = sans pool)")
+    args = p.parse_args()
+
+    raws = sorted({os.path.abspath(f) for pat in args.patterns
+                   for f in glob.glob(pat if os.path.isabs(pat) else os.path.join(PROJECT_ROOT, pat))})
+    if not raws:
+        print("aucun brut ne correspond a %s" % " ".join(args.patterns), file=sys.stderr)
+        return 1
+    no_bgs = {"no": [False], "yes": [True], "both": [False, True]}[args.no_bg]
+    combos = grid(parse_list(args.fuzz, float), parse_list(args.pad, int),
+                  parse_list(args.max_size, int), no_bgs)
+    os.makedirs(args.out, exist_ok=True)
+    workers = args.workers or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    if workers > 1 and len(raws) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(sweep_raw, raws, itertools.repeat(combos),
+                                    itertools.repeat(args.out), itertools.repeat(args.keep)))
+    else:
+        results = [sweep_raw(src, combos, args.out, args.keep) for src in raws]
+
+    with open(os.path.join(args.out, "sweep.csv"), "w", encoding="utf-8", newline="") as f:
+        out = csv.DictWriter(f, COLUMNS)
+        out.writeheader()
+        for rows in results:
+            out.writerows(rows)
+    for src, rows in zip(raws, results):
+        empty = sum(r["empty"] for r in rows)
+        print("%-40s %d reglage(s)%s" % (os.path.basename(src), len(rows),
+                                         ", %d quasi vide(s)" % empty if empty else ""))
+    print("%d brut(s) x %d reglage(s) en %.1f s -> %s (planches *_sheet.png, sweep.csv)"
+          % (len(raws), len(combos), time.perf_counter() - t0, args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
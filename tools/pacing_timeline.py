@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Per-level pacing time series: enemies, enemy projectiles and obstacle rows.
+
+Expands every level's `waves` (tools/wave_timeline.py, which mirrors
+WaveManager.gd) onto a fixed-step time grid and derives, per step:
+  spawns_per_sec        enemy spawns
+  enemies_alive         enemies on screen (none killed: the worst case a
+                        device has to render; lifetime per archetype as in
+                        score_sim.py, artillery/swarm stay until wave end)
+  projectiles_per_sec   enemy shots (missile pattern projectile_count x
+                        wave_count per fire interval, clamped by
+                        game_balance.fire_rate_max like Enemy.gd)
+  projectiles_alive     shots still in flight (despawn_after_sec or the
+                        time to cross the viewport)
+  obstacle_rows_per_sec ObstacleSpawner rows (one per row_interval until the
+                        spawn cutoff)
+  obstacle_rows_alive   rows still scrolling through the viewport
+Waves run back to back with their hard timeout (no early clear), so the time
+axis is the longest possible level. Enemy modifiers are ignored.
+
+Exports one .npz (level_ids, offsets into the concatenated float32 series)
+and/or one long CSV (level_id, t, series...), plus a peak summary per level.
+
+Run from repo root:
+    python tools/pacing_timeline.py                        # peak summary
+    python tools/pacing_timeline.py --npz pacing.npz --csv pacing.csv --step 0.1
+    python tools/pacing_timeline.py --levels world_3 --sort projectiles_alive
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+
+import numpy as np
+
+import wave_timeline
+from score_sim import DEFAULT_LIFETIME_SEC, STATIONARY_WAVE_TYPES
+from wave_timeline import compute_scores
+
+REPO = wave_timeline.REPO
+VIEWPORT_HEIGHT_PX = 1280.0  # project.godot window/size/viewport_height
+DEFAULT_ENEMY_LIFETIME_SEC = 9.0
+DEFAULT_FIRE_INTERVAL_SEC = 2.0  # Enemy.gd fire_rate default
+DEFAULT_FIRE_RATE_MAX = 80.0  # Enemy.gd DEFAULT_MAX_FIRE_RATE
+OBSTACLE_DEFAULTS = {"speed": 200.0, "row_interval": 1.2}  # ObstacleSpawner.setup
+SERIES = ("spawns_per_sec", "enemies_alive", "projectiles_per_sec", "projectiles_alive",
+          "obstacle_rows_per_sec", "obstacle_rows_alive")
+
+
+def load_fire_profiles(config):
+    """enemy_id -> (projectiles per volley, fire interval, projectile lifetime).
+
+    Also returns the minimum fire interval (1 / game_balance.fire_rate_max).
+    """
+    patterns = {p.get("id"): p for p in compute_scores.load_json(
+        str(REPO / "data" / "patterns" / "missile_patterns_enemy.json")).get("patterns", [])}
+    missiles = {m.get("id"): m for m in compute_scores.load_json(
+        str(REPO / "data" / "missiles" / "missiles.json")).get("missiles", [])}
+    game = compute_scores.load_json(str(REPO / "data" / "game.json"))
+    rate_max = max(0.01, float(game.get("game_balance", {}).get("fire_rate_max", DEFAULT_FIRE_RATE_MAX)))
+    profiles = {}
+    for enemy_id, enemy in config["enemies"].items():
+        pattern = patterns.get(enemy.get("missile_pattern_id", ""))
+        if not pattern:
+            profiles[enemy_id] = (0, 0.0, 0.0)
+            continue
+        interval = max(1.0 / rate_max, float(enemy.get("fire_rate", DEFAULT_FIRE_INTERVAL_SEC)))
+        volley = int(pattern.get("projectile_count", 1)) * max(1, int(pattern.get("wave_count", 1)))
+        speed = float(missiles.get(enemy.get("missile_id", ""), {}).get("speed", 0)) or float(pattern.get("speed", 200))
+        lifetime = float(pattern.get("despawn_after_sec", 0)) or VIEWPORT_HEIGHT_PX / max(1.0, speed)
+        profiles[enemy_id] = (volley, interval, lifetime)
+    return profiles, 1.0 / rate_max
+
+
+def _box(grid, start, end, value, step):
+    """Add `value` over [start, end) on a step grid (fractional edges)."""
+    if end <= start:
+        return
+    edges = np.array([start, end]) / step
+    lo, hi = int(edges[0]), int(edges[1])
+    if lo >= len(grid):
+        return
+    if lo == hi:
+        grid[lo] += value * (edges[1] - edges[0])
+        return
+    grid[lo] += value * (lo + 1 - edges[0])
+    grid[lo + 1:min(hi, len(grid))] += value
+    if hi < len(grid):
+        grid[hi] += value * (edges[1] - hi)
+
+
+def _impulses(grid, times, weight, step):
+    idx = (np.asarray(times) / step).astype(np.int64)
+    idx = idx[idx < len(grid)]
+    np.add.at(grid, idx, weight / step)
+
+
+def _in_flight(rate, lifetime, step):
+    """Items alive given a per-second emission `rate` and a fixed `lifetime`."""
+    width = max(1, int(round(lifetime / step)))
+    csum = np.concatenate(([0.0], np.cumsum(rate * step)))
+    lag = np.maximum(np.arange(1, len(csum)) - width, 0)
+    return csum[1:] - csum[lag]
+
+
+def level_series(world, level, config, profiles, min_interval, step, lifetimes):
+    """Dict of series (arrays on the step grid) for one level."""
+    defaults = world.get("wave_runtime_defaults", {})
+    timeline = wave_timeline.level_timeline(level, defaults, config)
+    total = sum(entry["duration"] for entry in timeline)
+    n = max(1, int(math.ceil(total / step)))
+    spawns = np.zeros(n)
+    alive = np.zeros(n)
+    proj_rate = np.zeros(n)
+    proj_alive = np.zeros(n)
+    rows = np.zeros(n)
+    rows_alive = np.zeros(n)
+
+    start = 0.0
+    for entry in timeline:
+        wave = entry["wave"]
+        end = start + entry["duration"]
+        if entry["enemy_id"] and len(entry["delays"]):
+            times = start + entry["delays"]
+            _impulses(spawns, times, 1.0, step)
+            if entry["type"] in STATIONARY_WAVE_TYPES:
+                exits = np.full(len(times), end)
+            else:
+                exits = np.minimum(times + lifetimes.get(entry["enemy_id"], DEFAULT_ENEMY_LIFETIME_SEC), end)
+            volley, interval, proj_life = profiles.get(entry["enemy_id"], (0, 0.0, 0.0))
+            if entry["type"] == "artillery":
+                # WaveManager passes fire_rate_override to every artillery unit.
+                interval = max(min_interval, 0.05, float(wave.get("fire_rate_sec", defaults.get(
+                    "artillery_fire_rate_sec", wave_timeline.ARTILLERY_WAVE_DEFAULT_FIRE_RATE_SEC))))
+            shots = volley / interval if volley else 0.0
+            wave_alive = np.zeros(n)
+            for t0, t1 in zip(times, exits):
+                _box(wave_alive, t0, t1, 1.0, step)
+            alive += wave_alive
+            if shots > 0.0:
+                wave_rate = wave_alive * shots
+                proj_rate += wave_rate
+                proj_alive += _in_flight(wave_rate, proj_life, step)
+        elif entry["type"] == "obstacle":
+            interval = max(0.05, float(wave.get("row_interval", OBSTACLE_DEFAULTS["row_interval"])))
+            speed = max(1.0, float(wave.get("speed", OBSTACLE_DEFAULTS["speed"])))
+            # ObstacleSpawner: first row after one interval, none after the cutoff.
+            count = int(math.floor(entry["cutoff"] / interval + 1e-9))
+            times = start + interval * np.arange(1, count + 1)
+            wave_rows = np.zeros(n)
+            _impulses(wave_rows, times, 1.0, step)
+            rows += wave_rows
+            rows_alive += _in_flight(wave_rows, VIEWPORT_HEIGHT_PX / speed, step)
+        start = end
+
+    return {
+        "spawns_per_sec": spawns, "enemies_alive": alive,
+        "projectiles_per_sec": proj_rate, "projectiles_alive": proj_alive,
+        "obstacle_rows_per_sec": rows, "obstacle_rows_alive": rows_alive,
+    }
+
+
+def peaks(series, step, window):
+    """Max, time of max and max `window`-second average per series."""
+    width = max(1, int(round(window / step)))
+    out = {}
+    for name, values in series.items():
+        if not len(values):
+            out[name] = {"max": 0.0, "t": 0.0, "window_max": 0.0}
+            continue
+        i = int(np.argmax(values))
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        avg = (csum[width:] - csum[:-width]) / width if len(values) >= width else csum[-1:] / len(values)
+        out[name] = {"max": round(float(values[i]), 2), "t": round(i * step, 2),
+                     "window_max": round(float(avg.max()), 2)}
+    return out
+
+
+def write_npz(path, results, step):
+    level_ids = [r["level_id"] for r in results]
+    offsets = np.cumsum([0] + [len(r["series"]["spawns_per_sec"]) for r in results]).astype(np.int64)
+    arrays = {name: np.concatenate([r["series"][name] for r in results]).astype(np.float32) for name in SERIES}
+    np.savez_compressed(path, level_ids=np.array(level_ids), offsets=offsets, step=np.float32(step), **arrays)
+
+
+def write_csv(path, results, step):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(("level_id", "t") + SERIES)
+        for r in results:
+            cols = [r["series"][name] for name in SERIES]
+            for i, row in enumerate(zip(*cols)):
+                out.writerow([r["level_id"], f"{i * step:.2f}"] + [f"{v:.3f}" for v in row])
+
+
+def main():
+    p = argparse.ArgumentParser(description="Per-level pacing time series (enemies, projectiles, obstacles)")
+    p.add_argument("--step", type=float, default=0.1, help="Grid step in seconds")
+    p.add_argument("--window", type=float, default=1.0, help="Averaging window for the window_max peaks (s)")
+    p.add_argument("--levels", default="", help="Comma-separated world_id / level_id prefixes")
+    p.add_argument("--npz", help="Write the series to this .npz")
+    p.add_argument("--csv", help="Write the series to this CSV (long format)")
+    p.add_argument("--json", help="Write the peak summary to this file")
+    p.add_argument("--sort", choices=SERIES, help="Order the summary by this series' peak, densest first")
+    args = p.parse_args()
+    if args.step <= 0:
+        p.error("--step must be > 0")
+
+    config = compute_scores.load_config(str(REPO))
+    profiles, min_interval = load_fire_profiles(config)
+    prefixes = [s.strip() for s in args.levels.split(",") if s.strip()]
+    results = []
+    for world, level in wave_timeline.iter_world_levels():
+        level_id = level.get("id", "")
+        if prefixes and not any(level_id.startswith(pfx) for pfx in prefixes):
+            continue
+        series = level_series(world, level, config, profiles, min_interval, args.step,
+                              DEFAULT_LIFETIME_SEC)
+        results.append({"level_id": level_id, "duration": round(len(series["spawns_per_sec"]) * args.step, 1),
+                        "series": series, "peaks": peaks(series, args.step, args.window)})
+    if not results:
+        print("no level matched", file=sys.stderr)
+        return 1
+
+    if args.npz:
+        write_npz(args.npz, results, args.step)
+    if args.csv:
+        write_csv(args.csv, results, args.step)
+    summary = [{"level_id": r["level_id"], "duration": r["duration"], "peaks": r["peaks"]} for r in results]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    if args.sort:
+        summary.sort(key=lambda s: -s["peaks"][args.sort]["max"])
+    print(f"{'level':<18} {'len':>6} {'spawn/s':>8} {'alive':>6} @t      {'shots/s':>8} {'in-air':>7} @t      {'rows':>5}")
+    for s in summary:
+        pk = s["peaks"]
+        print(f"{s['level_id']:<18} {s['duration']:6.1f} {pk['spawns_per_sec']['window_max']:8.1f} "
+              f"{pk['enemies_alive']['max']:6.1f} {pk['enemies_alive']['t']:<7.1f}"
+              f"{pk['projectiles_per_sec']['window_max']:8.1f} {pk['projectiles_alive']['max']:7.1f} "
+              f"{pk['projectiles_alive']['t']:<7.1f}{pk['obstacle_rows_alive']['max']:5.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
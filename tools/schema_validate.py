@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""Validate data/ against the schemas of data/_schema/*.schema.json.
+
+Each schema is compiled once into nested closures: the per-node work
+(property lookups, `$ref` resolution, enum sets, regexes, the `type`
+discriminator of world waves) is done at compile time, so validating a file
+is a plain walk of the data. JSON paths ("levels[2].waves[4].enemy_id") are
+only built when an error is reported.
+
+Supported keywords: type, enum, properties, required, additionalProperties
+(false or a schema), items, minItems, maxItems, minimum, maximum,
+exclusiveMinimum, pattern, $ref ("#/definitions/x") and the custom
+"discriminator" {"property", "default", "mapping"} used for wave types.
+
+Run from repo root:
+    python tools/schema_validate.py                    # all data files
+    python tools/schema_validate.py data/bosses.json
+    python tools/schema_validate.py --bench 20         # compiled vs naive walk
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO / "data"
+SCHEMA_DIR = DATA_DIR / "_schema"
+
+# Schema file -> data files (globs relative to data/) it validates.
+SCHEMAS = {
+    "world.schema.json": ["worlds/world_*.json"],
+    "bosses.schema.json": ["bosses.json"],
+    "loot_table.schema.json": ["loot_table.json"],
+    "skills.schema.json": ["skills.json"],
+    "idle_factory.schema.json": ["idle_factory.json"],
+    "freemode.schema.json": ["freemode.json"],
+}
+
+# bool is a subclass of int in Python but not a JSON number.
+JSON_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+def format_path(path):
+    """Linked (parent, key) path -> 'levels[2].waves[4].enemy_id'."""
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    out = ""
+    for key in reversed(keys):
+        out += f"[{key}]" if isinstance(key, int) else (f".{key}" if out else key)
+    return out
+
+
+def _type_name(value):
+    for name in ("boolean", "object", "array", "string", "integer", "number", "null"):
+        if type(value) in JSON_TYPES[name]:
+            return name
+    return type(value).__name__
+
+
+def _resolve(root, ref):
+    if not ref.startswith("#/"):
+        raise ValueError(f"unsupported $ref '{ref}'")
+    node = root
+    for part in ref[2:].split("/"):
+        node = node[part]
+    return node
+
+
+# --- compiled validators ----------------------------------------------------
+
+class SchemaCompiler:
+    """Turns one schema document into a `fn(value, path, errors)` closure."""
+
+    def __init__(self, root):
+        self.root = root
+        self.refs = {}
+
+    def compile(self, schema=None):
+        return self._compile(self.root if schema is None else schema)
+
+    def _ref(self, ref):
+        # Recursive definitions: the slot is filled after compilation.
+        if ref not in self.refs:
+            slot = []
+            self.refs[ref] = lambda value, path, errors: slot[0](value, path, errors)
+            slot.append(self._compile(_resolve(self.root, ref)))
+        return self.refs[ref]
+
+    def _compile(self, schema):
+        if "$ref" in schema:
+            return self._ref(schema["$ref"])
+        checks = []
+
+        if "discriminator" in schema:
+            checks.append(self._discriminator(schema["discriminator"]))
+
+        if "type" in schema:
+            names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            allowed = frozenset(t for n in names for t in JSON_TYPES[n])
+            integer_only = names == ["integer"]
+            expected = "|".join(names)
+
+            def check_type(value, path, errors):
+                if type(value) not in allowed or (integer_only and isinstance(value, bool)):
+                    errors.append((path, f"expected {expected}, got {_type_name(value)}"))
+                    return False
+                return True
+            checks.append(check_type)
+
+        if "enum" in schema:
+            options = schema["enum"]
+            hashable = frozenset(o for o in options if not isinstance(o, (dict, list)))
+
+            def check_enum(value, path, errors):
+                if value in hashable if isinstance(value, (str, int, float)) else value in options:
+                    return True
+                errors.append((path, f"{json.dumps(value, ensure_ascii=False)} not in {options}"))
+                return False
+            checks.append(check_enum)
+
+        bounds = [(k, schema[k]) for k in ("minimum", "maximum", "exclusiveMinimum") if k in schema]
+        if bounds:
+            checks.append(self._bounds(bounds))
+
+        if "pattern" in schema:
+            regex = re.compile(schema["pattern"])
+
+            def check_pattern(value, path, errors):
+                if isinstance(value, str) and not regex.search(value):
+                    errors.append((path, f"'{value}' does not match {regex.pattern}"))
+                return True
+            checks.append(check_pattern)
+
+        if any(k in schema for k in ("properties", "required", "additionalProperties")):
+            checks.append(self._object(schema))
+        if any(k in schema for k in ("items", "minItems", "maxItems")):
+            checks.append(self._array(schema))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path, errors):
+            for check in checks:
+                if not check(value, path, errors):
+                    return False
+            return True
+        return check_all
+
+    def _discriminator(self, spec):
+        prop = spec["property"]
+        default = spec.get("default")
+        mapping = {key: self._ref(ref) for key, ref in spec["mapping"].items()}
+
+        def check_discriminator(value, path, errors):
+            if not isinstance(value, dict):
+                return True  # left to the type check
+            tag = value.get(prop, default)
+            validator = mapping.get(tag) if isinstance(tag, str) else None
+            if validator is None:
+                errors.append(((path, prop), f"unknown {prop} '{tag}'"))
+                return False
+            return validator(value, path, errors)
+        return check_discriminator
+
+    @staticmethod
+    def _bounds(bounds):
+        def check_bounds(value, path, errors):
+            if type(value) not in (int, float):
+                return True
+            for keyword, limit in bounds:
+                if keyword == "minimum" and value < limit:
+                    errors.append((path, f"{value} < minimum {limit}"))
+                elif keyword == "maximum" and value > limit:
+                    errors.append((path, f"{value} > maximum {limit}"))
+                elif keyword == "exclusiveMinimum" and value <= limit:
+                    errors.append((path, f"{value} <= exclusiveMinimum {limit}"))
+            return True
+        return check_bounds
+
+    def _object(self, schema):
+        props = {key: self._compile(sub) for key, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        extra = schema.get("additionalProperties", True)
+        extra_fn = self._compile(extra) if isinstance(extra, dict) else None
+        closed = extra is False
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return True
+            for key in required:
+                if key not in value:
+                    errors.append((path, f"missing required '{key}'"))
+            for key, item in value.items():
+                fn = props.get(key)
+                if fn is not None:
+                    fn(item, (path, key), errors)
+                elif extra_fn is not None:
+                    extra_fn(item, (path, key), errors)
+                elif closed:
+                    errors.append(((path, key), "unexpected property"))
+            return True
+        return check_object
+
+    def _array(self, schema):
+        items_fn = self._compile(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return True
+            if min_items is not None and len(value) < min_items:
+                errors.append((path, f"{len(value)} item(s) < minItems {min_items}"))
+            if max_items is not None and len(value) > max_items:
+                errors.append((path, f"{len(value)} item(s) > maxItems {max_items}"))
+            if items_fn is not None:
+                for i, item in enumerate(value):
+                    items_fn(item, (path, i), errors)
+            return True
+        return check_array
+
+
+def compile_schema(schema):
+    return SchemaCompiler(schema).compile()
+
+
+# --- naive interpreter (reference for --bench) ------------------------------
+
+def interpret(schema, value, path, root, errors):
+    """Walk `schema` for every node; same findings as the compiled closures."""
+    if "$ref" in schema:
+        return interpret(_resolve(root, schema["$ref"]), value, path, root, errors)
+    if "discriminator" in schema and isinstance(value, dict):
+        spec = schema["discriminator"]
+        tag = value.get(spec["property"], spec.get("default"))
+        ref = spec["mapping"].get(tag) if isinstance(tag, str) else None
+        if ref is None:
+            errors.append((_join(path, spec["property"]), f"unknown {spec['property']} '{tag}'"))
+            return False
+        if not interpret({"$ref": ref}, value, path, root, errors):
+            return False
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        ok = any(type(value) in JSON_TYPES[n] for n in names)
+        if names == ["integer"] and isinstance(value, bool):
+            ok = False
+        if not ok:
+            errors.append((path, f"expected {'|'.join(names)}, got {_type_name(value)}"))
+            return False
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append((path, f"{json.dumps(value, ensure_ascii=False)} not in {schema['enum']}"))
+        return False
+    if type(value) in (int, float):
+        for keyword in ("minimum", "maximum", "exclusiveMinimum"):
+            if keyword not in schema:
+                continue
+            limit = schema[keyword]
+            if keyword == "minimum" and value < limit:
+                errors.append((path, f"{value} < minimum {limit}"))
+            elif keyword == "maximum" and value > limit:
+                errors.append((path, f"{value} > maximum {limit}"))
+            elif keyword == "exclusiveMinimum" and value <= limit:
+                errors.append((path, f"{value} <= exclusiveMinimum {limit}"))
+    if "pattern" in schema and isinstance(value, str) and not re.search(schema["pattern"], value):
+        errors.append((path, f"'{value}' does not match {schema['pattern']}"))
+    if isinstance(value, dict):
+        for key in schema.get("required", ()):
+            if key not in value:
+                errors.append((path, f"missing required '{key}'"))
+        props = schema.get("properties", {})
+        extra = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in props:
+                interpret(props[key], item, _join(path, key), root, errors)
+            elif isinstance(extra, dict):
+                interpret(extra, item, _join(path, key), root, errors)
+            elif extra is False:
+                errors.append((_join(path, key), "unexpected property"))
+    if isinstance(value, list):
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            errors.append((path, f"{len(value)} item(s) < minItems {schema['minItems']}"))
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append((path, f"{len(value)} item(s) > maxItems {schema['maxItems']}"))
+        if "items" in schema:
+            for i, item in enumerate(value):
+                interpret(schema["items"], item, _join(path, i), root, errors)
+    return True
+
+
+def _join(path, key):
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else key
+
+
+# --- driver -----------------------------------------------------------------
+
+def load_schemas():
+    return {name: json.loads((SCHEMA_DIR / name).read_text(encoding="utf-8")) for name in SCHEMAS}
+
+
+def collect_files(only=None):
+    """(schema name, repo-relative data path) pairs."""
+    only = {Path(p).resolve() for p in only or ()}
+    files = []
+    for name, patterns in SCHEMAS.items():
+        for pattern in patterns:
+            for path in sorted(DATA_DIR.glob(pattern)):
+                if not only or path.resolve() in only:
+                    files.append((name, path.relative_to(REPO).as_posix()))
+    return files
+
+
+def validate(validator, data):
+    """Run a compiled validator; returns [(json_path, message)]."""
+    errors = []
+    validator(data, None, errors)
+    return [(format_path(path), message) for path, message in errors]
+
+
+def bench(schemas, docs, rounds):
+    compiled = {name: compile_schema(schema) for name, schema in schemas.items()}
+    for name, rel, data in docs:
+        naive = []
+        interpret(schemas[name], data, "", schemas[name], naive)
+        if naive != validate(compiled[name], data):
+            raise AssertionError(f"{rel}: compiled and naive validators disagree")
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for name, _, data in docs:
+            interpret(schemas[name], data, "", schemas[name], [])
+    naive_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        compiled = {name: compile_schema(schema) for name, schema in schemas.items()}
+    compile_s = (time.perf_counter() - t0) / rounds
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for name, _, data in docs:
+            compiled[name](data, None, [])
+    compiled_s = time.perf_counter() - t0
+
+    print(f"{len(docs)} file(s) x {rounds} round(s), identical findings")
+    print(f"  naive     {naive_s / rounds * 1000:8.2f} ms/round")
+    print(f"  compiled  {compiled_s / rounds * 1000:8.2f} ms/round  (+{compile_s * 1000:.2f} ms compile, once)")
+    print(f"  speedup   x{naive_s / compiled_s:.1f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Validate data/ against data/_schema/*.schema.json")
+    p.add_argument("files", nargs="*", help="Data files to validate (default: all covered files)")
+    p.add_argument("--bench", type=int, metavar="N", help="Time compiled vs naive validation over N rounds")
+    args = p.parse_args()
+
+    schemas = load_schemas()
+    files = collect_files(args.files)
+    if args.files and not files:
+        p.error("no given file is covered by a schema")
+
+    docs = []
+    failures = 0
+    for name, rel in files:
+        try:
+            docs.append((name, rel, json.loads((REPO / rel).read_text(encoding="utf-8"))))
+        except ValueError as exc:
+            print(f"{rel}: invalid JSON: {exc}")
+            failures += 1
+
+    if args.bench:
+        bench(schemas, docs, args.bench)
+        return 0
+
+    t0 = time.perf_counter()
+    validators = {name: compile_schema(schema) for name, schema in schemas.items()}
+    for name, rel, data in docs:
+        for path, message in validate(validators[name], data):
+            print(f"{rel}:{path} {message}")
+            failures += 1
+    print(f"{len(files)} file(s) against {len(schemas)} schema(s), {failures} error(s) "
+          f"in {(time.perf_counter() - t0) * 1000:.1f} ms", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Monte Carlo simulator for level score and time-to-clear distributions.
+
+Replays each level's `waves` timeline (tools/wave_timeline.py, which mirrors
+WaveManager.gd) against a parameterised player and returns the distribution
+of score and clear time per level. compute_scores.py only gives the
+deterministic upper bound; this accounts for the SPAWN_STOP cutoff, spawn
+jitter, enemies leaving the screen before they are killed, early wave clear
+(WAVE_CLEAR_ADVANCE_DELAY_SEC) and the boss fight.
+
+Player model (per run):
+  - effective DPS = --dps * lognormal(0, --dps-cv), one draw per run;
+  - targets are engaged in spawn order; an enemy needs hp / dps + --overhead
+    seconds and is lost if it leaves the screen first (per-archetype
+    lifetime, --lifetime); artillery and swarms stay until the wave ends;
+  - enemy HP ignores world multipliers unless --world-hp (a geared player
+    keeps pace with the world).
+
+Each level is a discrete-event recurrence over its spawns, vectorised over a
+chunk of runs; chunks fan out over a process pool. Every chunk owns its own
+SeedSequence child, so results do not depend on --workers.
+
+Run from repo root:
+    python tools/score_sim.py --runs 4000
+    python tools/score_sim.py --runs 4000 --levels world_1 --json sim.json
+    python tools/score_sim.py --stars 20,50,85   # star thresholds from percentiles
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import wave_timeline
+from wave_timeline import compute_scores
+
+# Seconds an archetype stays reachable before leaving the screen.
+DEFAULT_LIFETIME_SEC = {"swarmer": 7.0, "fighter": 9.0, "tank": 13.0, "elite": 10.0}
+STATIONARY_WAVE_TYPES = {"artillery", "swarm"}
+# Obstacle spawners stop at the cutoff; rows still need to scroll off screen.
+OBSTACLE_SCROLL_OUT_SEC = 3.0
+STAR_KEYS = ("score_1star", "score_2stars", "score_3stars")
+
+
+def build_plan(world, level, config, args):
+    """Pre-expand one level into plain arrays (picklable for the pool)."""
+    defaults = world.get("wave_runtime_defaults", {})
+    hp_mult = float(world.get("multipliers", {}).get("hp", 1.0)) if args.world_hp else 1.0
+    elite = config["enemies"].get("elite", {})
+    waves = []
+    for entry in wave_timeline.level_timeline(level, defaults, config, args.density):
+        wave = {"type": entry["type"], "duration": entry["duration"], "cutoff": entry["cutoff"]}
+        if entry["enemy_id"] and len(entry["delays"]):
+            enemy = config["enemies"].get(entry["enemy_id"], {})
+            wave["delays"] = entry["delays"]
+            wave["hp"] = float(enemy.get("hp", 0)) * entry["hp_multiplier"] * hp_mult
+            wave["score"] = float(enemy.get("score", 0))
+            wave["lifetime"] = (math.inf if entry["type"] in STATIONARY_WAVE_TYPES
+                                else args.lifetime.get(entry["enemy_id"], args.default_lifetime))
+            wave["elite_chance"] = args.elite_chance if entry["elite_eligible"] else 0.0
+            wave["elite_hp"] = float(elite.get("hp", 0)) * hp_mult
+            wave["elite_score"] = float(elite.get("score", 0))
+            wave["elite_lifetime"] = args.lifetime.get("elite", args.default_lifetime)
+        waves.append(wave)
+    boss_id = level.get("boss_id", "") or ""
+    boss = config["bosses"].get(boss_id, {})
+    return {
+        "world_id": world.get("id", ""),
+        "level_id": level.get("id", ""),
+        "boss_id": boss_id,
+        "boss_hp": float(boss.get("hp", 0)) * hp_mult,
+        "boss_score": float(boss.get("score", 0)),
+        "thresholds": {k: int(level.get(k, 0)) for k in STAR_KEYS},
+        "waves": waves,
+    }
+
+
+def simulate_wave(wave, dps, rng, args):
+    """(score, end_time) per run for one enemy wave. dps has shape (R,)."""
+    runs = len(dps)
+    base = wave["delays"]
+    n = len(base)
+    arrivals = base[None, :] + rng.uniform(0.0, args.jitter, size=(runs, n))
+    arrivals = np.minimum(arrivals, wave["cutoff"])
+    arrivals.sort(axis=1)
+    hp = np.full((runs, n), wave["hp"])
+    score = np.full((runs, n), wave["score"])
+    lifetime = np.full((runs, n), wave["lifetime"])
+    if wave["elite_chance"] > 0.0:
+        swap = rng.random((runs, n)) <= wave["elite_chance"]
+        hp[swap] = wave["elite_hp"]
+        score[swap] = wave["elite_score"]
+        lifetime[swap] = wave["elite_lifetime"]
+    service = hp / dps[:, None] + args.overhead
+
+    # Discrete-event recurrence: the player is a single server working the
+    # spawn queue in order; an enemy abandons the queue at arrival + lifetime.
+    t = np.zeros(runs)
+    kill_time = np.full((runs, n), np.inf)
+    settled = np.zeros(runs)
+    for j in range(n):
+        t = np.maximum(t, arrivals[:, j])
+        finish = t + service[:, j]
+        deadline = arrivals[:, j] + lifetime[:, j]
+        killed = finish <= deadline
+        kill_time[:, j] = np.where(killed, finish, np.inf)
+        # A lost target still burns the time spent shooting at it.
+        t = np.where(killed, finish, np.maximum(t, deadline))
+        settled = np.maximum(settled, np.where(killed, finish, deadline))
+
+    # Early clear once everything is dead or gone, else the hard timeout.
+    end = np.minimum(wave["duration"], settled + wave_timeline.WAVE_CLEAR_ADVANCE_DELAY_SEC)
+    scored = (kill_time <= end[:, None]) * score
+    return scored.sum(axis=1), end
+
+
+def simulate_chunk(plan, runs, seed_seq, args):
+    rng = np.random.default_rng(seed_seq)
+    dps = args.dps * rng.lognormal(0.0, args.dps_cv, size=runs) if args.dps_cv > 0 else np.full(runs, args.dps)
+    score = np.zeros(runs)
+    elapsed = np.zeros(runs)
+    for wave in plan["waves"]:
+        if "delays" in wave:
+            wave_score, wave_time = simulate_wave(wave, dps, rng, args)
+            score += wave_score
+            elapsed += wave_time
+        elif wave["type"] == "obstacle":
+            elapsed += min(wave["duration"], wave["cutoff"] + OBSTACLE_SCROLL_OUT_SEC
+                           + wave_timeline.WAVE_CLEAR_ADVANCE_DELAY_SEC)
+        elif wave["type"] in wave_timeline.SELF_TIMED_TYPES:
+            elapsed += wave["duration"] * args.minigame_fraction
+        else:
+            elapsed += wave["duration"]
+        elapsed += args.wave_gap
+    if plan["boss_hp"] > 0:
+        elapsed += plan["boss_hp"] / dps + args.overhead
+        score += plan["boss_score"]
+    return score, elapsed
+
+
+def _run_task(task):
+    plan, runs, seed_seq, args = task
+    return plan["level_id"], simulate_chunk(plan, runs, seed_seq, args)
+
+
+def simulate(plans, args):
+    """level_id -> (scores, times), each of shape (--runs,)."""
+    root = np.random.SeedSequence(args.seed)
+    tasks = []
+    for li, plan in enumerate(plans):
+        # spawn_key pins each (level, chunk) stream regardless of scheduling.
+        for ci, start in enumerate(range(0, args.runs, args.chunk)):
+            seq = np.random.SeedSequence(root.entropy, spawn_key=(li, ci))
+            tasks.append((plan, min(args.chunk, args.runs - start), seq, args))
+    if args.workers == 1:
+        results = list(map(_run_task, tasks))
+    else:
+        workers = args.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    parts = {plan["level_id"]: [] for plan in plans}
+    for level_id, chunk in results:
+        parts[level_id].append(chunk)
+    return {lid: (np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks]))
+            for lid, chunks in parts.items()}
+
+
+def round_threshold(value, step=50):
+    return int(step * round(value / step))
+
+
+def summarize(plans, results, star_percentiles):
+    report = []
+    for plan in plans:
+        scores, times = results[plan["level_id"]]
+        pct = np.percentile(scores, [5, 25, 50, 75, 95])
+        tpct = np.percentile(times, [5, 50, 95])
+        suggested = [round_threshold(v) for v in np.percentile(scores, star_percentiles)]
+        report.append({
+            "world_id": plan["world_id"],
+            "level_id": plan["level_id"],
+            "boss_id": plan["boss_id"],
+            "score_mean": round(float(scores.mean()), 1),
+            "score_p5": float(pct[0]), "score_p25": float(pct[1]), "score_p50": float(pct[2]),
+            "score_p75": float(pct[3]), "score_p95": float(pct[4]),
+            "clear_time_p5": round(float(tpct[0]), 1),
+            "clear_time_p50": round(float(tpct[1]), 1),
+            "clear_time_p95": round(float(tpct[2]), 1),
+            "current_thresholds": plan["thresholds"],
+            "suggested_thresholds": dict(zip(STAR_KEYS, suggested)),
+        })
+    return report
+
+
+def parse_lifetimes(text):
+    lifetimes = dict(DEFAULT_LIFETIME_SEC)
+    for item in (text or "").split(","):
+        if "=" in item:
+            k, v = item.split("=", 1)
+            lifetimes[k.strip()] = float(v)
+    return lifetimes
+
+
+def main():
+    p = argparse.ArgumentParser(description="Monte Carlo level score / clear-time simulator")
+    p.add_argument("--runs", type=int, default=2000, help="Simulated runs per level")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all cores, 1 = serial)")
+    p.add_argument("--chunk", type=int, default=500, help="Runs per pool task")
+    p.add_argument("--levels", default="", help="Comma-separated world_id / level_id prefixes")
+    p.add_argument("--dps", type=float, default=2500.0, help="Median player DPS")
+    p.add_argument("--dps-cv", type=float, default=0.35, help="Per-run lognormal sigma of DPS")
+    p.add_argument("--overhead", type=float, default=0.15, help="Seconds lost per target (aim/travel)")
+    p.add_argument("--jitter", type=float, default=0.05, help="Max spawn delay jitter (s)")
+    p.add_argument("--lifetime", default="", help="Override lifetimes: 'fighter=8,tank=15'")
+    p.add_argument("--default-lifetime", type=float, default=9.0)
+    p.add_argument("--elite-chance", type=float, default=0.0,
+                   help="Elite replacement chance (Override protocol elite_vanguard)")
+    p.add_argument("--density", type=float, default=None, help="enemy_density_multiplier override")
+    p.add_argument("--world-hp", action="store_true", help="Apply world multipliers.hp to enemy HP")
+    p.add_argument("--minigame-fraction", type=float, default=1.0,
+                   help="Share of a self-timed mini-game wave's duration actually played")
+    p.add_argument("--wave-gap", type=float, default=0.0, help="Seconds between waves (splash/story)")
+    p.add_argument("--stars", default="25,55,85", help="Percentiles for 1/2/3-star thresholds")
+    p.add_argument("--json", help="Write the full report to this file")
+    args = p.parse_args()
+    args.lifetime = parse_lifetimes(args.lifetime)
+    star_percentiles = [float(v) for v in args.stars.split(",")]
+    if len(star_percentiles) != 3:
+        p.error("--stars expects three percentiles")
+
+    t0 = time.perf_counter()
+    config = compute_scores.load_config(str(wave_timeline.REPO))
+    prefixes = [s.strip() for s in args.levels.split(",") if s.strip()]
+    plans = [build_plan(world, level, config, args)
+             for world, level in wave_timeline.iter_world_levels()
+             if not prefixes or any(str(level.get("id", "")).startswith(x) for x in prefixes)]
+    results = simulate(plans, args)
+    report = summarize(plans, results, star_percentiles)
+    elapsed = time.perf_counter() - t0
+
+    print("| Level | Score p5 | p50 | p95 | Clear p50 (s) | Current 1/2/3* | Suggested 1/2/3* |")
+    print("|---|---:|---:|---:|---:|---|---|")
+    for r in report:
+        cur = "/".join(str(r["current_thresholds"][k]) for k in STAR_KEYS)
+        sug = "/".join(str(r["suggested_thresholds"][k]) for k in STAR_KEYS)
+        print(f"| {r['level_id']} | {r['score_p5']:.0f} | {r['score_p50']:.0f} | {r['score_p95']:.0f} "
+              f"| {r['clear_time_p50']} | {cur} | {sug} |")
+    print(f"\n{len(plans)} levels x {args.runs} runs in {elapsed:.2f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": {k: v for k, v in vars(args).items() if k != "json"},
+                       "levels": report}, f, indent=1, ensure_ascii=False)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
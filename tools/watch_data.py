@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Watch data/ and print audit / score deltas as designers edit.
+
+Keeps every parsed data file, the audit findings (tools/audit_rules.py) and
+the per-level baseline scores (compute_scores.py) in memory. On each change
+only what the edit can affect is recomputed:
+  - a world file: its audit rules, and the scores of the levels whose JSON
+    actually changed;
+  - any other data file: the known-id context (incremental xref index),
+    then the files its rules cover; scores are recomputed for every level
+    only when enemies/bosses/wave_types/game.json changed.
+The delta report lists new issues, resolved issues and score changes per
+level.
+
+Changes are detected with inotify (through libc, no extra dependency) and
+fall back to mtime polling where inotify is unavailable.
+
+Run from repo root:
+    python tools/watch_data.py
+    python tools/watch_data.py --poll --interval 0.5
+    python tools/watch_data.py --json          # one JSON delta per line
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+import audit_rules
+import audit_waves
+from analysis_cache import CONFIG_FILES
+from wave_timeline import compute_scores
+
+REPO = audit_rules.REPO
+DATA_DIR = audit_rules.DATA_DIR
+WORLDS_PREFIX = "data/worlds/"
+# Files whose edit changes every level's score.
+SCORE_CONFIG_FILES = {f"data/{name}" for name in CONFIG_FILES} | {"data/game.json"}
+IGNORED_DIRS = {"locales"}
+DEBOUNCE_SEC = 0.05
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def watched_dirs():
+    dirs = [DATA_DIR]
+    for dirpath, dirnames, _ in os.walk(DATA_DIR):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS and not d.startswith("_"))
+        dirs.extend(os.path.join(dirpath, d) for d in dirnames)
+    return dirs
+
+
+def watched_files():
+    files = []
+    for d in watched_dirs():
+        for name in os.listdir(d):
+            if name.endswith(".json"):
+                files.append(os.path.relpath(os.path.join(d, name), REPO).replace(os.sep, "/"))
+    return sorted(files)
+
+
+class InotifyWatcher:
+    """Directory watches through libc's inotify; raises OSError where unsupported."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_MODIFY
+        for d in watched_dirs():
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), mask)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed on {d}")
+            self.dirs[wd] = os.path.relpath(d, REPO).replace(os.sep, "/")
+
+    def _drain(self, changed):
+        try:
+            buf = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buf):
+            wd, _, _, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if name.endswith(".json") and wd in self.dirs:
+                changed.add(f"{self.dirs[wd]}/{name}")
+
+    def wait(self):
+        """Block until at least one .json changed; returns the changed paths."""
+        changed = set()
+        while not changed:
+            select.select([self.fd], [], [])
+            self._drain(changed)
+        # Editors write in several syscalls (truncate, write, rename...).
+        while select.select([self.fd], [], [], DEBOUNCE_SEC)[0]:
+            self._drain(changed)
+        return changed
+
+
+class PollingWatcher:
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    @staticmethod
+    def _scan():
+        snapshot = {}
+        for rel in watched_files():
+            try:
+                st = os.stat(REPO / rel)
+            except OSError:
+                continue
+            snapshot[rel] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self):
+        while True:
+            time.sleep(self.interval)
+            current = self._scan()
+            changed = {rel for rel in set(current) | set(self.snapshot)
+                       if current.get(rel) != self.snapshot.get(rel)}
+            self.snapshot = current
+            if changed:
+                return changed
+
+
+def _finding_key(finding):
+    return (finding["file"], finding["rule"], finding["path"], finding["message"])
+
+
+class DataState:
+    """In-memory audit findings and level scores, refreshed per changed file."""
+
+    def __init__(self):
+        self.config = compute_scores.load_config(str(REPO))
+        self.ctx = audit_rules.build_context()
+        self.prepared = audit_rules.prepare_context(self.ctx)
+        self.targets = {rel: target for target, rel in audit_waves.collect_tasks()}
+        self.findings = {}
+        self.levels = {}  # (world_id, level_id) -> (level, world_defaults)
+        self.level_files = {}  # world rel path -> [(world_id, level_id)]
+        self.scores = {}
+        for rel in self.targets:
+            self.findings[rel] = self._audit(rel, self._read(rel))
+        for rel in self.targets:
+            if rel.startswith(WORLDS_PREFIX):
+                self._load_world(rel, self._read(rel))
+
+    @staticmethod
+    def _read(rel):
+        try:
+            with open(REPO / rel, "rb") as f:
+                return json.loads(f.read().decode("utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError as exc:
+            return exc
+
+    def _audit(self, rel, data):
+        if data is None:
+            return []
+        if isinstance(data, ValueError):
+            return [{"rule": "X001", "severity": "error", "file": rel, "path": "",
+                     "message": f"invalid JSON: {data}"}]
+        return audit_rules.run_rules(self.targets[rel], data, self.prepared, rel)
+
+    def _score(self, level, defaults):
+        counts = compute_scores.analyze_level(level, defaults, self.config)
+        score = sum(c * self.config["enemy_score"].get(eid, 0) for eid, c in counts.items())
+        boss_id = level.get("boss_id", "")
+        return score + (self.config["boss_score"].get(boss_id, 0) if boss_id else 0)
+
+    def _load_world(self, rel, data):
+        """Replace one world's levels; returns the (world_id, level_id) keys whose content changed.
+
+        Keys carry the world id so that a level only ever belongs to the file
+        that defines it: a level id copied into another world, or moved from
+        one world to another, never overwrites or drops the other file's entry."""
+        if isinstance(data, ValueError):
+            return set()  # keep the last good version until the JSON parses again
+        changed = set()
+        new_ids = []
+        if isinstance(data, dict):
+            defaults = data.get("wave_runtime_defaults", {})
+            world_id = str(data.get("id") or os.path.splitext(os.path.basename(rel))[0])
+            for level in audit_rules.iter_levels(data):
+                if not isinstance(level, dict):
+                    continue
+                key = (world_id, str(level.get("id", "?")))
+                new_ids.append(key)
+                if self.levels.get(key) != (level, defaults):
+                    self.levels[key] = (level, defaults)
+                    self.scores[key] = self._score(level, defaults)
+                    changed.add(key)
+        for key in set(self.level_files.get(rel, [])) - set(new_ids):
+            self.levels.pop(key, None)
+            self.scores.pop(key, None)
+            changed.add(key)
+        self.level_files[rel] = new_ids
+        return changed
+
+    def refresh(self, changed_files):
+        """Re-audit / re-score after `changed_files`; returns the delta."""
+        t0 = time.perf_counter()
+        old_findings = {k: f for fs in self.findings.values() for f in fs for k in [_finding_key(f)]}
+        old_scores = dict(self.scores)
+
+        config_changed = [rel for rel in changed_files if not rel.startswith(WORLDS_PREFIX)]
+        parsed = {rel: self._read(rel) for rel in changed_files}
+        # New or deleted world files come and go with the tree.
+        self.targets = {rel: target for target, rel in audit_waves.collect_tasks()}
+        to_audit = {rel for rel in changed_files if rel in self.targets}
+        for rel in list(self.findings):
+            if rel not in self.targets:
+                del self.findings[rel]
+
+        if config_changed:
+            ctx = audit_rules.build_context()
+            if ctx != self.ctx:
+                self.ctx = ctx
+                self.prepared = audit_rules.prepare_context(ctx)
+                to_audit = set(self.targets)
+        for rel in to_audit:
+            data = parsed[rel] if rel in parsed else self._read(rel)
+            self.findings[rel] = self._audit(rel, data)
+
+        rescored = set()
+        if any(rel in SCORE_CONFIG_FILES for rel in config_changed):
+            self.config = compute_scores.load_config(str(REPO))
+            for key, (level, defaults) in self.levels.items():
+                self.scores[key] = self._score(level, defaults)
+            rescored = set(self.levels)
+        for rel, data in parsed.items():
+            if rel.startswith(WORLDS_PREFIX):
+                rescored |= self._load_world(rel, data)
+
+        new_findings = {k: f for fs in self.findings.values() for f in fs for k in [_finding_key(f)]}
+        return {
+            "files": sorted(changed_files),
+            "new": [new_findings[k] for k in new_findings if k not in old_findings],
+            "resolved": [old_findings[k] for k in old_findings if k not in new_findings],
+            "scores": [{"world_id": key[0], "level_id": key[1],
+                        "old": old_scores.get(key), "new": self.scores.get(key)}
+                       for key in sorted(rescored)
+                       if old_scores.get(key) != self.scores.get(key)],
+            "rescored_levels": len(rescored),
+            "audited_files": len(to_audit),
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 1),
+        }
+
+    def totals(self):
+        counts = {s: 0 for s in audit_rules.SEVERITIES}
+        for fs in self.findings.values():
+            for f in fs:
+                counts[f["severity"]] += 1
+        return counts
+
+
+def print_delta(delta, out=sys.stdout):
+    w = out.write
+    w(f"[{time.strftime('%H:%M:%S')}] {', '.join(delta['files'])}  "
+      f"({delta['audited_files']} file(s) audited, {delta['rescored_levels']} level(s) rescored, "
+      f"{delta['elapsed_ms']} ms)\n")
+    for f in delta["new"]:
+        w(f"  + {f['rule']} {f['severity']:<7} {f['file']}:{f['path']} {f['message']}\n")
+    for f in delta["resolved"]:
+        w(f"  - {f['rule']} {f['severity']:<7} {f['file']}:{f['path']} {f['message']}\n")
+    for s in delta["scores"]:
+        if s["old"] is None or s["new"] is None:
+            w(f"  ~ {s['world_id']}/{s['level_id']}: {s['old']} -> {s['new']}\n")
+        else:
+            w(f"  ~ {s['world_id']}/{s['level_id']}: {s['old']} -> {s['new']} ({s['new'] - s['old']:+d})\n")
+    if not (delta["new"] or delta["resolved"] or delta["scores"]):
+        w("  no audit or score change\n")
+    out.flush()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Watch data/ and report audit / score deltas")
+    p.add_argument("--poll", action="store_true", help="Use mtime polling instead of inotify")
+    p.add_argument("--interval", type=float, default=0.25, help="Polling interval in seconds")
+    p.add_argument("--json", action="store_true", help="Print each delta as one JSON line")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    state = DataState()
+    watcher = None
+    if not args.poll:
+        try:
+            watcher = InotifyWatcher()
+        except (OSError, AttributeError) as exc:
+            print(f"inotify unavailable ({exc}), polling every {args.interval}s", file=sys.stderr)
+    watcher = watcher or PollingWatcher(args.interval)
+    totals = state.totals()
+    print(f"Watching data/ with {type(watcher).__name__}: {len(state.targets)} file(s), "
+          f"{len(state.levels)} level(s), " + ", ".join(f"{n} {s}" for s, n in totals.items())
+          + f" (loaded in {time.perf_counter() - t0:.2f}s). Ctrl+C to stop.", file=sys.stderr)
+    try:
+        while True:
+            delta = state.refresh(watcher.wait())
+            if args.json:
+                print(json.dumps(delta, ensure_ascii=False), flush=True)
+            else:
+                print_delta(delta)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
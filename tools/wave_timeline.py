@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Expand a level's `waves` list into the spawn timeline WaveManager.gd plays.
+
+Shared by the simulators in tools/ (score_sim.py, ...). Mirrors:
+  - WaveManager._resolve_wave_duration (force_duration_sec, self-timed
+    mini-game waves and their padding),
+  - the per-type spawn schedules (_start_enemy_wave, _start_swarm_wave,
+    _start_tank_wave, _start_artillery_wave) including the SPAWN_STOP cutoff.
+
+Run from repo root to dump one level:
+    python tools/wave_timeline.py world_1_lvl_3
+"""
+
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.insert(0, str(REPO))
+
+import compute_scores  # noqa: E402  (repo root module)
+
+SPAWN_STOP = compute_scores.SPAWN_STOP
+WAVE_CLEAR_ADVANCE_DELAY_SEC = 2.0
+ARTILLERY_WAVE_DEFAULT_SPAWN_INTERVAL_SEC = 0.08
+ARTILLERY_WAVE_DEFAULT_FIRE_RATE_SEC = 3.0
+
+# Waves whose manager owns the clock (WaveManager._resolve_wave_duration).
+SELF_TIMED_TYPES = {
+    "pong", "breakout", "ball_launcher", "vertical_climb", "lane_runner",
+    "slice_rush", "match3", "gravity_hole", "star_drift", "suika_up", "snake",
+    "survivor",
+}
+# wave_types.json key and runtime fallback for the default duration of each type.
+DEFAULT_DURATION = {
+    "snake": ("round_duration_sec", 45.0, 10.0),
+    "pong": ("duration_sec_default", 30.0, 5.0),
+    "breakout": ("duration_sec_default", 45.0, 5.0),
+    "ball_launcher": ("duration_sec_default", 60.0, 10.0),
+    "suika_up": ("duration_sec_default", 60.0, 10.0),
+    "vertical_climb": ("duration_sec_default", 40.0, 5.0),
+    "lane_runner": ("duration_sec_default", 35.0, 8.0),
+    "slice_rush": ("duration_sec_default", 30.0, 10.0),
+    "match3": ("duration_sec_default", 45.0, 10.0),
+    "gravity_hole": ("duration_sec_default", 40.0, 10.0),
+    "star_drift": ("duration_sec_default", 50.0, 10.0),
+    "survivor": ("duration_sec_default", 80.0, 10.0),
+}
+# Self-finishing waves get a margin for the boss escape animation.
+SELF_FINISH_PADDING_TYPES = {"suika_up", "match3", "snake"}
+SELF_FINISH_PADDING_SEC = 6.0
+
+
+def resolve_wave_duration(wave, world_defaults, config):
+    """Seconds the WaveManager clock allows for this wave (hard timeout)."""
+    wave_type = compute_scores.resolve_wave_type(wave)
+    wave_types = config["wave_types"]
+    duration = max(0.1, float(wave.get("duration", 20.0)))
+    forced = float(world_defaults.get("force_duration_sec", -1.0))
+    honor_explicit = wave_type in ("gate_runner", "asteroid_split") and "duration" in wave
+    if wave_type in SELF_TIMED_TYPES:
+        honor_explicit = True
+        if "duration" not in wave:
+            key, fallback, floor = DEFAULT_DURATION[wave_type]
+            cfg = wave_types.get(wave_type, {})
+            duration = max(floor, float(cfg.get(key, fallback)))
+    if forced > 0.0 and not honor_explicit:
+        duration = forced
+    if wave_type in SELF_FINISH_PADDING_TYPES:
+        duration += SELF_FINISH_PADDING_SEC
+    if wave_type == "gravity_hole":
+        margin = float(wave_types.get("gravity_hole", {}).get("transition_margin_sec", 6.0))
+        duration += min(20.0, max(2.0, margin))
+    return max(0.1, duration)
+
+
+def _delays(count, interval, cutoff):
+    """Spawn delays i * interval, dropped once past the spawn cutoff."""
+    if count <= 0:
+        return np.zeros(0)
+    allowed = int(math.floor(cutoff / interval + 1e-9)) + 1 if interval > 0 else count
+    return np.arange(min(count, allowed), dtype=np.float64) * interval
+
+
+def expand_wave(wave, world_defaults, config, density=None, max_spawns=None):
+    """One wave -> dict with its type, duration and spawn schedule.
+
+    `delays` are seconds from wave start; `enemy_id` is empty for waves that
+    spawn no enemies (obstacles, mini-games).
+    """
+    wave_type = compute_scores.resolve_wave_type(wave)
+    duration = resolve_wave_duration(wave, world_defaults, config)
+    cutoff = max(0.0, duration - SPAWN_STOP)
+    entry = {"type": wave_type, "duration": duration, "cutoff": cutoff,
+             "enemy_id": "", "delays": np.zeros(0), "hp_multiplier": 1.0,
+             "elite_eligible": False, "wave": wave}
+    if wave_type not in compute_scores.SCORED_WAVE_TYPES:
+        return entry
+    enemy_id = compute_scores.resolve_enemy_id(wave, wave_type, config["enemy_score"])
+    if not enemy_id:
+        return entry
+    entry["enemy_id"] = enemy_id
+    dens = config["density_mult"] if density is None else density
+    if wave_type == "enemy":
+        base_interval = max(0.05, float(wave.get("interval", world_defaults.get("enemy_target_interval_sec", 1.0))))
+        spawns = world_defaults.get("enemy_max_spawns_per_wave", 160) if max_spawns is None else max_spawns
+        count = compute_scores.compute_enemy_count(base_interval, cutoff + SPAWN_STOP, spawns,
+                                                   dens, config["density_cap"])
+        interval = min(duration, max(0.05, base_interval / max(0.01, dens)))
+        entry["delays"] = _delays(count, interval, cutoff)
+        entry["elite_eligible"] = enemy_id != "elite"
+    elif wave_type == "swarm":
+        swarm_cfg = compute_scores.wave_type_config(config["wave_types"], config["gameplay"], "swarm")
+        count = max(1, int(wave.get("count", config["swarm_default"])))
+        interval = max(0.01, float(wave.get("spawn_interval_sec", swarm_cfg.get("spawn_interval_sec", 0.15))))
+        entry["delays"] = _delays(count, interval, cutoff)
+        entry["elite_eligible"] = enemy_id != "elite"
+    elif wave_type == "tank":
+        tank_cfg = compute_scores.wave_type_config(config["wave_types"], config["gameplay"], "tank")
+        interval = max(0.1, float(wave.get("interval", config["tank_default_interval"])))
+        count = max(1, int(wave.get("count", math.ceil(max(0.1, cutoff) / interval))))
+        entry["delays"] = _delays(count, interval, cutoff)
+        entry["hp_multiplier"] = max(0.01, float(wave.get("hp_multiplier", tank_cfg.get("default_hp_multiplier", 1.35))))
+    else:
+        count = compute_scores.compute_artillery_count(wave, world_defaults)
+        interval = max(0.01, float(wave.get("spawn_interval_sec", world_defaults.get(
+            "artillery_spawn_interval_sec", ARTILLERY_WAVE_DEFAULT_SPAWN_INTERVAL_SEC))))
+        entry["delays"] = _delays(count, interval, cutoff)
+    return entry
+
+
+def level_timeline(level, world_defaults, config, density=None, max_spawns=None):
+    return [expand_wave(w, world_defaults, config, density, max_spawns)
+            for w in level.get("waves", []) if isinstance(w, dict)]
+
+
+def iter_world_levels(root=REPO):
+    """(world, level) pairs for every data/worlds/world_N.json, in order."""
+    for path in compute_scores.world_paths(str(root)):
+        world = compute_scores.load_json(path)
+        for level in world.get("levels", []):
+            if isinstance(level, dict):
+                yield world, level
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python tools/wave_timeline.py <level_id>")
+        return 1
+    config = compute_scores.load_config(str(REPO))
+    for world, level in iter_world_levels():
+        if level.get("id") != sys.argv[1]:
+            continue
+        t = 0.0
+        for idx, entry in enumerate(level_timeline(level, world.get("wave_runtime_defaults", {}), config)):
+            n = len(entry["delays"])
+            last = float(entry["delays"][-1]) if n else 0.0
+            print(f"wave#{idx:<2} t={t:7.1f}s type={entry['type']:<14} duration={entry['duration']:5.1f}s "
+                  f"enemy={entry['enemy_id'] or '-':<10} spawns={n:<4} last_spawn={last:5.2f}s")
+            t += entry["duration"]
+        print(json.dumps({"level_id": level.get("id"), "max_duration_sec": round(t, 1)}))
+        return 0
+    print(f"level '{sys.argv[1]}' not found")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
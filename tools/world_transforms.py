@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Apply an ordered pipeline of transforms to every data/worlds/world_N.json.
+
+Replaces the one-off scripts/update_*.py patchers: each world file is loaded
+once, every step of the pipeline is applied in memory, and the file is
+written back only when its content actually changed, with only the changed
+spans rewritten (tools/json_patch.py). Worlds are processed in a
+process pool; --dry-run prints a per-file diff summary instead of writing.
+
+A pipeline is a JSON file (see tools/pipelines/):
+    {"description": "...",
+     "steps": [{"transform": "set_boss", "worlds": ["world_[2-9]"], ...params}]}
+`worlds` (fnmatch patterns on the world id, default: all) is accepted by
+every step; the other keys are the transform's parameters. A pipeline with
+an "archived" note (a one-off migration written for an older state of the
+data) is kept for reference: --dry-run / --diff still show what it would do,
+but it is never written back. Transforms are
+registered below with @transform; randomised ones draw from a Random seeded
+by (pipeline seed, world id, step index), so a run is reproducible and does
+not depend on --workers.
+
+Run from repo root:
+    python tools/world_transforms.py tools/pipelines/boss_animation_keys.json --dry-run
+    python tools/world_transforms.py tools/pipelines/boss_animation_keys.json --diff
+    python tools/world_transforms.py pipeline.json --worlds world_1,world_2 --seed 3
+    python tools/world_transforms.py --list
+"""
+
+import argparse
+import difflib
+import fnmatch
+import inspect
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import json_patch
+
+REPO = Path(__file__).resolve().parents[1]
+WORLDS_DIR = REPO / "data" / "worlds"
+
+TRANSFORMS = {}
+
+
+def transform(name):
+    """Register `fn(world, ctx, **params)`; returns the number of edits made."""
+    def register(fn):
+        if name in TRANSFORMS:
+            raise ValueError(f"duplicate transform '{name}'")
+        TRANSFORMS[name] = fn
+        return fn
+    return register
+
+
+class StepContext:
+    def __init__(self, world_id, step_index, seed):
+        self.world_id = world_id
+        self.step_index = step_index
+        self.seed = seed
+        self._rng = None
+
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = random.Random(f"{self.seed}/{self.world_id}/{self.step_index}")
+        return self._rng
+
+
+def _levels(world):
+    levels = world.get("levels", [])
+    return [lvl for lvl in levels if isinstance(lvl, dict)] if isinstance(levels, list) else []
+
+
+def _waves(world):
+    for level in _levels(world):
+        waves = level.get("waves", [])
+        if isinstance(waves, list):
+            yield from (w for w in waves if isinstance(w, dict))
+
+
+# --- transforms ---------------------------------------------------------------
+
+@transform("set_boss")
+def set_boss(world, ctx, boss_id=None, by_index=None, only_existing=False):
+    """boss_id per level: by_index {"<level index>": id}, else boss_id."""
+    by_index = by_index or {}
+    edits = 0
+    for level in _levels(world):
+        if only_existing and "boss_id" not in level:
+            continue
+        new = by_index.get(str(level.get("index", 0)), boss_id)
+        if new is not None and level.get("boss_id") != new:
+            level["boss_id"] = new
+            edits += 1
+    return edits
+
+
+@transform("rewrite_enemy_ids")
+def rewrite_enemy_ids(world, ctx, mapping=None, choices=None, only=None, clear_skin=False):
+    """Rename enemy_id through `mapping`, or draw from `choices` (restricted to `only` ids)."""
+    mapping = mapping or {}
+    edits = 0
+    for wave in _waves(world):
+        old = wave.get("enemy_id")
+        if not isinstance(old, str):
+            continue
+        if old in mapping:
+            new = mapping[old]
+        elif choices and (only is None or old in only):
+            new = ctx.rng.choice(choices)
+        else:
+            continue
+        wave["enemy_id"] = new
+        if clear_skin and "enemy_skin" in wave:
+            wave["enemy_skin"] = ""
+        edits += new != old
+    return edits
+
+
+@transform("randomize_enemy_count")
+def randomize_enemy_count(world, ctx, min=1, max=1):
+    """count = randint(min, max) on every wave with an enemy_id."""
+    edits = 0
+    for wave in _waves(world):
+        if "enemy_id" in wave:
+            count = ctx.rng.randint(min, max)
+            edits += wave.get("count") != count
+            wave["count"] = count
+    return edits
+
+
+@transform("strip_wave_keys")
+def strip_wave_keys(world, ctx, keys=()):
+    """Delete the given keys from every wave."""
+    edits = 0
+    for wave in _waves(world):
+        for key in keys:
+            if key in wave:
+                del wave[key]
+                edits += 1
+    return edits
+
+
+@transform("set_skin_overrides")
+def set_skin_overrides(world, ctx, overrides=None, merge=False):
+    """Replace (or with merge, update per section) the world's skin_overrides."""
+    overrides = overrides or {}
+    current = world.get("skin_overrides")
+    if merge and isinstance(current, dict):
+        new = {**current}
+        for section, values in overrides.items():
+            new[section] = {**current.get(section, {}), **values}
+    else:
+        new = overrides
+    if current == new:
+        return 0
+    world["skin_overrides"] = json.loads(json.dumps(new))
+    return 1
+
+
+@transform("add_boss_animation_keys")
+def add_boss_animation_keys(world, ctx, duration=2.0, frequency=8.0):
+    """Add <boss>_animation_duration / _frequency after each skin_overrides.bosses entry."""
+    bosses = world.get("skin_overrides", {}).get("bosses")
+    if not isinstance(bosses, dict):
+        return 0
+    new = {}
+    edits = 0
+    for key, value in bosses.items():
+        new[key] = value
+        if key.endswith(("_animation_duration", "_animation_frequency")):
+            continue
+        for suffix, default in (("_animation_duration", duration), ("_animation_frequency", frequency)):
+            if key + suffix not in bosses:
+                new[key + suffix] = default
+                edits += 1
+    if edits:
+        # Re-insert everything so the new keys sit next to their boss.
+        bosses.clear()
+        bosses.update(new)
+    return edits
+
+
+@transform("reorder_keys")
+def reorder_keys(world, ctx, order=()):
+    """Move the listed top-level keys first, in this order."""
+    keys = [k for k in order if k in world] + [k for k in world if k not in order]
+    if keys == list(world):
+        return 0
+    items = [(k, world[k]) for k in keys]
+    world.clear()
+    world.update(items)
+    return 1
+
+
+# --- engine -------------------------------------------------------------------
+
+def load_pipeline(path):
+    """-> (steps, archived note or None)."""
+    with open(path, encoding="utf-8") as f:
+        pipeline = json.load(f)
+    steps = pipeline.get("steps", []) if isinstance(pipeline, dict) else pipeline
+    archived = pipeline.get("archived") if isinstance(pipeline, dict) else None
+    for i, step in enumerate(steps):
+        name = step.get("transform")
+        if name not in TRANSFORMS:
+            raise ValueError(f"step {i}: unknown transform '{name}'")
+        params = {k: v for k, v in step.items() if k not in ("transform", "worlds")}
+        accepted = inspect.signature(TRANSFORMS[name]).parameters
+        unknown = [k for k in params if k not in accepted or k in ("world", "ctx")]
+        if unknown:
+            raise ValueError(f"step {i} ({name}): unknown parameter(s) {', '.join(unknown)}")
+    return steps, archived
+
+
+def apply_steps(world_id, data, steps, seed):
+    """Run the pipeline on one parsed world in place; returns edits per step."""
+    edits = []
+    for i, step in enumerate(steps):
+        patterns = step.get("worlds") or ["*"]
+        if not any(fnmatch.fnmatchcase(world_id, p) for p in patterns):
+            edits.append(0)
+            continue
+        params = {k: v for k, v in step.items() if k not in ("transform", "worlds")}
+        edits.append(int(TRANSFORMS[step["transform"]](data, StepContext(world_id, i, seed), **params) or 0))
+    return edits
+
+
+def process_world(path, steps, seed):
+    """-> (path, old text, new text or None when unchanged, edits per step)."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    data = json.loads(text)
+    edits = apply_steps(Path(path).stem, data, steps, seed)
+    new_text = json_patch.patch_text(text, data)
+    return path, text, (new_text if new_text != text else None), edits
+
+
+def diff_stats(old, new):
+    added = removed = 0
+    for line in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0):
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return added, removed
+
+
+def run(steps, paths, seed=0, workers=1):
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(process_world, paths, [steps] * len(paths), [seed] * len(paths)))
+    return [process_world(p, steps, seed) for p in paths]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Apply a transform pipeline to the world files")
+    p.add_argument("pipeline", nargs="?", help="Pipeline JSON file")
+    p.add_argument("--worlds", default="", help="Comma-separated world ids to process (default: all)")
+    p.add_argument("--seed", type=int, default=0, help="Seed of the randomised transforms")
+    p.add_argument("--dry-run", action="store_true", help="Report what would change, write nothing")
+    p.add_argument("--diff", action="store_true", help="Print the unified diff of each change (implies --dry-run)")
+    p.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count, 1 = inline)")
+    p.add_argument("--list", action="store_true", help="List the registered transforms and exit")
+    args = p.parse_args()
+
+    if args.list:
+        for name, fn in TRANSFORMS.items():
+            params = [n for n in inspect.signature(fn).parameters if n not in ("world", "ctx")]
+            doc = (fn.__doc__ or "").strip().splitlines()
+            print(f"{name:<24} ({', '.join(params)})  {doc[0] if doc else ''}")
+        return 0
+    if not args.pipeline:
+        p.error("a pipeline file is required")
+
+    try:
+        steps, archived = load_pipeline(args.pipeline)
+    except (OSError, ValueError) as exc:
+        print(f"{args.pipeline}: {exc}", file=sys.stderr)
+        return 2
+    if archived and not (args.dry_run or args.diff):
+        print(f"{args.pipeline}: archived, not applied ({archived}); --dry-run / --diff to inspect it",
+              file=sys.stderr)
+        return 2
+    selected = {w.strip() for w in args.worlds.split(",") if w.strip()}
+    paths = [str(path) for path in sorted(WORLDS_DIR.glob("world_*.json"),
+                                          key=lambda q: int(re.sub(r"\D", "", q.stem) or 0))
+             if not selected or path.stem in selected]
+    dry_run = args.dry_run or args.diff
+
+    t0 = time.perf_counter()
+    results = run(steps, paths, args.seed, args.workers or os.cpu_count() or 1)
+    changed = 0
+    for path, old_text, new_text, edits in results:
+        rel = Path(path).relative_to(REPO).as_posix()
+        per_step = ", ".join(f"{s['transform']}={n}" for s, n in zip(steps, edits) if n)
+        if new_text is None:
+            print(f"  {rel}: unchanged")
+            continue
+        changed += 1
+        added, removed = diff_stats(old_text, new_text)
+        print(f"{'~' if dry_run else 'W'} {rel}: +{added} -{removed} lines ({per_step or 'reordered'})")
+        if args.diff:
+            sys.stdout.writelines(difflib.unified_diff(
+                old_text.splitlines(True), new_text.splitlines(True), f"a/{rel}", f"b/{rel}"))
+        if not dry_run:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(new_text)
+    verb = "would change" if dry_run else "written"
+    print(f"{len(paths)} world(s), {changed} {verb}, {len(steps)} step(s) "
+          f"in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
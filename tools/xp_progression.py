@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Offline XP progression solver for game.json > progression.
+
+Combines the curve (ProfileManager.get_xp_for_level: int(base * N^exponent)
+XP from level N to N+1, capped at max_player_level), the score -> XP
+conversion of Game.gd (score * xp_per_score_ratio * world_xp_multipliers[w]
+* override reward multiplier) and per-level score baselines from
+compute_scores.py to answer, for every player level and every route:
+how many level clears and how much play time does it take?
+
+Routes:
+  - campaign: every level once in order (world_1 .. world_9), then farm the
+    last world in rotation;
+  - farm_<world_id>: replay that world's levels in rotation from level 1.
+
+Clear time per level is the WaveManager timeline length (tools/wave_timeline.py)
+plus --boss-time, or the p50 clear time/score of a tools/score_sim.py --json
+report (--sim). All route/level solving is vectorised; the inverse solver
+bisects the curve base (or exponent) to hit a target time-to-max.
+
+Run from repo root:
+    python tools/xp_progression.py                       # clears/hours per milestone
+    python tools/xp_progression.py --target-hours 40     # curve params hitting 40 h on campaign
+    python tools/xp_progression.py --sweep-base 8000:20000:500 --sweep-exponent 0.6:1.2:0.05
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import wave_timeline
+from wave_timeline import compute_scores
+
+PLAYABLE_LEVEL_TYPES = {"normal", "boss"}
+
+
+def load_progression(root=wave_timeline.REPO):
+    game = compute_scores.load_json(str(root / "data" / "game.json"))
+    prog = game.get("progression", {})
+    return {
+        "base": float(prog.get("xp_curve_base", 100)),
+        "exponent": float(prog.get("xp_curve_exponent", 1.5)),
+        "ratio": float(prog.get("xp_per_score_ratio", 1.0)),
+        "max_level": int(prog.get("max_player_level", 0)),
+        "world_mult": {k: max(0.0, float(v)) for k, v in prog.get("world_xp_multipliers", {}).items()},
+    }
+
+
+def xp_to_reach(base, exponent, max_level):
+    """Cumulative XP from level 1 to reach each level 2..max_level.
+
+    `base`/`exponent` broadcast: pass arrays of shape (P, 1) to get (P, max_level - 1).
+    """
+    n = np.arange(1, max_level, dtype=np.float64)
+    per_level = np.floor(np.asarray(base, dtype=np.float64) * np.power(n, exponent))
+    return np.cumsum(per_level, axis=-1)
+
+
+def level_table(prog, sim_report=None, boss_time=60.0, score_efficiency=1.0, overrides=0,
+                xp_mult=1.0, root=wave_timeline.REPO):
+    """Per playable level: world_id, level_id, xp per clear, seconds per clear."""
+    config = compute_scores.load_config(str(root))
+    ds = compute_scores.load_dataset(str(root), config)
+    scores = compute_scores.score_matrix(ds)[:, 0, 0, 0]
+    reward = compute_scores.override_reward_multiplier(config["override_settings"], overrides)
+    sim = {r["level_id"]: r for r in (sim_report or {}).get("levels", [])}
+
+    rows = []
+    li = 0
+    for world, level in wave_timeline.iter_world_levels(root):
+        meta = ds["levels"][li]
+        score = float(scores[li]) * score_efficiency
+        li += 1
+        if level.get("type", "normal") not in PLAYABLE_LEVEL_TYPES:
+            continue
+        timeline = wave_timeline.level_timeline(level, world.get("wave_runtime_defaults", {}), config)
+        seconds = sum(e["duration"] for e in timeline) + (boss_time if level.get("boss_id") else 0.0)
+        if meta["level_id"] in sim:
+            score = sim[meta["level_id"]]["score_p50"]
+            seconds = sim[meta["level_id"]]["clear_time_p50"]
+        world_mult = prog["world_mult"].get(meta["world_id"], 1.0)
+        xp = round(score * prog["ratio"] * world_mult * xp_mult * reward)
+        rows.append({"world_id": meta["world_id"], "level_id": meta["level_id"],
+                     "xp": float(xp), "seconds": float(seconds)})
+    return rows
+
+
+def build_routes(rows):
+    """route name -> (prefix xp, prefix seconds, cycle xp, cycle seconds) arrays."""
+    worlds = {}
+    for r in rows:
+        worlds.setdefault(r["world_id"], []).append(r)
+    routes = {}
+    last = list(worlds)[-1]
+    routes["campaign"] = (np.array([r["xp"] for r in rows]), np.array([r["seconds"] for r in rows]),
+                          np.array([r["xp"] for r in worlds[last]]),
+                          np.array([r["seconds"] for r in worlds[last]]))
+    for world_id, wrows in worlds.items():
+        routes["farm_" + world_id] = (np.zeros(0), np.zeros(0),
+                                      np.array([r["xp"] for r in wrows]),
+                                      np.array([r["seconds"] for r in wrows]))
+    return routes
+
+
+def solve_route(route, targets):
+    """Clears and seconds needed to accumulate `targets` XP (any shape) on a route.
+
+    The route plays its prefix once, then loops its cycle forever; XP carries
+    over between level-ups exactly like ProfileManager.gain_xp.
+    """
+    pre_xp, pre_t, cyc_xp, cyc_t = route
+    targets = np.asarray(targets, dtype=np.float64)
+    pre_cum = np.cumsum(pre_xp)
+    pre_tcum = np.cumsum(pre_t)
+    pre_total = pre_cum[-1] if len(pre_cum) else 0.0
+    pre_time = pre_tcum[-1] if len(pre_tcum) else 0.0
+
+    clears = np.zeros(targets.shape)
+    seconds = np.zeros(targets.shape)
+    in_prefix = targets <= pre_total
+    if len(pre_cum):
+        idx = np.searchsorted(pre_cum, targets[in_prefix], side="left")
+        clears[in_prefix] = idx + 1
+        seconds[in_prefix] = pre_tcum[idx]
+    clears[targets <= 0] = 0
+    seconds[targets <= 0] = 0.0
+
+    rest = np.maximum(targets - pre_total, 0.0)[~in_prefix]
+    cyc_cum = np.cumsum(cyc_xp)
+    cyc_tcum = np.cumsum(cyc_t)
+    cycle_xp = cyc_cum[-1]
+    if cycle_xp <= 0:
+        clears[~in_prefix] = np.inf
+        seconds[~in_prefix] = np.inf
+        return clears, seconds
+    # Full cycles first, then the partial cycle that crosses the target.
+    full = np.maximum(np.ceil(rest / cycle_xp) - 1, 0)
+    remainder = rest - full * cycle_xp
+    idx = np.searchsorted(cyc_cum, remainder, side="left")
+    clears[~in_prefix] = len(pre_xp) + full * len(cyc_xp) + idx + 1
+    seconds[~in_prefix] = pre_time + full * cyc_tcum[-1] + cyc_tcum[idx]
+    return clears, seconds
+
+
+def time_to_max(route, base, exponent, max_level):
+    """Seconds to reach max_level for arrays of (base, exponent) pairs."""
+    base, exponent = np.broadcast_arrays(np.asarray(base, dtype=np.float64),
+                                         np.asarray(exponent, dtype=np.float64))
+    totals = xp_to_reach(base.reshape(-1, 1), exponent.reshape(-1, 1), max_level)[:, -1]
+    return solve_route(route, totals)[1].reshape(base.shape)
+
+
+def solve_base(route, target_seconds, exponents, max_level, lo=1.0, hi=1e9, iterations=60):
+    """Curve base hitting target_seconds to max for each exponent (vectorised bisection)."""
+    exponents = np.asarray(exponents, dtype=np.float64)
+    lo = np.full(exponents.shape, lo)
+    hi = np.full(exponents.shape, hi)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        too_fast = time_to_max(route, mid, exponents, max_level) < target_seconds
+        lo = np.where(too_fast, mid, lo)
+        hi = np.where(too_fast, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def solve_exponent(route, target_seconds, base, max_level, lo=0.01, hi=4.0, iterations=60):
+    """Curve exponent hitting target_seconds to max for each base."""
+    base = np.asarray(base, dtype=np.float64)
+    lo = np.full(base.shape, lo)
+    hi = np.full(base.shape, hi)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        too_fast = time_to_max(route, base, mid, max_level) < target_seconds
+        lo = np.where(too_fast, mid, lo)
+        hi = np.where(too_fast, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def parse_range(text):
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        return np.arange(start, stop + step / 2.0, step)
+    return np.array([float(v) for v in text.split(",")])
+
+
+def main():
+    p = argparse.ArgumentParser(description="XP progression solver (game.json > progression)")
+    p.add_argument("--sim", help="tools/score_sim.py --json report: use p50 score and clear time")
+    p.add_argument("--boss-time", type=float, default=60.0, help="Seconds per boss fight (no --sim)")
+    p.add_argument("--score-efficiency", type=float, default=1.0,
+                   help="Share of the compute_scores baseline a player actually scores")
+    p.add_argument("--overrides", type=int, default=0, help="Active Override protocols")
+    p.add_argument("--xp-mult", type=float, default=1.0, help="Player XP gain multiplier (skills)")
+    p.add_argument("--milestones", default="5,10,20,30,40,50,60", help="Player levels to report")
+    p.add_argument("--route", default="", help="Only report this route (campaign, farm_world_3...)")
+    p.add_argument("--target-hours", type=float, help="Solve curve params for this time-to-max")
+    p.add_argument("--solve", default="base", choices=["base", "exponent"],
+                   help="Parameter to solve with --target-hours")
+    p.add_argument("--sweep-base", help="Time-to-max grid: bases 'a:b:step' or 'a,b'")
+    p.add_argument("--sweep-exponent", help="Time-to-max grid: exponents 'a:b:step' or 'a,b'")
+    p.add_argument("--json", help="Write the results to this file")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    prog = load_progression()
+    sim_report = None
+    if args.sim:
+        with open(args.sim, encoding="utf-8") as f:
+            sim_report = json.load(f)
+    rows = level_table(prog, sim_report, args.boss_time, args.score_efficiency, args.overrides, args.xp_mult)
+    routes = build_routes(rows)
+    if args.route:
+        if args.route not in routes:
+            p.error(f"unknown route '{args.route}' (known: {', '.join(routes)})")
+        routes = {args.route: routes[args.route]}
+    max_level = prog["max_level"] or 100
+    result = {"progression": prog, "routes": {}}
+
+    cum_xp = xp_to_reach(prog["base"], prog["exponent"], max_level)
+    milestones = [m for m in (int(v) for v in args.milestones.split(",")) if 2 <= m <= max_level]
+    print(f"Curve: base={prog['base']:g} exponent={prog['exponent']:g} ratio={prog['ratio']:g} "
+          f"max_level={max_level} ({cum_xp[-1]:,.0f} XP to max)\n")
+    print("| Route | " + " | ".join(f"Lv{m} clears / h" for m in milestones) + " |")
+    print("|---|" + "---:|" * len(milestones))
+    for name, route in routes.items():
+        clears, seconds = solve_route(route, cum_xp)
+        result["routes"][name] = {"clears": clears.tolist(), "hours": (seconds / 3600.0).tolist()}
+        cells = [f"{clears[m - 2]:.0f} / {seconds[m - 2] / 3600.0:.1f}" for m in milestones]
+        print(f"| {name} | " + " | ".join(cells) + " |")
+
+    route_name = args.route or "campaign"
+    route = routes[route_name]
+    if args.target_hours:
+        target = args.target_hours * 3600.0
+        if args.solve == "base":
+            exponents = np.round(np.arange(0.5, 1.55, 0.05), 2)
+            bases = solve_base(route, target, exponents, max_level)
+            pairs = list(zip(bases.tolist(), exponents.tolist()))
+        else:
+            bases = np.array([prog["base"] * f for f in (0.5, 0.75, 1.0, 1.25, 1.5)])
+            exponents = solve_exponent(route, target, bases, max_level)
+            pairs = list(zip(bases.tolist(), exponents.tolist()))
+        print(f"\nCurve params reaching level {max_level} in {args.target_hours:g} h on {route_name}:")
+        for base, exponent in pairs:
+            print(f"  base={base:10.0f}  exponent={exponent:.3f}")
+        result["solve"] = [{"base": b, "exponent": e} for b, e in pairs]
+
+    if args.sweep_base or args.sweep_exponent:
+        bases = parse_range(args.sweep_base) if args.sweep_base else np.array([prog["base"]])
+        exponents = parse_range(args.sweep_exponent) if args.sweep_exponent else np.array([prog["exponent"]])
+        grid = time_to_max(route, bases[:, None], exponents[None, :], max_level) / 3600.0
+        print(f"\nTime to level {max_level} on {route_name} (hours), "
+              f"{grid.size} curve variants:")
+        print("base \\ exp " + " ".join(f"{e:7.2f}" for e in exponents))
+        for b, row in zip(bases, grid):
+            print(f"{b:10.0f} " + " ".join(f"{h:7.1f}" for h in row))
+        result["sweep"] = {"bases": bases.tolist(), "exponents": exponents.tolist(), "hours": grid.tolist()}
+
+    print(f"\nSolved in {time.perf_counter() - t0:.3f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""Persistent cross-reference index of data ids and res:// paths.
+
+Scans data/**/*.json, every .tres/.tscn resource of the project and the ids
+built into the runtime scripts (move patterns of Boss.gd/Enemy.gd, wave types
+of WaveManager.gd), and records in a local SQLite database (.cache/xref.sqlite):
+  - defs: every defined id (enemy, boss, obstacle, move/missile pattern,
+    modifier, unique, skill, protocol, ...) and where it is defined;
+  - refs: every reference site (enemy_id, boss_id, loot_table, prerequisite,
+    res:// paths...) with its JSON path (or line for .tres/.tscn files).
+    The boss_id of a minigame wave (suika_up, match3, ...) is a
+    "<type>_boss" reference to wave_types.json > <type>.bosses[].
+
+Updates are incremental: a file is only re-parsed when its mtime/size
+changed *and* its SHA-256 differs from the indexed one. Tools query the
+index instead of re-walking the tree:
+
+    with open_index() as index:
+        index.defined_ids("enemy")
+        index.who_references("boss_forest_final")
+
+Run from repo root:
+    python tools/xref_index.py refs boss_forest_final
+    python tools/xref_index.py dangling --kind enemy
+    python tools/xref_index.py dangling --kind res
+    python tools/xref_index.py defs --kind boss
+    python tools/xref_index.py stats [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from wave_timeline import compute_scores
+
+REPO = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO / "data"
+DB_PATH = Path(os.environ.get("PEWPEWLOOT_XREF_DB", REPO / ".cache" / "xref.sqlite"))
+SCHEMA_VERSION = 1
+
+# (file glob under data/, collection spec, kind). Spec segments: "key[]"
+# iterates a list, "key{}" a dict's values (id defaults to the dict key),
+# a bare "{}" the root dict, "" the root object itself.
+DEF_SPECS = (
+    ("enemies.json", "enemies[]", "enemy"),
+    ("bosses.json", "bosses[]", "boss"),
+    ("obstacles.json", "obstacles{}", "obstacle"),
+    ("patterns/move_patterns.json", "patterns[]", "move_pattern"),
+    ("patterns/missile_patterns_enemy.json", "patterns[]", "missile_pattern"),
+    ("patterns/missile_patterns_player.json", "patterns[]", "player_missile_pattern"),
+    ("missiles/missiles.json", "missiles[]", "missile"),
+    ("missiles/boss_powers.json", "powers[]", "boss_power"),
+    ("missiles/super_powers.json", "powers[]", "super_power"),
+    ("missiles/unique_powers.json", "powers[]", "unique_power"),
+    ("enemy_modifiers.json", "{}", "modifier"),
+    ("loot/uniques.json", "uniques[]", "unique"),
+    ("loot_table.json", "slots[]", "slot"),
+    ("loot_table.json", "affixes{}.[]", "affix"),
+    ("skills.json", "trees{}.branches{}.levels[]", "skill"),
+    ("override_protocols.json", "protocols[]", "protocol"),
+    ("ships/ships.json", "ships[]", "ship"),
+    ("effects.json", "effects[]", "effect"),
+    ("fluids/fluid_presets.json", "{}", "fluid"),
+    ("story.json", "sequences[]", "story"),
+    ("idle_factory.json", "generators[]", "generator"),
+    ("idle_factory.json", "resources{}", "resource"),
+    ("wave_types.json", "{}", "wave_type"),
+    ("worlds/world_*.json", "", "world"),
+    ("worlds/world_*.json", "levels[]", "level"),
+)
+# JSON key -> kind of the id it references.
+REF_KEYS = {
+    "enemy_id": "enemy",
+    "enemy_visual_enemy_id": "enemy",
+    "boss_id": "boss",
+    "source_boss": "boss",
+    "obstacle_id": "obstacle",
+    "move_pattern_id": "move_pattern",
+    "pattern_id": "move_pattern",
+    "missile_pattern_id": "missile_pattern",
+    "missile_id": "missile",
+    "missile_override": "missile",
+    "special_power_id": "boss_power",
+    "unique_power_id": "unique_power",
+    "enemy_modifier_id": "modifier",
+    "loot_table": "unique",
+    "slot": "slot",
+    "prerequisite": "skill",
+    "fluid_id": "fluid",
+    "pool_fluid_id": "fluid",
+    "story_id": "story",
+    "resource_id": "resource",
+    "cost_resource_id": "resource",
+    "world_id": "world",
+}
+# Per-file overrides where the same key points at another namespace.
+REF_KEY_OVERRIDES = {
+    "data/ships/ships.json": {"missile_pattern_id": "player_missile_pattern",
+                              "special_power_id": "super_power"},
+}
+# Ids hardcoded as match labels in the runtime scripts (+ their `_:` default).
+BUILTIN_SOURCES = {
+    "scenes/Boss.gd": ("move_pattern", None),
+    "scenes/Enemy.gd": ("move_pattern", None),
+    "scenes/WaveManager.gd": ("wave_type", "enemy"),
+}
+# Waves run by WaveManager itself; any other type hands the wave to a minigame
+# manager, whose boss_id picks from wave_types.json > <type>.bosses[] (kind
+# "<type>_boss"), not from bosses.json.
+WAVE_MANAGER_TYPES = set(compute_scores.SCORED_WAVE_TYPES) | {"obstacle"}
+_MATCH_LABEL = re.compile(r'^\s+("[a-z0-9_]+"(?:\s*,\s*"[a-z0-9_]+")*)\s*:\s*$', re.M)
+_WAVE_LOC = re.compile(r"levels\[\d+\]\.waves\[\d+\]\.")
+_RES_PATH = re.compile(r'res://[^"\s)\]\\]+')
+SKIP_DIRS = {".git", ".godot", ".cache", ".import", "android"}
+
+
+def _iter_spec(node, segments, path):
+    """Yield (id, json_path) for the objects a DEF_SPECS spec selects."""
+    if not segments:
+        if isinstance(node, dict) and isinstance(node.get("id"), str):
+            yield node["id"], path
+        return
+    seg, rest = segments[0], segments[1:]
+    key, mode = (seg[:-2], seg[-2:]) if seg.endswith(("[]", "{}")) else (seg, "")
+    child = node.get(key) if key and isinstance(node, dict) else node
+    child_path = f"{path}.{key}".lstrip(".") if key else path
+    if mode == "[]" and isinstance(child, list):
+        for i, item in enumerate(child):
+            yield from _iter_spec(item, rest, f"{child_path}[{i}]")
+    elif mode == "{}" and isinstance(child, dict):
+        for k, item in child.items():
+            if not isinstance(item, dict):
+                continue
+            item_path = f"{child_path}.{k}".lstrip(".")
+            if rest:
+                yield from _iter_spec(item, rest, item_path)
+            else:
+                yield str(item.get("id", k)), item_path
+    elif mode == "" and child is not None:
+        yield from _iter_spec(child, rest, child_path)
+
+
+def _walk_refs(node, path, keys, out):
+    if isinstance(node, dict):
+        for k, v in node.items():
+            child = f"{path}.{k}" if path else k
+            kind = keys.get(k)
+            if kind and isinstance(v, str) and v:
+                out.append((kind, v, child))
+            elif kind and isinstance(v, list):
+                out.extend((kind, x, f"{child}[{i}]") for i, x in enumerate(v) if isinstance(x, str) and x)
+            else:
+                _walk_refs(v, child, keys, out)
+    elif isinstance(node, list):
+        for i, v in enumerate(node):
+            _walk_refs(v, f"{path}[{i}]", keys, out)
+    elif isinstance(node, str) and node.startswith("res://"):
+        out.append(("res", node, path))
+
+
+def extract(rel_path, raw):
+    """(defs, refs) of one file: lists of (kind, id, location)."""
+    defs, refs = [], []
+    text = raw.decode("utf-8", errors="replace")
+    if rel_path.endswith(".json"):
+        data = json.loads(text)
+        data_rel = rel_path[len("data/"):]
+        for pattern, spec, kind in DEF_SPECS:
+            if Path(data_rel).match(pattern) and data_rel.count("/") == pattern.count("/"):
+                segments = [s for s in spec.split(".") if s]
+                for def_id, loc in _iter_spec(data, segments, ""):
+                    defs.append((kind, def_id, loc))
+        keys = dict(REF_KEYS, **REF_KEY_OVERRIDES.get(rel_path, {}))
+        _walk_refs(data, "", keys, refs)
+        if rel_path == "data/wave_types.json" and isinstance(data, dict):
+            for wave_type, section in data.items():
+                bosses = section.get("bosses") if isinstance(section, dict) else None
+                for i, boss in enumerate(bosses if isinstance(bosses, list) else []):
+                    if isinstance(boss, dict) and isinstance(boss.get("id"), str):
+                        defs.append((f"{wave_type}_boss", boss["id"], f"{wave_type}.bosses[{i}]"))
+        if rel_path.startswith("data/worlds/"):
+            # Wave types are only references inside waves.
+            minigame = {}
+            for li, level in enumerate(data.get("levels", []) if isinstance(data, dict) else []):
+                for wi, wave in enumerate(level.get("waves", []) if isinstance(level, dict) else []):
+                    if isinstance(wave, dict) and isinstance(wave.get("type"), str):
+                        refs.append(("wave_type", wave["type"], f"levels[{li}].waves[{wi}].type"))
+                    if isinstance(wave, dict):
+                        wave_type = compute_scores.resolve_wave_type(wave)
+                        if wave_type not in WAVE_MANAGER_TYPES:
+                            minigame[f"levels[{li}].waves[{wi}]."] = wave_type
+            for i, (kind, ref_id, loc) in enumerate(refs):
+                m = _WAVE_LOC.match(loc) if kind == "boss" and minigame else None
+                if m and m.group() in minigame:
+                    refs[i] = (f"{minigame[m.group()]}_boss", ref_id, loc)
+    elif rel_path in BUILTIN_SOURCES:
+        kind, default = BUILTIN_SOURCES[rel_path]
+        for m in _MATCH_LABEL.finditer(text):
+            line = text.count("\n", 0, m.start()) + 1
+            for label in m.group(1).split(","):
+                defs.append((kind, label.strip().strip('"'), f"line {line}"))
+        if default:
+            defs.append((kind, default, "match default"))
+    else:
+        for lineno, line in enumerate(text.splitlines(), 1):
+            for m in _RES_PATH.finditer(line):
+                refs.append(("res", m.group(0), f"line {lineno}"))
+    return defs, refs
+
+
+def indexed_files(root=REPO):
+    """Repo-relative posix paths of every file the index covers."""
+    files = [p.relative_to(root).as_posix() for p in (root / "data").rglob("*.json")]
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if name.endswith((".tres", ".tscn")):
+                files.append(Path(dirpath, name).relative_to(root).as_posix())
+    files.extend(rel for rel in BUILTIN_SOURCES if (root / rel).is_file())
+    return sorted(set(files))
+
+
+def _extractor_digest():
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class XrefIndex:
+    def __init__(self, db_path=DB_PATH, root=REPO):
+        self.root = Path(root)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT);
+            CREATE TABLE IF NOT EXISTS defs (kind TEXT, id TEXT, file TEXT, loc TEXT);
+            CREATE TABLE IF NOT EXISTS refs (kind TEXT, id TEXT, file TEXT, loc TEXT);
+            CREATE INDEX IF NOT EXISTS defs_kind_id ON defs (kind, id);
+            CREATE INDEX IF NOT EXISTS defs_file ON defs (file);
+            CREATE INDEX IF NOT EXISTS refs_id ON refs (id, kind);
+            CREATE INDEX IF NOT EXISTS refs_kind ON refs (kind);
+            CREATE INDEX IF NOT EXISTS refs_file ON refs (file);
+        """)
+        # A new schema or extractor version invalidates every indexed file.
+        version = f"{SCHEMA_VERSION}:{_extractor_digest()}"
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if not row or row[0] != version:
+            self.clear()
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+            self.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def clear(self):
+        with self.db:
+            for table in ("files", "defs", "refs"):
+                self.db.execute(f"DELETE FROM {table}")
+
+    def update(self):
+        """Re-index changed files; returns (reparsed, removed) counts."""
+        known = {row[0]: row[1:] for row in self.db.execute("SELECT path, mtime_ns, size, sha256 FROM files")}
+        current = indexed_files(self.root)
+        reparsed = 0
+        with self.db:
+            for rel in current:
+                st = os.stat(self.root / rel)
+                entry = known.get(rel)
+                if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                    continue
+                with open(self.root / rel, "rb") as f:
+                    raw = f.read()
+                sha = hashlib.sha256(raw).hexdigest()
+                if not entry or entry[2] != sha:
+                    self._drop(rel)
+                    try:
+                        defs, refs = extract(rel, raw)
+                    except ValueError as exc:
+                        print(f"[xref] {rel}: {exc}", file=sys.stderr)
+                        defs, refs = [], []
+                    self.db.executemany("INSERT INTO defs VALUES (?, ?, ?, ?)",
+                                        [(k, i, rel, loc) for k, i, loc in defs])
+                    self.db.executemany("INSERT INTO refs VALUES (?, ?, ?, ?)",
+                                        [(k, i, rel, loc) for k, i, loc in refs])
+                    reparsed += 1
+                self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                (rel, st.st_mtime_ns, st.st_size, sha))
+            removed = set(known) - set(current)
+            for rel in removed:
+                self._drop(rel)
+                self.db.execute("DELETE FROM files WHERE path = ?", (rel,))
+        return reparsed, len(removed)
+
+    def _drop(self, rel):
+        self.db.execute("DELETE FROM defs WHERE file = ?", (rel,))
+        self.db.execute("DELETE FROM refs WHERE file = ?", (rel,))
+
+    def defined_ids(self, kind, file=None):
+        if file:
+            rows = self.db.execute("SELECT id FROM defs WHERE kind = ? AND file = ?", (kind, file))
+        else:
+            rows = self.db.execute("SELECT id FROM defs WHERE kind = ?", (kind,))
+        return {row[0] for row in rows}
+
+    def definitions(self, kind=None, def_id=None):
+        sql, args = "SELECT kind, id, file, loc FROM defs WHERE 1", []
+        if kind:
+            sql, args = sql + " AND kind = ?", args + [kind]
+        if def_id:
+            sql, args = sql + " AND id = ?", args + [def_id]
+        return self.db.execute(sql + " ORDER BY kind, id, file", args).fetchall()
+
+    def who_references(self, ref_id, kind=None):
+        sql, args = "SELECT kind, id, file, loc FROM refs WHERE id = ?", [ref_id]
+        if kind:
+            sql, args = sql + " AND kind = ?", args + [kind]
+        return self.db.execute(sql + " ORDER BY file, rowid", args).fetchall()
+
+    def references_in(self, file, loc=None):
+        """References made by one file, optionally only under the JSON path `loc`."""
+        rows = self.db.execute("SELECT kind, id, file, loc FROM refs WHERE file = ? ORDER BY rowid", (file,))
+        if not loc:
+            return rows.fetchall()
+        return [row for row in rows if row[3] == loc or row[3].startswith((loc + ".", loc + "["))]
+
+    def dangling(self, kind=None):
+        """References whose id is defined nowhere (res:// paths: missing on disk)."""
+        rows = []
+        if kind in (None, "res"):
+            exists = {}
+            for row in self.db.execute("SELECT kind, id, file, loc FROM refs WHERE kind = 'res' ORDER BY file, rowid"):
+                res_path = row[1]
+                if res_path not in exists:
+                    exists[res_path] = (self.root / res_path[len("res://"):]).exists()
+                if not exists[res_path]:
+                    rows.append(row)
+        if kind != "res":
+            sql = ("SELECT r.kind, r.id, r.file, r.loc FROM refs r WHERE r.kind != 'res' "
+                   "AND NOT EXISTS (SELECT 1 FROM defs d WHERE d.kind = r.kind AND d.id = r.id)")
+            args = []
+            if kind:
+                sql, args = sql + " AND r.kind = ?", [kind]
+            rows.extend(self.db.execute(sql + " ORDER BY r.file, r.rowid", args).fetchall())
+        return rows
+
+    def stats(self):
+        return {table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("files", "defs", "refs")}
+
+
+def open_index(update=True, db_path=DB_PATH):
+    """Open the index, bringing it up to date with the tree by default."""
+    index = XrefIndex(db_path)
+    if update:
+        index.update()
+    return index
+
+
+def main():
+    p = argparse.ArgumentParser(description="Query the data cross-reference index")
+    p.add_argument("command", choices=["refs", "dangling", "defs", "stats"])
+    p.add_argument("id", nargs="?", help="Id (or res:// path) for refs/defs")
+    p.add_argument("--kind", help="Restrict to one kind (enemy, boss, res, ...)")
+    p.add_argument("--rebuild", action="store_true", help="Drop the index and re-scan everything")
+    p.add_argument("--json", action="store_true", help="JSON lines output")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    index = XrefIndex()
+    if args.rebuild:
+        index.clear()
+    reparsed, removed = index.update()
+    t1 = time.perf_counter()
+
+    if args.command == "refs":
+        if not args.id:
+            p.error("refs needs an id")
+        rows = index.who_references(args.id, args.kind)
+    elif args.command == "dangling":
+        rows = index.dangling(args.kind)
+    elif args.command == "defs":
+        rows = index.definitions(args.kind, args.id)
+    else:
+        rows = []
+        print(json.dumps(index.stats()))
+    t2 = time.perf_counter()
+
+    for kind, ref_id, file, loc in rows:
+        if args.json:
+            print(json.dumps({"kind": kind, "id": ref_id, "file": file, "loc": loc}, ensure_ascii=False))
+        else:
+            print(f"{file}:{loc}  {kind} {ref_id}")
+    print(f"{len(rows)} row(s); update {(t1 - t0) * 1000:.1f} ms ({reparsed} reparsed, {removed} removed), "
+          f"query {(t2 - t1) * 1000:.1f} ms", file=sys.stderr)
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())